@@ -1,3 +1,61 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from api.models import APIKey, UploadIntent, UploadSession
 
-# Register your models here.
+
+class APIKeyAdminForm(forms.ModelForm):
+    """Formulaire de clé d'API avec choix des portées"""
+    
+    scopes = forms.MultipleChoiceField(
+        choices=APIKey.Scope.choices,
+        widget=forms.CheckboxSelectMultiple,
+        required=False,
+    )
+    
+    class Meta:
+        model = APIKey
+        fields = ['user', 'name', 'scopes', 'expires_at', 'revoked']
+
+
+@admin.register(APIKey)
+class APIKeyAdmin(admin.ModelAdmin):
+    form = APIKeyAdminForm
+    list_display = ['name', 'user', 'prefix', 'scopes', 'revoked', 'expires_at', 'last_used_at', 'created_at']
+    list_filter = ['revoked', 'created_at']
+    search_fields = ['name', 'prefix', 'user__username']
+    readonly_fields = ['prefix', 'created_at', 'last_used_at']
+    actions = ['revoke_keys']
+    
+    def save_model(self, request, obj, form, change):
+        """Génère la clé à la création et l'affiche une seule fois"""
+        raw_key = None if change else obj.set_new_key()
+        super().save_model(request, obj, form, change)
+        if raw_key:
+            messages.warning(
+                request,
+                f"Clé d'API créée : {raw_key} — copiez-la maintenant, elle ne sera plus affichée."
+            )
+    
+    @admin.action(description="Révoquer les clés sélectionnées")
+    def revoke_keys(self, request, queryset):
+        # save() par clé pour invalider le cache de recherche
+        for api_key in queryset:
+            api_key.revoked = True
+            api_key.save(update_fields=['revoked'])
+        self.message_user(request, f"{queryset.count()} clé(s) révoquée(s)")
+
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'user', 'status', 'upload_offset', 'upload_length', 'expires_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['file_name', 'user__username']
+    readonly_fields = ['upload_offset', 'document', 'created_at']
+
+
+@admin.register(UploadIntent)
+class UploadIntentAdmin(admin.ModelAdmin):
+    list_display = ['file_name', 'user', 'status', 'size', 'expires_at', 'created_at']
+    list_filter = ['status', 'created_at']
+    search_fields = ['file_name', 'object_key', 'user__username']
+    readonly_fields = ['object_key', 'checksum', 'document', 'created_at']
@@ -0,0 +1,83 @@
+"""
+Authentification par clé d'API pour les clients scriptés
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import authentication, exceptions
+
+from .models import APIKey
+
+
+class APIKeyAuthentication(authentication.BaseAuthentication):
+    """
+    Authentifie les requêtes portant une clé d'API
+    
+    En-têtes acceptés :
+        Authorization: Api-Key <préfixe>.<secret>
+        X-API-Key: <préfixe>.<secret>
+    
+    La clé est retrouvée par son préfixe (mise en cache) puis vérifiée par
+    une empreinte SHA-256 : aucun hachage de mot de passe par requête.
+    L'utilisateur n'est pas mis en cache : il est relu à chaque requête
+    (clé primaire), un compte désactivé est refusé immédiatement.
+    """
+    
+    keyword = 'Api-Key'
+    
+    def authenticate(self, request):
+        raw_key = self._get_raw_key(request)
+        if raw_key is None:
+            return None
+        
+        prefix, _, secret = raw_key.partition('.')
+        if not prefix or not secret:
+            raise exceptions.AuthenticationFailed("Clé d'API mal formée")
+        
+        api_key = self._get_api_key(prefix)
+        if api_key is None or not api_key.check_secret(secret):
+            raise exceptions.AuthenticationFailed("Clé d'API invalide")
+        if not api_key.is_active:
+            raise exceptions.AuthenticationFailed("Clé d'API révoquée ou expirée")
+        user = get_user_model().objects.filter(pk=api_key.user_id).first()
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed("Utilisateur inactif")
+        
+        self._touch(api_key)
+        return user, api_key
+    
+    def authenticate_header(self, request):
+        return self.keyword
+    
+    def _get_raw_key(self, request):
+        """Extrait la clé des en-têtes (None si absente)"""
+        header = authentication.get_authorization_header(request).decode('latin-1')
+        parts = header.split()
+        if parts and parts[0].lower() == self.keyword.lower():
+            if len(parts) != 2:
+                raise exceptions.AuthenticationFailed("En-tête Api-Key invalide")
+            return parts[1]
+        return request.META.get('HTTP_X_API_KEY') or None
+    
+    def _get_api_key(self, prefix):
+        """Recherche la clé par préfixe, avec cache (invalidé à la modification, sans l'utilisateur)"""
+        cache_key = APIKey.cache_key(prefix)
+        api_key = cache.get(cache_key)
+        if api_key is None:
+            api_key = APIKey.objects.filter(prefix=prefix).first()
+            if api_key is None:
+                return None
+            cache.set(cache_key, api_key, settings.API_KEY_CACHE_TIMEOUT)
+        return api_key
+    
+    def _touch(self, api_key):
+        """Met à jour la date de dernière utilisation (au plus une écriture par intervalle)"""
+        now = timezone.now()
+        interval = timedelta(seconds=settings.API_KEY_LAST_USED_INTERVAL)
+        if api_key.last_used_at and now - api_key.last_used_at < interval:
+            return
+        APIKey.objects.filter(pk=api_key.pk).update(last_used_at=now)
+        api_key.last_used_at = now
+        cache.set(APIKey.cache_key(api_key.prefix), api_key, settings.API_KEY_CACHE_TIMEOUT)
@@ -0,0 +1,75 @@
+"""
+Cache des réponses de l'API : cache serveur des documents terminés et
+validation HTTP (ETag, 304 Not Modified)
+"""
+import hashlib
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from documents.models import Document
+
+
+def document_etag(document_id, updated_at, kind: str) -> str:
+    """
+    ETag fort d'une représentation du document
+
+    Dérivé de la date de dernière modification : calculable sans charger
+    ni sérialiser le texte extrait.
+
+    Args:
+        document_id: ID du document
+        updated_at: Document.updated_at
+        kind: Représentation (detail, text, download)
+    """
+    digest = hashlib.sha256(f"{document_id}:{updated_at.isoformat()}:{kind}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """
+    Vérifie If-None-Match (comparaison faible, RFC 9110)
+
+    Un ETag rendu faible par la compression (W/"...") reste valide.
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    candidates = parse_etags(header)
+    if '*' in candidates:
+        return True
+    return etag in [candidate[2:] if candidate.startswith('W/') else candidate for candidate in candidates]
+
+
+def get_document_payload(document_id, kind: str, user) -> Optional[Tuple[Dict, str]]:
+    """
+    Réponse en cache d'un document, si elle appartient à l'utilisateur
+
+    Args:
+        document_id: ID du document (paramètre d'URL)
+        kind: Type de réponse (voir Document.CACHED_PAYLOADS)
+        user: Utilisateur authentifié
+
+    Returns:
+        Tuple (données sérialisées, ETag), ou None (absente ou autre propriétaire)
+    """
+    cached = cache.get(Document.payload_cache_key(document_id, kind))
+    if cached is None or cached['user_id'] != user.pk:
+        return None
+    return cached['data'], cached['etag']
+
+
+def set_document_payload(document: Document, kind: str, data: Dict, etag: str) -> None:
+    """
+    Met en cache la réponse d'un document terminé
+
+    Seuls les documents terminés sont mis en cache : leur contenu ne change
+    plus, et Document.save() / delete() / touch() invalident l'entrée.
+    """
+    if document.status != Document.Status.COMPLETED or settings.DOCUMENT_CACHE_TIMEOUT <= 0:
+        return
+    cache.set(
+        Document.payload_cache_key(document.pk, kind),
+        {'user_id': document.user_id, 'data': data, 'etag': etag},
+        settings.DOCUMENT_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('prefix', models.CharField(editable=False, max_length=16, unique=True, verbose_name='Préfixe')),
+                ('hashed_key', models.CharField(editable=False, max_length=64, verbose_name='Empreinte de la clé')),
+                ('scopes', models.JSONField(blank=True, default=list, verbose_name='Portées')),
+                ('expires_at', models.DateTimeField(blank=True, null=True, verbose_name="Date d'expiration")),
+                ('revoked', models.BooleanField(default=False, verbose_name='Révoquée')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('last_used_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernière utilisation')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_keys', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': "Clé d'API",
+                'verbose_name_plural': "Clés d'API",
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:19
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_apikey'),
+        ('documents', '0009_document_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Type MIME')),
+                ('upload_length', models.PositiveBigIntegerField(verbose_name='Taille totale (octets)')),
+                ('checksum', models.CharField(blank=True, max_length=64, null=True, verbose_name='Empreinte SHA-256 du fichier')),
+                ('upload_offset', models.PositiveBigIntegerField(default=0, verbose_name='Octets reçus')),
+                ('language', models.CharField(blank=True, max_length=10, null=True, verbose_name='Langue demandée')),
+                ('engine', models.CharField(blank=True, max_length=50, null=True, verbose_name='Moteur demandé')),
+                ('status', models.CharField(choices=[('active', 'En cours'), ('completed', 'Terminé')], default='active', max_length=20, verbose_name='Statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('expires_at', models.DateTimeField(verbose_name="Date d'expiration")),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='documents.document', verbose_name='Document créé')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Upload reprenable',
+                'verbose_name_plural': 'Uploads reprenables',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='api_uploads_status_660266_idx')],
+            },
+        ),
+    ]
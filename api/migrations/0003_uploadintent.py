@@ -0,0 +1,43 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:24
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_uploadsession'),
+        ('documents', '0009_document_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadIntent',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255, verbose_name='Nom du fichier')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Type MIME')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Taille (octets)')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Empreinte SHA-256')),
+                ('object_key', models.CharField(max_length=255, unique=True, verbose_name="Clé de l'objet")),
+                ('language', models.CharField(blank=True, max_length=10, null=True, verbose_name='Langue demandée')),
+                ('engine', models.CharField(blank=True, max_length=50, null=True, verbose_name='Moteur demandé')),
+                ('status', models.CharField(choices=[('pending', "En attente de l'envoi"), ('verified', 'Vérifié, import en cours'), ('completed', 'Document créé'), ('failed', 'Refusé')], default='pending', max_length=20, verbose_name='Statut')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name="Message d'erreur")),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('expires_at', models.DateTimeField(verbose_name="Expiration de l'URL d'envoi")),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_intent', to='documents.document', verbose_name='Document créé')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_intents', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Envoi direct',
+                'verbose_name_plural': 'Envois directs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='api_uploadi_status_fcde24_idx')],
+            },
+        ),
+    ]
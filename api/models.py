@@ -1,3 +1,401 @@
+import hashlib
+import hmac
+import os
+import secrets
+import uuid
+from datetime import timedelta
+from django.conf import settings
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class APIKey(models.Model):
+    """
+    Clé d'API d'un client scripté
+    
+    Seule l'empreinte SHA-256 de la partie secrète est stockée : la clé
+    complète (<préfixe>.<secret>) n'est affichée qu'à sa création. Le
+    secret étant aléatoire (256 bits), un hachage rapide suffit, sans le
+    coût de PBKDF2 des mots de passe.
+    """
+    
+    class Scope(models.TextChoices):
+        DOCUMENTS_READ = 'documents:read', _('Lecture des documents')
+        DOCUMENTS_WRITE = 'documents:write', _('Upload et suppression des documents')
+    
+    # Relation
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='api_keys',
+        verbose_name=_("Utilisateur")
+    )
+    
+    # Identification
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Nom")
+    )
+    prefix = models.CharField(
+        max_length=16,
+        unique=True,
+        editable=False,
+        verbose_name=_("Préfixe")
+    )
+    hashed_key = models.CharField(
+        max_length=64,
+        editable=False,
+        verbose_name=_("Empreinte de la clé")
+    )
+    
+    # Droits
+    scopes = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Portées")
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date d'expiration")
+    )
+    revoked = models.BooleanField(
+        default=False,
+        verbose_name=_("Révoquée")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    last_used_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Dernière utilisation")
+    )
+    
+    class Meta:
+        verbose_name = _("Clé d'API")
+        verbose_name_plural = _("Clés d'API")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.prefix})"
+    
+    @staticmethod
+    def hash_secret(secret: str) -> str:
+        """Empreinte SHA-256 de la partie secrète"""
+        return hashlib.sha256(secret.encode()).hexdigest()
+    
+    @staticmethod
+    def cache_key(prefix: str) -> str:
+        """Clé de cache de la recherche par préfixe"""
+        return f'api_key:{prefix}'
+    
+    def set_new_key(self) -> str:
+        """
+        Génère une nouvelle clé (préfixe et secret)
+        
+        Returns:
+            Clé complète à transmettre au client (non récupérable ensuite)
+        """
+        self.prefix = secrets.token_hex(4)
+        secret = secrets.token_urlsafe(32)
+        self.hashed_key = self.hash_secret(secret)
+        return f"{self.prefix}.{secret}"
+    
+    @classmethod
+    def generate(cls, user, name: str, scopes=None, expires_at=None):
+        """
+        Crée une clé d'API
+        
+        Returns:
+            Tuple (APIKey, clé complète)
+        """
+        api_key = cls(user=user, name=name, scopes=list(scopes or []), expires_at=expires_at)
+        raw_key = api_key.set_new_key()
+        api_key.save()
+        return api_key, raw_key
+    
+    def check_secret(self, secret: str) -> bool:
+        """Compare le secret à l'empreinte stockée (temps constant)"""
+        return hmac.compare_digest(self.hash_secret(secret), self.hashed_key)
+    
+    @property
+    def is_active(self) -> bool:
+        """Clé utilisable (non révoquée, non expirée)"""
+        if self.revoked:
+            return False
+        return self.expires_at is None or self.expires_at > timezone.now()
+    
+    def has_scope(self, scope: str) -> bool:
+        """Vérifie qu'une portée est accordée à la clé"""
+        return scope in (self.scopes or [])
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Révocation ou changement de portée : visible dès la requête suivante
+        cache.delete(self.cache_key(self.prefix))
+
+
+@receiver(post_delete, sender=APIKey)
+def invalidate_api_key_cache(sender, instance, **kwargs):
+    """Suppression (y compris QuerySet.delete et cascade depuis l'utilisateur) : clé retirée du cache"""
+    cache.delete(APIKey.cache_key(instance.prefix))
+
+
+class UploadSession(models.Model):
+    """
+    Upload reprenable par morceaux (protocole inspiré de tus)
+    
+    Les morceaux sont écrits à leur offset dans un fichier partiel
+    (voir storage_dir) : après une coupure, le client lit l'offset
+    atteint (HEAD) et reprend à partir de là. La session expire après
+    UPLOAD_SESSION_TTL secondes sans activité.
+    """
+    
+    class Status(models.TextChoices):
+        ACTIVE = 'active', _('En cours')
+        COMPLETED = 'completed', _('Terminé')
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    # Relation
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        verbose_name=_("Utilisateur")
+    )
+    document = models.OneToOneField(
+        'documents.Document',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_session',
+        verbose_name=_("Document créé")
+    )
+    
+    # Fichier annoncé
+    file_name = models.CharField(
+        max_length=255,
+        verbose_name=_("Nom du fichier")
+    )
+    content_type = models.CharField(
+        max_length=100,
+        verbose_name=_("Type MIME")
+    )
+    upload_length = models.PositiveBigIntegerField(
+        verbose_name=_("Taille totale (octets)")
+    )
+    checksum = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        verbose_name=_("Empreinte SHA-256 du fichier")
+    )
+    upload_offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Octets reçus")
+    )
+    
+    # Options OCR
+    language = models.CharField(
+        max_length=10,
+        blank=True,
+        null=True,
+        verbose_name=_("Langue demandée")
+    )
+    engine = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name=_("Moteur demandé")
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+        verbose_name=_("Statut")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_("Date d'expiration")
+    )
+    
+    class Meta:
+        verbose_name = _("Upload reprenable")
+        verbose_name_plural = _("Uploads reprenables")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.upload_offset}/{self.upload_length})"
+    
+    @staticmethod
+    def next_expiry():
+        """Date d'expiration d'une session active à partir de maintenant"""
+        return timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+    
+    @staticmethod
+    def storage_dir() -> str:
+        """Répertoire des fichiers partiels"""
+        return settings.UPLOAD_SESSION_DIR or os.path.join(settings.MEDIA_ROOT, 'uploads', 'partial')
+    
+    @property
+    def partial_path(self) -> str:
+        """Chemin du fichier partiel"""
+        return os.path.join(self.storage_dir(), f"{self.pk}.part")
+    
+    @property
+    def is_complete(self) -> bool:
+        """Tous les octets annoncés ont été reçus"""
+        return self.upload_offset == self.upload_length
+    
+    @property
+    def is_expired(self) -> bool:
+        return self.status == self.Status.ACTIVE and self.expires_at <= timezone.now()
+    
+    def delete_partial_file(self):
+        """Supprime le fichier partiel (ignoré s'il n'existe pas)"""
+        try:
+            os.remove(self.partial_path)
+        except FileNotFoundError:
+            pass
+    
+    def save(self, *args, **kwargs):
+        if self.expires_at is None:
+            self.expires_at = self.next_expiry()
+        super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        self.delete_partial_file()
+        return super().delete(*args, **kwargs)
+
+
+class UploadIntent(models.Model):
+    """
+    Envoi direct d'un fichier vers le stockage objet (URL présignée)
+    
+    Le client annonce le fichier (nom, type, taille, empreinte SHA-256),
+    l'envoie au stockage puis signale la fin de l'envoi : les métadonnées
+    de l'objet sont vérifiées avant que le document soit créé.
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('En attente de l\'envoi')
+        VERIFIED = 'verified', _('Vérifié, import en cours')
+        COMPLETED = 'completed', _('Document créé')
+        FAILED = 'failed', _('Refusé')
+    
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    
+    # Relation
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='upload_intents',
+        verbose_name=_("Utilisateur")
+    )
+    document = models.OneToOneField(
+        'documents.Document',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload_intent',
+        verbose_name=_("Document créé")
+    )
+    
+    # Fichier annoncé
+    file_name = models.CharField(
+        max_length=255,
+        verbose_name=_("Nom du fichier")
+    )
+    content_type = models.CharField(
+        max_length=100,
+        verbose_name=_("Type MIME")
+    )
+    size = models.PositiveBigIntegerField(
+        verbose_name=_("Taille (octets)")
+    )
+    checksum = models.CharField(
+        max_length=64,
+        verbose_name=_("Empreinte SHA-256")
+    )
+    object_key = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_("Clé de l'objet")
+    )
+    
+    # Options OCR
+    language = models.CharField(
+        max_length=10,
+        blank=True,
+        null=True,
+        verbose_name=_("Langue demandée")
+    )
+    engine = models.CharField(
+        max_length=50,
+        blank=True,
+        null=True,
+        verbose_name=_("Moteur demandé")
+    )
+    
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Statut")
+    )
+    error_message = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name=_("Message d'erreur")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    expires_at = models.DateTimeField(
+        verbose_name=_("Expiration de l'URL d'envoi")
+    )
+    
+    class Meta:
+        verbose_name = _("Envoi direct")
+        verbose_name_plural = _("Envois directs")
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.file_name} ({self.status})"
+    
+    @property
+    def is_expired(self) -> bool:
+        return self.status == self.Status.PENDING and self.expires_at <= timezone.now()
@@ -0,0 +1,224 @@
+"""
+Client minimal d'un stockage objet compatible S3 (AWS S3, MinIO...)
+
+Les URL sont présignées (AWS Signature Version 4, authentification par
+paramètres de requête) : le client envoie le fichier directement au
+stockage, sans passer par les processus web. Le serveur n'utilise le
+stockage que pour de petites requêtes (HEAD, DELETE) et les workers
+pour rapatrier les fichiers (GET).
+"""
+import base64
+import hashlib
+import hmac
+import http.client
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Optional
+from urllib.parse import quote, urlsplit
+from django.conf import settings
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+UNSIGNED_PAYLOAD = 'UNSIGNED-PAYLOAD'
+
+
+class ObjectStoreError(Exception):
+    """Réponse inattendue du stockage objet"""
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _encode(value: str) -> str:
+    return quote(value, safe='-_.~')
+
+
+def presign_url(method: str, url: str, access_key: str, secret_key: str, region: str,
+                expires: int, headers: Optional[Dict[str, str]] = None,
+                now: Optional[datetime] = None, service: str = 's3') -> str:
+    """
+    Présigne une URL (AWS Signature Version 4, paramètres de requête)
+
+    Args:
+        method: Méthode HTTP (PUT, GET, HEAD, DELETE)
+        url: URL de l'objet, sans paramètres
+        access_key: Identifiant de la clé d'accès
+        secret_key: Clé secrète
+        region: Région de signature
+        expires: Validité de l'URL (secondes)
+        headers: En-têtes signés, que le client doit envoyer à l'identique
+            (Host est toujours signé)
+        now: Date de signature (défaut: maintenant)
+
+    Returns:
+        URL présignée
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    scope = f"{now.strftime('%Y%m%d')}/{region}/{service}/aws4_request"
+
+    parts = urlsplit(url)
+    signed = {'host': parts.netloc}
+    signed.update({name.lower(): str(value).strip() for name, value in (headers or {}).items()})
+    signed_headers = ';'.join(sorted(signed))
+
+    params = {
+        'X-Amz-Algorithm': ALGORITHM,
+        'X-Amz-Credential': f"{access_key}/{scope}",
+        'X-Amz-Date': amz_date,
+        'X-Amz-Expires': str(expires),
+        'X-Amz-SignedHeaders': signed_headers,
+    }
+    canonical_query = '&'.join(f"{_encode(k)}={_encode(v)}" for k, v in sorted(params.items()))
+    canonical_request = '\n'.join([
+        method.upper(),
+        quote(parts.path or '/', safe='/-_.~'),
+        canonical_query,
+        ''.join(f"{name}:{signed[name]}\n" for name in sorted(signed)),
+        signed_headers,
+        UNSIGNED_PAYLOAD,
+    ])
+    string_to_sign = '\n'.join([
+        ALGORITHM,
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ])
+
+    key = _hmac(f"AWS4{secret_key}".encode(), now.strftime('%Y%m%d'))
+    for part in (region, service, 'aws4_request'):
+        key = _hmac(key, part)
+    signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+    return f"{parts.scheme}://{parts.netloc}{quote(parts.path or '/', safe='/-_.~')}?{canonical_query}&X-Amz-Signature={signature}"
+
+
+def checksum_header_value(sha256_hex: str) -> str:
+    """Valeur de l'en-tête x-amz-checksum-sha256 (empreinte en base64)"""
+    return base64.b64encode(bytes.fromhex(sha256_hex)).decode()
+
+
+class S3ObjectStore:
+    """
+    Bucket d'un stockage compatible S3 (adressage par chemin)
+
+    Args:
+        endpoint: URL du stockage utilisée par le serveur (ex: http://minio:9000)
+        bucket: Nom du bucket
+        public_endpoint: URL du stockage utilisée par les clients (défaut: endpoint)
+    """
+
+    def __init__(self, endpoint: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = 'us-east-1', public_endpoint: Optional[str] = None):
+        self.endpoint = endpoint.rstrip('/')
+        self.public_endpoint = (public_endpoint or endpoint).rstrip('/')
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+
+    def object_url(self, key: str, public: bool = False) -> str:
+        endpoint = self.public_endpoint if public else self.endpoint
+        return f"{endpoint}/{self.bucket}/{key}"
+
+    def _presign(self, method, key, expires=300, headers=None, public=False) -> str:
+        return presign_url(method, self.object_url(key, public), self.access_key, self.secret_key,
+                           self.region, expires, headers=headers)
+
+    def presigned_put(self, key: str, content_type: str, size: int, sha256_hex: str, expires: int) -> Dict:
+        """
+        Cible d'envoi direct d'un fichier
+
+        Le type, la taille et l'empreinte SHA-256 sont signés : le stockage
+        refuse un envoi qui ne les respecte pas (empreinte vérifiée à la
+        réception via x-amz-checksum-sha256).
+
+        Returns:
+            Dict (method, url, headers) à transmettre au client
+        """
+        headers = {
+            'Content-Type': content_type,
+            'Content-Length': str(size),
+            'x-amz-checksum-sha256': checksum_header_value(sha256_hex),
+        }
+        return {
+            'method': 'PUT',
+            'url': self._presign('PUT', key, expires, headers=headers, public=True),
+            'headers': headers,
+        }
+
+    def _request(self, method: str, key: str, headers: Optional[Dict[str, str]] = None):
+        url = urlsplit(self._presign(method, key, headers=headers))
+        connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(url.netloc, timeout=settings.OBJECT_STORE_TIMEOUT)
+        connection.request(method, f"{url.path}?{url.query}", headers=headers or {})
+        return connection, connection.getresponse()
+
+    def head(self, key: str) -> Optional[Dict]:
+        """
+        Métadonnées d'un objet
+
+        Returns:
+            Dict (size, content_type, checksum_sha256) ou None si l'objet
+            n'existe pas ; checksum_sha256 (hexadécimal) est None si le
+            stockage ne conserve pas l'empreinte
+        """
+        connection, response = self._request('HEAD', key, headers={'x-amz-checksum-mode': 'ENABLED'})
+        try:
+            response.read()
+            if response.status == 404:
+                return None
+            if response.status != 200:
+                raise ObjectStoreError(f"HEAD {key}: HTTP {response.status}")
+            checksum = response.getheader('x-amz-checksum-sha256')
+            return {
+                'size': int(response.getheader('Content-Length', 0)),
+                'content_type': (response.getheader('Content-Type') or '').split(';')[0].strip(),
+                'checksum_sha256': base64.b64decode(checksum).hex() if checksum else None,
+            }
+        finally:
+            connection.close()
+
+    def download(self, key: str, destination, block_size: int = 64 * 1024) -> str:
+        """
+        Copie un objet dans un fichier, par blocs
+
+        Args:
+            key: Clé de l'objet
+            destination: Fichier ouvert en écriture binaire
+
+        Returns:
+            Empreinte SHA-256 (hexadécimale) du contenu copié
+        """
+        connection, response = self._request('GET', key)
+        try:
+            if response.status != 200:
+                raise ObjectStoreError(f"GET {key}: HTTP {response.status}")
+            digest = hashlib.sha256()
+            for block in iter(lambda: response.read(block_size), b''):
+                destination.write(block)
+                digest.update(block)
+            return digest.hexdigest()
+        finally:
+            connection.close()
+
+    def delete(self, key: str) -> None:
+        connection, response = self._request('DELETE', key)
+        try:
+            response.read()
+            if response.status not in (200, 204, 404):
+                raise ObjectStoreError(f"DELETE {key}: HTTP {response.status}")
+        finally:
+            connection.close()
+
+
+def get_object_store() -> Optional[S3ObjectStore]:
+    """Stockage des envois directs, None si OBJECT_STORE_ENDPOINT n'est pas configuré"""
+    if not settings.OBJECT_STORE_ENDPOINT:
+        return None
+    return S3ObjectStore(
+        endpoint=settings.OBJECT_STORE_ENDPOINT,
+        bucket=settings.OBJECT_STORE_BUCKET,
+        access_key=settings.OBJECT_STORE_ACCESS_KEY,
+        secret_key=settings.OBJECT_STORE_SECRET_KEY,
+        region=settings.OBJECT_STORE_REGION,
+        public_endpoint=settings.OBJECT_STORE_PUBLIC_ENDPOINT or None,
+    )
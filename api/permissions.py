@@ -0,0 +1,24 @@
+"""
+Permissions de l'API REST
+"""
+from rest_framework import permissions
+
+from .models import APIKey
+
+
+class HasAPIKeyScope(permissions.BasePermission):
+    """
+    Vérifie la portée de la clé d'API utilisée
+    
+    Lecture (GET, HEAD, OPTIONS) : documents:read ; écriture : documents:write.
+    Les requêtes authentifiées autrement (session, Basic) ne sont pas limitées.
+    """
+    
+    message = "La clé d'API n'a pas la portée requise"
+    
+    def has_permission(self, request, view):
+        if not isinstance(request.auth, APIKey):
+            return True
+        if request.method in permissions.SAFE_METHODS:
+            return request.auth.has_scope(APIKey.Scope.DOCUMENTS_READ)
+        return request.auth.has_scope(APIKey.Scope.DOCUMENTS_WRITE)
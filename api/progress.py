@@ -0,0 +1,81 @@
+"""
+Suivi des documents en cours de traitement : statut groupé et attente longue
+"""
+import time
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from documents.models import Document
+
+STATUS_FIELDS = ('id', 'status', 'pages_count', 'error_code', 'queued_at', 'processed_at', 'updated_at')
+
+
+def document_statuses(queryset, ids: Iterable[int]) -> List[Dict]:
+    """
+    Statut et progression de plusieurs documents en une requête
+
+    Seules les colonnes de statut sont lues (clé primaire), les pages déjà
+    traitées sont comptées dans la même requête.
+
+    Args:
+        queryset: Documents de l'utilisateur
+        ids: IDs demandés (les IDs inconnus sont ignorés)
+
+    Returns:
+        Liste de dicts (id, status, pages_count, pages_done, progress...)
+    """
+    rows = (
+        queryset.filter(pk__in=list(ids))
+        .order_by('pk')
+        .values(*STATUS_FIELDS)
+        .annotate(pages_done=Count('page_results'))
+    )
+    statuses = []
+    for row in rows:
+        if row['status'] == Document.Status.COMPLETED:
+            row['pages_done'] = row['pages_count']
+        row['progress'] = round(row['pages_done'] / row['pages_count'], 3) if row['pages_count'] else 0.0
+        statuses.append(row)
+    return statuses
+
+
+def wait_for_document(queryset, document_id: int, timeout: float) -> Optional[Dict]:
+    """
+    Attend la fin du traitement d'un document (terminé ou en échec)
+
+    L'attente lit le signal posé en cache à la fin de
+    process_document_ocr, sans interroger la base. La base n'est relue
+    qu'au signal, et toutes les API_WAIT_DB_INTERVAL secondes au cas où un
+    signal aurait été perdu. La connexion à la base est rendue pendant
+    l'attente.
+
+    Args:
+        queryset: Documents de l'utilisateur
+        document_id: ID du document
+        timeout: Durée maximale d'attente (secondes)
+
+    Returns:
+        Statut du document (voir document_statuses) à la fin du traitement
+        ou à l'expiration du délai, None si le document n'existe pas
+    """
+    signal_key = Document.signal_cache_key(document_id)
+    signal = cache.get(signal_key)
+    deadline = time.monotonic() + timeout
+    while True:
+        statuses = document_statuses(queryset, [document_id])
+        if not statuses or statuses[0]['status'] in Document.FINAL_STATUSES:
+            return statuses[0] if statuses else None
+        if time.monotonic() >= deadline:
+            return statuses[0]
+
+        if not connection.in_atomic_block:
+            connection.close()
+        next_db_check = min(deadline, time.monotonic() + settings.API_WAIT_DB_INTERVAL)
+        while time.monotonic() < next_db_check:
+            time.sleep(min(settings.API_WAIT_POLL_INTERVAL, max(next_db_check - time.monotonic(), 0)))
+            current = cache.get(signal_key)
+            if current != signal:
+                signal = current
+                break
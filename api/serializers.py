@@ -1,9 +1,71 @@
 """
 Serializers pour l'API REST
 """
+from urllib.parse import urlsplit
 from rest_framework import serializers
-from documents.models import Document, OCRResult
+from django.conf import settings
+from documents.models import Document, OCRRegionResult, OCRResult, OCRTemplate
 from django.contrib.auth.models import User
+from ocr.validators.region_validator import RegionValidator
+from webhooks.delivery import resolve_public_addresses
+from webhooks.models import WebhookEndpoint
+from .models import UploadIntent, UploadSession
+
+
+def split_field_names(names):
+    """
+    Sépare les noms de champs de premier niveau des noms imbriqués
+
+    Args:
+        names: Noms de champs, éventuellement pointés (ex: ocr_result.raw_text)
+
+    Returns:
+        Tuple (noms de premier niveau, {champ imbriqué: noms})
+    """
+    top_level, nested = set(), {}
+    for name in names:
+        parent, _, child = name.partition('.')
+        if child:
+            nested.setdefault(parent, []).append(child)
+        else:
+            top_level.add(parent)
+    return top_level, nested
+
+
+class SparseFieldsMixin:
+    """
+    Sélection des champs rendus par un serializer (fields, exclude, expand)
+
+    Les champs de Meta.expandable_fields (textes volumineux) ne sont rendus
+    que s'ils sont demandés par expand ou fields. Les noms pointés
+    (ocr_result.raw_text) s'appliquent aux serializers imbriqués.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested, nested_fields = split_field_names(fields or [])
+        excluded, nested_exclude = split_field_names(exclude or [])
+        expanded, nested_expand = split_field_names(expand or [])
+        # Un champ imbriqué demandé (ocr_result.word_count) inclut son parent
+        requested |= set(nested_fields)
+        expandable = getattr(self.Meta, 'expandable_fields', ())
+
+        for name in list(self.fields):
+            if fields and name not in requested:
+                self.fields.pop(name)
+            elif name in excluded:
+                self.fields.pop(name)
+            elif name in expandable and name not in expanded and name not in requested:
+                self.fields.pop(name)
+            elif isinstance(self.fields[name], SparseFieldsMixin) and (
+                name in nested_fields or name in nested_exclude or name in nested_expand
+            ):
+                self.fields[name] = self.fields[name].__class__(
+                    read_only=True,
+                    fields=nested_fields.get(name),
+                    exclude=nested_exclude.get(name),
+                    expand=nested_expand.get(name),
+                )
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -15,8 +77,8 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['id']
 
 
-class OCRResultSerializer(serializers.ModelSerializer):
-    """Serializer pour les résultats OCR"""
+class OCRResultSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Serializer pour les résultats OCR (textes rendus sur demande)"""
     
     class Meta:
         model = OCRResult
@@ -30,15 +92,41 @@ class OCRResultSerializer(serializers.ModelSerializer):
             'word_count',
             'character_count',
             'processing_time',
+            'stage_timings',
+            'version',
             'created_at',
         ]
         read_only_fields = fields
+        expandable_fields = ['raw_text', 'cleaned_text']
 
 
-class DocumentSerializer(serializers.ModelSerializer):
-    """Serializer pour les documents"""
+class OCRRegionResultSerializer(serializers.ModelSerializer):
+    """Serializer pour les résultats OCR par zone"""
+    
+    class Meta:
+        model = OCRRegionResult
+        fields = [
+            'name',
+            'page_number',
+            'text',
+            'confidence_score',
+            'language_detected',
+            'engine_used',
+        ]
+        read_only_fields = fields
+
+
+class DocumentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    Serializer pour les documents
+
+    Le texte extrait n'est rendu que sur demande (?expand=extracted_text,
+    ocr_result.cleaned_text...) : un client qui suit le statut ne reçoit
+    pas les textes.
+    """
     user = UserSerializer(read_only=True)
     ocr_result = OCRResultSerializer(read_only=True)
+    region_results = OCRRegionResultSerializer(many=True, read_only=True)
     file_url = serializers.SerializerMethodField()
     
     class Meta:
@@ -57,9 +145,13 @@ class DocumentSerializer(serializers.ModelSerializer):
             'confidence_score',
             'status',
             'error_message',
+            'error_code',
             'uploaded_at',
+            'queued_at',
             'processed_at',
             'ocr_result',
+            'ocr_regions',
+            'region_results',
         ]
         read_only_fields = [
             'id',
@@ -74,10 +166,15 @@ class DocumentSerializer(serializers.ModelSerializer):
             'confidence_score',
             'status',
             'error_message',
+            'error_code',
             'uploaded_at',
+            'queued_at',
             'processed_at',
             'ocr_result',
+            'ocr_regions',
+            'region_results',
         ]
+        expandable_fields = ['extracted_text']
     
     def get_file_url(self, obj):
         """Retourne l'URL du fichier"""
@@ -105,9 +202,144 @@ class DocumentUploadSerializer(serializers.Serializer):
         default='tesseract',
         help_text="Nom du moteur OCR à utiliser (ex: tesseract). Par défaut: tesseract"
     )
+    regions = serializers.JSONField(
+        required=False,
+        allow_null=True,
+        help_text="Zones à lire (JSON) : [{name, page, x, y, width, height, single_line}], "
+                  "coordonnées relatives à la page (0 à 1)"
+    )
+    template = serializers.IntegerField(
+        required=False,
+        allow_null=True,
+        help_text="ID d'un modèle de formulaire (zones enregistrées)"
+    )
+    
+    def validate(self, attrs):
+        """Zones explicites ou modèle de formulaire de l'utilisateur, normalisées"""
+        regions = attrs.get('regions')
+        template_id = attrs.pop('template', None)
+        if regions is not None and template_id is not None:
+            raise serializers.ValidationError("Indiquer des zones ou un modèle, pas les deux")
+        if template_id is not None:
+            request = self.context.get('request')
+            template = OCRTemplate.objects.filter(pk=template_id, user=getattr(request, 'user', None)).first()
+            if template is None:
+                raise serializers.ValidationError({'template': "Modèle de formulaire inconnu"})
+            regions = template.regions
+        if regions is not None:
+            try:
+                attrs['regions'] = RegionValidator().normalize(regions)
+            except ValueError as e:
+                raise serializers.ValidationError({'regions': str(e)})
+        return attrs
 
 
-class DocumentListSerializer(serializers.ModelSerializer):
+class OCRTemplateSerializer(serializers.ModelSerializer):
+    """Serializer des modèles de formulaire (zones OCR nommées)"""
+    
+    class Meta:
+        model = OCRTemplate
+        fields = ['id', 'name', 'regions', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+    
+    def validate_name(self, value):
+        """Nom unique parmi les modèles de l'utilisateur"""
+        templates = OCRTemplate.objects.filter(user=self.context['request'].user, name=value)
+        if self.instance is not None:
+            templates = templates.exclude(pk=self.instance.pk)
+        if templates.exists():
+            raise serializers.ValidationError("Un modèle porte déjà ce nom")
+        return value
+    
+    def validate_regions(self, value):
+        """Zones normalisées (voir RegionValidator)"""
+        try:
+            return RegionValidator().normalize(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """Serializer des uploads reprenables"""
+    language = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Code langue ISO 639-2 (ex: fra, eng). Laissé vide pour auto-détection."
+    )
+    engine = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        default='tesseract',
+        help_text="Nom du moteur OCR à utiliser (ex: tesseract). Par défaut: tesseract"
+    )
+    checksum = serializers.RegexField(
+        r'^[0-9a-fA-F]{64}$',
+        required=False,
+        allow_null=True,
+        help_text="Empreinte SHA-256 (hexadécimale) du fichier complet, vérifiée à la validation"
+    )
+    
+    class Meta:
+        model = UploadSession
+        fields = [
+            'id',
+            'file_name',
+            'content_type',
+            'upload_length',
+            'upload_offset',
+            'checksum',
+            'language',
+            'engine',
+            'status',
+            'document',
+            'created_at',
+            'expires_at',
+        ]
+        read_only_fields = ['id', 'upload_offset', 'status', 'document', 'created_at', 'expires_at']
+
+
+class UploadIntentSerializer(serializers.ModelSerializer):
+    """Serializer des envois directs vers le stockage objet"""
+    language = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        help_text="Code langue ISO 639-2 (ex: fra, eng). Laissé vide pour auto-détection."
+    )
+    engine = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        allow_null=True,
+        default='tesseract',
+        help_text="Nom du moteur OCR à utiliser (ex: tesseract). Par défaut: tesseract"
+    )
+    checksum = serializers.RegexField(
+        r'^[0-9a-fA-F]{64}$',
+        help_text="Empreinte SHA-256 (hexadécimale) du fichier"
+    )
+    
+    class Meta:
+        model = UploadIntent
+        fields = [
+            'id',
+            'file_name',
+            'content_type',
+            'size',
+            'checksum',
+            'language',
+            'engine',
+            'status',
+            'error_message',
+            'document',
+            'created_at',
+            'expires_at',
+        ]
+        read_only_fields = ['id', 'status', 'error_message', 'document', 'created_at', 'expires_at']
+
+
+class DocumentListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer simplifié pour la liste des documents"""
     user = serializers.StringRelatedField(read_only=True)
     
@@ -125,3 +357,56 @@ class DocumentListSerializer(serializers.ModelSerializer):
             'processed_at',
         ]
         read_only_fields = fields
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    """
+    Serializer des webhooks
+
+    Le secret de signature n'est rendu qu'à la création.
+    """
+    events = serializers.ListField(
+        child=serializers.ChoiceField(choices=WebhookEndpoint.Event.choices),
+        required=False,
+        help_text="Événements notifiés (vide : tous)"
+    )
+
+    class Meta:
+        model = WebhookEndpoint
+        fields = [
+            'id',
+            'url',
+            'events',
+            'is_active',
+            'secret',
+            'consecutive_failures',
+            'last_success_at',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'secret', 'consecutive_failures', 'last_success_at', 'created_at']
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if not self.context.get('include_secret'):
+            data.pop('secret', None)
+        return data
+
+    def validate_url(self, value):
+        """
+        URL http(s), hors réseau local sauf WEBHOOK_ALLOW_PRIVATE_URLS
+
+        Le nom d'hôte est résolu : toutes ses adresses doivent être
+        publiques (vérifiées de nouveau à chaque envoi).
+        """
+        parts = urlsplit(value)
+        if parts.scheme not in ('http', 'https'):
+            raise serializers.ValidationError("Seules les URL http et https sont acceptées")
+        if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+            return value
+        try:
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+            resolve_public_addresses(parts.hostname, port)
+        except ValueError as e:
+            # UnsafeWebhookURLError ou port invalide
+            raise serializers.ValidationError(str(e))
+        return value
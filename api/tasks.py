@@ -0,0 +1,106 @@
+"""
+Tâches Celery de l'app api
+"""
+import http.client
+import logging
+from celery import shared_task
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from documents.services.document_service import DocumentService
+from .models import UploadIntent, UploadSession
+from .object_store import ObjectStoreError, get_object_store
+from .upload_intents import import_upload_intent
+from .uploads import UploadError
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='api.expire_upload_sessions')
+def expire_upload_sessions_task(limit=1000):
+    """
+    Supprime les uploads reprenables abandonnés et leurs fichiers partiels
+
+    Tâche périodique (Celery Beat) : une session expire après
+    UPLOAD_SESSION_TTL secondes sans nouveau morceau. Les sessions
+    terminées (document créé) sont supprimées à la même échéance. Les
+    envois directs jamais signalés sont supprimés avec le même délai de
+    grâce après l'expiration de leur URL, de même que les envois vérifiés
+    jamais importés (tâche perdue) et les envois en échec.
+
+    Args:
+        limit: Nombre maximum de sessions supprimées par exécution
+
+    Returns:
+        Nombre de sessions et d'envois directs supprimés
+    """
+    now = timezone.now()
+    expired = UploadSession.objects.filter(expires_at__lte=now)[:limit]
+    count = 0
+    for session in expired:
+        # delete() supprime aussi le fichier partiel
+        session.delete()
+        count += 1
+
+    # Envois directs non terminés (jamais signalés, jamais importés ou en
+    # échec) : objet éventuel supprimé du stockage
+    store = get_object_store()
+    abandoned = UploadIntent.objects.filter(
+        status__in=[UploadIntent.Status.PENDING, UploadIntent.Status.VERIFIED, UploadIntent.Status.FAILED],
+        expires_at__lte=now - timedelta(seconds=settings.UPLOAD_SESSION_TTL),
+    )[:limit]
+    for intent in abandoned:
+        if store is not None:
+            store.delete(intent.object_key)
+        intent.delete()
+        count += 1
+    if count:
+        logger.info("%s uploads reprenables expirés supprimés", count)
+    return count
+
+
+@shared_task(
+    bind=True,
+    name='api.import_upload_intent',
+    autoretry_for=(OSError, http.client.HTTPException, ObjectStoreError),
+    retry_backoff=True,
+    max_retries=3,
+)
+def import_upload_intent_task(self, intent_id):
+    """
+    Rapatrie un envoi direct vérifié, crée le document et lance l'OCR
+
+    Les erreurs réseau et les réponses inattendues du stockage sont
+    réessayées (backoff exponentiel) ; une fois les essais épuisés, l'envoi
+    passe en échec.
+
+    Args:
+        intent_id: ID de l'envoi direct
+
+    Returns:
+        ID du document créé, None si l'envoi a été refusé
+    """
+    intent = UploadIntent.objects.select_related('user').get(pk=intent_id)
+    if intent.status == UploadIntent.Status.COMPLETED:
+        return intent.document_id
+    service = DocumentService()
+    try:
+        document = import_upload_intent(get_object_store(), intent, service)
+    except UploadError as e:
+        logger.warning("Envoi direct %s refusé: %s", intent_id, e)
+        return None
+    except (OSError, http.client.HTTPException, ObjectStoreError) as e:
+        if self.request.retries >= self.max_retries:
+            # Essais épuisés : l'objet est supprimé par expire_upload_sessions
+            UploadIntent.objects.filter(pk=intent.pk, status=UploadIntent.Status.VERIFIED).update(
+                status=UploadIntent.Status.FAILED,
+                error_message=f"Import impossible, stockage objet indisponible: {e}",
+            )
+            logger.error("Import de l'envoi direct %s abandonné: %s", intent_id, e)
+        raise
+    service.queue_document_ocr(
+        document=document,
+        language=intent.language,
+        engine_name=intent.engine or 'tesseract'
+    )
+    return document.id
@@ -0,0 +1,115 @@
+"""
+Limitation de débit de l'API
+"""
+import time
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import BaseThrottle
+
+# Prélèvement atomique d'un jeton (Redis) : lecture, recharge et écriture
+# en une seule opération côté serveur
+TAKE_TOKEN_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated_at = tonumber(redis.call('HGET', KEYS[1], 'updated_at'))
+if tokens == nil or updated_at == nil then
+    tokens = capacity
+    updated_at = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * refill_rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Seau à jetons par utilisateur (par IP pour les requêtes anonymes)
+    
+    Appliqué aux seules soumissions OCR (création de document, fin d'un
+    upload reprenable ou d'un envoi direct) : les morceaux d'upload,
+    l'attente longue, les lectures et la gestion des modèles et webhooks
+    ne consomment pas de jetons.
+    
+    Le seau contient au plus RATE_LIMIT_REQUESTS jetons et se recharge
+    en continu de RATE_LIMIT_REQUESTS jetons par RATE_LIMIT_WINDOW
+    secondes : les rafales courtes passent, un débit soutenu est lissé.
+    L'état est stocké dans le cache partagé (Redis en production), commun
+    à tous les processus web. Le prélèvement d'un jeton est atomique : un
+    script Lua avec Redis, un verrou dans le cache pour les autres
+    backends. Des soumissions concurrentes ne passent pas toutes sur le
+    même solde.
+    """
+    
+    cache_format = 'throttle:bucket:{ident}'
+    # Verrou des backends sans script : durée de vie et attente maximale (secondes)
+    lock_timeout = 5
+    lock_wait = 1.0
+    
+    def __init__(self):
+        self.capacity = settings.RATE_LIMIT_REQUESTS
+        self.window = settings.RATE_LIMIT_WINDOW
+        self._wait = None
+    
+    def get_cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'ip:{self.get_ident(request)}'
+        return self.cache_format.format(ident=ident)
+    
+    def allow_request(self, request, view):
+        if self.capacity <= 0 or self.window <= 0:
+            return True
+        
+        refill_rate = self.capacity / self.window
+        key = self.get_cache_key(request)
+        now = time.time()
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], RedisCache):
+            allowed, tokens = self._take_token_redis(key, refill_rate, now)
+        else:
+            allowed, tokens = self._take_token_locked(key, refill_rate, now)
+        if not allowed:
+            self._wait = (1 - tokens) / refill_rate
+        return allowed
+    
+    def _take_token_redis(self, key, refill_rate, now):
+        """Prélève un jeton par le script Lua (une seule opération Redis)"""
+        redis_key = cache.make_and_validate_key(key)
+        client = cache._cache.get_client(redis_key, write=True)
+        allowed, tokens = client.register_script(TAKE_TOKEN_SCRIPT)(
+            keys=[redis_key], args=[self.capacity, refill_rate, now, self.window]
+        )
+        return bool(allowed), float(tokens)
+    
+    def _take_token_locked(self, key, refill_rate, now):
+        """Prélève un jeton sous un verrou posé dans le cache (cache.add)"""
+        lock_key = f'{key}:lock'
+        deadline = time.monotonic() + self.lock_wait
+        while not cache.add(lock_key, 1, self.lock_timeout):
+            if time.monotonic() >= deadline:
+                # Verrou non obtenu : la soumission est refusée, pas comptée deux fois
+                return False, 0.0
+            time.sleep(0.005)
+        try:
+            tokens, updated_at = cache.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + max(0.0, now - updated_at) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            cache.set(key, (tokens, now), self.window)
+            return allowed, tokens
+        finally:
+            cache.delete(lock_key)
+    
+    def wait(self):
+        return self._wait
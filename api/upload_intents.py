@@ -0,0 +1,162 @@
+"""
+Envois directs vers le stockage objet (URL présignées)
+
+Le client annonce le fichier et reçoit une URL d'envoi présignée : les
+octets vont directement au stockage, les processus web ne traitent que
+de petites requêtes JSON. À la fin de l'envoi, les métadonnées de
+l'objet (taille, type, empreinte) sont vérifiées ; un worker rapatrie
+ensuite le fichier, crée le document et lance l'OCR.
+"""
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.utils import timezone
+from ocr.validators.file_validator import FileValidator
+from .models import UploadIntent
+from .uploads import GONE, OFFSET_CONFLICT, PAYLOAD_TOO_LARGE, UploadError
+
+# Objet non conforme à l'annonce
+UNPROCESSABLE = 422
+
+
+def object_key_for(user, file_name: str) -> str:
+    """Clé de l'objet : préfixe par utilisateur, nom aléatoire"""
+    extension = os.path.splitext(file_name)[1].lower()
+    return f"incoming/{user.pk}/{uuid.uuid4().hex}{extension}"
+
+
+def create_upload_intent(store, user, file_name: str, content_type: str, size: int, checksum: str,
+                         language=None, engine=None):
+    """
+    Enregistre un envoi direct et présigne sa cible
+
+    Returns:
+        Tuple (UploadIntent, cible d'envoi {method, url, headers})
+
+    Raises:
+        UploadError: Taille, type ou extension refusés
+    """
+    announced = SimpleNamespace(name=file_name, size=size, content_type=content_type)
+    is_valid, error_message = FileValidator().validate_file(announced)
+    if not is_valid:
+        raise UploadError(error_message, PAYLOAD_TOO_LARGE if size > settings.MAX_FILE_SIZE else 400)
+
+    intent = UploadIntent.objects.create(
+        user=user,
+        file_name=file_name,
+        content_type=content_type,
+        size=size,
+        checksum=checksum.lower(),
+        object_key=object_key_for(user, file_name),
+        language=language,
+        engine=engine,
+        expires_at=timezone.now() + timedelta(seconds=settings.UPLOAD_INTENT_TTL),
+    )
+    target = store.presigned_put(
+        intent.object_key, content_type, size, intent.checksum, expires=settings.UPLOAD_INTENT_TTL
+    )
+    return intent, target
+
+
+def _reject(store, intent, message: str):
+    """Refuse l'objet envoyé : l'envoi direct est terminé en échec"""
+    UploadIntent.objects.filter(pk=intent.pk).update(status=UploadIntent.Status.FAILED, error_message=message)
+    intent.status = UploadIntent.Status.FAILED
+    intent.error_message = message
+    store.delete(intent.object_key)
+    return UploadError(message, UNPROCESSABLE)
+
+
+def verify_uploaded_object(store, intent) -> bool:
+    """
+    Vérifie l'objet envoyé (HEAD) et marque l'envoi comme vérifié
+
+    Args:
+        store: Stockage objet
+        intent: Envoi direct en attente
+
+    Returns:
+        True si cet appel a vérifié l'envoi, False s'il l'était déjà
+        (signalement répété)
+
+    Raises:
+        UploadError: Envoi expiré, objet absent ou non conforme à l'annonce
+    """
+    if intent.status != UploadIntent.Status.PENDING:
+        if intent.status == UploadIntent.Status.FAILED:
+            raise UploadError(intent.error_message or "Envoi refusé", UNPROCESSABLE)
+        return False
+
+    metadata = store.head(intent.object_key)
+    if metadata is None:
+        if intent.is_expired:
+            raise UploadError("URL d'envoi expirée", GONE)
+        raise UploadError("Fichier absent du stockage : envoi non terminé", OFFSET_CONFLICT)
+    if metadata['size'] != intent.size:
+        raise _reject(store, intent, f"Taille reçue ({metadata['size']}) différente de l'annonce ({intent.size})")
+    if metadata['content_type'] != intent.content_type:
+        raise _reject(store, intent, f"Type reçu ({metadata['content_type']}) différent de l'annonce")
+    if metadata['checksum_sha256'] and metadata['checksum_sha256'] != intent.checksum:
+        raise _reject(store, intent, "Empreinte SHA-256 différente de l'annonce")
+
+    # Transition conditionnelle : un seul import pour des signalements concurrents
+    verified = UploadIntent.objects.filter(pk=intent.pk, status=UploadIntent.Status.PENDING).update(
+        status=UploadIntent.Status.VERIFIED
+    )
+    intent.status = UploadIntent.Status.VERIFIED
+    return bool(verified)
+
+
+def import_upload_intent(store, intent, service):
+    """
+    Rapatrie l'objet vérifié et crée le document
+
+    Le fichier est copié par blocs dans un fichier temporaire ; l'empreinte
+    du contenu est recalculée (le stockage peut ne pas conserver
+    l'empreinte). L'objet est supprimé du stockage une fois le document créé.
+
+    Args:
+        store: Stockage objet
+        intent: Envoi direct vérifié
+        service: DocumentService
+
+    Returns:
+        Document créé (ou déjà créé par un import précédent)
+
+    Raises:
+        UploadError: Contenu non conforme ou fichier refusé par la validation
+    """
+    if intent.status == UploadIntent.Status.COMPLETED and intent.document_id:
+        return intent.document
+
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(intent.file_name)[1]) as temp:
+        checksum = store.download(intent.object_key, temp)
+        if checksum != intent.checksum or temp.tell() != intent.size:
+            raise _reject(store, intent, "Contenu du stockage différent de l'annonce")
+        temp.seek(0)
+        try:
+            with transaction.atomic():
+                document = service.create_document(
+                    user=intent.user,
+                    uploaded_file=UploadedFile(
+                        file=temp,
+                        name=intent.file_name,
+                        content_type=intent.content_type,
+                        size=intent.size,
+                    ),
+                    language=intent.language,
+                    engine_name=intent.engine,
+                )
+                intent.document = document
+                intent.status = UploadIntent.Status.COMPLETED
+                intent.save(update_fields=['document', 'status'])
+        except ValueError as e:
+            raise _reject(store, intent, str(e))
+
+    store.delete(intent.object_key)
+    return document
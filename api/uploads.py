@@ -0,0 +1,248 @@
+"""
+Uploads reprenables par morceaux (protocole inspiré de tus 1.0)
+
+Création de la session (taille annoncée), envoi des morceaux à leur
+offset (PATCH, en-tête Upload-Offset), reprise après coupure (HEAD) puis
+validation finale qui crée le Document. Les morceaux sont écrits sur
+disque au fil de la lecture : la mémoire utilisée par le processus web
+ne dépend pas de la taille du fichier.
+"""
+import base64
+import hashlib
+import os
+import uuid
+from types import SimpleNamespace
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+from ocr.validators.file_validator import FileValidator
+from .models import UploadSession
+
+TUS_VERSION = '1.0.0'
+CHECKSUM_ALGORITHMS = ('sha1', 'sha256', 'md5')
+READ_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Requête d'upload refusée (code HTTP associé)"""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+# Codes HTTP du protocole tus
+OFFSET_CONFLICT = 409
+GONE = 410
+PAYLOAD_TOO_LARGE = 413
+UNSUPPORTED_MEDIA_TYPE = 415
+CHECKSUM_MISMATCH = 460
+
+
+def create_upload_session(user, file_name: str, content_type: str, upload_length: int,
+                          checksum=None, language=None, engine=None) -> UploadSession:
+    """
+    Ouvre une session d'upload après validation du fichier annoncé
+
+    Raises:
+        UploadError: Taille, type ou extension refusés
+    """
+    announced = SimpleNamespace(name=file_name, size=upload_length, content_type=content_type)
+    is_valid, error_message = FileValidator().validate_file(announced)
+    if not is_valid:
+        status_code = PAYLOAD_TOO_LARGE if upload_length > settings.MAX_FILE_SIZE else 400
+        raise UploadError(error_message, status_code)
+
+    session = UploadSession.objects.create(
+        user=user,
+        file_name=file_name,
+        content_type=content_type,
+        upload_length=upload_length,
+        checksum=checksum.lower() if checksum else None,
+        language=language,
+        engine=engine,
+    )
+    os.makedirs(UploadSession.storage_dir(), exist_ok=True)
+    # Fichier vide : le premier morceau est écrit à l'offset 0
+    open(session.partial_path, 'wb').close()
+    return session
+
+
+def parse_checksum_header(header: str):
+    """
+    Lit l'en-tête Upload-Checksum (« <algorithme> <empreinte base64> »)
+
+    Returns:
+        Tuple (algorithme, empreinte) ou None si l'en-tête est absent
+
+    Raises:
+        UploadError: En-tête invalide ou algorithme non supporté
+    """
+    if not header:
+        return None
+    algorithm, _, encoded = header.strip().partition(' ')
+    algorithm = algorithm.lower()
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise UploadError(f"Algorithme d'empreinte non supporté: {algorithm}")
+    try:
+        return algorithm, base64.b64decode(encoded.strip(), validate=True)
+    except ValueError:
+        raise UploadError("En-tête Upload-Checksum invalide")
+
+
+def append_chunk(session_id, user, stream, offset: int, length: int, checksum_header: str = None) -> UploadSession:
+    """
+    Écrit un morceau à l'offset courant de la session
+
+    Le morceau est d'abord lu dans un fichier propre à la requête, sans
+    transaction ni verrou : une lecture lente n'immobilise ni connexion
+    ni ligne en base. L'offset est ensuite avancé par une mise à jour
+    conditionnelle (WHERE upload_offset = offset) ; seul l'envoi qui la
+    remporte copie ses octets dans le fichier partiel, un envoi concurrent
+    reçoit un conflit (409). Sans empreinte, les octets reçus avant une
+    coupure sont conservés (le client reprend à l'offset atteint) ; avec
+    empreinte, un morceau incomplet ou altéré est entièrement rejeté.
+
+    Args:
+        session_id: ID de la session
+        user: Propriétaire de la session
+        stream: Corps de la requête (lu par blocs)
+        offset: Valeur de l'en-tête Upload-Offset
+        length: Taille du morceau (Content-Length)
+        checksum_header: Valeur de l'en-tête Upload-Checksum (optionnel)
+
+    Returns:
+        Session mise à jour
+
+    Raises:
+        UploadSession.DoesNotExist: Session inconnue
+        UploadError: Offset, taille ou empreinte refusés
+    """
+    expected = parse_checksum_header(checksum_header)
+    session = UploadSession.objects.get(pk=session_id, user=user)
+    _check_chunk(session, offset, length)
+
+    digest = hashlib.new(expected[0]) if expected else None
+    received = 0
+    chunk_path = f"{session.partial_path}.{uuid.uuid4().hex}"
+    try:
+        with open(chunk_path, 'wb') as chunk:
+            try:
+                while received < length:
+                    block = stream.read(min(READ_BLOCK_SIZE, length - received))
+                    if not block:
+                        break
+                    chunk.write(block)
+                    if digest:
+                        digest.update(block)
+                    received += len(block)
+            except (UnreadablePostError, OSError):
+                # Connexion coupée : les octets reçus sont conservés (sans empreinte)
+                pass
+        if digest and (received != length or digest.digest() != expected[1]):
+            raise UploadError("Empreinte du morceau invalide", CHECKSUM_MISMATCH)
+
+        with transaction.atomic():
+            # Compare-and-swap de l'offset : un seul envoi l'emporte
+            advanced = UploadSession.objects.filter(
+                pk=session.pk,
+                status=UploadSession.Status.ACTIVE,
+                upload_offset=offset,
+                expires_at__gt=timezone.now(),
+            ).update(upload_offset=offset + received, expires_at=UploadSession.next_expiry())
+            if not advanced:
+                session.refresh_from_db()
+                _check_chunk(session, offset, length)
+                raise UploadError("Morceau envoyé en parallèle sur cette session", OFFSET_CONFLICT)
+            # Copie locale sous le verrou posé par la mise à jour (annulée en cas d'erreur)
+            try:
+                with open(chunk_path, 'rb') as chunk, open(session.partial_path, 'r+b') as partial:
+                    partial.seek(offset)
+                    for block in iter(lambda: chunk.read(READ_BLOCK_SIZE), b''):
+                        partial.write(block)
+                    partial.truncate(offset + received)
+            except OSError:
+                with open(session.partial_path, 'r+b') as partial:
+                    partial.truncate(offset)
+                raise
+    finally:
+        try:
+            os.remove(chunk_path)
+        except FileNotFoundError:
+            pass
+
+    session.refresh_from_db()
+    return session
+
+
+def _check_chunk(session: UploadSession, offset: int, length: int) -> None:
+    """Vérifie l'état de la session, l'offset et la taille d'un morceau"""
+    if session.status != UploadSession.Status.ACTIVE or session.is_expired:
+        raise UploadError("Session d'upload terminée ou expirée", GONE)
+    if offset != session.upload_offset:
+        raise UploadError(
+            f"Offset {offset} différent de l'offset de la session ({session.upload_offset})",
+            OFFSET_CONFLICT
+        )
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE or offset + length > session.upload_length:
+        raise UploadError("Morceau trop volumineux", PAYLOAD_TOO_LARGE)
+
+
+def file_checksum(path: str) -> str:
+    """Empreinte SHA-256 d'un fichier (lu par blocs)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def complete_upload(session_id, user, create_document):
+    """
+    Valide une session complète et crée le document
+
+    Idempotent : un second appel (réponse perdue) retourne le même document.
+
+    Args:
+        session_id: ID de la session
+        user: Propriétaire de la session
+        create_document: Fonction (uploaded_file) -> Document
+
+    Returns:
+        Tuple (session, créé) ; créé est False si la session était déjà validée
+
+    Raises:
+        UploadSession.DoesNotExist: Session inconnue
+        UploadError: Upload incomplet, expiré ou empreinte du fichier invalide
+    """
+    with transaction.atomic():
+        session = UploadSession.objects.select_for_update().get(pk=session_id, user=user)
+        if session.status == UploadSession.Status.COMPLETED:
+            if session.document_id is None:
+                raise UploadError("Le document de cette session a été supprimé", GONE)
+            return session, False
+        if session.is_expired:
+            raise UploadError("Session d'upload expirée", GONE)
+        if not session.is_complete:
+            raise UploadError(
+                f"Upload incomplet ({session.upload_offset}/{session.upload_length} octets)",
+                OFFSET_CONFLICT
+            )
+        if session.checksum and file_checksum(session.partial_path) != session.checksum:
+            raise UploadError("Empreinte du fichier invalide", CHECKSUM_MISMATCH)
+
+        with open(session.partial_path, 'rb') as partial:
+            uploaded_file = UploadedFile(
+                file=partial,
+                name=session.file_name,
+                content_type=session.content_type,
+                size=session.upload_length,
+            )
+            session.document = create_document(uploaded_file)
+
+        session.status = UploadSession.Status.COMPLETED
+        session.save(update_fields=['document', 'status'])
+    session.delete_partial_file()
+    return session, True
@@ -7,9 +7,14 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'documents', views.DocumentViewSet, basename='document')
+router.register(r'uploads', views.UploadSessionViewSet, basename='upload')
+router.register(r'upload-intents', views.UploadIntentViewSet, basename='upload-intent')
+router.register(r'webhooks', views.WebhookEndpointViewSet, basename='webhook')
+router.register(r'templates', views.OCRTemplateViewSet, basename='ocr-template')
 
 app_name = 'api'
 
 urlpatterns = [
+    path('events/', views.document_events, name='events'),
     path('', include(router.urls)),
 ]
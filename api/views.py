@@ -5,19 +5,121 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.urls import replace_query_param
+from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404
-from django.http import Http404
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET
 
-from documents.models import Document, OCRResult
+from documents.models import Document, OCRLayout, OCRResult, OCRTemplate
 from documents.services.document_service import DocumentService
+from webhooks.models import WebhookEndpoint
+from core.events import event_stream
+from core.profiling import profile_view
+from ocr.exceptions import PermanentOCRError, get_error_code
+from .authentication import APIKeyAuthentication
+from .cache import document_etag, etag_matches, get_document_payload, set_document_payload
+from .models import APIKey, UploadIntent, UploadSession
+from .permissions import HasAPIKeyScope
+from .progress import document_statuses, wait_for_document
+from .throttling import TokenBucketThrottle
+from . import upload_intents, uploads
+from .object_store import ObjectStoreError, get_object_store
+from .tasks import import_upload_intent_task
 from .serializers import (
     DocumentSerializer,
     DocumentListSerializer,
     DocumentUploadSerializer,
+    OCRResultSerializer,
+    OCRTemplateSerializer,
+    UploadIntentSerializer,
+    UploadSessionSerializer,
+    WebhookEndpointSerializer,
 )
 
 
+def start_document_processing(request, service, document, language, engine, sparse_options=None):
+    """
+    Lance l'OCR d'un document créé par l'API et construit la réponse
+    
+    Si Celery est activé, le traitement est mis en file (202 Accepted),
+    sinon il est exécuté de manière synchrone (201 Created).
+    
+    Args:
+        request: Requête DRF
+        service: DocumentService
+        document: Document créé
+        language: Langue pour l'OCR (optionnel)
+        engine: Nom du moteur OCR
+        sparse_options: Champs rendus (fields, exclude, expand)
+    
+    Returns:
+        Response
+    """
+    sparse_options = sparse_options or {}
+    # Traitement asynchrone : file choisie selon le coût estimé
+    if settings.CELERY_ENABLED:
+        service.queue_document_ocr(
+            document=document,
+            language=language,
+            engine_name=engine
+        )
+        response_serializer = DocumentSerializer(
+            document,
+            context={'request': request},
+            **sparse_options
+        )
+        return Response(
+            response_serializer.data,
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    # Traitement OCR
+    try:
+        ocr_result = service.process_document_ocr(
+            document=document,
+            language=language,
+            engine_name=engine
+        )
+    except Exception as e:
+        document.status = Document.Status.FAILED
+        document.error_message = str(e)
+        document.error_code = get_error_code(e)
+        document.save()
+        return Response(
+            {
+                'error': 'Erreur lors du traitement OCR',
+                'message': str(e),
+                'error_code': document.error_code,
+                'document_id': document.id,
+                'status': document.status,
+            },
+            # Erreur déterministe (fichier corrompu, langue...) : 422
+            status=(
+                status.HTTP_422_UNPROCESSABLE_ENTITY
+                if isinstance(e, PermanentOCRError)
+                else status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        )
+    
+    # Retour du document avec le résultat OCR
+    response_serializer = DocumentSerializer(
+        document,
+        context={'request': request},
+        **sparse_options
+    )
+    return Response(
+        response_serializer.data,
+        status=status.HTTP_201_CREATED
+    )
+
+
 class DocumentViewSet(viewsets.ModelViewSet):
     """
     ViewSet pour la gestion des documents via API
@@ -26,10 +128,24 @@ class DocumentViewSet(viewsets.ModelViewSet):
     retrieve: Récupère un document spécifique
     create: Upload et traitement OCR d'un nouveau document
     destroy: Supprime un document
+    
+    Champs rendus : ?fields=, ?exclude=, ?expand= (list, retrieve, create).
+    Les textes (extracted_text, ocr_result.raw_text/cleaned_text) ne sont
+    rendus, et lus en base, que sur demande.
+    
+    Authentification : clé d'API (Authorization: Api-Key <clé>, portées
+    documents:read / documents:write), session ou Basic.
     """
     
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasAPIKeyScope]
     parser_classes = [MultiPartParser, FormParser]
+    sparse_params = ('fields', 'exclude', 'expand')
+    
+    def get_throttles(self):
+        """Seules les soumissions (create) consomment le seau à jetons"""
+        if self.action == 'create':
+            return [TokenBucketThrottle()]
+        return super().get_throttles()
     
     def get_serializer_class(self):
         """Retourne le serializer approprié selon l'action"""
@@ -41,7 +157,56 @@ class DocumentViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filtre les documents par utilisateur authentifié"""
-        return Document.objects.filter(user=self.request.user).order_by('-uploaded_at')
+        queryset = Document.objects.filter(user=self.request.user).order_by('-uploaded_at')
+        if self.action in ('list', 'retrieve'):
+            queryset = self._sparse_queryset(queryset, self.get_serializer_class()(**self._sparse_options()))
+        return queryset
+    
+    def get_serializer(self, *args, **kwargs):
+        """Serializer limité aux champs demandés (?fields=, ?exclude=, ?expand=)"""
+        if self.action in ('list', 'retrieve'):
+            kwargs.update(self._sparse_options())
+        return super().get_serializer(*args, **kwargs)
+    
+    def _sparse_options(self):
+        """
+        Champs demandés par le client
+        
+        ?fields=id,status : uniquement ces champs
+        ?exclude=user : tous les champs sauf ceux-ci
+        ?expand=extracted_text,ocr_result.cleaned_text : textes omis par défaut
+        """
+        options = {}
+        for param in self.sparse_params:
+            value = self.request.query_params.get(param)
+            if value:
+                options[param] = sorted({name.strip() for name in value.split(',') if name.strip()})
+        return options
+    
+    def _representation(self, kind):
+        """Nom de la représentation (ETag, cache) : kind et champs demandés"""
+        options = self._sparse_options()
+        if not options:
+            return kind
+        return kind + '?' + '&'.join(f"{param}={','.join(names)}" for param, names in options.items())
+    
+    def _sparse_queryset(self, queryset, serializer):
+        """Ne lit en base que les colonnes rendues (textes volumineux différés)"""
+        fields = serializer.fields
+        if 'user' in fields:
+            queryset = queryset.select_related('user')
+        if 'extracted_text' not in fields:
+            queryset = queryset.defer('extracted_text')
+        if 'ocr_result' in fields:
+            nested = fields['ocr_result'].fields
+            queryset = queryset.select_related('ocr_result').defer(*[
+                f'ocr_result__{name}'
+                for name in OCRResultSerializer.Meta.expandable_fields
+                if name not in nested
+            ])
+        if 'region_results' in fields:
+            queryset = queryset.prefetch_related('region_results')
+        return queryset
     
     def get_object(self):
         """Retourne un document spécifique avec vérification de propriété"""
@@ -49,6 +214,55 @@ class DocumentViewSet(viewsets.ModelViewSet):
         self.check_object_permissions(self.request, obj)
         return obj
     
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Récupère un document
+        
+        GET /api/documents/{id}/
+        
+        Textes omis par défaut, voir _sparse_options(). La représentation
+        par défaut d'un document terminé est mise en cache (invalidée à
+        la modification ou à la suppression du document). Avec
+        If-None-Match, un document inchangé répond 304 sans être sérialisé.
+        """
+        representation = self._representation('detail')
+        cached = representation == 'detail'
+        data, etag = (cached and get_document_payload(kwargs['pk'], 'detail', request.user)) or (None, None)
+        if etag is None:
+            etag = self._current_etag(representation)
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+        
+        if data is None:
+            document = self.get_object()
+            etag = document_etag(document.pk, document.updated_at, representation)
+            # Sans requête : URL du fichier relative en cache, rendue absolue ci-dessous
+            data = DocumentSerializer(document, **self._sparse_options()).data
+            if cached:
+                set_document_payload(document, 'detail', data, etag)
+        
+        if data.get('file_url'):
+            data = dict(data, file_url=request.build_absolute_uri(data['file_url']))
+        return self._with_etag(Response(data), etag)
+    
+    def _current_etag(self, kind):
+        """ETag courant du document (requête légère, sans le texte)"""
+        updated_at = self.get_queryset().filter(pk=self.kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            raise Http404
+        return document_etag(self.kwargs['pk'], updated_at, kind)
+    
+    def _not_modified(self, etag):
+        """Réponse 304 : le client réutilise sa copie"""
+        return self._with_etag(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+    
+    def _with_etag(self, response, etag):
+        """Ajoute l'ETag ; le client revalide à chaque lecture"""
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+    
+    @profile_view('api.documents.create')
     def create(self, request, *args, **kwargs):
         """
         Upload et traitement OCR d'un nouveau document
@@ -59,8 +273,14 @@ class DocumentViewSet(viewsets.ModelViewSet):
             - file: fichier à traiter (obligatoire)
             - language: code langue ISO 639-2 (optionnel)
             - engine: nom du moteur OCR (optionnel, défaut: tesseract)
+            - regions: zones nommées à lire, JSON (optionnel)
+            - template: ID d'un modèle de formulaire (optionnel)
+        
+        Avec des zones, seules les zones sont lues (region_results).
+        Si Celery est activé, le traitement est mis en file (202 Accepted),
+        sinon il est exécuté de manière synchrone (201 Created).
         """
-        serializer = DocumentUploadSerializer(data=request.data)
+        serializer = DocumentUploadSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         
         uploaded_file = serializer.validated_data['file']
@@ -74,38 +294,13 @@ class DocumentViewSet(viewsets.ModelViewSet):
             document = service.create_document(
                 user=request.user,
                 uploaded_file=uploaded_file,
-                language=language
+                language=language,
+                engine_name=engine,
+                regions=serializer.validated_data.get('regions')
             )
             
-            # Traitement OCR
-            try:
-                ocr_result = service.process_document_ocr(
-                    document=document,
-                    language=language,
-                    engine_name=engine
-                )
-            except Exception as e:
-                document.status = Document.Status.FAILED
-                document.error_message = str(e)
-                document.save()
-                return Response(
-                    {
-                        'error': 'Erreur lors du traitement OCR',
-                        'message': str(e),
-                        'document_id': document.id,
-                        'status': document.status,
-                    },
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-            
-            # Retour du document avec le résultat OCR
-            response_serializer = DocumentSerializer(
-                document,
-                context={'request': request}
-            )
-            return Response(
-                response_serializer.data,
-                status=status.HTTP_201_CREATED
+            return start_document_processing(
+                request, service, document, language, engine, self._sparse_options()
             )
             
         except ValueError as e:
@@ -119,6 +314,60 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'], url_path='status')
+    def bulk_status(self, request):
+        """
+        Statut et progression de plusieurs documents
+        
+        GET /api/documents/status/?ids=1,2,3
+        
+        Une seule requête en base, sans sérialisation des documents : à
+        préférer au GET de chaque document pour suivre un lot.
+        """
+        try:
+            ids = {int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()}
+        except ValueError:
+            return Response(
+                {'error': 'ids doit être une liste d\'entiers séparés par des virgules'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not ids or len(ids) > settings.API_STATUS_MAX_IDS:
+            return Response(
+                {'error': f'Entre 1 et {settings.API_STATUS_MAX_IDS} ids sont acceptés'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        return Response({'results': document_statuses(self.get_queryset(), ids)})
+    
+    @action(detail=True, methods=['get'])
+    def wait(self, request, pk=None):
+        """
+        Attend la fin du traitement d'un document (long-poll)
+        
+        GET /api/documents/{id}/wait/?timeout=30
+        
+        Répond dès que le document est terminé ou en échec (200), ou à
+        l'expiration du délai avec le statut courant (202 : à relancer).
+        Le délai est borné par API_WAIT_MAX_TIMEOUT.
+        """
+        try:
+            timeout = float(request.query_params.get('timeout', settings.API_WAIT_MAX_TIMEOUT))
+        except ValueError:
+            return Response({'error': 'timeout doit être un nombre'}, status=status.HTTP_400_BAD_REQUEST)
+        timeout = min(max(timeout, 0), settings.API_WAIT_MAX_TIMEOUT)
+        
+        try:
+            document_id = int(pk)
+        except ValueError:
+            raise Http404
+        
+        document_status = wait_for_document(self.get_queryset(), document_id, timeout)
+        if document_status is None:
+            raise Http404
+        if document_status['status'] in Document.FINAL_STATUSES:
+            return Response(document_status)
+        return Response(document_status, status=status.HTTP_202_ACCEPTED)
+    
     @action(detail=True, methods=['get'])
     def text(self, request, pk=None):
         """
@@ -126,6 +375,14 @@ class DocumentViewSet(viewsets.ModelViewSet):
         
         GET /api/documents/{id}/text/
         """
+        data, etag = get_document_payload(pk, 'text', request.user) or (None, None)
+        if etag is None:
+            etag = self._current_etag('text')
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+        if data is not None:
+            return self._with_etag(Response(data), etag)
+        
         document = self.get_object()
         
         if document.status != Document.Status.COMPLETED:
@@ -140,13 +397,79 @@ class DocumentViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        return Response({
+        data = {
             'document_id': document.id,
             'file_name': document.file_name,
             'text': document.extracted_text,
             'confidence_score': document.confidence_score,
             'language': document.language_detected,
-        })
+        }
+        etag = document_etag(document.pk, document.updated_at, 'text')
+        set_document_payload(document, 'text', data, etag)
+        return self._with_etag(Response(data), etag)
+    
+    @action(detail=True, methods=['get'])
+    def layout(self, request, pk=None):
+        """
+        Disposition des mots d'un document (boîtes et confiances), par pages
+        
+        GET /api/documents/{id}/layout/?page=1&page_size=1
+        
+        page : première page rendue, page_size : nombre de pages (au plus
+        API_LAYOUT_MAX_PAGES). Les boîtes [left, top, width, height] sont
+        en pixels de l'image lue par l'OCR (width, height de la page).
+        Seules les pages demandées sont décodées.
+        """
+        try:
+            first_page = int(request.query_params.get('page', 1))
+            page_size = int(request.query_params.get('page_size', 1))
+        except ValueError:
+            return Response(
+                {'error': 'page et page_size doivent être des entiers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if first_page < 1 or not 1 <= page_size <= settings.API_LAYOUT_MAX_PAGES:
+            return Response(
+                {'error': f'page doit être positif et page_size compris entre 1 et {settings.API_LAYOUT_MAX_PAGES}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        etag = self._current_etag(f'layout?page={first_page}&page_size={page_size}')
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+        
+        # Disposition lue seule (table séparée), sans le document ni les textes
+        layout = OCRLayout.objects.filter(
+            ocr_result__document_id=self.kwargs['pk'],
+            ocr_result__document__user=request.user,
+        ).select_related('ocr_result').only('data', 'word_count', 'ocr_result__version').first()
+        if layout is None:
+            return Response(
+                {'error': 'Aucune disposition des mots disponible'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        word_layout = layout.decode()
+        page_numbers = word_layout.page_numbers
+        if first_page > page_numbers[-1]:
+            return Response({'error': 'Page non valide'}, status=status.HTTP_404_NOT_FOUND)
+        last_page = first_page + page_size - 1
+        url = request.build_absolute_uri()
+        
+        data = {
+            'document_id': int(self.kwargs['pk']),
+            'version': layout.ocr_result.version,
+            'pages_count': len(page_numbers),
+            'word_count': layout.word_count,
+            'next': replace_query_param(url, 'page', last_page + 1) if last_page < page_numbers[-1] else None,
+            'previous': replace_query_param(url, 'page', max(first_page - page_size, 1)) if first_page > 1 else None,
+            'results': [
+                word_layout.page(page_number)
+                for page_number in page_numbers
+                if first_page <= page_number <= last_page
+            ],
+        }
+        return self._with_etag(Response(data), etag)
     
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
@@ -155,6 +478,10 @@ class DocumentViewSet(viewsets.ModelViewSet):
         
         GET /api/documents/{id}/download/
         """
+        etag = self._current_etag('download')
+        if etag_matches(request, etag):
+            return self._not_modified(etag)
+        
         document = self.get_object()
         
         if document.status != Document.Status.COMPLETED or not document.extracted_text:
@@ -168,4 +495,348 @@ class DocumentViewSet(viewsets.ModelViewSet):
         
         response = HttpResponse(document.extracted_text, content_type='text/plain; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="{os.path.splitext(document.file_name)[0]}.txt"'
+        return self._with_etag(response, document_etag(document.pk, document.updated_at, 'download'))
+
+
+class UploadSessionViewSet(viewsets.ViewSet):
+    """
+    Uploads reprenables par morceaux (protocole inspiré de tus 1.0)
+    
+    create: POST /api/uploads/ {file_name, content_type, upload_length,
+        checksum?, language?, engine?} ouvre une session (201, en-tête Location)
+    retrieve: GET/HEAD /api/uploads/{id}/ donne l'offset atteint
+        (en-tête Upload-Offset) pour reprendre après une coupure
+    partial_update: PATCH /api/uploads/{id}/ (Content-Type:
+        application/offset+octet-stream, Upload-Offset, Upload-Checksum
+        optionnel « sha256 <base64> ») écrit un morceau (204)
+    complete: POST /api/uploads/{id}/complete/ crée le document et lance
+        l'OCR (comme POST /api/documents/)
+    destroy: DELETE /api/uploads/{id}/ abandonne la session
+    """
+    
+    permission_classes = [IsAuthenticated, HasAPIKeyScope]
+    parser_classes = [JSONParser]
+    
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+    
+    def _tus_headers(self, response, session=None):
+        response['Tus-Resumable'] = uploads.TUS_VERSION
+        response['Cache-Control'] = 'no-store'
+        if session is not None:
+            response['Upload-Offset'] = str(session.upload_offset)
+            response['Upload-Length'] = str(session.upload_length)
+            response['Upload-Expires'] = http_date(session.expires_at.timestamp())
         return response
+    
+    def _error(self, error: uploads.UploadError, session_id=None):
+        response = Response({'error': str(error)}, status=error.status_code)
+        session = self.get_queryset().filter(pk=session_id).first() if session_id else None
+        return self._tus_headers(response, session)
+    
+    def create(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            session = uploads.create_upload_session(
+                user=request.user,
+                file_name=data['file_name'],
+                content_type=data['content_type'],
+                upload_length=data['upload_length'],
+                checksum=data.get('checksum'),
+                language=data.get('language') or None,
+                engine=data.get('engine') or 'tesseract',
+            )
+        except uploads.UploadError as e:
+            return self._error(e)
+        response = Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+        response['Location'] = request.build_absolute_uri(
+            reverse('api:upload-detail', kwargs={'pk': session.pk})
+        )
+        return self._tus_headers(response, session)
+    
+    def retrieve(self, request, pk=None):
+        session = get_object_or_404(self.get_queryset(), pk=pk)
+        if session.is_expired:
+            return self._error(uploads.UploadError("Session d'upload expirée", uploads.GONE))
+        return self._tus_headers(Response(UploadSessionSerializer(session).data), session)
+    
+    def partial_update(self, request, pk=None):
+        content_type = request.content_type.split(';')[0].strip()
+        if content_type != 'application/offset+octet-stream':
+            return self._error(uploads.UploadError(
+                "Content-Type attendu: application/offset+octet-stream", uploads.UNSUPPORTED_MEDIA_TYPE
+            ))
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return self._error(uploads.UploadError("En-têtes Upload-Offset et Content-Length requis"))
+        try:
+            session = uploads.append_chunk(
+                pk, request.user, request.stream, offset, length,
+                checksum_header=request.headers.get('Upload-Checksum'),
+            )
+        except UploadSession.DoesNotExist:
+            raise Http404
+        except uploads.UploadError as e:
+            return self._error(e, session_id=pk)
+        return self._tus_headers(Response(status=status.HTTP_204_NO_CONTENT), session)
+    
+    def destroy(self, request, pk=None):
+        session = get_object_or_404(self.get_queryset(), pk=pk)
+        session.delete()
+        return self._tus_headers(Response(status=status.HTTP_204_NO_CONTENT))
+    
+    @action(detail=True, methods=['post'], throttle_classes=[TokenBucketThrottle])
+    def complete(self, request, pk=None):
+        """
+        Crée le document à partir de l'upload complet et lance l'OCR
+        
+        L'empreinte SHA-256 annoncée à la création est vérifiée. Un second
+        appel retourne le document déjà créé (200).
+        """
+        session = get_object_or_404(self.get_queryset(), pk=pk)
+        language = session.language
+        engine = session.engine or 'tesseract'
+        service = DocumentService()
+        try:
+            session, created = uploads.complete_upload(
+                pk, request.user,
+                lambda uploaded_file: service.create_document(
+                    user=request.user,
+                    uploaded_file=uploaded_file,
+                    language=language,
+                    engine_name=engine,
+                )
+            )
+        except UploadSession.DoesNotExist:
+            raise Http404
+        except uploads.UploadError as e:
+            return self._error(e, session_id=pk)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if not created:
+            return Response(DocumentSerializer(session.document, context={'request': request}).data)
+        return start_document_processing(request, service, session.document, language, engine)
+
+
+class UploadIntentViewSet(viewsets.ViewSet):
+    """
+    Envois directs vers le stockage objet compatible S3
+    
+    create: POST /api/upload-intents/ {file_name, content_type, size,
+        checksum (SHA-256), language?, engine?} retourne la cible d'envoi
+        présignée (upload: method, url, headers à envoyer à l'identique)
+    retrieve: GET /api/upload-intents/{id}/ donne le statut et le document créé
+    complete: POST /api/upload-intents/{id}/complete/ à la fin de l'envoi :
+        taille, type et empreinte de l'objet sont vérifiés, puis le document
+        est créé et l'OCR lancé (202 ; 201 sans Celery)
+    
+    Les octets ne passent pas par les processus web. Désactivé (503) si
+    OBJECT_STORE_ENDPOINT n'est pas configuré.
+    """
+    
+    permission_classes = [IsAuthenticated, HasAPIKeyScope]
+    parser_classes = [JSONParser]
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.store = get_object_store()
+    
+    def get_queryset(self):
+        return UploadIntent.objects.filter(user=self.request.user)
+    
+    def _unavailable(self):
+        return Response({'error': "Envoi direct non configuré"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    
+    def create(self, request):
+        if self.store is None:
+            return self._unavailable()
+        serializer = UploadIntentSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            intent, target = upload_intents.create_upload_intent(
+                self.store,
+                user=request.user,
+                file_name=data['file_name'],
+                content_type=data['content_type'],
+                size=data['size'],
+                checksum=data['checksum'],
+                language=data.get('language') or None,
+                engine=data.get('engine') or 'tesseract',
+            )
+        except uploads.UploadError as e:
+            return Response({'error': str(e)}, status=e.status_code)
+        return Response(
+            {**UploadIntentSerializer(intent).data, 'upload': target},
+            status=status.HTTP_201_CREATED
+        )
+    
+    def retrieve(self, request, pk=None):
+        intent = get_object_or_404(self.get_queryset(), pk=pk)
+        return Response(UploadIntentSerializer(intent).data)
+    
+    @action(detail=True, methods=['post'], throttle_classes=[TokenBucketThrottle])
+    def complete(self, request, pk=None):
+        """
+        Signale la fin de l'envoi : vérification de l'objet puis import
+        
+        Le fichier est rapatrié par un worker (Celery) : la réponse (202)
+        donne le statut de l'envoi, le document apparaît ensuite dans
+        GET /api/upload-intents/{id}/. Un signalement répété est sans effet ;
+        un import abandonné (stockage indisponible) est signalé en échec (422).
+        """
+        if self.store is None:
+            return self._unavailable()
+        intent = get_object_or_404(self.get_queryset().select_related('user', 'document'), pk=pk)
+        if intent.status == UploadIntent.Status.COMPLETED and intent.document_id:
+            return Response(DocumentSerializer(intent.document, context={'request': request}).data)
+        try:
+            verified = upload_intents.verify_uploaded_object(self.store, intent)
+        except uploads.UploadError as e:
+            return Response({'error': str(e), 'status': intent.status}, status=e.status_code)
+        except (OSError, ObjectStoreError) as e:
+            return Response(
+                {'error': f"Stockage objet indisponible: {e}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        if settings.CELERY_ENABLED:
+            if verified:
+                import_upload_intent_task.apply_async(args=[str(intent.pk)])
+            return Response(UploadIntentSerializer(intent).data, status=status.HTTP_202_ACCEPTED)
+        
+        # Sans Celery : import et OCR synchrones (développement)
+        service = DocumentService()
+        try:
+            document = upload_intents.import_upload_intent(self.store, intent, service)
+        except uploads.UploadError as e:
+            return Response({'error': str(e), 'status': intent.status}, status=e.status_code)
+        return start_document_processing(
+            request, service, document, intent.language, intent.engine or 'tesseract'
+        )
+
+
+class WebhookEndpointViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet des webhooks de fin de traitement de l'utilisateur
+    
+    Les notifications (document.completed, document.failed) sont envoyées
+    par lots en POST JSON, signées dans l'en-tête X-OCR-Signature
+    (t=<horodatage>,v1=<HMAC-SHA256(secret, "<t>.<corps>")>). Le secret
+    n'est rendu qu'à la création.
+    """
+    
+    serializer_class = WebhookEndpointSerializer
+    permission_classes = [IsAuthenticated, HasAPIKeyScope]
+    http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+    
+    def get_queryset(self):
+        """Filtre les webhooks par utilisateur authentifié"""
+        return WebhookEndpoint.objects.filter(user=self.request.user)
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include_secret'] = self.action == 'create'
+        return context
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+    
+    def perform_update(self, serializer):
+        # Réactivation manuelle : le compteur d'échecs repart de zéro
+        if serializer.validated_data.get('is_active'):
+            serializer.save(consecutive_failures=0)
+        else:
+            serializer.save()
+
+
+class OCRTemplateViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet des modèles de formulaire de l'utilisateur
+    
+    Un modèle enregistre des zones nommées (coordonnées relatives à la
+    page), utilisées à l'upload avec template=<id> : seules ces zones sont
+    lues par l'OCR.
+    """
+    
+    serializer_class = OCRTemplateSerializer
+    permission_classes = [IsAuthenticated, HasAPIKeyScope]
+    
+    def get_queryset(self):
+        """Filtre les modèles par utilisateur authentifié"""
+        return OCRTemplate.objects.filter(user=self.request.user)
+    
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+
+def _events_user(request):
+    """
+    Utilisateur du flux d'événements : clé d'API (portée documents:read) ou session
+    
+    Returns:
+        Utilisateur authentifié, ou None
+    """
+    try:
+        authenticated = APIKeyAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated:
+        user, api_key = authenticated
+        return user if api_key.has_scope(APIKey.Scope.DOCUMENTS_READ) else None
+    return request.user if request.user.is_authenticated else None
+
+
+@require_GET
+async def document_events(request):
+    """
+    Flux d'événements (SSE) de progression des documents de l'utilisateur
+    
+    GET /api/events/?documents=1,2
+    Accept: text/event-stream
+    
+    Événements : status (changement de statut) et page (page traitée,
+    progression). L'état courant des documents demandés est envoyé à
+    l'ouverture. Vue asynchrone, à servir par le service ASGI (events) :
+    une connexion ouverte n'occupe ni thread ni connexion à la base.
+    """
+    user = await sync_to_async(_events_user)(request)
+    if user is None:
+        return JsonResponse({'detail': "Informations d'authentification non fournies."}, status=401)
+    
+    try:
+        document_ids = {int(value) for value in request.GET.get('documents', '').split(',') if value.strip()}
+    except ValueError:
+        return JsonResponse(
+            {'error': 'documents doit être une liste d\'entiers séparés par des virgules'},
+            status=400
+        )
+    
+    initial_events = []
+    if document_ids:
+        rows = await sync_to_async(document_statuses)(Document.objects.filter(user=user), document_ids)
+        initial_events = [
+            {
+                'type': 'status',
+                'document_id': row['id'],
+                'status': row['status'],
+                'error_code': row['error_code'],
+                'pages_count': row['pages_count'],
+                'progress': row['progress'],
+            }
+            for row in rows
+        ]
+    
+    response = StreamingHttpResponse(
+        event_stream(user.pk, document_ids or None, initial_events),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un reverse proxy (nginx)
+    response['X-Accel-Buffering'] = 'no'
+    return response
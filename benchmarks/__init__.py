@@ -0,0 +1,22 @@
+"""
+Benchmarks OCR reproductibles (corpus synthétique, harnais, baseline)
+
+Usage:
+    python manage.py benchmark_ocr --baseline benchmarks/baseline.json
+"""
+from .baseline import compare, load_baseline, save_baseline
+from .corpus import CorpusItem, generate_corpus
+from .harness import BenchmarkResult, api_harness, engine_harness, run_benchmark, service_harness
+
+__all__ = [
+    'BenchmarkResult',
+    'CorpusItem',
+    'api_harness',
+    'compare',
+    'engine_harness',
+    'generate_corpus',
+    'load_baseline',
+    'run_benchmark',
+    'save_baseline',
+    'service_harness',
+]
@@ -0,0 +1,74 @@
+"""
+Baseline des benchmarks : enregistrement et détection des régressions
+"""
+import json
+import platform
+from typing import Dict, List
+
+# Métriques comparées : (chemin dans le résultat, sens de l'amélioration)
+COMPARED_METRICS = (
+    (('docs_per_second',), 'higher'),
+    (('latency_ms', 'p50'), 'lower'),
+    (('latency_ms', 'p90'), 'lower'),
+    (('peak_rss_mb',), 'lower'),
+)
+
+
+def _get(result: Dict, path) -> float:
+    value = result
+    for key in path:
+        value = value[key]
+    return value
+
+
+def load_baseline(path: str) -> Dict:
+    """Charge une baseline enregistrée avec save_baseline"""
+    with open(path, encoding='utf-8') as baseline_file:
+        return json.load(baseline_file)
+
+
+def save_baseline(path: str, results: Dict[str, Dict], metadata: Dict) -> None:
+    """Enregistre les résultats comme nouvelle baseline"""
+    data = {
+        'metadata': dict(metadata, python=platform.python_version(), machine=platform.machine()),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(data, baseline_file, indent=2, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare(results: Dict[str, Dict], baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """
+    Compare les résultats à la baseline
+
+    Args:
+        results: Résultats par benchmark (BenchmarkResult.to_dict)
+        baseline: Baseline chargée avec load_baseline
+        tolerance: Dégradation relative tolérée (0.2 = 20 %)
+
+    Returns:
+        Liste des régressions (vide si aucune)
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        if result['errors'] > reference.get('errors', 0):
+            regressions.append(
+                f"{name}: {result['errors']} erreurs (baseline: {reference.get('errors', 0)})"
+            )
+        for path, better in COMPARED_METRICS:
+            try:
+                current, expected = _get(result, path), _get(reference, path)
+            except KeyError:
+                continue
+            if not expected:
+                continue
+            change = (current - expected) / expected
+            if (better == 'higher' and change < -tolerance) or (better == 'lower' and change > tolerance):
+                regressions.append(
+                    f"{name}: {'.'.join(path)} {current} (baseline: {expected}, {change:+.0%})"
+                )
+    return regressions
@@ -0,0 +1,144 @@
+"""
+Corpus synthétique pour les benchmarks OCR
+
+Les pages sont générées hors ligne avec PIL à partir d'une graine : le
+même corpus est reproduit à l'identique d'une exécution à l'autre.
+"""
+import os
+import random
+import time
+from typing import List
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+# Vocabulaire des textes générés (français, comme les documents traités)
+WORDS = (
+    'facture total montant client adresse date référence article quantité prix '
+    'unitaire remise livraison paiement échéance contrat société numéro page '
+    'document rapport analyse résultat section annexe tableau signature'
+).split()
+
+# Date des métadonnées PDF (fichiers identiques d'une génération à l'autre)
+FIXED_DATE = time.gmtime(1704067200)
+
+# Types de documents du corpus
+KINDS = ('receipt', 'dense_text', 'multipage_pdf', 'large_photo')
+
+
+class CorpusItem:
+    """Document du corpus (fichier sur disque et pages en mémoire)"""
+
+    def __init__(self, name: str, kind: str, path: str, mime_type: str, pages: List[Image.Image]):
+        self.name = name
+        self.kind = kind
+        self.path = path
+        self.mime_type = mime_type
+        self.pages = pages
+
+    @property
+    def pages_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def pixels(self) -> int:
+        return sum(page.width * page.height for page in self.pages)
+
+    def __repr__(self):
+        return f"CorpusItem({self.name}, {self.pages_count} pages)"
+
+
+def _font(size: int):
+    """Police par défaut de PIL à la taille demandée"""
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 : police bitmap à taille fixe
+        return ImageFont.load_default()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def render_receipt(rng: random.Random) -> Image.Image:
+    """Ticket de caisse étroit : lignes article / prix"""
+    image = Image.new('L', (600, 1400), color=255)
+    draw = ImageDraw.Draw(image)
+    font = _font(22)
+    y = 40
+    draw.text((40, y), _sentence(rng, 2).upper(), fill=0, font=font)
+    for _ in range(30):
+        y += 40
+        draw.text((40, y), _sentence(rng, 2), fill=0, font=font)
+        draw.text((440, y), f"{rng.uniform(1, 99):7.2f} EUR", fill=0, font=font)
+    return image
+
+
+def render_dense_text(rng: random.Random) -> Image.Image:
+    """Page A4 à 200 dpi remplie de texte"""
+    image = Image.new('L', (1654, 2339), color=255)
+    draw = ImageDraw.Draw(image)
+    font = _font(26)
+    for line in range(70):
+        draw.text((120, 100 + line * 31), _sentence(rng, 12), fill=0, font=font)
+    return image
+
+
+def render_large_photo(rng: random.Random) -> Image.Image:
+    """Photo de document : grande image couleur bruitée et floutée"""
+    width, height = 4000, 3000
+    # Bruit de capteur généré par la graine (Image.effect_noise n'est pas reproductible)
+    noise = Image.frombytes('L', (width // 4, height // 4), rng.randbytes(width * height // 16))
+    image = noise.resize((width, height)).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((500, 300, 3500, 2700), fill=(235, 232, 225))
+    font = _font(48)
+    for line in range(35):
+        draw.text((600, 380 + line * 64), _sentence(rng, 8), fill=(20, 20, 30), font=font)
+    return image.filter(ImageFilter.GaussianBlur(1))
+
+
+def generate_corpus(output_dir: str, seed: int = 0, copies: int = 1,
+                    pdf_pages: int = 5, kinds=KINDS) -> List[CorpusItem]:
+    """
+    Génère le corpus dans output_dir
+
+    Args:
+        output_dir: Répertoire des fichiers générés
+        seed: Graine du générateur (corpus reproductible)
+        copies: Nombre de documents par type
+        pdf_pages: Nombre de pages des PDF multi-pages
+        kinds: Types de documents à générer (voir KINDS)
+
+    Returns:
+        Liste des documents générés
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    items = []
+
+    for copy in range(copies):
+        for kind in kinds:
+            name = f"{kind}_{copy:03d}"
+            if kind == 'receipt':
+                pages, extension, mime_type = [render_receipt(rng)], 'png', 'image/png'
+            elif kind == 'dense_text':
+                pages, extension, mime_type = [render_dense_text(rng)], 'png', 'image/png'
+            elif kind == 'large_photo':
+                pages, extension, mime_type = [render_large_photo(rng)], 'jpg', 'image/jpeg'
+            elif kind == 'multipage_pdf':
+                pages = [render_dense_text(rng) for _ in range(pdf_pages)]
+                extension, mime_type = 'pdf', 'application/pdf'
+            else:
+                raise ValueError(f"Type de document inconnu: {kind}")
+
+            path = os.path.join(output_dir, f"{name}.{extension}")
+            if extension == 'pdf':
+                pages[0].save(path, 'PDF', resolution=200, save_all=True, append_images=pages[1:],
+                              creationDate=FIXED_DATE, modDate=FIXED_DATE)
+            elif extension == 'jpg':
+                pages[0].save(path, 'JPEG', quality=90)
+            else:
+                pages[0].save(path, 'PNG')
+            items.append(CorpusItem(name, kind, path, mime_type, pages))
+
+    return items
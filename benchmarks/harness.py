@@ -0,0 +1,197 @@
+"""
+Harnais de mesure : débit, percentiles de latence et pic de mémoire (RSS)
+
+Trois harnais couvrent le pipeline de l'intérieur vers l'extérieur :
+le moteur OCR seul, DocumentService (validation, stockage, rendu, OCR,
+écriture en base) et le chemin de création de l'API REST.
+"""
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from .corpus import CorpusItem
+
+
+def percentile(values: List[float], percent: float) -> float:
+    """Percentile par interpolation linéaire (values non vide)"""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * percent / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def current_rss_mb() -> float:
+    """RSS courant du processus (Linux), sinon pic depuis le démarrage"""
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Pic de RSS depuis le démarrage du processus"""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en octets sous macOS, en kilo-octets sous Linux
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return maxrss / divisor
+
+
+class RSSSampler:
+    """Relève le RSS pendant un benchmark pour en mesurer le pic"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.peak_mb = current_rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+class BenchmarkResult:
+    """Mesures d'un benchmark"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies: List[float] = []
+        self.pages = 0
+        self.errors = 0
+        self.wall_seconds = 0.0
+        self.peak_rss_mb = 0.0
+
+    def to_dict(self) -> Dict:
+        """Résumé sérialisable (rapport et baseline)"""
+        latencies_ms = [latency * 1000 for latency in self.latencies] or [0.0]
+        wall = self.wall_seconds or 1e-9
+        return {
+            'runs': len(self.latencies),
+            'errors': self.errors,
+            'pages': self.pages,
+            'docs_per_second': round(len(self.latencies) / wall, 3),
+            'pages_per_second': round(self.pages / wall, 3),
+            'latency_ms': {
+                'mean': round(sum(latencies_ms) / len(latencies_ms), 2),
+                'p50': round(percentile(latencies_ms, 50), 2),
+                'p90': round(percentile(latencies_ms, 90), 2),
+                'p99': round(percentile(latencies_ms, 99), 2),
+                'max': round(max(latencies_ms), 2),
+            },
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+        }
+
+
+def run_benchmark(
+    name: str,
+    func: Callable[[CorpusItem], None],
+    items: List[CorpusItem],
+    repeat: int = 1,
+    warmup: int = 1
+) -> BenchmarkResult:
+    """
+    Exécute func sur chaque document du corpus
+
+    Les exécutions de chauffe (imports, caches, initialisation du moteur)
+    ne sont pas mesurées. Une exception compte comme une erreur, sans
+    interrompre le benchmark.
+
+    Args:
+        name: Nom du benchmark
+        func: Opération mesurée, appelée avec un CorpusItem
+        items: Corpus
+        repeat: Nombre de passes sur le corpus
+        warmup: Nombre d'exécutions de chauffe (sur le premier document)
+
+    Returns:
+        Mesures du benchmark
+    """
+    result = BenchmarkResult(name)
+    for _ in range(warmup if items else 0):
+        try:
+            func(items[0])
+        except Exception:
+            pass
+
+    with RSSSampler() as sampler:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for item in items:
+                call_started = time.perf_counter()
+                try:
+                    func(item)
+                except Exception:
+                    result.errors += 1
+                    continue
+                result.latencies.append(time.perf_counter() - call_started)
+                result.pages += item.pages_count
+        result.wall_seconds = time.perf_counter() - started
+
+    result.peak_rss_mb = sampler.peak_mb
+    return result
+
+
+def engine_harness(engine, language: Optional[str] = None):
+    """OCR des pages en mémoire avec le moteur seul (sans Django)"""
+    def run(item: CorpusItem):
+        for page in item.pages:
+            engine.extract_text(page, language=language)
+    return run
+
+
+def _uploaded_file(item: CorpusItem):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    with open(item.path, 'rb') as corpus_file:
+        return SimpleUploadedFile(
+            os.path.basename(item.path), corpus_file.read(), content_type=item.mime_type
+        )
+
+
+def service_harness(user, engine_name: Optional[str] = None, language: Optional[str] = None):
+    """Upload puis OCR synchrone via DocumentService"""
+    from documents.services.document_service import DocumentService
+
+    service = DocumentService()
+
+    def run(item: CorpusItem):
+        document = service.create_document(
+            user=user, uploaded_file=_uploaded_file(item), engine_name=engine_name
+        )
+        service.process_document_ocr(document, language=language, engine_name=engine_name)
+    return run
+
+
+def api_harness(user, engine_name: Optional[str] = None):
+    """POST /api/v1/documents/ (traitement synchrone, CELERY_ENABLED=False)"""
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    url = reverse('api:document-list')
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def run(item: CorpusItem):
+        data = {'file': _uploaded_file(item)}
+        if engine_name:
+            data['engine'] = engine_name
+        response = client.post(url, data, format='multipart')
+        if response.status_code not in (201, 202):
+            raise RuntimeError(f"HTTP {response.status_code}: {response.content[:200]!r}")
+    return run
@@ -0,0 +1,204 @@
+"""
+Générateur de charge pour l'API (upload et statut des documents)
+
+Des threads clients envoient des uploads puis interrogent le statut du
+document créé, à concurrence croissante. Avec le moteur simulé (fake),
+la latence mesurée est celle de Django, DRF, l'ORM, le stockage et
+Celery : le coût propre du framework par requête et le débit maximal
+soutenable sont déduits des paliers.
+"""
+import base64
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from typing import Dict, List, Optional
+from .harness import percentile
+
+
+class LoadLevelResult:
+    """Mesures d'un palier de concurrence"""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.latencies: Dict[str, List[float]] = {'upload': [], 'status': []}
+        self.errors = 0
+        self.throttled = 0
+        self.wall_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency: float):
+        with self._lock:
+            self.latencies[endpoint].append(latency)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def record_throttled(self):
+        with self._lock:
+            self.throttled += 1
+
+    @property
+    def requests(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def error_rate(self) -> float:
+        total = self.requests + self.errors
+        return self.errors / total if total else 0.0
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.wall_seconds if self.wall_seconds else 0.0
+
+    def latency_ms(self, endpoint: str, percent: float) -> float:
+        values = self.latencies[endpoint]
+        return round(percentile(values, percent) * 1000, 2) if values else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'concurrency': self.concurrency,
+            'requests': self.requests,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'requests_per_second': round(self.requests_per_second, 2),
+            'uploads_per_second': round(
+                len(self.latencies['upload']) / self.wall_seconds if self.wall_seconds else 0.0, 2
+            ),
+            'upload_ms': {p: self.latency_ms('upload', value) for p, value in (('p50', 50), ('p90', 90), ('p99', 99))},
+            'status_ms': {p: self.latency_ms('status', value) for p, value in (('p50', 50), ('p90', 90), ('p99', 99))},
+        }
+
+
+class LoadGenerator:
+    """Client HTTP de charge (clé d'API ou authentification Basic, urllib)"""
+
+    def __init__(self, base_url: str, username: str, password: str,
+                 payload: bytes, filename: str, content_type: str,
+                 engine: Optional[str] = 'fake', status_polls: int = 1, timeout: float = 60,
+                 api_key: Optional[str] = None):
+        self.documents_url = base_url.rstrip('/') + '/api/v1/documents/'
+        if api_key:
+            authorization = f'Api-Key {api_key}'
+        else:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            authorization = f'Basic {credentials}'
+        self.headers = {'Authorization': authorization, 'Accept': 'application/json'}
+        self.payload = payload
+        self.filename = filename
+        self.content_type = content_type
+        self.engine = engine
+        self.status_polls = status_polls
+        self.timeout = timeout
+
+    def _multipart_body(self):
+        """Encode le fichier (et le moteur) en multipart/form-data"""
+        boundary = uuid.uuid4().hex
+        parts = []
+        if self.engine:
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="engine"\r\n\r\n{self.engine}\r\n'.encode()
+            )
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{self.filename}"\r\n'
+            f'Content-Type: {self.content_type}\r\n\r\n'.encode() + self.payload + b'\r\n'
+        )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+    def _request(self, url: str, data: Optional[bytes] = None, content_type: Optional[str] = None) -> Dict:
+        headers = dict(self.headers)
+        if content_type:
+            headers['Content-Type'] = content_type
+        request = urllib.request.Request(url, data=data, headers=headers)
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b'{}')
+
+    def _timed(self, result: LoadLevelResult, endpoint: str, *args) -> Optional[Dict]:
+        started = time.perf_counter()
+        try:
+            body = self._request(*args)
+        except urllib.error.HTTPError as exc:
+            # 429 : limitation de débit du serveur, comptée à part des erreurs
+            if exc.code == 429:
+                result.record_throttled()
+            else:
+                result.record_error()
+            return None
+        except (urllib.error.URLError, OSError, ValueError):
+            result.record_error()
+            return None
+        result.record(endpoint, time.perf_counter() - started)
+        return body
+
+    def _client_loop(self, result: LoadLevelResult, deadline: float):
+        """Boucle d'un client : upload puis consultations du statut"""
+        while time.perf_counter() < deadline:
+            body, content_type = self._multipart_body()
+            document = self._timed(result, 'upload', self.documents_url, body, content_type)
+            if not document or 'id' not in document:
+                continue
+            for _ in range(self.status_polls):
+                self._timed(result, 'status', f"{self.documents_url}{document['id']}/")
+
+    def run_level(self, concurrency: int, duration: float) -> LoadLevelResult:
+        """
+        Maintient la concurrence donnée pendant duration secondes
+
+        Args:
+            concurrency: Nombre de clients simultanés
+            duration: Durée du palier (secondes)
+
+        Returns:
+            Mesures du palier
+        """
+        result = LoadLevelResult(concurrency)
+        started = time.perf_counter()
+        deadline = started + duration
+        clients = [
+            threading.Thread(target=self._client_loop, args=(result, deadline), daemon=True)
+            for _ in range(concurrency)
+        ]
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        result.wall_seconds = time.perf_counter() - started
+        return result
+
+    def ramp(self, levels: List[int], duration: float, max_p90_ms: float = 1000,
+             max_error_rate: float = 0.01) -> Dict:
+        """
+        Augmente la concurrence palier par palier et détermine le débit soutenable
+
+        Un palier est soutenable si son taux d'erreur et la latence p90 des
+        uploads restent sous les seuils. La montée s'arrête au premier palier
+        non soutenable. Les réponses 429 (limitation de débit) sont comptées
+        à part et n'entrent pas dans le taux d'erreur.
+
+        Args:
+            levels: Paliers de concurrence (ex: [1, 2, 4, 8])
+            duration: Durée de chaque palier (secondes)
+            max_p90_ms: Latence p90 maximale des uploads
+            max_error_rate: Taux d'erreur maximal
+
+        Returns:
+            Dict avec les paliers mesurés et le débit maximal soutenable
+        """
+        results = []
+        sustainable = None
+        for concurrency in levels:
+            level = self.run_level(concurrency, duration)
+            results.append(level)
+            if level.error_rate > max_error_rate or level.latency_ms('upload', 90) > max_p90_ms:
+                break
+            if sustainable is None or level.requests_per_second > sustainable.requests_per_second:
+                sustainable = level
+
+        return {
+            'levels': [level.to_dict() for level in results],
+            'max_sustainable': sustainable.to_dict() if sustainable else None,
+        }
@@ -0,0 +1,170 @@
+"""
+Tests pour les benchmarks OCR
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest.mock import patch
+from PIL import Image
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth.models import User
+from django.test import LiveServerTestCase, TestCase, override_settings
+from documents.models import Document
+from benchmarks import compare, generate_corpus, run_benchmark
+from benchmarks.harness import percentile
+from benchmarks.loadgen import LoadGenerator
+
+
+class StubEngine:
+    """Moteur OCR de test sans dépendance système"""
+    
+    name = 'stub'
+    
+    def extract_text(self, image, language=None, **kwargs):
+        return {'text': 'facture', 'confidence': 90.0, 'language': 'fra'}
+
+
+class BenchmarkTest(TestCase):
+    """Tests pour le corpus, les mesures et la comparaison à la baseline"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.work_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+    
+    def _digest(self, items):
+        return [hashlib.sha256(open(item.path, 'rb').read()).hexdigest() for item in items]
+    
+    def test_corpus_is_reproducible(self):
+        """Test que la même graine produit les mêmes fichiers"""
+        kinds = ('receipt', 'multipage_pdf')
+        first = generate_corpus(os.path.join(self.work_dir, 'a'), seed=1, pdf_pages=2, kinds=kinds)
+        second = generate_corpus(os.path.join(self.work_dir, 'b'), seed=1, pdf_pages=2, kinds=kinds)
+        
+        self.assertEqual(self._digest(first), self._digest(second))
+        self.assertEqual([item.pages_count for item in first], [1, 2])
+    
+    def test_percentile(self):
+        """Test le calcul des percentiles par interpolation"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertEqual(percentile(values, 100), 100)
+        self.assertEqual(percentile([7.0], 99), 7.0)
+    
+    def test_run_benchmark_counts_errors(self):
+        """Test qu'une exception est comptée comme erreur sans arrêter le benchmark"""
+        items = generate_corpus(self.work_dir, kinds=('receipt',), copies=2)
+        calls = []
+        
+        def operation(item):
+            calls.append(item.name)
+            if item.name == 'receipt_001':
+                raise RuntimeError("échec")
+        
+        result = run_benchmark('test', operation, items, repeat=2, warmup=0).to_dict()
+        
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(result['runs'], 2)
+        self.assertEqual(result['errors'], 2)
+        self.assertGreater(result['peak_rss_mb'], 0)
+    
+    def test_compare_detects_regressions(self):
+        """Test la détection des régressions au-delà de la tolérance"""
+        reference = {
+            'errors': 0,
+            'docs_per_second': 10.0,
+            'latency_ms': {'p50': 100.0, 'p90': 150.0},
+            'peak_rss_mb': 200.0,
+        }
+        baseline = {'results': {'engine.stub': reference}}
+        slower = dict(reference, docs_per_second=7.0, latency_ms={'p50': 100.0, 'p90': 200.0})
+        
+        self.assertEqual(compare({'engine.stub': reference}, baseline), [])
+        regressions = compare({'engine.stub': slower}, baseline, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('docs_per_second', regressions[0])
+    
+    def test_benchmark_command_baseline(self):
+        """Test la commande : baseline enregistrée puis régression détectée"""
+        baseline_path = os.path.join(self.work_dir, 'baseline.json')
+        options = {
+            'suites': 'engine,service,api',
+            'kinds': 'receipt',
+            'repeat': 1,
+            'stdout': StringIO(),
+        }
+        
+        with patch('ocr.engines.factory.OCREngineFactory.get_engine', return_value=StubEngine()):
+            call_command('benchmark_ocr', baseline=baseline_path, save_baseline=True, **options)
+            
+            with open(baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)
+            self.assertEqual(
+                sorted(baseline['results']), ['api.stub', 'engine.stub', 'service.stub']
+            )
+            self.assertEqual(baseline['results']['service.stub']['errors'], 0)
+            self.assertEqual(baseline['results']['api.stub']['errors'], 0)
+            self.assertFalse(Document.objects.exists())
+            
+            # Baseline irréaliste : tout benchmark est une régression
+            baseline['results']['engine.stub']['docs_per_second'] = 1e9
+            with open(baseline_path, 'w') as baseline_file:
+                json.dump(baseline, baseline_file)
+            with self.assertRaises(CommandError):
+                call_command('benchmark_ocr', baseline=baseline_path, **options)
+
+
+@override_settings(
+    OCR_FAKE_ENGINE_ENABLED=True, OCR_FAKE_ENGINE_CPU_MS=1, CELERY_ENABLED=False, RATE_LIMIT_REQUESTS=0
+)
+class LoadGeneratorTest(LiveServerTestCase):
+    """Tests pour le générateur de charge (serveur de test local)"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        User.objects.create_user(username='loadtest', password='testpass123')
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+    
+    def test_ramp_measures_upload_and_status(self):
+        """Test que les paliers mesurent uploads et statuts avec le moteur simulé"""
+        image = BytesIO()
+        Image.new('RGB', (20, 20), color='white').save(image, format='PNG')
+        generator = LoadGenerator(
+            self.live_server_url, 'loadtest', 'testpass123',
+            payload=image.getvalue(), filename='load.png', content_type='image/png',
+        )
+        
+        with self.settings(MEDIA_ROOT=self.media_root):
+            report = generator.ramp([1], duration=0.5)
+        
+        level = report['levels'][0]
+        self.assertGreater(level['requests'], 0)
+        self.assertEqual(level['errors'], 0)
+        self.assertGreater(level['upload_ms']['p50'], 0)
+        self.assertGreater(level['status_ms']['p50'], 0)
+        self.assertEqual(report['max_sustainable']['concurrency'], 1)
+        self.assertTrue(Document.objects.filter(engine_used='fake').exists())
+    
+    def test_throttled_uploads_are_not_errors(self):
+        """Test que les réponses 429 sont comptées à part des erreurs"""
+        cache.clear()
+        image = BytesIO()
+        Image.new('RGB', (20, 20), color='white').save(image, format='PNG')
+        generator = LoadGenerator(
+            self.live_server_url, 'loadtest', 'testpass123',
+            payload=image.getvalue(), filename='load.png', content_type='image/png', status_polls=0,
+        )
+        
+        with self.settings(MEDIA_ROOT=self.media_root, RATE_LIMIT_REQUESTS=1, RATE_LIMIT_WINDOW=3600):
+            report = generator.ramp([1], duration=1.5)
+        
+        level = report['levels'][0]
+        self.assertEqual(level['errors'], 0)
+        self.assertGreater(level['throttled'], 0)
+        self.assertEqual(Document.objects.count(), 1)
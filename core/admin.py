@@ -1,3 +1,11 @@
 from django.contrib import admin
+from core.models import ProfileRecord
 
-# Register your models here.
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    list_display = ['name', 'trigger', 'duration_ms', 'samples_count', 'file_name', 'created_at']
+    list_filter = ['name', 'trigger', 'created_at']
+    search_fields = ['name', 'file_path']
+    readonly_fields = ['name', 'trigger', 'file_path', 'duration_ms', 'samples_count', 'metadata', 'created_at']
+    date_hierarchy = 'created_at'
@@ -0,0 +1,210 @@
+"""
+Événements de progression des documents (pages traitées, fin de traitement)
+
+Les workers OCR publient sur un canal pub/sub par utilisateur (Redis en
+production, mémoire en développement et pour les tests). Chaque
+processus web asynchrone ne maintient qu'un abonnement au broker et
+redistribue les événements aux flux SSE ouverts (une file asyncio par
+connexion) : de nombreuses connexions sont servies par quelques workers
+à boucle d'événements.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import AsyncIterator, Dict, Iterable, Optional
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = 'ocr:events:user:'
+
+
+def channel_for(user_id: int) -> str:
+    """Canal pub/sub des événements d'un utilisateur"""
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+class EventHub:
+    """Abonnés locaux au processus (une file asyncio par flux SSE)"""
+
+    def __init__(self):
+        self._subscribers: Dict[int, Dict[asyncio.Queue, asyncio.AbstractEventLoop]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Crée la file d'un flux (à appeler depuis la boucle d'événements)"""
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, {})[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            queues = self._subscribers.get(user_id, {})
+            queues.pop(queue, None)
+            if not queues:
+                self._subscribers.pop(user_id, None)
+
+    def subscriber_count(self, user_id: int) -> int:
+        with self._lock:
+            return len(self._subscribers.get(user_id, {}))
+
+    def dispatch(self, user_id: int, event: Dict):
+        """Transmet un événement aux flux de l'utilisateur (depuis n'importe quel thread)"""
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, {}).items())
+        for queue, loop in targets:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # Boucle fermée : le flux se désabonne à sa fermeture
+                pass
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: Dict):
+        # Client trop lent : l'événement le plus ancien est abandonné
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+class InMemoryEventBroker:
+    """Broker local au processus (développement sans Celery, tests)"""
+
+    def __init__(self):
+        self.hub = EventHub()
+
+    def publish(self, user_id: int, event: Dict):
+        self.hub.dispatch(user_id, event)
+
+    async def ensure_listening(self):
+        pass
+
+
+class RedisEventBroker:
+    """Broker Redis : publication par les workers, un abonnement par processus web"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.hub = EventHub()
+        self._client = None
+        self._listener: Optional[asyncio.Task] = None
+
+    def publish(self, user_id: int, event: Dict):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel_for(user_id), json.dumps(event))
+
+    async def ensure_listening(self):
+        """Démarre l'abonnement du processus à l'ouverture du premier flux"""
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        while True:
+            client = aioredis.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + '*')
+                    async for message in pubsub.listen():
+                        if message['type'] != 'pmessage':
+                            continue
+                        user_id = int(message['channel'].decode().rsplit(':', 1)[1])
+                        self.hub.dispatch(user_id, json.loads(message['data']))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Abonnement aux événements OCR interrompu: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                # Une reconnexion ouvre un nouveau client : libère les connexions de l'ancien
+                try:
+                    await client.aclose()
+                except Exception:
+                    pass
+
+
+_brokers: Dict[tuple, object] = {}
+
+
+def get_broker():
+    """Retourne le broker configuré (EVENTS_BACKEND: redis ou memory)"""
+    key = (settings.EVENTS_BACKEND, settings.EVENTS_REDIS_URL)
+    if key not in _brokers:
+        if settings.EVENTS_BACKEND == 'redis':
+            _brokers[key] = RedisEventBroker(settings.EVENTS_REDIS_URL)
+        else:
+            _brokers[key] = InMemoryEventBroker()
+    return _brokers[key]
+
+
+def publish_document_event(document, event_type: str, **data):
+    """
+    Publie un événement de progression d'un document
+
+    Ne lève jamais d'exception : un broker indisponible ne doit pas faire
+    échouer l'OCR.
+
+    Args:
+        document: Document concerné
+        event_type: page (page traitée) ou status (changement de statut)
+        **data: Champs de l'événement (page, pages_count, error_code...)
+    """
+    if not settings.EVENTS_ENABLED:
+        return
+    event = {'type': event_type, 'document_id': document.pk, 'status': document.status, **data}
+    try:
+        get_broker().publish(document.user_id, event)
+    except Exception as e:
+        logger.warning("Publication de l'événement %s du document %s impossible: %s",
+                       event_type, document.pk, e)
+
+
+def format_sse(event: Dict) -> str:
+    """Sérialise un événement au format text/event-stream"""
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+
+async def event_stream(user_id: int, document_ids: Optional[Iterable[int]] = None,
+                       initial_events: Iterable[Dict] = ()) -> AsyncIterator[str]:
+    """
+    Flux SSE des événements d'un utilisateur
+
+    Des commentaires de maintien (keepalive) sont envoyés toutes les
+    EVENTS_HEARTBEAT secondes. Le flux se ferme après
+    EVENTS_MAX_DURATION secondes et le client se reconnecte
+    automatiquement (EventSource).
+
+    Args:
+        user_id: ID de l'utilisateur
+        document_ids: Documents suivis (tous si None)
+        initial_events: Événements envoyés à l'ouverture (état courant)
+    """
+    document_ids = set(document_ids) if document_ids else None
+    broker = get_broker()
+    await broker.ensure_listening()
+    queue = broker.hub.subscribe(user_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.EVENTS_MAX_DURATION
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        for event in initial_events:
+            yield format_sse(event)
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(settings.EVENTS_HEARTBEAT, remaining))
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if document_ids is None or event.get('document_id') in document_ids:
+                yield format_sse(event)
+    finally:
+        broker.hub.unsubscribe(user_id, queue)
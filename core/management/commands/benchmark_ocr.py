@@ -0,0 +1,184 @@
+"""
+Django management command pour mesurer les performances du pipeline OCR.
+
+Génère un corpus synthétique reproductible (tickets, pages denses, PDF
+multi-pages, grandes photos) puis mesure le moteur OCR seul,
+DocumentService et le chemin de création de l'API. Les documents créés
+sont annulés en fin de benchmark (transaction et répertoire média
+temporaires).
+
+Usage:
+    python manage.py benchmark_ocr
+    python manage.py benchmark_ocr --baseline benchmarks/baseline.json --save-baseline
+    python manage.py benchmark_ocr --baseline benchmarks/baseline.json
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from benchmarks import (
+    api_harness,
+    compare,
+    engine_harness,
+    generate_corpus,
+    load_baseline,
+    run_benchmark,
+    save_baseline,
+    service_harness,
+)
+from benchmarks.corpus import KINDS
+from ocr.engines.factory import OCREngineFactory
+from ocr.exceptions import OCRError
+
+SUITES = ('engine', 'service', 'api')
+
+
+class Command(BaseCommand):
+    """
+    Commande Django pour lancer les benchmarks OCR.
+
+    Affiche débit, percentiles de latence et pic de RSS par benchmark.
+    Avec --baseline, compare aux résultats enregistrés et échoue (code de
+    sortie non nul) si un benchmark régresse au-delà de --tolerance.
+    """
+    help = 'Mesure les performances OCR sur un corpus synthétique et compare à une baseline'
+
+    def add_arguments(self, parser):
+        """
+        Ajoute les arguments optionnels de la commande.
+        """
+        parser.add_argument(
+            '--suites',
+            default=','.join(SUITES),
+            help=f"Benchmarks à exécuter, séparés par des virgules ({', '.join(SUITES)})",
+        )
+        parser.add_argument('--engine', default='tesseract', help='Moteur OCR mesuré')
+        parser.add_argument('--language', default=None, help='Langue OCR (défaut du moteur)')
+        parser.add_argument(
+            '--kinds',
+            default=','.join(KINDS),
+            help=f"Types de documents du corpus ({', '.join(KINDS)})",
+        )
+        parser.add_argument('--copies', type=int, default=1, help='Documents par type')
+        parser.add_argument('--pdf-pages', type=int, default=5, help='Pages des PDF multi-pages')
+        parser.add_argument('--seed', type=int, default=0, help='Graine du corpus')
+        parser.add_argument('--repeat', type=int, default=3, help='Passes mesurées sur le corpus')
+        parser.add_argument('--warmup', type=int, default=1, help='Exécutions de chauffe')
+        parser.add_argument('--output', default=None, help='Fichier JSON du rapport')
+        parser.add_argument('--baseline', default=None, help='Fichier JSON de la baseline')
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Enregistre les résultats comme nouvelle baseline (--baseline)',
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Dégradation relative tolérée avant de signaler une régression (0.2 = 20 %%)',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Exécute les benchmarks et compare à la baseline.
+        """
+        suites = [suite.strip() for suite in options['suites'].split(',') if suite.strip()]
+        unknown = set(suites) - set(SUITES)
+        if unknown:
+            raise CommandError(f"Benchmarks inconnus: {', '.join(sorted(unknown))}")
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError("--save-baseline nécessite --baseline")
+
+        work_dir = tempfile.mkdtemp(prefix='ocr-benchmark-')
+        try:
+            items = generate_corpus(
+                os.path.join(work_dir, 'corpus'),
+                seed=options['seed'],
+                copies=options['copies'],
+                pdf_pages=options['pdf_pages'],
+                kinds=[kind.strip() for kind in options['kinds'].split(',') if kind.strip()],
+            )
+            self.stdout.write(
+                f"Corpus: {len(items)} documents, {sum(item.pages_count for item in items)} pages"
+            )
+            results = self._run_suites(suites, items, work_dir, options)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self._print_results(results)
+
+        metadata = {
+            'engine': options['engine'],
+            'seed': options['seed'],
+            'copies': options['copies'],
+            'pdf_pages': options['pdf_pages'],
+            'repeat': options['repeat'],
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as report:
+                json.dump({'metadata': metadata, 'results': results}, report, indent=2)
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], results, metadata)
+            self.stdout.write(self.style.SUCCESS(f"Baseline enregistrée dans {options['baseline']}"))
+        elif options['baseline']:
+            regressions = compare(results, load_baseline(options['baseline']), options['tolerance'])
+            if regressions:
+                raise CommandError(
+                    "Régressions par rapport à la baseline:\n  " + '\n  '.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la baseline"))
+
+    def _run_suites(self, suites, items, work_dir, options):
+        """Exécute les benchmarks demandés et retourne leurs résultats"""
+        try:
+            engine = OCREngineFactory.get_engine(options['engine'])
+        except OCRError as e:
+            raise CommandError(str(e))
+
+        results = {}
+        run_options = {'repeat': options['repeat'], 'warmup': options['warmup']}
+
+        if 'engine' in suites:
+            name = f"engine.{engine.name}"
+            harness = engine_harness(engine, language=options['language'])
+            results[name] = run_benchmark(name, harness, items, **run_options).to_dict()
+
+        if 'service' in suites or 'api' in suites:
+            # Documents et fichiers créés pendant le benchmark : annulés à la fin
+            media_root = os.path.join(work_dir, 'media')
+            with override_settings(
+                MEDIA_ROOT=media_root, CELERY_ENABLED=False, RATE_LIMIT_REQUESTS=0
+            ), transaction.atomic():
+                user = get_user_model().objects.create_user(username='ocr-benchmark')
+                if 'service' in suites:
+                    name = f"service.{engine.name}"
+                    harness = service_harness(user, engine.name, language=options['language'])
+                    results[name] = run_benchmark(name, harness, items, **run_options).to_dict()
+                if 'api' in suites:
+                    name = f"api.{engine.name}"
+                    harness = api_harness(user, engine.name)
+                    results[name] = run_benchmark(name, harness, items, **run_options).to_dict()
+                transaction.set_rollback(True)
+
+        return results
+
+    def _print_results(self, results):
+        """Affiche un tableau récapitulatif"""
+        header = f"{'benchmark':<22}{'docs/s':>9}{'pages/s':>9}{'p50 ms':>10}{'p90 ms':>10}" \
+                 f"{'p99 ms':>10}{'RSS Mo':>9}{'erreurs':>9}"
+        self.stdout.write(header)
+        for name, result in results.items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{name:<22}{result['docs_per_second']:>9}{result['pages_per_second']:>9}"
+                f"{latency['p50']:>10}{latency['p90']:>10}{latency['p99']:>10}"
+                f"{result['peak_rss_mb']:>9}{result['errors']:>9}"
+            )
@@ -0,0 +1,144 @@
+"""
+Django management command pour tester la charge de l'API OCR.
+
+Envoie des uploads et des consultations de statut à un serveur en cours
+d'exécution, à concurrence croissante. À utiliser avec le moteur simulé
+(OCR_FAKE_ENGINE_ENABLED=True sur le serveur) pour mesurer le coût propre
+du framework et le débit maximal soutenable, et sans limitation de débit
+(RATE_LIMIT_REQUESTS=0 sur le serveur) : sinon les uploads au-delà du
+quota reçoivent des 429, comptés dans la colonne « limités ».
+
+Usage:
+    OCR_FAKE_ENGINE_ENABLED=True RATE_LIMIT_REQUESTS=0 python manage.py runserver
+    python manage.py loadtest_api --url http://127.0.0.1:8000 --username admin --password admin
+    python manage.py loadtest_api --concurrency 1,4,16,64 --duration 30 --engine-cpu-ms 50
+"""
+import io
+import json
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.corpus import render_receipt
+from benchmarks.loadgen import LoadGenerator
+
+
+class Command(BaseCommand):
+    """
+    Commande Django pour générer de la charge sur l'API.
+
+    Affiche, par palier de concurrence, le débit et les latences des
+    uploads et des consultations de statut, puis le coût du framework
+    par requête (palier de concurrence 1) et le débit maximal soutenable.
+    """
+    help = "Teste la charge des endpoints d'upload et de statut de l'API"
+
+    def add_arguments(self, parser):
+        """
+        Ajoute les arguments optionnels de la commande.
+        """
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='URL du serveur')
+        parser.add_argument('--username', default='admin', help='Utilisateur (authentification Basic)')
+        parser.add_argument('--password', default='admin', help='Mot de passe')
+        parser.add_argument('--api-key', default=None, help="Clé d'API (remplace l'authentification Basic)")
+        parser.add_argument('--engine', default='fake', help='Moteur OCR demandé à l\'upload')
+        parser.add_argument(
+            '--concurrency',
+            default='1,2,4,8,16',
+            help='Paliers de concurrence, séparés par des virgules',
+        )
+        parser.add_argument('--duration', type=float, default=10, help='Durée de chaque palier (secondes)')
+        parser.add_argument('--status-polls', type=int, default=1, help='Consultations du statut par upload')
+        parser.add_argument(
+            '--engine-cpu-ms',
+            type=float,
+            default=0,
+            help='Coût du moteur simulé (OCR_FAKE_ENGINE_CPU_MS), déduit des uploads synchrones',
+        )
+        parser.add_argument('--max-p90-ms', type=float, default=1000, help='Latence p90 maximale soutenable')
+        parser.add_argument('--max-error-rate', type=float, default=0.01, help="Taux d'erreur maximal soutenable")
+        parser.add_argument('--output', default=None, help='Fichier JSON du rapport')
+
+    def handle(self, *args, **options):
+        """
+        Exécute les paliers de charge et affiche le rapport.
+        """
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError("--concurrency doit être une liste d'entiers (ex: 1,2,4)")
+        if not levels:
+            raise CommandError("Aucun palier de concurrence")
+
+        # Document d'une page, identique d'une exécution à l'autre
+        payload = io.BytesIO()
+        render_receipt(random.Random(0)).save(payload, format='PNG')
+
+        generator = LoadGenerator(
+            options['url'],
+            options['username'],
+            options['password'],
+            payload=payload.getvalue(),
+            filename='loadtest.png',
+            content_type='image/png',
+            engine=options['engine'] or None,
+            status_polls=options['status_polls'],
+            api_key=options['api_key'],
+        )
+        report = generator.ramp(
+            levels,
+            options['duration'],
+            max_p90_ms=options['max_p90_ms'],
+            max_error_rate=options['max_error_rate'],
+        )
+        report['framework_cost_ms'] = self._framework_cost(report, options['engine_cpu_ms'])
+
+        self._print_report(report)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+        if not report['max_sustainable']:
+            raise CommandError("Aucun palier soutenable (erreurs ou latence au-delà des seuils)")
+
+    @staticmethod
+    def _framework_cost(report, engine_cpu_ms):
+        """Coût par requête hors moteur OCR, mesuré sans contention (premier palier)"""
+        first = report['levels'][0] if report['levels'] else None
+        if not first or not first['requests']:
+            return None
+        return {
+            'upload_ms': round(max(first['upload_ms']['p50'] - engine_cpu_ms, 0), 2),
+            'status_ms': first['status_ms']['p50'],
+        }
+
+    def _print_report(self, report):
+        """Affiche les paliers et le débit maximal soutenable"""
+        self.stdout.write(
+            f"{'clients':>8}{'req/s':>10}{'uploads/s':>11}{'upload p50':>12}{'upload p90':>12}"
+            f"{'statut p50':>12}{'erreurs':>9}{'limités':>9}"
+        )
+        for level in report['levels']:
+            self.stdout.write(
+                f"{level['concurrency']:>8}{level['requests_per_second']:>10}{level['uploads_per_second']:>11}"
+                f"{level['upload_ms']['p50']:>12}{level['upload_ms']['p90']:>12}"
+                f"{level['status_ms']['p50']:>12}{level['errors']:>9}{level['throttled']:>9}"
+            )
+
+        if any(level['throttled'] for level in report['levels']):
+            self.stdout.write(self.style.WARNING(
+                "Réponses 429 reçues : lancer le serveur avec RATE_LIMIT_REQUESTS=0"
+            ))
+
+        cost = report['framework_cost_ms']
+        if cost:
+            self.stdout.write(
+                f"Coût du framework par requête: upload {cost['upload_ms']} ms, statut {cost['status_ms']} ms"
+            )
+        sustainable = report['max_sustainable']
+        if sustainable:
+            self.stdout.write(self.style.SUCCESS(
+                f"Débit maximal soutenable: {sustainable['requests_per_second']} req/s "
+                f"({sustainable['concurrency']} clients)"
+            ))
@@ -0,0 +1,150 @@
+"""
+Django management command pour les campagnes de retraitement OCR.
+
+Crée une campagne (documents terminés sélectionnés par moteur, date de
+traitement ou confiance), affiche l'avancement et le coût des campagnes,
+ou met en pause, reprend et annule une campagne. Les documents sont
+envoyés par Celery Beat (dispatch_reprocessing) au débit de la campagne.
+
+Usage:
+    python manage.py reprocess_documents --create "Tesseract 5.4" --before 2024-06-01 --max-confidence 80
+    python manage.py reprocess_documents
+    python manage.py reprocess_documents --campaign 3 --pause
+"""
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from documents.models import ReprocessingCampaign
+from documents.services.reprocessing import ReprocessingService
+
+
+class Command(BaseCommand):
+    """
+    Commande Django pour les campagnes de retraitement.
+
+    Sans --create ni --campaign, affiche l'avancement des campagnes non
+    terminées.
+    """
+    help = 'Crée, suit et pilote les campagnes de retraitement OCR'
+
+    def add_arguments(self, parser):
+        """
+        Ajoute les arguments optionnels de la commande.
+        """
+        parser.add_argument('--create', metavar='NOM', default=None, help='Crée une campagne')
+        parser.add_argument('--engine', default='tesseract', help='Moteur OCR du retraitement')
+        parser.add_argument('--language', default=None, help='Langue OCR (défaut du moteur)')
+        parser.add_argument('--filter-engine', default='', help='Documents traités par ce moteur')
+        parser.add_argument('--before', default=None, help='Documents traités avant cette date (AAAA-MM-JJ)')
+        parser.add_argument(
+            '--max-confidence',
+            type=float,
+            default=None,
+            help='Documents dont la confiance est inférieure à ce seuil',
+        )
+        parser.add_argument(
+            '--min-improvement',
+            type=float,
+            default=0.0,
+            help='Gain de confiance minimal pour remplacer un résultat',
+        )
+        parser.add_argument('--rate', type=int, default=None, help='Documents envoyés par minute')
+        parser.add_argument('--all', action='store_true', help='Affiche aussi les campagnes terminées')
+
+        parser.add_argument('--campaign', type=int, default=None, help='ID de la campagne à piloter')
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--pause', action='store_true', help='Met la campagne en pause')
+        action.add_argument('--resume', action='store_true', help='Reprend la campagne')
+        action.add_argument('--cancel', action='store_true', help='Annule la campagne')
+
+    def handle(self, *args, **options):
+        """
+        Exécute l'action demandée.
+        """
+        service = ReprocessingService()
+
+        if options['create']:
+            campaign = service.create_campaign(
+                options['create'],
+                engine_name=options['engine'],
+                language=options['language'],
+                filter_engine=options['filter_engine'],
+                filter_processed_before=self._parse_before(options['before']),
+                filter_max_confidence=options['max_confidence'],
+                min_improvement=options['min_improvement'],
+                rate_per_minute=options['rate'],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Campagne {campaign.pk} créée : {campaign.total_items} documents"
+            ))
+            self._print_campaign(service, campaign)
+            return
+
+        if options['campaign'] is not None:
+            try:
+                campaign = ReprocessingCampaign.objects.get(pk=options['campaign'])
+            except ReprocessingCampaign.DoesNotExist:
+                raise CommandError(f"Campagne inconnue: {options['campaign']}")
+            status = self._requested_status(campaign, options)
+            if status:
+                service.set_status(campaign, status)
+            self._print_campaign(service, campaign)
+            return
+
+        if options['pause'] or options['resume'] or options['cancel']:
+            raise CommandError("--pause, --resume et --cancel nécessitent --campaign")
+
+        campaigns = ReprocessingCampaign.objects.all()
+        if not options['all']:
+            campaigns = campaigns.exclude(
+                status__in=[ReprocessingCampaign.Status.COMPLETED, ReprocessingCampaign.Status.CANCELLED]
+            )
+        for campaign in campaigns:
+            self._print_campaign(service, campaign)
+
+    def _parse_before(self, value):
+        """Date (AAAA-MM-JJ) ou date et heure ISO 8601"""
+        if value is None:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"Date invalide: {value}")
+            parsed = datetime.combine(day, time.min)
+        return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+    def _requested_status(self, campaign, options):
+        """Nouveau statut demandé, après vérification de la transition"""
+        finished = (ReprocessingCampaign.Status.COMPLETED, ReprocessingCampaign.Status.CANCELLED)
+        if not (options['pause'] or options['resume'] or options['cancel']):
+            return None
+        if campaign.status in finished:
+            raise CommandError(f"La campagne {campaign.pk} est {campaign.get_status_display().lower()}")
+        if options['pause']:
+            return ReprocessingCampaign.Status.PAUSED
+        if options['resume']:
+            return ReprocessingCampaign.Status.RUNNING
+        return ReprocessingCampaign.Status.CANCELLED
+
+    def _print_campaign(self, service, campaign):
+        """Affiche l'avancement et le coût d'une campagne"""
+        progress = service.progress(campaign)
+        counts = progress['counts']
+        self.stdout.write(
+            f"[{campaign.pk}] {campaign.name} - {campaign.get_status_display()} : "
+            f"{progress['done']}/{progress['total']} ({progress['percent']} %)"
+        )
+        self.stdout.write(
+            f"  remplacés {counts['improved']}, conservés {counts['kept']}, ignorés {counts['skipped']}, "
+            f"échecs {counts['failed']}, en file {counts['queued']}, en attente {counts['pending']}"
+        )
+        gain = f"+{progress['average_gain']}" if progress['average_gain'] is not None else '-'
+        eta = f", fin estimée dans {progress['eta_minutes']} min" if progress['eta_minutes'] is not None else ''
+        self.stdout.write(
+            f"  gain moyen {gain}, coût estimé {progress['estimated_cost']} MP, "
+            f"temps OCR {progress['processing_seconds']} s{eta}"
+        )
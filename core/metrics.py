@@ -0,0 +1,264 @@
+"""
+Métriques Prometheus (débit, latence OCR, profondeur des files, échecs)
+
+Les compteurs sont mis à jour par DocumentService et la tâche Celery. En
+déploiement multi-processus (gunicorn, workers Celery préfork), chaque
+processus écrit dans PROMETHEUS_MULTIPROC_DIR et l'agrégation est faite
+au moment de l'export.
+"""
+import os
+from typing import Dict, Optional
+from django.conf import settings
+
+# Export Prometheus optionnel avec prometheus_client
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+    from prometheus_client.core import GaugeMetricFamily
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    CONTENT_TYPE_LATEST = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# Tranches de nombre de pages (cardinalité des labels bornée)
+PAGE_BUCKETS = ((1, '1'), (5, '2-5'), (20, '6-20'), (100, '21-100'))
+
+if PROMETHEUS_AVAILABLE:
+    DOCUMENTS_UPLOADED = Counter(
+        'ocr_documents_uploaded_total',
+        "Documents uploadés",
+        ['mime_type'],
+    )
+    DOCUMENTS_PROCESSED = Counter(
+        'ocr_documents_processed_total',
+        "Documents traités par l'OCR",
+        ['engine', 'status'],
+    )
+    PAGES_PROCESSED = Counter(
+        'ocr_pages_processed_total',
+        "Pages traitées par l'OCR",
+        ['engine'],
+    )
+    DOCUMENT_SECONDS = Histogram(
+        'ocr_document_processing_seconds',
+        "Durée de traitement OCR d'un document",
+        ['engine', 'language', 'pages'],
+        buckets=(0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800),
+    )
+    STAGE_SECONDS = Histogram(
+        'ocr_stage_seconds',
+        "Durée cumulée d'une étape du pipeline OCR par document",
+        ['stage'],
+        buckets=(0.005, 0.025, 0.1, 0.5, 1, 5, 30, 120, 600),
+    )
+    TASKS = Counter(
+        'ocr_tasks_total',
+        "Exécutions de la tâche OCR par issue",
+        ['outcome'],
+    )
+    TASK_FAILURES = Counter(
+        'ocr_task_failures_total',
+        "Échecs de la tâche OCR par classe d'erreur",
+        ['error_code', 'transient'],
+    )
+    ADAPTIVE_PAGES = Counter(
+        'ocr_adaptive_pages_total',
+        "Pages traitées par l'OCR adaptatif, par passe retenue",
+        ['tier', 'escalated'],
+    )
+    REPROCESSING_ITEMS = Counter(
+        'ocr_reprocessing_items_total',
+        "Documents retraités par les campagnes, par issue",
+        ['outcome'],
+    )
+
+
+def pages_label(pages_count: int) -> str:
+    """Retourne la tranche de nombre de pages utilisée comme label"""
+    for limit, label in PAGE_BUCKETS:
+        if pages_count <= limit:
+            return label
+    return '100+'
+
+
+def record_upload(mime_type: str) -> None:
+    """Compte un document uploadé"""
+    if PROMETHEUS_AVAILABLE:
+        DOCUMENTS_UPLOADED.labels(mime_type=mime_type).inc()
+
+
+def record_document_processed(
+    engine: str,
+    language: str,
+    pages_count: int,
+    duration: float,
+    stage_timings: Optional[Dict[str, int]] = None
+) -> None:
+    """Enregistre un document traité avec succès (latence, pages, étapes)"""
+    if not PROMETHEUS_AVAILABLE:
+        return
+    DOCUMENTS_PROCESSED.labels(engine=engine, status='completed').inc()
+    PAGES_PROCESSED.labels(engine=engine).inc(pages_count)
+    DOCUMENT_SECONDS.labels(
+        engine=engine,
+        language=language or 'unknown',
+        pages=pages_label(pages_count),
+    ).observe(duration)
+    for stage, milliseconds in (stage_timings or {}).items():
+        STAGE_SECONDS.labels(stage=stage).observe(milliseconds / 1000)
+
+
+def record_document_failed(engine: Optional[str]) -> None:
+    """Enregistre un document en échec"""
+    if PROMETHEUS_AVAILABLE:
+        DOCUMENTS_PROCESSED.labels(engine=engine or 'unknown', status='failed').inc()
+
+
+def record_task_outcome(outcome: str) -> None:
+    """Compte une exécution de tâche (success, retry, dead_letter, skipped)"""
+    if PROMETHEUS_AVAILABLE:
+        TASKS.labels(outcome=outcome).inc()
+
+
+def record_task_failure(error_code: str, transient: bool) -> None:
+    """Compte un échec de tâche par classe d'erreur"""
+    if PROMETHEUS_AVAILABLE:
+        TASK_FAILURES.labels(error_code=error_code, transient=str(transient).lower()).inc()
+
+
+def record_page_tier(tier: str, escalated: bool) -> None:
+    """Compte une page de l'OCR adaptatif (passe retenue, escalade)"""
+    if PROMETHEUS_AVAILABLE:
+        ADAPTIVE_PAGES.labels(tier=tier, escalated=str(escalated).lower()).inc()
+
+
+def record_reprocessing_outcome(outcome: str) -> None:
+    """Compte un document retraité (improved, kept, skipped, failed)"""
+    if PROMETHEUS_AVAILABLE:
+        REPROCESSING_ITEMS.labels(outcome=outcome).inc()
+
+
+class CurrentProcessCollector:
+    """Expose les métriques du processus courant (mode mono-processus)"""
+
+    def collect(self):
+        return REGISTRY.collect()
+
+
+class QueueDepthCollector:
+    """Profondeur des files calculée à chaque export (base et broker)"""
+
+    # Réglages nommant les files Celery à mesurer
+    queue_settings = (
+        'OCR_INTERACTIVE_QUEUE', 'OCR_BULK_QUEUE', 'OCR_DEAD_LETTER_QUEUE',
+        'REPROCESSING_QUEUE', 'WEBHOOKS_QUEUE',
+    )
+
+    def collect(self):
+        from django.db.models import Count
+        from documents.models import Document
+
+        documents = GaugeMetricFamily(
+            'ocr_documents_by_status',
+            "Documents par statut",
+            labels=['status'],
+        )
+        counts = dict(
+            Document.objects.values_list('status').annotate(count=Count('id')).order_by()
+        )
+        for status in Document.Status.values:
+            documents.add_metric([status], counts.get(status, 0))
+        yield documents
+
+        queue_lengths = self._broker_queue_lengths()
+        if queue_lengths:
+            queues = GaugeMetricFamily(
+                'ocr_queue_messages',
+                "Messages en attente dans les files Celery",
+                labels=['queue'],
+            )
+            for queue, length in queue_lengths.items():
+                queues.add_metric([queue], length)
+            yield queues
+
+    def _broker_queue_lengths(self) -> Dict[str, int]:
+        """Longueur des files Celery (ignorée si le broker est injoignable)"""
+        from img_to_txt_ocr.celery import app
+
+        lengths = {}
+        try:
+            with app.connection_for_read() as connection:
+                connection.ensure_connection(max_retries=1)
+                channel = connection.default_channel
+                for queue in dict.fromkeys(getattr(settings, name) for name in self.queue_settings):
+                    lengths[queue] = channel.queue_declare(queue, passive=True).message_count
+        except Exception:
+            return {}
+        return lengths
+
+
+def build_registry(include_queue_depth: bool = True):
+    """
+    Construit le registre à exporter
+
+    En mode multi-processus (PROMETHEUS_MULTIPROC_DIR), les fichiers de
+    tous les processus sont agrégés ; sinon le registre du processus est
+    utilisé.
+    """
+    registry = CollectorRegistry()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(CurrentProcessCollector())
+    if include_queue_depth:
+        registry.register(QueueDepthCollector())
+    return registry
+
+
+def export_metrics(include_queue_depth: bool = True) -> bytes:
+    """Retourne les métriques au format texte Prometheus"""
+    if not PROMETHEUS_AVAILABLE:
+        return b''
+    return generate_latest(build_registry(include_queue_depth))
+
+
+def reset_multiprocess_dir() -> None:
+    """
+    Vide PROMETHEUS_MULTIPROC_DIR au démarrage du processus maître
+
+    Les fichiers d'une exécution précédente fausseraient les compteurs.
+    """
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for filename in os.listdir(directory):
+        if filename.endswith('.db'):
+            os.remove(os.path.join(directory, filename))
+
+
+def mark_process_dead(pid: int) -> None:
+    """Nettoie les gauges d'un processus terminé (mode multi-processus)"""
+    if PROMETHEUS_AVAILABLE and os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
+
+
+def start_worker_exporter(port: int) -> None:
+    """
+    Démarre l'export HTTP d'un worker Celery (agrégation de ses processus)
+
+    Les workers tournent dans leur propre conteneur : leurs métriques sont
+    exposées sur un port dédié plutôt que par /metrics du serveur web.
+    """
+    if not PROMETHEUS_AVAILABLE or not port:
+        return
+    from prometheus_client import start_http_server
+    start_http_server(port, registry=build_registry(include_queue_depth=False))
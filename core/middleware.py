@@ -0,0 +1,99 @@
+"""
+Middlewares du projet
+"""
+import gzip
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+# Compression brotli optionnelle (package brotli), sinon gzip
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """
+    Encodages acceptés par le client et leur poids (q)
+
+    Returns:
+        Dict {encodage: q}, encodages refusés (q=0) exclus
+    """
+    accepted = {}
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    Compression brotli ou gzip des réponses volumineuses de l'API
+
+    Seuls les types de COMPRESSION_CONTENT_TYPES (JSON, texte brut) sont
+    compressés : les pages HTML contiennent le jeton CSRF, qu'une
+    compression exposerait à BREACH. Les réponses plus petites que
+    COMPRESSION_MIN_SIZE sont envoyées telles quelles. Un ETag fort
+    devient faible (W/), la représentation n'étant plus identique octet
+    pour octet.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.compress(request, response)
+
+    def compress(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type not in settings.COMPRESSION_CONTENT_TYPES:
+            return response
+
+        # Réponse variable selon Accept-Encoding, même non compressée (caches intermédiaires)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        encoding = self._choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding == 'br':
+            compressed = brotli.compress(response.content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        elif encoding == 'gzip':
+            compressed = gzip.compress(response.content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+        else:
+            return response
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
+
+    def _choose_encoding(self, header: str):
+        """Encodage préféré par le client parmi ceux disponibles"""
+        accepted = parse_accept_encoding(header)
+        available = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+        candidates = [coding for coding in available if coding in accepted or '*' in accepted]
+        if not candidates:
+            return None
+        # À poids égal, brotli (meilleur taux) est préféré
+        return max(candidates, key=lambda coding: accepted.get(coding, accepted.get('*', 0)))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, max_length=255, verbose_name='Opération')),
+                ('trigger', models.CharField(choices=[('sampled', 'Échantillonnage'), ('header', 'En-tête HTTP'), ('flag', 'Option de tâche')], default='sampled', max_length=20, verbose_name='Déclenchement')),
+                ('file_path', models.CharField(max_length=500, verbose_name='Fichier du profil')),
+                ('duration_ms', models.PositiveIntegerField(default=0, verbose_name='Durée (ms)')),
+                ('samples_count', models.PositiveIntegerField(default=0, verbose_name="Nombre d'échantillons")),
+                ('metadata', models.JSONField(blank=True, default=dict, verbose_name='Métadonnées')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+            ],
+            options={
+                'verbose_name': 'Profil',
+                'verbose_name_plural': 'Profils',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
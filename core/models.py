@@ -1,3 +1,58 @@
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+import os
 
-# Create your models here.
+
+class ProfileRecord(models.Model):
+    """Profil d'échantillonnage enregistré sur disque (format flamegraph)"""
+    
+    class Trigger(models.TextChoices):
+        SAMPLED = 'sampled', _('Échantillonnage')
+        HEADER = 'header', _('En-tête HTTP')
+        FLAG = 'flag', _('Option de tâche')
+    
+    name = models.CharField(
+        max_length=255,
+        db_index=True,
+        verbose_name=_("Opération")
+    )
+    trigger = models.CharField(
+        max_length=20,
+        choices=Trigger.choices,
+        default=Trigger.SAMPLED,
+        verbose_name=_("Déclenchement")
+    )
+    file_path = models.CharField(
+        max_length=500,
+        verbose_name=_("Fichier du profil")
+    )
+    duration_ms = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Durée (ms)")
+    )
+    samples_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Nombre d'échantillons")
+    )
+    metadata = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Métadonnées")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    
+    class Meta:
+        verbose_name = _("Profil")
+        verbose_name_plural = _("Profils")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.duration_ms} ms)"
+    
+    @property
+    def file_name(self):
+        """Nom du fichier du profil"""
+        return os.path.basename(self.file_path)
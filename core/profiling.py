@@ -0,0 +1,187 @@
+"""
+Profileur par échantillonnage activable en production
+
+Un thread relève la pile du thread profilé à intervalle régulier et
+compte les piles identiques. Le résultat est écrit au format « collapsed
+stacks » (une pile par ligne, frames séparées par « ; », suivie du nombre
+d'échantillons), directement utilisable par flamegraph.pl ou speedscope.
+
+Le profilage est désactivé par défaut (PROFILING_ENABLED) : le coût se
+limite alors à la lecture d'un setting par appel.
+"""
+import functools
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# En-tête HTTP forçant le profilage d'une requête (utilisateurs staff)
+PROFILE_HEADER = 'HTTP_X_OCR_PROFILE'
+
+
+class SamplingProfiler:
+    """Échantillonne la pile d'un thread à intervalle fixe"""
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Démarre l'échantillonnage dans un thread démon"""
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        """Convertit une pile en ligne « racine;...;feuille »"""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            names.append(f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(';', ':'))
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Retourne les piles au format collapsed (flamegraph)"""
+        return '\n'.join(
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        ) + '\n'
+
+
+def should_profile(forced: bool = False) -> bool:
+    """
+    Indique si un appel doit être profilé
+
+    Args:
+        forced: Profilage demandé explicitement (en-tête, option de tâche)
+
+    Returns:
+        True si le profilage est activé et l'appel retenu
+    """
+    if not settings.PROFILING_ENABLED:
+        return False
+    return forced or random.random() < settings.PROFILING_SAMPLE_RATE
+
+
+@contextmanager
+def profile_block(name: str, trigger: str = 'sampled', metadata: Optional[dict] = None):
+    """
+    Profile le bloc et enregistre le dump (fichier + ProfileRecord)
+
+    Args:
+        name: Nom de l'opération profilée
+        trigger: Origine du profilage (sampled, header, flag)
+        metadata: Informations complémentaires (document, utilisateur...)
+    """
+    profiler = SamplingProfiler(interval=settings.PROFILING_INTERVAL)
+    start_time = time.perf_counter()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        duration_ms = int((time.perf_counter() - start_time) * 1000)
+        try:
+            save_profile(profiler, name, trigger, duration_ms, metadata or {})
+        except Exception:
+            # Le profilage ne doit jamais faire échouer l'opération profilée
+            logger.exception("Impossible d'enregistrer le profil %s", name)
+
+
+def save_profile(profiler: SamplingProfiler, name: str, trigger: str,
+                 duration_ms: int, metadata: dict):
+    """Écrit le dump collapsed dans PROFILING_DIR et l'enregistre en base"""
+    from core.models import ProfileRecord
+
+    os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+    filename = f"{timezone.now():%Y%m%d-%H%M%S}-{name}-{uuid.uuid4().hex[:8]}.folded"
+    file_path = os.path.join(settings.PROFILING_DIR, filename)
+    with open(file_path, 'w', encoding='utf-8') as dump:
+        dump.write(profiler.collapsed())
+
+    return ProfileRecord.objects.create(
+        name=name,
+        trigger=trigger,
+        file_path=file_path,
+        duration_ms=duration_ms,
+        samples_count=profiler.samples,
+        metadata=metadata,
+    )
+
+
+def profile_view(name: str):
+    """
+    Décorateur de méthode de vue : profile une fraction des requêtes
+
+    Un utilisateur staff peut forcer le profilage avec l'en-tête X-OCR-Profile: 1.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.PROFILING_ENABLED:
+                return view_method(self, request, *args, **kwargs)
+
+            forced = (
+                request.META.get(PROFILE_HEADER) == '1'
+                and getattr(request.user, 'is_staff', False)
+            )
+            if not should_profile(forced):
+                return view_method(self, request, *args, **kwargs)
+
+            metadata = {'path': request.path, 'user_id': request.user.pk}
+            with profile_block(name, 'header' if forced else 'sampled', metadata):
+                return view_method(self, request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_task(name: str):
+    """
+    Décorateur de tâche Celery : profile une fraction des exécutions
+
+    L'argument nommé profile=True de la tâche force le profilage.
+    """
+    def decorator(task_func):
+        @functools.wraps(task_func)
+        def wrapper(*args, **kwargs):
+            if not settings.PROFILING_ENABLED:
+                return task_func(*args, **kwargs)
+
+            forced = bool(kwargs.get('profile'))
+            if not should_profile(forced):
+                return task_func(*args, **kwargs)
+
+            metadata = {'args': [repr(arg) for arg in args[1:]]}
+            with profile_block(name, 'flag' if forced else 'sampled', metadata):
+                return task_func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,10 +1,26 @@
 """
 Tests pour l'app core
 """
-from django.test import TestCase, Client
+import os
+import shutil
+import tempfile
+import time
+import gzip
+from io import StringIO
+from unittest.mock import MagicMock, patch
+from PIL import Image
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.http import HttpResponse, JsonResponse
+from django.test import TestCase, Client, RequestFactory, override_settings
 from django.contrib.auth.models import User
 from django.urls import reverse
+from core.models import ProfileRecord
+from core.middleware import CompressionMiddleware, parse_accept_encoding
+from core.profiling import SamplingProfiler, profile_task
 from documents.models import Document
+from documents.tests_services import StubOCREngine
 
 
 class HomeViewTest(TestCase):
@@ -141,3 +157,222 @@ class DocumentHistoryViewTest(TestCase):
         self.client.logout()
         response = self.client.get(reverse('document_history'))
         self.assertRedirects(response, f"{reverse('login')}?next={reverse('document_history')}")
+
+
+class MetricsViewTest(TestCase):
+    """Tests pour l'export des métriques Prometheus"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+    
+    def test_metrics_view_exports_document_counts(self):
+        """Test que /metrics expose les documents par statut"""
+        Document.objects.create(
+            user=self.user,
+            file_name='scan.png',
+            file_size=1024,
+            mime_type='image/png',
+        )
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn('ocr_documents_by_status{status="pending"} 1.0', content)
+        self.assertIn('ocr_documents_processed_total', content)
+    
+    def test_metrics_view_disabled(self):
+        """Test que /metrics renvoie 404 si les métriques sont désactivées"""
+        with self.settings(METRICS_ENABLED=False):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 404)
+    
+    def test_metrics_view_restricted_ips(self):
+        """Test que /metrics refuse les IPs non autorisées"""
+        with self.settings(METRICS_ALLOWED_IPS=['10.0.0.1']):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
+    
+    def test_metrics_view_defaults_to_loopback(self):
+        """Test que /metrics n'est ouvert qu'à la boucle locale sans liste d'IPs"""
+        with self.settings(METRICS_ALLOWED_IPS=[]):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='::1').status_code, 200)
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1').status_code, 403)
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='').status_code, 403)
+        
+        with self.settings(METRICS_ALLOWED_IPS=['10.0.0.1']):
+            self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+    
+    def test_queue_depth_covers_every_configured_queue(self):
+        """Test que la profondeur est exportée pour toutes les files configurées"""
+        connection = MagicMock()
+        connection.__enter__.return_value.default_channel.queue_declare.return_value.message_count = 2
+        with patch('img_to_txt_ocr.celery.app.connection_for_read', return_value=connection):
+            content = self.client.get(reverse('metrics')).content.decode()
+        
+        for queue in ['ocr_interactive', 'ocr_bulk', 'ocr_dead_letter', 'ocr_reprocessing', 'webhooks']:
+            self.assertIn(f'ocr_queue_messages{{queue="{queue}"}} 2.0', content)
+
+class ProfilingTest(TestCase):
+    """Tests pour le profileur par échantillonnage"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.profiles_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profiles_dir, ignore_errors=True)
+    
+    @staticmethod
+    def busy(duration=0.05):
+        """Occupe le CPU pendant la durée donnée"""
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            pass
+        return 'done'
+    
+    def test_sampling_profiler_collapsed_output(self):
+        """Test que les piles sont écrites au format collapsed"""
+        profiler = SamplingProfiler(interval=0.001)
+        profiler.start()
+        self.busy()
+        profiler.stop()
+        
+        self.assertGreater(profiler.samples, 0)
+        first_line = profiler.collapsed().splitlines()[0]
+        stack, count = first_line.rsplit(' ', 1)
+        self.assertIn('busy (tests.py:', stack)
+        self.assertGreater(int(count), 0)
+    
+    def test_profile_task_flag_writes_profile(self):
+        """Test que profile=True enregistre un profil quand le profilage est activé"""
+        task = profile_task('test.task')(lambda profile=False: self.busy())
+        with self.settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0.0,
+                           PROFILING_INTERVAL=0.001, PROFILING_DIR=self.profiles_dir):
+            self.assertEqual(task(profile=True), 'done')
+        
+        record = ProfileRecord.objects.get()
+        self.assertEqual(record.name, 'test.task')
+        self.assertEqual(record.trigger, ProfileRecord.Trigger.FLAG)
+        self.assertTrue(os.path.exists(record.file_path))
+        self.assertGreater(record.samples_count, 0)
+    
+    def test_profiling_disabled(self):
+        """Test qu'aucun profil n'est enregistré si le profilage est désactivé"""
+        task = profile_task('test.task')(lambda profile=False: self.busy(0.001))
+        with self.settings(PROFILING_ENABLED=False, PROFILING_DIR=self.profiles_dir):
+            task(profile=True)
+        self.assertFalse(ProfileRecord.objects.exists())
+        self.assertEqual(os.listdir(self.profiles_dir), [])
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100)
+class CompressionMiddlewareTest(TestCase):
+    """Tests pour la compression des réponses"""
+    
+    def _get(self, response, accept_encoding='gzip, deflate'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+    
+    def test_large_json_is_gzipped(self):
+        """Test qu'une réponse JSON volumineuse est compressée"""
+        payload = {'text': 'texte répété ' * 100}
+        response = self._get(JsonResponse(payload))
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), JsonResponse(payload).content)
+    
+    def test_small_and_html_responses_untouched(self):
+        """Test que les petites réponses et le HTML ne sont pas compressés"""
+        self.assertFalse(self._get(JsonResponse({'ok': True})).has_header('Content-Encoding'))
+        self.assertFalse(self._get(HttpResponse('<p>page</p>' * 100)).has_header('Content-Encoding'))
+    
+    def test_client_without_gzip_gets_identity(self):
+        """Test qu'un client refusant gzip reçoit la réponse non compressée"""
+        response = self._get(JsonResponse({'text': 'x' * 500}), accept_encoding='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+    
+    def test_parse_accept_encoding(self):
+        """Test l'analyse des poids d'Accept-Encoding"""
+        self.assertEqual(
+            parse_accept_encoding('br;q=0.9, gzip, deflate;q=0'),
+            {'br': 0.9, 'gzip': 1.0}
+        )
+
+
+class IngestDocumentsCommandTest(TestCase):
+    """Tests pour la commande d'ingestion en masse"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='archiviste', password='testpass123')
+        self.source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source_dir, ignore_errors=True)
+        for name, color in (('a.png', 'white'), ('b.png', 'black'), ('sub/c.png', 'red')):
+            path = os.path.join(self.source_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            Image.new('RGB', (20, 10), color=color).save(path)
+        # Doublon de a.png sous un autre nom, et fichier refusé
+        shutil.copy(os.path.join(self.source_dir, 'a.png'), os.path.join(self.source_dir, 'copie.png'))
+        with open(os.path.join(self.source_dir, 'notes.txt'), 'w') as f:
+            f.write('pas une image')
+    
+    def _ingest(self, source=None, *args):
+        out = StringIO()
+        call_command('ingest_documents', source or self.source_dir, '--user', 'archiviste',
+                     '--workers', '1', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_ingest_deduplicates_and_resumes(self):
+        """Test que les doublons sont ignorés et qu'une relance ne recrée rien"""
+        output = self._ingest(None, '--mode', 'none')
+        
+        self.assertIn('3 créés', output)
+        self.assertIn('1 doublons', output)
+        self.assertIn('1 refusés', output)
+        documents = Document.objects.filter(user=self.user)
+        self.assertEqual(sorted(documents.values_list('file_name', flat=True)), ['a.png', 'b.png', 'c.png'])
+        document = documents.get(file_name='a.png')
+        self.assertEqual(len(document.content_hash), 64)
+        self.assertEqual(document.pages_count, 1)
+        self.assertEqual(document.estimated_pixels, 200)
+        self.assertTrue(os.path.exists(document.original_file.path))
+        
+        # Relance : les documents jamais traités sont repris, aucun n'est recréé
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=StubOCREngine()):
+            output = self._ingest(None, '--mode', 'local', '--batch-size', '2')
+        self.assertIn('0 créés, 3 repris', output)
+        self.assertIn('OCR : 3 terminés', output)
+        self.assertEqual(Document.objects.count(), 3)
+        self.assertFalse(Document.objects.exclude(status=Document.Status.COMPLETED).exists())
+        
+        output = self._ingest(None, '--mode', 'local')
+        self.assertIn('0 créés, 0 repris, 4 doublons', output)
+    
+    def test_ingest_manifest_with_celery(self):
+        """Test l'ingestion d'un manifeste avec envoi des documents à Celery"""
+        manifest = os.path.join(self.source_dir, 'manifest.txt')
+        with open(manifest, 'w') as f:
+            f.write('# Lot de test\nb.png\n\nsub/c.png\n')
+        
+        with patch('documents.tasks.process_document_ocr_task.apply_async') as apply_async:
+            output = self._ingest(manifest, '--mode', 'celery')
+        
+        self.assertIn('2 créés', output)
+        self.assertIn('2 documents envoyés à Celery', output)
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(
+            [call.kwargs['queue'] for call in apply_async.call_args_list], [settings.OCR_BULK_QUEUE] * 2
+        )
+        self.assertEqual(
+            sorted(Document.objects.values_list('file_name', flat=True)), ['b.png', 'c.png']
+        )
+    
+    def test_unknown_user(self):
+        """Test qu'un utilisateur inconnu est refusé"""
+        with self.assertRaises(CommandError):
+            call_command('ingest_documents', self.source_dir, '--user', 'inconnu', stdout=StringIO())
@@ -0,0 +1,215 @@
+"""
+Traces de bout en bout : upload, attente dans la file Celery, tâche OCR
+
+Le contexte de trace suit le format W3C traceparent
+(00-<trace_id>-<span_id>-01) : il est créé à l'upload, stocké sur le
+document et transmis à la tâche Celery dans les en-têtes du message.
+Les spans terminés sont envoyés à un exporteur (fichier JSON lines au
+format des spans OTLP/JSON, ou mémoire pour les tests).
+
+Le traçage est désactivé par défaut (TRACING_ENABLED) : start_span ne
+crée alors aucun span.
+"""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+from django.conf import settings
+
+# Span actif du contexte courant (thread ou tâche asyncio)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+
+class SpanContext:
+    """Identifiants propagés entre processus (trace et span parent)"""
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+    def __repr__(self):
+        return f"SpanContext({self.trace_id}, {self.span_id})"
+
+
+class Span:
+    """Opération chronométrée d'une trace"""
+
+    def __init__(self, name: str, parent: Optional[SpanContext] = None,
+                 attributes: Optional[Dict] = None, start_time_ns: Optional[int] = None):
+        self.name = name
+        self.context = SpanContext(
+            parent.trace_id if parent else secrets.token_hex(16),
+            secrets.token_hex(8),
+        )
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes or {})
+        self.start_time_ns = start_time_ns or time.time_ns()
+        self.end_time_ns = None
+        self.status = 'ok'
+
+    @property
+    def duration_ms(self) -> float:
+        """Durée du span en millisecondes"""
+        return ((self.end_time_ns or time.time_ns()) - self.start_time_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value):
+        """Ajoute un attribut au span"""
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        """Marque le span en erreur"""
+        self.status = 'error'
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def end(self, end_time_ns: Optional[int] = None):
+        """Termine le span et l'envoie à l'exporteur"""
+        self.end_time_ns = end_time_ns or time.time_ns()
+        get_exporter().export(self)
+
+    def to_dict(self) -> Dict:
+        """Représentation au format des spans OTLP/JSON"""
+        return {
+            'traceId': self.context.trace_id,
+            'spanId': self.context.span_id,
+            'parentSpanId': self.parent_id or '',
+            'name': self.name,
+            'startTimeUnixNano': str(self.start_time_ns),
+            'endTimeUnixNano': str(self.end_time_ns),
+            'attributes': [
+                {'key': key, 'value': _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            'status': {'code': 'STATUS_CODE_ERROR' if self.status == 'error' else 'STATUS_CODE_OK'},
+        }
+
+
+def _otlp_value(value) -> Dict:
+    """Convertit une valeur d'attribut au format OTLP/JSON"""
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+class InMemorySpanExporter:
+    """Conserve les spans en mémoire (tests)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def clear(self):
+        self.spans = []
+
+
+class FileSpanExporter:
+    """Ajoute les spans à un fichier JSON lines (un span OTLP/JSON par ligne)"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        record = span.to_dict()
+        record['resource'] = {'service.name': settings.TRACING_SERVICE_NAME}
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as spans_file:
+                spans_file.write(line + '\n')
+
+
+_exporters = {}
+
+
+def get_exporter():
+    """Retourne l'exporteur configuré (TRACING_EXPORTER: file ou memory)"""
+    key = (settings.TRACING_EXPORTER, str(settings.TRACING_FILE))
+    if key not in _exporters:
+        if settings.TRACING_EXPORTER == 'memory':
+            _exporters[key] = InMemorySpanExporter()
+        else:
+            _exporters[key] = FileSpanExporter(settings.TRACING_FILE)
+    return _exporters[key]
+
+
+def current_span() -> Optional[Span]:
+    """Retourne le span actif"""
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict] = None,
+               parent: Optional[SpanContext] = None):
+    """
+    Ouvre un span enfant du span actif (ou du parent donné)
+
+    Args:
+        name: Nom de l'opération
+        attributes: Attributs du span
+        parent: Contexte parent (ex: reçu dans les en-têtes Celery)
+
+    Yields:
+        Span créé, ou None si le traçage est désactivé
+    """
+    if not settings.TRACING_ENABLED:
+        yield None
+        return
+
+    active = _current_span.get()
+    span = Span(name, parent or (active.context if active else None), attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.record_exception(exc)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def record_span(name: str, start_time: float, end_time: Optional[float] = None,
+                parent: Optional[SpanContext] = None, attributes: Optional[Dict] = None):
+    """
+    Enregistre un span déjà écoulé (ex: attente dans la file Celery)
+
+    Args:
+        name: Nom de l'opération
+        start_time: Début (timestamp Unix en secondes)
+        end_time: Fin (timestamp Unix, défaut: maintenant)
+        parent: Contexte parent
+        attributes: Attributs du span
+    """
+    if not settings.TRACING_ENABLED:
+        return None
+    span = Span(name, parent, attributes, start_time_ns=int(start_time * 1_000_000_000))
+    span.end(int(end_time * 1_000_000_000) if end_time else None)
+    return span
+
+
+def format_traceparent(span: Optional[Span]) -> Optional[str]:
+    """Sérialise le contexte d'un span en en-tête traceparent"""
+    if span is None:
+        return None
+    return f"00-{span.context.trace_id}-{span.context.span_id}-01"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """Lit un en-tête traceparent (None s'il est absent ou invalide)"""
+    if not value:
+        return None
+    parts = value.split('-')
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2])
@@ -8,6 +8,8 @@ from django.conf import settings
 from documents.forms import DocumentUploadForm
 from documents.models import Document, OCRResult
 from documents.services.document_service import DocumentService
+from core import metrics
+import ipaddress
 import os
 
 
@@ -70,6 +72,16 @@ def ocr_tools(request):
                     language=form.cleaned_data.get('language') or None
                 )
                 
+                # Avec Celery : mise en file, la page du résultat suit la
+                # progression en direct (flux SSE)
+                if settings.CELERY_ENABLED:
+                    service.queue_document_ocr(
+                        document=document,
+                        language=form.cleaned_data.get('language') or None
+                    )
+                    messages.info(request, 'Document mis en file de traitement.')
+                    return redirect('ocr_result', document_id=document.id)
+                
                 # Traitement OCR
                 try:
                     ocr_result = service.process_document_ocr(
@@ -115,6 +127,7 @@ def ocr_result(request, document_id):
     context = {
         'document': document,
         'ocr_result': ocr_result,
+        'events_base_url': settings.EVENTS_BASE_URL,
     }
     return render(request, 'core/ocr_result.html', context)
 
@@ -142,3 +155,29 @@ def document_history(request):
         'documents': documents,
     }
     return render(request, 'core/document_history.html', context)
+
+
+@require_http_methods(["GET"])
+def metrics_view(request):
+    """
+    Expose les métriques Prometheus (débit, latence, files d'attente)
+    
+    Accès limité aux IPs de METRICS_ALLOWED_IPS, à la boucle locale seule
+    si la liste est vide.
+    """
+    if not settings.METRICS_ENABLED:
+        raise Http404("Métriques désactivées")
+    
+    remote_addr = request.META.get('REMOTE_ADDR', '')
+    allowed_ips = settings.METRICS_ALLOWED_IPS
+    if allowed_ips:
+        allowed = remote_addr in allowed_ips
+    else:
+        try:
+            allowed = ipaddress.ip_address(remote_addr).is_loopback
+        except ValueError:
+            allowed = False
+    if not allowed:
+        return HttpResponse("Accès refusé", status=403, content_type='text/plain; charset=utf-8')
+    
+    return HttpResponse(metrics.export_metrics(), content_type=metrics.CONTENT_TYPE_LATEST)
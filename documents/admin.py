@@ -1,19 +1,83 @@
 from django.contrib import admin
-from documents.models import Document, OCRResult
+from documents.models import (
+    Document,
+    OCRLayout,
+    OCRPageResult,
+    OCRRegionResult,
+    OCRResult,
+    OCRResultVersion,
+    OCRTemplate,
+    ReprocessingCampaign,
+    ReprocessingItem,
+)
 
 
 @admin.register(Document)
 class DocumentAdmin(admin.ModelAdmin):
     list_display = ['file_name', 'user', 'status', 'uploaded_at', 'confidence_score']
-    list_filter = ['status', 'uploaded_at', 'engine_used']
+    list_filter = ['status', 'error_code', 'uploaded_at', 'engine_used']
     search_fields = ['file_name', 'user__username']
-    readonly_fields = ['uploaded_at', 'processed_at']
+    readonly_fields = ['uploaded_at', 'submitted_at', 'queued_at', 'processed_at']
     date_hierarchy = 'uploaded_at'
 
 
 @admin.register(OCRResult)
 class OCRResultAdmin(admin.ModelAdmin):
-    list_display = ['document', 'language_detected', 'confidence_score', 'word_count', 'created_at']
+    list_display = ['document', 'language_detected', 'confidence_score', 'word_count', 'version', 'created_at']
     list_filter = ['language_detected', 'engine_used', 'created_at']
     search_fields = ['document__file_name']
+    readonly_fields = ['created_at', 'stage_timings']
+
+
+@admin.register(OCRLayout)
+class OCRLayoutAdmin(admin.ModelAdmin):
+    list_display = ['ocr_result', 'word_count', 'size_bytes', 'created_at']
+    search_fields = ['ocr_result__document__file_name']
+    readonly_fields = ['word_count', 'created_at']
+
+
+@admin.register(OCRResultVersion)
+class OCRResultVersionAdmin(admin.ModelAdmin):
+    list_display = ['ocr_result', 'version', 'confidence_score', 'engine_used', 'archived_at']
+    list_filter = ['engine_used', 'archived_at']
+    search_fields = ['ocr_result__document__file_name']
+    readonly_fields = ['archived_at']
+
+
+@admin.register(OCRPageResult)
+class OCRPageResultAdmin(admin.ModelAdmin):
+    list_display = ['document', 'page_number', 'confidence_score', 'ocr_tier', 'escalated', 'engine_used', 'created_at']
+    list_filter = ['ocr_tier', 'escalated', 'engine_used', 'created_at']
+    search_fields = ['document__file_name']
     readonly_fields = ['created_at']
+
+
+@admin.register(OCRRegionResult)
+class OCRRegionResultAdmin(admin.ModelAdmin):
+    list_display = ['document', 'name', 'page_number', 'confidence_score', 'engine_used', 'created_at']
+    list_filter = ['engine_used', 'created_at']
+    search_fields = ['document__file_name', 'name']
+    readonly_fields = ['created_at']
+
+
+@admin.register(OCRTemplate)
+class OCRTemplateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'user', 'created_at', 'updated_at']
+    search_fields = ['name', 'user__username']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(ReprocessingCampaign)
+class ReprocessingCampaignAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'engine_name', 'total_items', 'rate_per_minute', 'created_at']
+    list_filter = ['status', 'engine_name', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['total_items', 'estimated_pixels', 'created_at', 'completed_at']
+
+
+@admin.register(ReprocessingItem)
+class ReprocessingItemAdmin(admin.ModelAdmin):
+    list_display = ['document', 'campaign', 'status', 'previous_confidence', 'new_confidence', 'processed_at']
+    list_filter = ['status', 'campaign']
+    search_fields = ['document__file_name']
+    readonly_fields = ['queued_at', 'processed_at']
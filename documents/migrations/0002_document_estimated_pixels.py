@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='estimated_pixels',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Pixels estimés'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_estimated_pixels'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRPageResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.PositiveIntegerField(verbose_name='Numéro de page')),
+                ('text', models.TextField(blank=True, verbose_name='Texte extrait')),
+                ('confidence_score', models.FloatField(verbose_name='Score de confiance')),
+                ('language_detected', models.CharField(max_length=10, verbose_name='Langue détectée')),
+                ('engine_used', models.CharField(max_length=50, verbose_name='Moteur OCR utilisé')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='page_results', to='documents.document', verbose_name='Document')),
+            ],
+            options={
+                'verbose_name': 'Résultat OCR de page',
+                'verbose_name_plural': 'Résultats OCR de page',
+                'ordering': ['document', 'page_number'],
+                'constraints': [models.UniqueConstraint(fields=('document', 'page_number'), name='unique_document_page_result')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_ocrpageresult'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='error_code',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True, verbose_name="Code d'erreur"),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_error_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='Traité par'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Expiration du bail'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='requested_engine',
+            field=models.CharField(blank=True, max_length=50, null=True, verbose_name='Moteur OCR demandé'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='requested_language',
+            field=models.CharField(blank=True, max_length=10, null=True, verbose_name='Langue demandée'),
+        ),
+    ]
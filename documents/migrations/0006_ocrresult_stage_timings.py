@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_document_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrresult',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Durées par étape (ms)'),
+        ),
+    ]
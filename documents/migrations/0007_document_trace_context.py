@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_ocrresult_stage_timings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='trace_context',
+            field=models.CharField(blank=True, max_length=55, null=True, verbose_name='Contexte de trace'),
+        ),
+    ]
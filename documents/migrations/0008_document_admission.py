@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_document_trace_context'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Date de mise en file'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='submitted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Date de soumission à l'OCR"),
+        ),
+    ]
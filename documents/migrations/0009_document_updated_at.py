@@ -0,0 +1,20 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:10
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0008_document_admission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text="Base des ETags de l'API, à renseigner aussi dans les update()", verbose_name='Date de modification'),
+            preserve_default=False,
+        ),
+    ]
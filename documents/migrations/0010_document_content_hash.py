@@ -0,0 +1,24 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0009_document_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Empreinte SHA-256 du fichier'),
+        ),
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['user', 'content_hash'], name='documents_d_user_id_79b163_idx'),
+        ),
+    ]
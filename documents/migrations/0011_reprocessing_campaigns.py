@@ -0,0 +1,69 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_document_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrresult',
+            name='version',
+            field=models.PositiveIntegerField(default=1, verbose_name='Version'),
+        ),
+        migrations.CreateModel(
+            name='ReprocessingCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('engine_name', models.CharField(default='tesseract', max_length=50, verbose_name='Moteur OCR')),
+                ('language', models.CharField(blank=True, max_length=10, null=True, verbose_name='Langue OCR')),
+                ('min_improvement', models.FloatField(default=0.0, help_text="Le nouveau résultat remplace l'ancien si sa confiance le dépasse d'au moins ce gain", verbose_name='Gain de confiance minimal')),
+                ('rate_per_minute', models.PositiveIntegerField(verbose_name='Documents envoyés par minute')),
+                ('filter_engine', models.CharField(blank=True, max_length=50, verbose_name='Moteur utilisé')),
+                ('filter_processed_before', models.DateTimeField(blank=True, null=True, verbose_name='Traités avant le')),
+                ('filter_max_confidence', models.FloatField(blank=True, null=True, verbose_name='Confiance inférieure à')),
+                ('status', models.CharField(choices=[('running', 'En cours'), ('paused', 'En pause'), ('completed', 'Terminée'), ('cancelled', 'Annulée')], default='running', max_length=20, verbose_name='Statut')),
+                ('total_items', models.PositiveIntegerField(default=0, verbose_name='Documents sélectionnés')),
+                ('estimated_pixels', models.PositiveBigIntegerField(default=0, help_text='Coût OCR estimé de la campagne (somme des documents sélectionnés)', verbose_name='Pixels estimés')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de fin')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reprocessing_campaigns', to=settings.AUTH_USER_MODEL, verbose_name='Créée par')),
+            ],
+            options={
+                'verbose_name': 'Campagne de retraitement',
+                'verbose_name_plural': 'Campagnes de retraitement',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReprocessingItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('queued', 'En file'), ('improved', 'Résultat remplacé'), ('kept', 'Résultat conservé'), ('skipped', 'Ignoré'), ('failed', 'Échec')], default='pending', max_length=20, verbose_name='Statut')),
+                ('previous_version', models.PositiveIntegerField(blank=True, null=True, verbose_name='Version précédente')),
+                ('previous_confidence', models.FloatField(blank=True, null=True, verbose_name='Confiance précédente')),
+                ('new_confidence', models.FloatField(blank=True, null=True, verbose_name='Nouvelle confiance')),
+                ('processing_time', models.FloatField(blank=True, null=True, verbose_name='Temps de traitement (secondes)')),
+                ('error_message', models.TextField(blank=True, null=True, verbose_name="Message d'erreur")),
+                ('queued_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de mise en file')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='Date de traitement')),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='documents.reprocessingcampaign', verbose_name='Campagne')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reprocessing_items', to='documents.document', verbose_name='Document')),
+            ],
+            options={
+                'verbose_name': 'Document à retraiter',
+                'verbose_name_plural': 'Documents à retraiter',
+                'ordering': ['campaign', 'id'],
+                'indexes': [models.Index(fields=['campaign', 'status'], name='documents_r_campaig_1dafe7_idx')],
+                'constraints': [models.UniqueConstraint(fields=('campaign', 'document'), name='unique_campaign_document')],
+            },
+        ),
+    ]
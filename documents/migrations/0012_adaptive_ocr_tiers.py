@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0011_reprocessing_campaigns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrpageresult',
+            name='escalated',
+            field=models.BooleanField(default=False, verbose_name='Passe précise déclenchée'),
+        ),
+        migrations.AddField(
+            model_name='ocrpageresult',
+            name='fast_confidence',
+            field=models.FloatField(blank=True, null=True, verbose_name='Confiance de la passe rapide'),
+        ),
+        migrations.AddField(
+            model_name='ocrpageresult',
+            name='ocr_tier',
+            field=models.CharField(choices=[('standard', 'Standard'), ('fast', 'Rapide'), ('accurate', 'Précis')], default='standard', max_length=20, verbose_name='Passe OCR'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0012_adaptive_ocr_tiers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='ocr_regions',
+            field=models.JSONField(blank=True, help_text='Zones nommées à lire (formulaires) ; vide : pages entières', null=True, verbose_name='Zones OCR'),
+        ),
+        migrations.CreateModel(
+            name='OCRRegionResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom de la zone')),
+                ('page_number', models.PositiveIntegerField(verbose_name='Numéro de page')),
+                ('text', models.TextField(blank=True, verbose_name='Texte extrait')),
+                ('confidence_score', models.FloatField(verbose_name='Score de confiance')),
+                ('language_detected', models.CharField(max_length=10, verbose_name='Langue détectée')),
+                ('engine_used', models.CharField(max_length=50, verbose_name='Moteur OCR utilisé')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='region_results', to='documents.document', verbose_name='Document')),
+            ],
+            options={
+                'verbose_name': 'Résultat OCR de zone',
+                'verbose_name_plural': 'Résultats OCR de zone',
+                'ordering': ['document', 'page_number', 'id'],
+                'constraints': [models.UniqueConstraint(fields=('document', 'name'), name='unique_document_region_result')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OCRTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Nom')),
+                ('regions', models.JSONField(verbose_name='Zones')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date de modification')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ocr_templates', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Modèle de formulaire',
+                'verbose_name_plural': 'Modèles de formulaire',
+                'ordering': ['name'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'name'), name='unique_user_ocr_template')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0013_ocr_regions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ocrpageresult',
+            name='layout',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Disposition des mots'),
+        ),
+        migrations.CreateModel(
+            name='OCRLayout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField(verbose_name='Disposition des mots')),
+                ('word_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de mots')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('ocr_result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='layout', to='documents.ocrresult', verbose_name='Résultat OCR')),
+            ],
+            options={
+                'verbose_name': 'Disposition OCR',
+                'verbose_name_plural': 'Dispositions OCR',
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-19 15:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0014_word_layout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OCRResultVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(verbose_name='Version')),
+                ('raw_text', models.TextField(verbose_name='Texte brut')),
+                ('cleaned_text', models.TextField(verbose_name='Texte nettoyé')),
+                ('confidence_score', models.FloatField(verbose_name='Score de confiance')),
+                ('language_detected', models.CharField(max_length=10, verbose_name='Langue détectée')),
+                ('engine_used', models.CharField(max_length=50, verbose_name='Moteur OCR utilisé')),
+                ('word_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de mots')),
+                ('character_count', models.PositiveIntegerField(default=0, verbose_name='Nombre de caractères')),
+                ('pages', models.JSONField(blank=True, default=list, verbose_name='Pages')),
+                ('layout', models.BinaryField(blank=True, null=True, verbose_name='Disposition des mots')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name="Date d'archivage")),
+                ('ocr_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='documents.ocrresult', verbose_name='Résultat OCR')),
+            ],
+            options={
+                'verbose_name': 'Version de résultat OCR',
+                'verbose_name_plural': 'Versions de résultats OCR',
+                'ordering': ['ocr_result', '-version'],
+                'constraints': [models.UniqueConstraint(fields=('ocr_result', 'version'), name='unique_ocr_result_version')],
+            },
+        ),
+    ]
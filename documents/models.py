@@ -1,7 +1,11 @@
+from django.core.cache import cache
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.utils.translation import gettext_lazy as _
+from ocr.layout import WordLayout
 import os
+import time
 
 
 class Document(models.Model):
@@ -13,6 +17,15 @@ class Document(models.Model):
         COMPLETED = 'completed', _('Terminé')
         FAILED = 'failed', _('Échec')
     
+    # Statuts de fin de traitement (un échec temporaire peut être réessayé)
+    FINAL_STATUSES = (Status.COMPLETED, Status.FAILED)
+    
+    # Réponses de l'API mises en cache (voir api.cache)
+    CACHED_PAYLOADS = ('detail', 'text')
+    
+    # Durée de vie du signal de fin de traitement (attentes longues de l'API)
+    SIGNAL_TIMEOUT = 600
+    
     # Relations
     user = models.ForeignKey(
         User,
@@ -37,6 +50,12 @@ class Document(models.Model):
         max_length=100,
         verbose_name=_("Type MIME")
     )
+    content_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        verbose_name=_("Empreinte SHA-256 du fichier")
+    )
     
     # Métadonnées OCR
     language_detected = models.CharField(
@@ -49,6 +68,10 @@ class Document(models.Model):
         default=1,
         verbose_name=_("Nombre de pages")
     )
+    estimated_pixels = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Pixels estimés")
+    )
     engine_used = models.CharField(
         max_length=50,
         null=True,
@@ -56,6 +79,26 @@ class Document(models.Model):
         verbose_name=_("Moteur OCR utilisé")
     )
     
+    # Options OCR demandées (réutilisées lors d'une remise en file)
+    requested_language = models.CharField(
+        max_length=10,
+        null=True,
+        blank=True,
+        verbose_name=_("Langue demandée")
+    )
+    requested_engine = models.CharField(
+        max_length=50,
+        null=True,
+        blank=True,
+        verbose_name=_("Moteur OCR demandé")
+    )
+    ocr_regions = models.JSONField(
+        null=True,
+        blank=True,
+        verbose_name=_("Zones OCR"),
+        help_text=_("Zones nommées à lire (formulaires) ; vide : pages entières")
+    )
+    
     # Résultats OCR
     extracted_text = models.TextField(
         null=True,
@@ -79,6 +122,11 @@ class Document(models.Model):
         blank=True,
         verbose_name=_("Date de traitement")
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Date de modification"),
+        help_text=_("Base des ETags de l'API, à renseigner aussi dans les update()")
+    )
     
     # Statut et erreurs
     status = models.CharField(
@@ -93,6 +141,48 @@ class Document(models.Model):
         blank=True,
         verbose_name=_("Message d'erreur")
     )
+    error_code = models.CharField(
+        max_length=50,
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Code d'erreur")
+    )
+    
+    # Bail du worker qui traite le document
+    claimed_by = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        verbose_name=_("Traité par")
+    )
+    lease_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Expiration du bail")
+    )
+    
+    # Admission équitable dans la file OCR (voir FairShareAdmission)
+    submitted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date de soumission à l'OCR")
+    )
+    queued_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name=_("Date de mise en file")
+    )
+    
+    # Traçage (contexte W3C traceparent créé à l'upload)
+    trace_context = models.CharField(
+        max_length=55,
+        null=True,
+        blank=True,
+        verbose_name=_("Contexte de trace")
+    )
     
     class Meta:
         verbose_name = _("Document")
@@ -101,6 +191,8 @@ class Document(models.Model):
         indexes = [
             models.Index(fields=['user', 'uploaded_at']),
             models.Index(fields=['status']),
+            # Déduplication des fichiers d'un utilisateur (ingestion en masse)
+            models.Index(fields=['user', 'content_hash']),
         ]
     
     def __str__(self):
@@ -109,6 +201,53 @@ class Document(models.Model):
     def get_file_extension(self):
         """Retourne l'extension du fichier"""
         return os.path.splitext(self.file_name)[1].lower()
+    
+    @property
+    def is_deferred(self):
+        """Soumis à l'OCR mais en attente d'admission (plafond de l'utilisateur atteint)"""
+        return (
+            self.status == self.Status.PENDING
+            and self.submitted_at is not None
+            and self.queued_at is None
+        )
+    
+    @property
+    def estimated_cost(self):
+        """Coût OCR estimé (mégapixels à traiter)"""
+        return self.estimated_pixels / 1_000_000
+    
+    @staticmethod
+    def payload_cache_key(document_id, kind: str) -> str:
+        """Clé de cache d'une réponse sérialisée de l'API (kind: detail, text)"""
+        return f'document:{document_id}:{kind}'
+    
+    def invalidate_cache(self):
+        """Supprime les réponses sérialisées en cache du document"""
+        cache.delete_many([self.payload_cache_key(self.pk, kind) for kind in self.CACHED_PAYLOADS])
+    
+    @staticmethod
+    def signal_cache_key(document_id) -> str:
+        """Clé de cache du signal de fin de traitement"""
+        return f'document:{document_id}:signal'
+    
+    def signal_state_change(self):
+        """Réveille les clients en attente du document (long-poll de l'API)"""
+        cache.set(self.signal_cache_key(self.pk), time.time(), self.SIGNAL_TIMEOUT)
+    
+    def touch(self):
+        """Marque le document comme modifié après une écriture hors save() (ETag, cache)"""
+        self.updated_at = timezone.now()
+        Document.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+        self.invalidate_cache()
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Fin de l'OCR, échec, modification : la réponse suivante est recalculée
+        self.invalidate_cache()
+    
+    def delete(self, *args, **kwargs):
+        self.invalidate_cache()
+        return super().delete(*args, **kwargs)
 
 
 class OCRResult(models.Model):
@@ -157,6 +296,17 @@ class OCRResult(models.Model):
         blank=True,
         verbose_name=_("Temps de traitement (secondes)")
     )
+    stage_timings = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_("Durées par étape (ms)")
+    )
+    
+    # Incrémentée à chaque remplacement par un retraitement (campagne)
+    version = models.PositiveIntegerField(
+        default=1,
+        verbose_name=_("Version")
+    )
     
     # Timestamps
     created_at = models.DateTimeField(
@@ -171,3 +321,528 @@ class OCRResult(models.Model):
     
     def __str__(self):
         return f"OCR Result for {self.document.file_name}"
+    
+    STAGE_LABELS = {
+        'load': _("Chargement"),
+        'render': _("Rendu PDF"),
+        'preprocess': _("Prétraitement"),
+        'engine_init': _("Initialisation du moteur"),
+        'ocr': _("OCR"),
+        'postprocess': _("Post-traitement"),
+        'persist': _("Enregistrement"),
+    }
+    
+    def get_stage_timings_display(self):
+        """Retourne les durées par étape avec libellé et part du total"""
+        timings = self.stage_timings or {}
+        total = sum(timings.values()) or 1
+        return [
+            {
+                'stage': stage,
+                'label': self.STAGE_LABELS.get(stage, stage),
+                'ms': ms,
+                'percent': round(ms * 100 / total, 1),
+            }
+            for stage, ms in timings.items()
+        ]
+
+
+class OCRLayout(models.Model):
+    """
+    Disposition des mots d'un résultat OCR (boîtes et confiances)
+    
+    Stockée dans une table séparée, au format binaire en colonnes de
+    WordLayout : elle n'est lue que par l'API layout, page par page.
+    """
+    
+    # Relation
+    ocr_result = models.OneToOneField(
+        OCRResult,
+        on_delete=models.CASCADE,
+        related_name='layout',
+        verbose_name=_("Résultat OCR")
+    )
+    
+    # Disposition encodée (voir ocr.layout.WordLayout)
+    data = models.BinaryField(
+        verbose_name=_("Disposition des mots")
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Nombre de mots")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    
+    class Meta:
+        verbose_name = _("Disposition OCR")
+        verbose_name_plural = _("Dispositions OCR")
+    
+    def __str__(self):
+        return f"Layout for {self.ocr_result.document.file_name}"
+    
+    @property
+    def size_bytes(self):
+        """Taille de la disposition encodée"""
+        return len(self.data)
+    
+    def decode(self) -> WordLayout:
+        """Disposition décodable page par page"""
+        return WordLayout(bytes(self.data))
+
+
+class OCRResultVersion(models.Model):
+    """
+    Version précédente d'un résultat OCR, archivée avant son remplacement
+    
+    Un retraitement (campagne) remplace le résultat courant en place ;
+    l'ancien texte, les pages et la disposition des mots sont conservés
+    ici pour comparer les versions ou revenir en arrière.
+    """
+    
+    # Relation
+    ocr_result = models.ForeignKey(
+        OCRResult,
+        on_delete=models.CASCADE,
+        related_name='versions',
+        verbose_name=_("Résultat OCR")
+    )
+    version = models.PositiveIntegerField(
+        verbose_name=_("Version")
+    )
+    
+    # Résultat archivé
+    raw_text = models.TextField(
+        verbose_name=_("Texte brut")
+    )
+    cleaned_text = models.TextField(
+        verbose_name=_("Texte nettoyé")
+    )
+    confidence_score = models.FloatField(
+        verbose_name=_("Score de confiance")
+    )
+    language_detected = models.CharField(
+        max_length=10,
+        verbose_name=_("Langue détectée")
+    )
+    engine_used = models.CharField(
+        max_length=50,
+        verbose_name=_("Moteur OCR utilisé")
+    )
+    word_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Nombre de mots")
+    )
+    character_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Nombre de caractères")
+    )
+    
+    # Pages (numéro, texte, confiance, langue, moteur, passe) et disposition des mots
+    pages = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Pages")
+    )
+    layout = models.BinaryField(
+        null=True,
+        blank=True,
+        verbose_name=_("Disposition des mots")
+    )
+    
+    # Date du remplacement par la version suivante
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date d'archivage")
+    )
+    
+    class Meta:
+        verbose_name = _("Version de résultat OCR")
+        verbose_name_plural = _("Versions de résultats OCR")
+        ordering = ['ocr_result', '-version']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ocr_result', 'version'],
+                name='unique_ocr_result_version'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Version {self.version} of {self.ocr_result.document.file_name}"
+
+
+class OCRPageResult(models.Model):
+    """Résultat OCR d'une page, enregistré dès qu'elle est traitée (checkpoint)"""
+    
+    class Tier(models.TextChoices):
+        STANDARD = 'standard', _('Standard')
+        FAST = 'fast', _('Rapide')
+        ACCURATE = 'accurate', _('Précis')
+    
+    # Relation
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='page_results',
+        verbose_name=_("Document")
+    )
+    page_number = models.PositiveIntegerField(
+        verbose_name=_("Numéro de page")
+    )
+    
+    # Résultat
+    text = models.TextField(
+        blank=True,
+        verbose_name=_("Texte extrait")
+    )
+    confidence_score = models.FloatField(
+        verbose_name=_("Score de confiance")
+    )
+    language_detected = models.CharField(
+        max_length=10,
+        verbose_name=_("Langue détectée")
+    )
+    engine_used = models.CharField(
+        max_length=50,
+        verbose_name=_("Moteur OCR utilisé")
+    )
+    
+    # OCR adaptatif : passe retenue et décision d'escalade
+    ocr_tier = models.CharField(
+        max_length=20,
+        choices=Tier.choices,
+        default=Tier.STANDARD,
+        verbose_name=_("Passe OCR")
+    )
+    escalated = models.BooleanField(
+        default=False,
+        verbose_name=_("Passe précise déclenchée")
+    )
+    fast_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Confiance de la passe rapide")
+    )
+    
+    # Disposition des mots de la page, regroupée dans OCRLayout à la fin du traitement
+    layout = models.BinaryField(
+        null=True,
+        blank=True,
+        verbose_name=_("Disposition des mots")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    
+    class Meta:
+        verbose_name = _("Résultat OCR de page")
+        verbose_name_plural = _("Résultats OCR de page")
+        ordering = ['document', 'page_number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['document', 'page_number'],
+                name='unique_document_page_result'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Page {self.page_number} of {self.document.file_name}"
+
+
+class OCRRegionResult(models.Model):
+    """Résultat OCR d'une zone nommée (formulaire à mise en page fixe)"""
+    
+    # Relation
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='region_results',
+        verbose_name=_("Document")
+    )
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Nom de la zone")
+    )
+    page_number = models.PositiveIntegerField(
+        verbose_name=_("Numéro de page")
+    )
+    
+    # Résultat
+    text = models.TextField(
+        blank=True,
+        verbose_name=_("Texte extrait")
+    )
+    confidence_score = models.FloatField(
+        verbose_name=_("Score de confiance")
+    )
+    language_detected = models.CharField(
+        max_length=10,
+        verbose_name=_("Langue détectée")
+    )
+    engine_used = models.CharField(
+        max_length=50,
+        verbose_name=_("Moteur OCR utilisé")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    
+    class Meta:
+        verbose_name = _("Résultat OCR de zone")
+        verbose_name_plural = _("Résultats OCR de zone")
+        ordering = ['document', 'page_number', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['document', 'name'],
+                name='unique_document_region_result'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.document.file_name})"
+
+
+class OCRTemplate(models.Model):
+    """
+    Modèle de formulaire : zones nommées réutilisables à l'upload
+    
+    Les zones sont normalisées par RegionValidator (coordonnées relatives
+    à la page).
+    """
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='ocr_templates',
+        verbose_name=_("Utilisateur")
+    )
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Nom")
+    )
+    regions = models.JSONField(
+        verbose_name=_("Zones")
+    )
+    
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name=_("Date de modification")
+    )
+    
+    class Meta:
+        verbose_name = _("Modèle de formulaire")
+        verbose_name_plural = _("Modèles de formulaire")
+        ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'name'],
+                name='unique_user_ocr_template'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.user.username})"
+
+
+class ReprocessingCampaign(models.Model):
+    """
+    Campagne de retraitement OCR (nouveau moteur, nouveaux modèles...)
+    
+    Les documents terminés correspondant aux filtres sont retraités en
+    arrière-plan, à débit limité, sur une file basse priorité. Le résultat
+    courant n'est remplacé que si le nouveau est meilleur.
+    """
+    
+    class Status(models.TextChoices):
+        RUNNING = 'running', _('En cours')
+        PAUSED = 'paused', _('En pause')
+        COMPLETED = 'completed', _('Terminée')
+        CANCELLED = 'cancelled', _('Annulée')
+    
+    name = models.CharField(
+        max_length=100,
+        verbose_name=_("Nom")
+    )
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='reprocessing_campaigns',
+        verbose_name=_("Créée par")
+    )
+    
+    # Traitement
+    engine_name = models.CharField(
+        max_length=50,
+        default='tesseract',
+        verbose_name=_("Moteur OCR")
+    )
+    language = models.CharField(
+        max_length=10,
+        null=True,
+        blank=True,
+        verbose_name=_("Langue OCR")
+    )
+    min_improvement = models.FloatField(
+        default=0.0,
+        verbose_name=_("Gain de confiance minimal"),
+        help_text=_("Le nouveau résultat remplace l'ancien si sa confiance le dépasse d'au moins ce gain")
+    )
+    rate_per_minute = models.PositiveIntegerField(
+        verbose_name=_("Documents envoyés par minute")
+    )
+    
+    # Sélection des documents (filtres vides : tous les documents terminés)
+    filter_engine = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name=_("Moteur utilisé")
+    )
+    filter_processed_before = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Traités avant le")
+    )
+    filter_max_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Confiance inférieure à")
+    )
+    
+    # État
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.RUNNING,
+        verbose_name=_("Statut")
+    )
+    total_items = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Documents sélectionnés")
+    )
+    estimated_pixels = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_("Pixels estimés"),
+        help_text=_("Coût OCR estimé de la campagne (somme des documents sélectionnés)")
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date de fin")
+    )
+    
+    class Meta:
+        verbose_name = _("Campagne de retraitement")
+        verbose_name_plural = _("Campagnes de retraitement")
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class ReprocessingItem(models.Model):
+    """Document d'une campagne de retraitement et issue de son retraitement"""
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('En attente')
+        QUEUED = 'queued', _('En file')
+        IMPROVED = 'improved', _('Résultat remplacé')
+        KEPT = 'kept', _('Résultat conservé')
+        SKIPPED = 'skipped', _('Ignoré')
+        FAILED = 'failed', _('Échec')
+    
+    # Issues définitives
+    FINAL_STATUSES = (Status.IMPROVED, Status.KEPT, Status.SKIPPED, Status.FAILED)
+    
+    campaign = models.ForeignKey(
+        ReprocessingCampaign,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name=_("Campagne")
+    )
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='reprocessing_items',
+        verbose_name=_("Document")
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Statut")
+    )
+    
+    # Comparaison des résultats
+    previous_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Version précédente")
+    )
+    previous_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Confiance précédente")
+    )
+    new_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Nouvelle confiance")
+    )
+    processing_time = models.FloatField(
+        null=True,
+        blank=True,
+        verbose_name=_("Temps de traitement (secondes)")
+    )
+    error_message = models.TextField(
+        null=True,
+        blank=True,
+        verbose_name=_("Message d'erreur")
+    )
+    queued_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date de mise en file")
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date de traitement")
+    )
+    
+    class Meta:
+        verbose_name = _("Document à retraiter")
+        verbose_name_plural = _("Documents à retraiter")
+        ordering = ['campaign', 'id']
+        indexes = [
+            models.Index(fields=['campaign', 'status']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['campaign', 'document'],
+                name='unique_campaign_document'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.document.file_name} ({self.get_status_display()})"
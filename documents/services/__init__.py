@@ -1,3 +1,15 @@
 from .document_service import DocumentService
+from .cost_estimator import OCRCostEstimator
+from .stage_timer import StageTimer
+from .admission import FairShareAdmission
+from .ingestion import BulkIngestor
+from .reprocessing import ReprocessingService
 
-__all__ = ['DocumentService']
+__all__ = [
+    'DocumentService',
+    'OCRCostEstimator',
+    'StageTimer',
+    'FairShareAdmission',
+    'BulkIngestor',
+    'ReprocessingService',
+]
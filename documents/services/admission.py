@@ -0,0 +1,115 @@
+from typing import List, Tuple
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from documents.models import Document
+
+
+class FairShareAdmission:
+    """
+    Admission équitable des documents dans la file OCR
+
+    Le travail en cours d'un utilisateur (documents admis, en file ou en
+    traitement) est plafonné en pages et en pixels. Un document qui
+    dépasserait le plafond reste en attente (submitted_at renseigné,
+    queued_at vide) et est admis quand les précédents se terminent : un
+    gros lot d'un utilisateur ne monopolise pas les workers.
+    """
+
+    IN_FLIGHT_STATUSES = (Document.Status.PENDING, Document.Status.PROCESSING)
+
+    def __init__(self):
+        self.enabled = getattr(settings, 'OCR_FAIR_SHARE_ENABLED', True)
+        self.max_pages = settings.OCR_USER_MAX_INFLIGHT_PAGES
+        self.max_pixels = settings.OCR_USER_MAX_INFLIGHT_PIXELS
+
+    def in_flight(self, user_id: int) -> Tuple[int, int]:
+        """
+        Travail OCR admis et non terminé d'un utilisateur
+
+        Returns:
+            Tuple (pages, pixels)
+        """
+        totals = Document.objects.filter(
+            user_id=user_id,
+            status__in=self.IN_FLIGHT_STATUSES,
+            queued_at__isnull=False,
+        ).aggregate(pages=Sum('pages_count'), pixels=Sum('estimated_pixels'))
+        return totals['pages'] or 0, totals['pixels'] or 0
+
+    def _fits(self, document: Document, pages: int, pixels: int) -> bool:
+        """Vérifie que le document tient dans le plafond de l'utilisateur"""
+        # Sans travail en cours, un document plus gros que le plafond passe seul
+        if pages == 0 and pixels == 0:
+            return True
+        return (
+            pages + document.pages_count <= self.max_pages
+            and pixels + document.estimated_pixels <= self.max_pixels
+        )
+
+    def admit(self, document: Document) -> bool:
+        """
+        Admet le document dans la file si le plafond de l'utilisateur le permet
+
+        Args:
+            document: Document en attente
+
+        Returns:
+            True si le document est admis (queued_at renseigné)
+        """
+        if document.queued_at is not None:
+            return True
+        if document.submitted_at is None:
+            document.submitted_at = timezone.now()
+            Document.objects.filter(pk=document.pk).update(submitted_at=document.submitted_at)
+        if not self.enabled:
+            self._mark_queued([document])
+            return True
+
+        with transaction.atomic():
+            # Verrou par utilisateur : deux uploads simultanés ne dépassent pas le plafond
+            User.objects.select_for_update().filter(pk=document.user_id).first()
+            pages, pixels = self.in_flight(document.user_id)
+            if not self._fits(document, pages, pixels):
+                return False
+            self._mark_queued([document])
+        return True
+
+    def admit_deferred(self, user_id: int) -> List[Document]:
+        """
+        Admet les documents en attente d'un utilisateur, dans l'ordre de soumission
+
+        Args:
+            user_id: ID de l'utilisateur
+
+        Returns:
+            Documents admis (à envoyer à Celery)
+        """
+        admitted = []
+        with transaction.atomic():
+            User.objects.select_for_update().filter(pk=user_id).first()
+            pages, pixels = self.in_flight(user_id)
+            deferred = Document.objects.filter(
+                user_id=user_id,
+                status=Document.Status.PENDING,
+                submitted_at__isnull=False,
+                queued_at__isnull=True,
+            ).order_by('submitted_at', 'id')
+            for document in deferred:
+                if self.enabled and not self._fits(document, pages, pixels):
+                    break
+                pages += document.pages_count
+                pixels += document.estimated_pixels
+                admitted.append(document)
+            self._mark_queued(admitted)
+        return admitted
+
+    def _mark_queued(self, documents: List[Document]):
+        now = timezone.now()
+        Document.objects.filter(pk__in=[document.pk for document in documents]).update(
+            queued_at=now, updated_at=now
+        )
+        for document in documents:
+            document.queued_at = now
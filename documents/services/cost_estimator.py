@@ -0,0 +1,67 @@
+import re
+from typing import Tuple
+from PIL import Image
+from django.conf import settings
+
+
+class OCRCostEstimator:
+    """Estime le coût OCR d'un document (pages et pixels) au moment de l'upload"""
+
+    # Taille A4 en points PDF (1 pt = 1/72 pouce), utilisée si pdfinfo échoue
+    DEFAULT_PAGE_SIZE_PTS = (595.0, 842.0)
+
+    PAGE_SIZE_PATTERN = re.compile(r'([\d.]+)\s*x\s*([\d.]+)\s*pts')
+
+    def __init__(self):
+        self.pdf_dpi = getattr(settings, 'OCR_PDF_DPI', 200)
+
+    def estimate(self, file_path: str, mime_type: str) -> Tuple[int, int]:
+        """
+        Estime le nombre de pages et le nombre total de pixels à traiter
+
+        Lit uniquement les métadonnées (en-tête image, pdfinfo) :
+        aucune page n'est rendue.
+
+        Args:
+            file_path: Chemin vers le fichier
+            mime_type: Type MIME du fichier
+
+        Returns:
+            Tuple (pages_count, total_pixels)
+        """
+        if mime_type == 'application/pdf':
+            return self._estimate_pdf(file_path)
+        return self._estimate_image(file_path)
+
+    def _estimate_pdf(self, file_path: str) -> Tuple[int, int]:
+        """Estime le coût d'un PDF à partir de pdfinfo"""
+        width_pts, height_pts = self.DEFAULT_PAGE_SIZE_PTS
+        try:
+            from pdf2image import pdfinfo_from_path
+            info = pdfinfo_from_path(file_path)
+            pages = max(int(info.get('Pages', 1)), 1)
+            match = self.PAGE_SIZE_PATTERN.search(str(info.get('Page size', '')))
+            if match:
+                width_pts, height_pts = float(match.group(1)), float(match.group(2))
+        except Exception:
+            # pdfinfo indisponible ou PDF illisible : estimation d'une page A4
+            pages = 1
+
+        # Pixels d'une page rendue à la résolution utilisée par l'OCR
+        page_pixels = int((width_pts / 72 * self.pdf_dpi) * (height_pts / 72 * self.pdf_dpi))
+        return pages, pages * page_pixels
+
+    def _estimate_image(self, file_path: str) -> Tuple[int, int]:
+        """Estime le coût d'une image (multi-frames pour TIFF)"""
+        try:
+            with Image.open(file_path) as image:
+                width, height = image.size
+                frames = getattr(image, 'n_frames', 1) or 1
+        except Exception:
+            return 1, 0
+        return frames, frames * width * height
+
+    @staticmethod
+    def cost_from_pixels(pixels: int) -> float:
+        """Convertit un nombre de pixels en coût OCR (mégapixels)"""
+        return (pixels or 0) / 1_000_000
@@ -1,11 +1,36 @@
+import hashlib
 import os
-from typing import Optional
+import socket
+import time
+import uuid
+from datetime import timedelta
+from typing import Dict, List, Optional
 from PIL import Image
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.core.files.uploadedfile import UploadedFile
 from django.conf import settings
-from documents.models import Document, OCRResult
+from documents.models import Document, OCRLayout, OCRResult, OCRResultVersion, OCRPageResult, OCRRegionResult
 from ocr.engines.factory import OCREngineFactory
 from ocr.validators.file_validator import FileValidator
+from ocr.exceptions import (
+    DocumentLeaseLostError,
+    DocumentLoadError,
+    EngineUnavailableError,
+    FileValidationError,
+    OCRTimeoutError,
+    get_error_code,
+    is_transient_error,
+)
+from ocr.layout import WordLayout
+from ocr.processors.image_processor import ImageProcessor
+from core import events, metrics, tracing
+from webhooks.models import WebhookEndpoint
+from webhooks.services import queue_document_event
+from .admission import FairShareAdmission
+from .cost_estimator import OCRCostEstimator
+from .stage_timer import StageTimer
 
 # Détection MIME optionnelle avec python-magic
 try:
@@ -20,12 +45,17 @@ class DocumentService:
     
     def __init__(self):
         self.validator = FileValidator()
+        self.cost_estimator = OCRCostEstimator()
+        self.image_processor = ImageProcessor()
+        self.admission = FairShareAdmission()
     
     def create_document(
         self,
         user,
         uploaded_file: UploadedFile,
-        language: Optional[str] = None
+        language: Optional[str] = None,
+        engine_name: Optional[str] = None,
+        regions: Optional[List[dict]] = None
     ) -> Document:
         """
         Crée un document à partir d'un fichier uploadé
@@ -34,118 +64,813 @@ class DocumentService:
             user: Utilisateur Django
             uploaded_file: Fichier uploadé
             language: Langue pour l'OCR (optionnel)
+            engine_name: Nom du moteur OCR (optionnel)
+            regions: Zones nommées à lire, normalisées par RegionValidator
+                (optionnel, pages entières par défaut)
         
         Returns:
             Instance de Document créée
         """
-        # Validation
-        is_valid, error_message = self.validator.validate_file(uploaded_file)
-        if not is_valid:
-            raise ValueError(error_message)
-        
-        # Détection du type MIME réel (optionnel)
-        if MAGIC_AVAILABLE:
-            try:
-                uploaded_file.seek(0)
-                mime_type = magic.from_buffer(uploaded_file.read(1024), mime=True)
-                uploaded_file.seek(0)
-            except Exception:
+        # Début de la trace : le contexte est conservé sur le document
+        # et transmis à la tâche Celery
+        with tracing.start_span('document.upload', {'file.name': uploaded_file.name}) as span:
+            # Validation
+            is_valid, error_message = self.validator.validate_file(uploaded_file)
+            if not is_valid:
+                raise FileValidationError(error_message)
+            
+            # Détection du type MIME réel (optionnel)
+            if MAGIC_AVAILABLE:
+                try:
+                    uploaded_file.seek(0)
+                    mime_type = magic.from_buffer(uploaded_file.read(1024), mime=True)
+                    uploaded_file.seek(0)
+                except Exception:
+                    mime_type = getattr(uploaded_file, 'content_type', 'application/octet-stream')
+            else:
                 mime_type = getattr(uploaded_file, 'content_type', 'application/octet-stream')
-        else:
-            mime_type = getattr(uploaded_file, 'content_type', 'application/octet-stream')
-        
-        # Création du document
-        document = Document.objects.create(
-            user=user,
-            original_file=uploaded_file,
-            file_name=uploaded_file.name,
-            file_size=uploaded_file.size,
-            mime_type=mime_type,
-            status=Document.Status.PENDING,
-        )
+            
+            # Création du document
+            document = Document.objects.create(
+                user=user,
+                original_file=uploaded_file,
+                file_name=uploaded_file.name,
+                file_size=uploaded_file.size,
+                mime_type=mime_type,
+                content_hash=self.compute_content_hash(uploaded_file),
+                requested_language=language,
+                requested_engine=engine_name,
+                ocr_regions=regions or None,
+                status=Document.Status.PENDING,
+            )
+            
+            # Estimation du coût OCR (pages et pixels) pour l'ordonnancement
+            pages_count, estimated_pixels = self.cost_estimator.estimate(
+                document.original_file.path,
+                document.mime_type
+            )
+            document.pages_count = pages_count
+            document.estimated_pixels = estimated_pixels
+            document.trace_context = tracing.format_traceparent(span)
+            document.save(update_fields=['pages_count', 'estimated_pixels', 'trace_context'])
+            
+            metrics.record_upload(document.mime_type)
         
         return document
     
+    @staticmethod
+    def compute_content_hash(uploaded_file) -> str:
+        """Empreinte SHA-256 d'un fichier uploadé (lu par morceaux)"""
+        digest = hashlib.sha256()
+        uploaded_file.seek(0)
+        for chunk in uploaded_file.chunks():
+            digest.update(chunk)
+        uploaded_file.seek(0)
+        return digest.hexdigest()
+    
+    def queue_document_ocr(
+        self,
+        document: Document,
+        language: Optional[str] = None,
+        engine_name: Optional[str] = None,
+        queue: Optional[str] = None
+    ):
+        """
+        Envoie le traitement OCR d'un document à Celery
+        
+        La file (interactive ou bulk) est choisie par le routeur Celery
+        à partir du coût estimé du document, sauf si queue est fournie
+        (ingestion en masse toujours sur la file bulk). Le contexte de trace du document
+        est transmis dans les en-têtes du message. Si l'utilisateur a déjà
+        atteint son plafond de travail en cours, le document reste en attente
+        et sera envoyé par admit_deferred_documents.
+        
+        Args:
+            document: Instance de Document
+            language: Langue pour l'OCR (optionnel)
+            engine_name: Nom du moteur OCR (optionnel)
+            queue: File Celery imposée (optionnel, sinon routeur)
+        
+        Returns:
+            AsyncResult de la tâche Celery, ou None si le document est différé
+        """
+        # Import local pour éviter l'import circulaire avec documents.tasks
+        from documents.tasks import process_document_ocr_task
+        
+        if not self.admission.admit(document):
+            return None
+        
+        # Contexte de trace et heure de mise en file (attente mesurée par la tâche)
+        headers = {'enqueued_at': time.time()}
+        if document.trace_context:
+            headers['traceparent'] = document.trace_context
+        
+        return process_document_ocr_task.apply_async(
+            args=[document.id],
+            kwargs={
+                'language': language or document.requested_language,
+                'engine_name': engine_name or document.requested_engine,
+            },
+            headers=headers,
+            queue=queue,
+        )
+    
+    def admit_deferred_documents(self, user_id: int) -> list:
+        """
+        Envoie à Celery les documents différés d'un utilisateur qui tiennent
+        désormais dans son plafond (appelé à la fin d'un traitement)
+        
+        Args:
+            user_id: ID de l'utilisateur
+        
+        Returns:
+            Liste des IDs envoyés
+        """
+        admitted = self.admission.admit_deferred(user_id)
+        for document in admitted:
+            self.queue_document_ocr(document)
+        return [document.id for document in admitted]
+    
+    def claim_document(self, document_id: int, lease_owner: str) -> bool:
+        """
+        Réserve atomiquement un document pour un worker (UPDATE conditionnel)
+        
+        Un document est réservable s'il est en attente, en échec, ou en
+        traitement avec un bail expiré (worker perdu). Deux workers qui
+        reçoivent le même message ne peuvent pas réserver tous les deux.
+        
+        Args:
+            document_id: ID du document
+            lease_owner: Identifiant unique du worker/de l'essai
+        
+        Returns:
+            True si le document a été réservé
+        """
+        now = timezone.now()
+        claimable = Q(status__in=[Document.Status.PENDING, Document.Status.FAILED]) | Q(
+            status=Document.Status.PROCESSING,
+            lease_expires_at__lt=now,
+        )
+        claimed = Document.objects.filter(claimable, pk=document_id).update(
+            status=Document.Status.PROCESSING,
+            claimed_by=lease_owner,
+            lease_expires_at=now + self._lease_duration(),
+            updated_at=now,
+        )
+        return claimed == 1
+    
+    def new_lease_owner(self) -> str:
+        """Génère un identifiant de bail unique (hôte, processus, essai)"""
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    
+    def _lease_duration(self) -> timedelta:
+        """Durée du bail, renouvelé après chaque page"""
+        return timedelta(seconds=getattr(settings, 'OCR_LEASE_TIMEOUT', 300))
+    
+    def _renew_lease(self, document: Document, lease_owner: str) -> None:
+        """
+        Prolonge le bail du document
+        
+        Raises:
+            DocumentLeaseLostError: Si le bail a été repris par un autre worker
+        """
+        renewed = Document.objects.filter(
+            pk=document.pk,
+            status=Document.Status.PROCESSING,
+            claimed_by=lease_owner,
+        ).update(lease_expires_at=timezone.now() + self._lease_duration())
+        if not renewed:
+            raise DocumentLeaseLostError(
+                f"Le document {document.pk} a été repris par un autre worker"
+            )
+    
     def process_document_ocr(
         self,
         document: Document,
         language: Optional[str] = None,
-        engine_name: Optional[str] = None
+        engine_name: Optional[str] = None,
+        lease_owner: Optional[str] = None,
+        retry_transient: bool = False
     ) -> OCRResult:
         """
-        Traite un document avec OCR
+        Traite un document avec OCR, page par page
+        
+        Chaque page est enregistrée (OCRPageResult) dès qu'elle est traitée :
+        en cas de nouvel essai, seules les pages manquantes sont traitées.
+        Le bail du document est renouvelé après chaque page. Les durées par
+        étape (chargement, rendu, OCR, écriture...) sont enregistrées dans
+        OCRResult.stage_timings et émises comme spans si le traçage est activé.
+        La fin du traitement est notifiée aux webhooks de l'utilisateur.
         
         Args:
             document: Instance de Document
             language: Langue pour l'OCR (optionnel)
             engine_name: Nom du moteur OCR (optionnel, défaut: tesseract)
+            lease_owner: Bail obtenu via claim_document (optionnel, sinon
+                le document est réservé par cet appel)
+            retry_transient: Un nouvel essai suivra une erreur temporaire :
+                le document reste en attente (error_code renseigné) au lieu
+                de passer en échec
         
         Returns:
             Instance de OCRResult créée
+        
+        Raises:
+            DocumentLeaseLostError: Si un autre worker a repris le document
         """
-        import time
+        # Span enfant de la tâche Celery, ou rattaché à l'upload en synchrone
+        parent = None if tracing.current_span() else tracing.parse_traceparent(document.trace_context)
+        with tracing.start_span('ocr.process', {'document.id': document.pk}, parent=parent) as span:
+            try:
+                ocr_result = self._process_document_ocr(
+                    document, language, engine_name, lease_owner, retry_transient
+                )
+            except DocumentLeaseLostError:
+                raise
+            except Exception as e:
+                # Échec définitif : erreur permanente, ou traitement synchrone
+                # (sans nouvel essai). Les essais épuisés sont notifiés par la tâche.
+                if lease_owner is None or not is_transient_error(e):
+                    queue_document_event(document, WebhookEndpoint.Event.DOCUMENT_FAILED)
+                raise
+            else:
+                queue_document_event(document, WebhookEndpoint.Event.DOCUMENT_COMPLETED)
+            finally:
+                # Succès ou échec : réveille les attentes longues et les flux SSE
+                document.signal_state_change()
+                events.publish_document_event(document, 'status', error_code=document.error_code)
+            if span is not None:
+                span.set_attribute('ocr.pages', document.pages_count)
+                span.set_attribute('ocr.engine', ocr_result.engine_used)
+            return ocr_result
+    
+    def _process_document_ocr(
+        self,
+        document: Document,
+        language: Optional[str],
+        engine_name: Optional[str],
+        lease_owner: Optional[str],
+        retry_transient: bool = False
+    ) -> OCRResult:
+        """Pipeline OCR page par page (voir process_document_ocr)"""
         start_time = time.time()
+        timer = StageTimer()
         
-        # Mise à jour du statut
-        document.status = Document.Status.PROCESSING
-        document.save()
+        # Mise à jour du statut : réservation directe pour les traitements
+        # synchrones, vérification du bail pour un document déjà réservé
+        with timer.stage('persist'):
+            if lease_owner is None:
+                document.status = Document.Status.PROCESSING
+                document.claimed_by = self.new_lease_owner()
+                document.lease_expires_at = timezone.now() + self._lease_duration()
+                document.save()
+                lease_owner = document.claimed_by
+            else:
+                self._renew_lease(document, lease_owner)
+                document.status = Document.Status.PROCESSING
+                document.claimed_by = lease_owner
+        events.publish_document_event(document, 'status')
         
         try:
-            # Chargement de l'image
-            image = self._load_image(document.original_file.path, document.mime_type)
+            file_path = document.original_file.path
+            is_pdf = document.mime_type == 'application/pdf'
+            with timer.stage('load'):
+                pages_count = self._count_pages(file_path, document.mime_type)
+                regions_by_page = self._group_regions(document.ocr_regions, pages_count)
             
             # Obtention du moteur OCR
-            engine = OCREngineFactory.get_engine(engine_name or 'tesseract')
-            
-            # Traitement OCR
-            result = engine.extract_text(image, language=language)
-            
-            # Nettoyage du texte
-            cleaned_text = self._clean_text(result['text'])
-            
-            # Calcul des statistiques
-            word_count = len(cleaned_text.split())
-            character_count = len(cleaned_text)
-            processing_time = time.time() - start_time
-            
-            # Création du résultat OCR
-            ocr_result = OCRResult.objects.create(
-                document=document,
-                raw_text=result['text'],
-                cleaned_text=cleaned_text,
-                confidence_score=result['confidence'],
-                language_detected=result['language'],
-                engine_used=engine.name,
-                word_count=word_count,
-                character_count=character_count,
-                processing_time=processing_time,
-            )
+            with timer.stage('engine_init'):
+                engine = OCREngineFactory.get_engine(engine_name or 'tesseract')
             
-            # Mise à jour du document
-            document.status = Document.Status.COMPLETED
-            document.extracted_text = cleaned_text
-            document.confidence_score = result['confidence']
-            document.language_detected = result['language']
-            document.engine_used = engine.name
-            document.processed_at = ocr_result.created_at
-            document.save()
+            # Pages déjà traitées lors d'une exécution précédente
+            with timer.stage('load'):
+                done_pages = set(
+                    document.page_results.values_list('page_number', flat=True)
+                )
+            
+            for page_number in range(1, pages_count + 1):
+                if page_number in done_pages:
+                    continue
+                # OCR par zones : seules les pages portant des zones sont lues
+                if regions_by_page is not None and page_number not in regions_by_page:
+                    continue
+                
+                # Chargement de la page (rendu pour les PDF)
+                with timer.stage('render' if is_pdf else 'load', page=page_number):
+                    image = self._load_image(file_path, document.mime_type, page_number)
+                
+                with timer.stage('preprocess', page=page_number):
+                    image = self.image_processor.prepare(image)
+                
+                if regions_by_page is not None:
+                    # Traitement OCR des zones de la page seulement
+                    with timer.stage('ocr', page=page_number, engine=engine.name):
+                        regions = engine.extract_regions(
+                            image,
+                            regions_by_page[page_number],
+                            language=language,
+                            max_workers=settings.OCR_REGION_WORKERS,
+                        )
+                    result = self._merge_regions(regions)
+                else:
+                    # Traitement OCR (passe rapide, passe précise si nécessaire)
+                    result = self._extract_page(engine, file_path, document.mime_type, page_number, image, language, timer)
+                
+                # Checkpoint de la page et renouvellement du bail
+                with timer.stage('persist', page=page_number):
+                    self._renew_lease(document, lease_owner)
+                    if regions_by_page is not None:
+                        for name, region in regions.items():
+                            OCRRegionResult.objects.update_or_create(
+                                document=document,
+                                name=name,
+                                defaults={
+                                    'page_number': page_number,
+                                    'text': self._clean_text(region['text']),
+                                    'confidence_score': region['confidence'],
+                                    'language_detected': region['language'],
+                                    'engine_used': engine.name,
+                                }
+                            )
+                    OCRPageResult.objects.update_or_create(
+                        document=document,
+                        page_number=page_number,
+                        defaults={
+                            'text': result['text'],
+                            'confidence_score': result['confidence'],
+                            'language_detected': result['language'],
+                            'engine_used': engine.name,
+                            'ocr_tier': result['ocr_tier'],
+                            'escalated': result['escalated'],
+                            'fast_confidence': result['fast_confidence'],
+                            'layout': self._page_layout(page_number, result),
+                        }
+                    )
+                events.publish_document_event(
+                    document, 'page', page=page_number, pages_count=pages_count,
+                    progress=round(page_number / pages_count, 3),
+                )
+            
+            with timer.stage('postprocess'):
+                # Assemblage des pages
+                page_results = list(
+                    document.page_results.filter(page_number__lte=pages_count).order_by('page_number')
+                )
+                raw_text = '\n\n'.join(page.text for page in page_results if page.text)
+                confidence = round(
+                    sum(page.confidence_score for page in page_results) / len(page_results), 2
+                )
+                language_detected = page_results[0].language_detected
+                
+                # Nettoyage du texte
+                cleaned_text = self._clean_text(raw_text)
+                
+                # Calcul des statistiques
+                word_count = len(cleaned_text.split())
+                character_count = len(cleaned_text)
+            
+            # Création du résultat OCR (uniquement si le bail est toujours détenu)
+            with timer.stage('persist'):
+                self._renew_lease(document, lease_owner)
+                with transaction.atomic():
+                    ocr_result = self._persist_result(
+                        document,
+                        raw_text=raw_text,
+                        cleaned_text=cleaned_text,
+                        confidence=confidence,
+                        language_detected=language_detected,
+                        engine_name=engine.name,
+                        word_count=word_count,
+                        character_count=character_count,
+                        processing_time=time.time() - start_time,
+                        pages_count=pages_count,
+                    )
+                    # Disposition des pages regroupée, checkpoints vidés
+                    layouts = [bytes(page.layout) for page in page_results if page.layout is not None]
+                    self._save_layout(ocr_result, WordLayout.merge(layouts) if layouts else None)
+                    OCRPageResult.objects.filter(document=document, layout__isnull=False).update(layout=None)
+            
+            # Durées par étape, écriture finale incluse
+            ocr_result.stage_timings = timer.as_dict()
+            OCRResult.objects.filter(pk=ocr_result.pk).update(stage_timings=ocr_result.stage_timings)
+            document.touch()
+            
+            metrics.record_document_processed(
+                engine=engine.name,
+                language=language_detected,
+                pages_count=pages_count,
+                duration=time.time() - start_time,
+                stage_timings=ocr_result.stage_timings,
+            )
             
             return ocr_result
             
+        except DocumentLeaseLostError:
+            # Un autre worker détient le document : ne pas le marquer en échec
+            raise
         except Exception as e:
-            # Gestion des erreurs
-            document.status = Document.Status.FAILED
+            # Gestion des erreurs (uniquement si le bail est toujours détenu) :
+            # le document reste en attente si un nouvel essai est prévu
+            retrying = retry_transient and lease_owner is not None and is_transient_error(e)
+            document.status = Document.Status.PENDING if retrying else Document.Status.FAILED
             document.error_message = str(e)
-            document.save()
+            document.error_code = get_error_code(e)
+            document.claimed_by = None
+            document.lease_expires_at = None
+            Document.objects.filter(pk=document.pk, claimed_by=lease_owner).update(
+                status=document.status,
+                error_message=document.error_message,
+                error_code=document.error_code,
+                claimed_by=None,
+                lease_expires_at=None,
+                updated_at=timezone.now(),
+            )
+            metrics.record_document_failed(engine_name or 'tesseract')
             raise
     
-    def _load_image(self, file_path: str, mime_type: str) -> Image.Image:
+    def _persist_result(
+        self,
+        document: Document,
+        raw_text: str,
+        cleaned_text: str,
+        confidence: float,
+        language_detected: str,
+        engine_name: str,
+        word_count: int,
+        character_count: int,
+        processing_time: float,
+        pages_count: int
+    ) -> OCRResult:
+        """Enregistre le résultat OCR et marque le document comme terminé"""
+        ocr_result = OCRResult.objects.create(
+            document=document,
+            raw_text=raw_text,
+            cleaned_text=cleaned_text,
+            confidence_score=confidence,
+            language_detected=language_detected,
+            engine_used=engine_name,
+            word_count=word_count,
+            character_count=character_count,
+            processing_time=processing_time,
+        )
+        
+        # Mise à jour du document et libération du bail
+        document.status = Document.Status.COMPLETED
+        document.error_message = None
+        document.error_code = None
+        document.claimed_by = None
+        document.lease_expires_at = None
+        document.pages_count = pages_count
+        document.extracted_text = cleaned_text
+        document.confidence_score = confidence
+        document.language_detected = language_detected
+        document.engine_used = engine_name
+        document.processed_at = ocr_result.created_at
+        document.save()
+        
+        return ocr_result
+    
+    def reprocess_document_ocr(
+        self,
+        document: Document,
+        language: Optional[str] = None,
+        engine_name: Optional[str] = None,
+        min_improvement: float = 0.0
+    ) -> dict:
         """
-        Charge une image depuis un fichier (support PDF via pdf2image)
+        Retraite un document terminé sans toucher à son résultat courant
+        
+        Les pages sont traitées en mémoire ; le résultat courant (texte,
+        pages, confiance) n'est remplacé que si la nouvelle confiance le
+        dépasse de plus de min_improvement. Le remplacement incrémente la
+        version du résultat ; la version remplacée (texte, pages,
+        disposition des mots) est archivée dans OCRResultVersion. Le statut
+        du document ne change pas : il reste lisible pendant tout le
+        retraitement.
+        
+        Args:
+            document: Document terminé (avec un OCRResult)
+            language: Langue pour l'OCR (optionnel)
+            engine_name: Nom du moteur OCR (optionnel, défaut: tesseract)
+            min_improvement: Gain de confiance minimal pour remplacer le résultat
+        
+        Returns:
+            Dict (improved, previous_version, previous_confidence,
+            new_confidence, processing_time) ; improved est False si le
+            résultat a été conservé ou modifié entre-temps
+        """
+        start_time = time.time()
+        previous = document.ocr_result
+        file_path = document.original_file.path
+        pages_count = self._count_pages(file_path, document.mime_type)
+        engine = OCREngineFactory.get_engine(engine_name or 'tesseract')
+        
+        pages = []
+        timer = StageTimer()
+        is_pdf = document.mime_type == 'application/pdf'
+        for page_number in range(1, pages_count + 1):
+            with timer.stage('render' if is_pdf else 'load', page=page_number):
+                image = self._load_image(file_path, document.mime_type, page_number)
+            with timer.stage('preprocess', page=page_number):
+                image = self.image_processor.prepare(image)
+            pages.append(self._extract_page(engine, file_path, document.mime_type, page_number, image, language, timer))
+        confidence = round(sum(page['confidence'] for page in pages) / len(pages), 2)
+        
+        outcome = {
+            'improved': False,
+            'previous_version': previous.version,
+            'previous_confidence': previous.confidence_score,
+            'new_confidence': confidence,
+        }
+        if confidence <= previous.confidence_score + min_improvement:
+            outcome['processing_time'] = time.time() - start_time
+            return outcome
+        
+        with timer.stage('postprocess'):
+            raw_text = '\n\n'.join(page['text'] for page in pages if page['text'])
+            cleaned_text = self._clean_text(raw_text)
+        with transaction.atomic():
+            # Un traitement interactif ou un autre retraitement a priorité
+            locked = Document.objects.select_for_update().filter(
+                pk=document.pk, status=Document.Status.COMPLETED
+            ).first()
+            current = OCRResult.objects.select_for_update().filter(
+                document=document, version=previous.version
+            ).first()
+            if locked is None or current is None:
+                outcome['processing_time'] = time.time() - start_time
+                return outcome
+            
+            self._archive_result(current)
+            document.page_results.all().delete()
+            OCRPageResult.objects.bulk_create([
+                OCRPageResult(
+                    document=locked,
+                    page_number=page_number,
+                    text=page['text'],
+                    confidence_score=page['confidence'],
+                    language_detected=page['language'],
+                    engine_used=engine.name,
+                    ocr_tier=page['ocr_tier'],
+                    escalated=page['escalated'],
+                    fast_confidence=page['fast_confidence'],
+                )
+                for page_number, page in enumerate(pages, start=1)
+            ])
+            
+            current.raw_text = raw_text
+            current.cleaned_text = cleaned_text
+            current.confidence_score = confidence
+            current.language_detected = pages[0]['language']
+            current.engine_used = engine.name
+            current.word_count = len(cleaned_text.split())
+            current.character_count = len(cleaned_text)
+            current.processing_time = time.time() - start_time
+            current.version = previous.version + 1
+            current.stage_timings = timer.as_dict()
+            current.save()
+            layouts = [
+                layout for layout in (
+                    self._layout_page(page_number, page) for page_number, page in enumerate(pages, start=1)
+                ) if layout is not None
+            ]
+            self._save_layout(current, WordLayout.encode(layouts) if layouts else None)
+            
+            locked.pages_count = pages_count
+            locked.extracted_text = cleaned_text
+            locked.confidence_score = confidence
+            locked.language_detected = current.language_detected
+            locked.engine_used = engine.name
+            # save() invalide les réponses en cache (ETag via updated_at)
+            locked.save(update_fields=[
+                'pages_count', 'extracted_text', 'confidence_score',
+                'language_detected', 'engine_used', 'updated_at',
+            ])
+        
+        outcome.update(improved=True, processing_time=current.processing_time)
+        return outcome
+    
+    def _extract_page(
+        self,
+        engine,
+        file_path: str,
+        mime_type: str,
+        page_number: int,
+        image: Image.Image,
+        language: Optional[str],
+        timer: StageTimer
+    ) -> dict:
+        """
+        OCR adaptatif d'une page
+        
+        Passe rapide sur l'image réduite (modèles rapides, segmentation
+        restreinte). Si sa confiance est sous OCR_ADAPTIVE_CONFIDENCE_THRESHOLD,
+        passe précise : page PDF rendue en haute résolution, prétraitement
+        poussé, meilleurs modèles. Le résultat le plus confiant est retenu.
+        
+        Args:
+            engine: Moteur OCR
+            file_path: Chemin vers le fichier (nouveau rendu des PDF)
+            mime_type: Type MIME du fichier
+            page_number: Numéro de la page
+            image: Page préparée (ImageProcessor.prepare)
+            language: Langue pour l'OCR (optionnel)
+            timer: Chronomètre des étapes
+        
+        Returns:
+            Résultat du moteur (text, confidence, language) complété de
+            ocr_tier, escalated, fast_confidence et page_size (taille de
+            l'image lue, référence des boîtes des mots)
+        """
+        if not settings.OCR_ADAPTIVE_ENABLED:
+            with timer.stage('ocr', page=page_number, engine=engine.name):
+                result = engine.extract_text(image, language=language)
+            return {
+                **result,
+                'ocr_tier': OCRPageResult.Tier.STANDARD,
+                'escalated': False,
+                'fast_confidence': None,
+                'page_size': image.size,
+            }
+        
+        with timer.stage('preprocess', page=page_number):
+            fast_image = self.image_processor.downscale(image, settings.OCR_ADAPTIVE_FAST_MAX_SIDE)
+        with timer.stage('ocr', page=page_number, engine=engine.name, tier='fast'):
+            fast = engine.extract_text(fast_image, language=language, quality='fast')
+        if fast['confidence'] >= settings.OCR_ADAPTIVE_CONFIDENCE_THRESHOLD:
+            metrics.record_page_tier(OCRPageResult.Tier.FAST, escalated=False)
+            return {
+                **fast,
+                'ocr_tier': OCRPageResult.Tier.FAST,
+                'escalated': False,
+                'fast_confidence': fast['confidence'],
+                'page_size': fast_image.size,
+            }
+        
+        # Escalade : page difficile (scan bruité, petite police, mise en page complexe)
+        escalation_dpi = settings.OCR_ADAPTIVE_ESCALATION_DPI
+        if mime_type == 'application/pdf' and escalation_dpi > getattr(settings, 'OCR_PDF_DPI', 200):
+            with timer.stage('render', page=page_number):
+                image = self.image_processor.prepare(
+                    self._load_image(file_path, mime_type, page_number, dpi=escalation_dpi)
+                )
+        with timer.stage('preprocess', page=page_number):
+            accurate_image = self.image_processor.enhance(image)
+        with timer.stage('ocr', page=page_number, engine=engine.name, tier='accurate'):
+            accurate = engine.extract_text(accurate_image, language=language, quality='best')
+        
+        if accurate['confidence'] >= fast['confidence']:
+            result, tier, page_size = accurate, OCRPageResult.Tier.ACCURATE, accurate_image.size
+        else:
+            result, tier, page_size = fast, OCRPageResult.Tier.FAST, fast_image.size
+        metrics.record_page_tier(tier, escalated=True)
+        return {
+            **result,
+            'ocr_tier': tier,
+            'escalated': True,
+            'fast_confidence': fast['confidence'],
+            'page_size': page_size,
+        }
+    
+    def _layout_page(self, page_number: int, result: dict) -> Optional[dict]:
+        """
+        Disposition des mots d'une page
+        
+        Les boîtes sont en pixels de l'image lue par le moteur (page_size),
+        réduite ou rendue en haute résolution selon la passe retenue.
+        
+        Returns:
+            Page au format de WordLayout.encode, ou None (disposition
+            désactivée, moteur sans boîtes, OCR par zones)
+        """
+        if not settings.OCR_WORD_LAYOUT_ENABLED or result.get('words') is None:
+            return None
+        width, height = result['page_size']
+        return {'page_number': page_number, 'width': width, 'height': height, 'words': result['words']}
+    
+    def _page_layout(self, page_number: int, result: dict) -> Optional[bytes]:
+        """Disposition encodée d'une page (checkpoint OCRPageResult.layout)"""
+        page = self._layout_page(page_number, result)
+        return WordLayout.encode([page]) if page is not None else None
+    
+    def _archive_result(self, ocr_result: OCRResult) -> OCRResultVersion:
+        """Archive la version courante d'un résultat OCR avant son remplacement"""
+        layout = OCRLayout.objects.filter(ocr_result=ocr_result).values_list('data', flat=True).first()
+        pages = list(
+            ocr_result.document.page_results.order_by('page_number').values(
+                'page_number', 'text', 'confidence_score', 'language_detected', 'engine_used', 'ocr_tier'
+            )
+        )
+        return OCRResultVersion.objects.create(
+            ocr_result=ocr_result,
+            version=ocr_result.version,
+            raw_text=ocr_result.raw_text,
+            cleaned_text=ocr_result.cleaned_text,
+            confidence_score=ocr_result.confidence_score,
+            language_detected=ocr_result.language_detected,
+            engine_used=ocr_result.engine_used,
+            word_count=ocr_result.word_count,
+            character_count=ocr_result.character_count,
+            pages=pages,
+            layout=bytes(layout) if layout is not None else None,
+        )
+    
+    def _save_layout(self, ocr_result: OCRResult, data: Optional[bytes]) -> None:
+        """Remplace la disposition des mots d'un résultat OCR (None : supprimée)"""
+        if data is None:
+            OCRLayout.objects.filter(ocr_result=ocr_result).delete()
+            return
+        OCRLayout.objects.update_or_create(
+            ocr_result=ocr_result,
+            defaults={'data': data, 'word_count': WordLayout(data).word_count},
+        )
+    
+    def _group_regions(self, regions: Optional[List[dict]], pages_count: int) -> Optional[Dict[int, List[dict]]]:
+        """
+        Zones d'un document groupées par page
+        
+        Args:
+            regions: Zones du document (None : pages entières)
+            pages_count: Nombre de pages du fichier
+        
+        Returns:
+            Dict {numéro de page: zones}, ou None sans zones
+        
+        Raises:
+            DocumentLoadError: Aucune zone sur une page du fichier
+        """
+        if not regions:
+            return None
+        by_page = {}
+        for region in regions:
+            if region['page'] <= pages_count:
+                by_page.setdefault(region['page'], []).append(region)
+        if not by_page:
+            raise DocumentLoadError(f"Aucune zone sur les {pages_count} page(s) du document")
+        return by_page
+    
+    def _merge_regions(self, regions: Dict[str, dict]) -> dict:
+        """
+        Résultat de page assemblé à partir des zones lues
+        
+        Returns:
+            Résultat au format de _extract_page (texte "zone: texte" par
+            ligne, confiance moyenne des zones)
+        """
+        results = list(regions.values())
+        return {
+            'text': '\n'.join(f"{name}: {result['text'].strip()}" for name, result in regions.items()),
+            'confidence': round(sum(result['confidence'] for result in results) / len(results), 2),
+            'language': results[0]['language'],
+            'ocr_tier': OCRPageResult.Tier.STANDARD,
+            'escalated': False,
+            'fast_confidence': None,
+        }
+    
+    def _count_pages(self, file_path: str, mime_type: str) -> int:
+        """
+        Compte les pages à traiter (pages PDF ou frames d'image)
+        
+        Args:
+            file_path: Chemin vers le fichier
+            mime_type: Type MIME du fichier
+        
+        Returns:
+            Nombre de pages
+        """
+        if mime_type == 'application/pdf':
+            try:
+                from pdf2image import pdfinfo_from_path
+                return max(int(pdfinfo_from_path(file_path)['Pages']), 1)
+            except ImportError:
+                raise EngineUnavailableError("pdf2image n'est pas installé pour traiter les PDF")
+            except Exception as e:
+                raise self._classify_pdf_error(e, "Erreur lors de la lecture du PDF")
+        
+        try:
+            with Image.open(file_path) as image:
+                return getattr(image, 'n_frames', 1) or 1
+        except Exception as e:
+            raise DocumentLoadError(f"Erreur lors de l'ouverture de l'image: {str(e)}")
+    
+    def _load_image(
+        self,
+        file_path: str,
+        mime_type: str,
+        page_number: int = 1,
+        dpi: Optional[int] = None
+    ) -> Image.Image:
+        """
+        Charge une page depuis un fichier (support PDF via pdf2image)
+        
+        Seule la page demandée est rendue, pour que les nouveaux essais
+        ne refassent pas le rendu des pages déjà traitées.
         
         Args:
             file_path: Chemin vers le fichier
             mime_type: Type MIME du fichier
+            page_number: Numéro de la page (à partir de 1)
+            dpi: Résolution de rendu des PDF (défaut: OCR_PDF_DPI)
         
         Returns:
             Image PIL
@@ -154,21 +879,50 @@ class DocumentService:
             # Conversion PDF en image
             try:
                 from pdf2image import convert_from_path
-                images = convert_from_path(file_path)
+                images = convert_from_path(
+                    file_path,
+                    dpi=dpi or getattr(settings, 'OCR_PDF_DPI', 200),
+                    first_page=page_number,
+                    last_page=page_number
+                )
                 if images:
-                    return images[0]  # Retourne la première page
+                    return images[0]
                 else:
-                    raise ValueError("Le PDF ne contient aucune page")
+                    raise DocumentLoadError("Le PDF ne contient aucune page")
             except ImportError:
-                raise ValueError("pdf2image n'est pas installé pour traiter les PDF")
+                raise EngineUnavailableError("pdf2image n'est pas installé pour traiter les PDF")
+            except DocumentLoadError:
+                raise
             except Exception as e:
-                raise ValueError(f"Erreur lors de la conversion PDF: {str(e)}")
+                raise self._classify_pdf_error(e, "Erreur lors de la conversion PDF")
         else:
-            # Image classique
+            # Image classique (frame demandée pour les TIFF multi-pages)
             try:
-                return Image.open(file_path)
+                image = Image.open(file_path)
+                if page_number > 1:
+                    image.seek(page_number - 1)
+                return image
             except Exception as e:
-                raise ValueError(f"Erreur lors de l'ouverture de l'image: {str(e)}")
+                raise DocumentLoadError(f"Erreur lors de l'ouverture de l'image: {str(e)}")
+    
+    def _classify_pdf_error(self, error: Exception, message: str) -> Exception:
+        """
+        Classe une erreur pdf2image en erreur temporaire ou permanente
+        
+        Args:
+            error: Exception levée par pdf2image
+            message: Contexte de l'erreur
+        
+        Returns:
+            Exception typée à lever
+        """
+        from pdf2image.exceptions import PDFInfoNotInstalledError, PDFPopplerTimeoutError
+        
+        if isinstance(error, PDFInfoNotInstalledError):
+            return EngineUnavailableError(f"{message}: poppler n'est pas installé")
+        if isinstance(error, PDFPopplerTimeoutError):
+            return OCRTimeoutError(f"{message}: délai dépassé")
+        return DocumentLoadError(f"{message}: {str(error)}")
     
     def _clean_text(self, text: str) -> str:
         """
@@ -0,0 +1,341 @@
+"""
+Ingestion en masse de fichiers locaux (reprise d'archives)
+
+Les fichiers sont lus directement sur disque, sans passer par l'API :
+empreinte, validation et estimation du coût sont calculées dans un pool
+de processus, les documents sont créés par lots (bulk_create) puis l'OCR
+est lancé dans le pool local ou envoyé à Celery. Les fichiers déjà
+ingérés (même empreinte pour l'utilisateur) sont ignorés : relancer la
+commande après une interruption reprend là où elle s'était arrêtée.
+"""
+import hashlib
+import logging
+import mimetypes
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, List, Optional
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.utils import timezone
+from documents.models import Document
+from ocr.validators.file_validator import FileValidator
+from .cost_estimator import OCRCostEstimator
+
+logger = logging.getLogger(__name__)
+
+# Détection du type MIME réel (optionnel), sinon par extension
+try:
+    import magic
+    MAGIC_AVAILABLE = True
+except ImportError:
+    MAGIC_AVAILABLE = False
+
+MODES = ('local', 'celery', 'none')
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+def iter_source_files(source: str) -> Iterator[str]:
+    """
+    Fichiers à ingérer : arborescence d'un répertoire (ordre stable) ou
+    manifeste (un chemin par ligne, relatif au manifeste ; lignes vides et
+    commentaires # ignorés)
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+        return
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding='utf-8') as manifest:
+        for line in manifest:
+            path = line.strip()
+            if path and not path.startswith('#'):
+                yield path if os.path.isabs(path) else os.path.join(base_dir, path)
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def inspect_file(path: str) -> Dict:
+    """
+    Empreinte, type, validation et coût estimé d'un fichier (pool de processus)
+
+    Returns:
+        Dict (path, size, sha256, mime_type, pages_count, estimated_pixels,
+        error) ; error est renseignée si le fichier est refusé ou illisible
+    """
+    info = {'path': path, 'error': None}
+    try:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            head = f.read(READ_BLOCK_SIZE)
+            digest.update(head)
+            for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+        info['size'] = os.path.getsize(path)
+        info['sha256'] = digest.hexdigest()
+        if MAGIC_AVAILABLE:
+            info['mime_type'] = magic.from_buffer(head[:1024], mime=True)
+        else:
+            info['mime_type'] = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+        announced = SimpleNamespace(name=os.path.basename(path), size=info['size'], content_type=info['mime_type'])
+        is_valid, error_message = FileValidator().validate_file(announced)
+        if not is_valid:
+            info['error'] = error_message
+            return info
+        info['pages_count'], info['estimated_pixels'] = OCRCostEstimator().estimate(path, info['mime_type'])
+    except OSError as e:
+        info['error'] = str(e)
+    return info
+
+
+def store_file(path: str) -> str:
+    """Copie un fichier dans le stockage des documents (pool de processus)"""
+    field = Document._meta.get_field('original_file')
+    name = field.generate_filename(None, os.path.basename(path))
+    with open(path, 'rb') as f:
+        return field.storage.save(name, File(f, name=name), max_length=field.max_length)
+
+
+def process_document(document_id: int, language: Optional[str], engine_name: str) -> Dict:
+    """
+    Réserve puis traite un document (pool de processus)
+
+    La réservation (bail) évite un double traitement si un worker Celery
+    ou une autre ingestion traite le même document.
+
+    Returns:
+        Dict (document_id, status, pages_count, error_code)
+    """
+    # Import local : DocumentService importe l'app webhooks et les moteurs OCR
+    from .document_service import DocumentService
+
+    service = DocumentService()
+    lease_owner = f"ingest:{service.new_lease_owner()}"
+    outcome = {'document_id': document_id, 'status': 'skipped', 'pages_count': 0, 'error_code': None}
+    if not service.claim_document(document_id, lease_owner):
+        return outcome
+    document = Document.objects.get(pk=document_id)
+    try:
+        service.process_document_ocr(document, language=language, engine_name=engine_name,
+                                     lease_owner=lease_owner)
+    except Exception as e:
+        logger.warning("Échec OCR du document %s pendant l'ingestion: %s", document_id, e)
+    document.refresh_from_db(fields=['status', 'pages_count', 'error_code'])
+    outcome.update(status=document.status, pages_count=document.pages_count, error_code=document.error_code)
+    return outcome
+
+
+def _process_document_args(args):
+    return process_document(*args)
+
+
+def _init_worker():
+    # Chaque processus ouvre ses propres connexions à la base
+    connections.close_all()
+
+
+class InlinePool:
+    """Exécution dans le processus courant (un seul worker, tests)"""
+
+    def imap(self, func, iterable, chunksize=1):
+        return map(func, iterable)
+
+    def imap_unordered(self, func, iterable, chunksize=1):
+        return map(func, iterable)
+
+    def close(self):
+        pass
+
+    def join(self):
+        pass
+
+
+class BulkIngestor:
+    """
+    Ingestion en masse des fichiers d'un répertoire ou d'un manifeste
+
+    Args:
+        user: Propriétaire des documents créés
+        language: Langue pour l'OCR (optionnel)
+        engine_name: Moteur OCR
+        mode: local (OCR dans le pool de processus), celery (mise en file)
+            ou none (création des documents seulement)
+        workers: Processus du pool (1 : tout dans le processus courant)
+        batch_size: Fichiers traités par lot
+        retry_failed: Relance l'OCR des documents déjà ingérés en échec
+        progress: Fonction appelée avec les statistiques après chaque lot
+    """
+
+    def __init__(self, user, language=None, engine_name='tesseract', mode='local', workers=1,
+                 batch_size=500, retry_failed=False, progress=None):
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu: {mode}")
+        self.user = user
+        self.language = language
+        self.engine_name = engine_name
+        self.mode = mode
+        self.workers = max(workers, 1)
+        self.batch_size = max(batch_size, 1)
+        self.retry_failed = retry_failed
+        self.progress = progress
+        self.stats = {
+            'files': 0,
+            'bytes': 0,
+            'created': 0,
+            'duplicates': 0,
+            'resumed': 0,
+            'invalid': 0,
+            'queued': 0,
+            'completed': 0,
+            'failed': 0,
+            'pages': 0,
+            'elapsed': 0.0,
+        }
+
+    def _pool(self):
+        if self.workers == 1:
+            return InlinePool()
+        # Connexions fermées avant le fork : aucune connexion partagée avec les enfants
+        connections.close_all()
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+        return context.Pool(self.workers, initializer=_init_worker)
+
+    def run(self, source: str) -> Dict:
+        """
+        Ingère les fichiers de la source
+
+        Returns:
+            Statistiques (compteurs, durée, débits files_per_second et
+            pages_per_second)
+        """
+        start = time.monotonic()
+        pool = self._pool()
+        try:
+            for paths in _batches(iter_source_files(source), self.batch_size):
+                document_ids = self._ingest_batch(paths, pool)
+                self._start_ocr(document_ids, pool)
+                self.stats['elapsed'] = time.monotonic() - start
+                if self.progress:
+                    self.progress(self.report())
+        finally:
+            pool.close()
+            pool.join()
+        self.stats['elapsed'] = time.monotonic() - start
+        return self.report()
+
+    def report(self) -> Dict:
+        """Statistiques courantes avec les débits"""
+        elapsed = self.stats['elapsed'] or 1e-9
+        return {
+            **self.stats,
+            'files_per_second': round(self.stats['files'] / elapsed, 2),
+            'pages_per_second': round(self.stats['pages'] / elapsed, 2),
+        }
+
+    def _ingest_batch(self, paths: List[str], pool) -> List[int]:
+        """Crée les documents d'un lot ; retourne les documents à traiter"""
+        chunksize = max(len(paths) // (self.workers * 4), 1)
+        inspected = list(pool.imap(inspect_file, paths, chunksize))
+        self.stats['files'] += len(inspected)
+
+        unique = {}
+        for info in inspected:
+            if info['error']:
+                self.stats['invalid'] += 1
+                logger.warning("Fichier ignoré %s: %s", info['path'], info['error'])
+            elif info['sha256'] in unique:
+                self.stats['duplicates'] += 1
+            else:
+                unique[info['sha256']] = info
+
+        # Fichiers déjà ingérés (exécution précédente interrompue, doublons)
+        to_process = []
+        now = timezone.now()
+        existing = Document.objects.filter(user=self.user, content_hash__in=list(unique)).values_list(
+            'content_hash', 'id', 'status', 'submitted_at', 'lease_expires_at'
+        )
+        for content_hash, document_id, status, submitted_at, lease_expires_at in existing:
+            if content_hash not in unique:
+                continue
+            del unique[content_hash]
+            # Jamais soumis (exécution interrompue) ou bail expiré (processus perdu)
+            resumable = (
+                (status == Document.Status.PENDING and submitted_at is None)
+                or (status == Document.Status.PROCESSING and lease_expires_at is not None and lease_expires_at < now)
+            )
+            if resumable or (self.retry_failed and status == Document.Status.FAILED):
+                to_process.append(document_id)
+                self.stats['resumed'] += 1
+            else:
+                self.stats['duplicates'] += 1
+
+        new_files = list(unique.values())
+        stored_names = list(pool.imap(store_file, [info['path'] for info in new_files], chunksize))
+        documents = Document.objects.bulk_create([
+            Document(
+                user=self.user,
+                original_file=stored_name,
+                file_name=os.path.basename(info['path']),
+                file_size=info['size'],
+                mime_type=info['mime_type'],
+                content_hash=info['sha256'],
+                pages_count=info['pages_count'],
+                estimated_pixels=info['estimated_pixels'],
+                requested_language=self.language,
+                requested_engine=self.engine_name,
+                status=Document.Status.PENDING,
+            )
+            for info, stored_name in zip(new_files, stored_names)
+        ], batch_size=self.batch_size)
+        self.stats['created'] += len(documents)
+        self.stats['bytes'] += sum(info['size'] for info in new_files)
+
+        if documents and documents[0].pk is None:
+            # Base sans RETURNING : relecture des IDs par empreinte
+            to_process += list(Document.objects.filter(
+                user=self.user, content_hash__in=[info['sha256'] for info in new_files]
+            ).values_list('id', flat=True))
+        else:
+            to_process += [document.pk for document in documents]
+        return to_process
+
+    def _start_ocr(self, document_ids: List[int], pool) -> None:
+        """Lance l'OCR des documents du lot selon le mode"""
+        if not document_ids or self.mode == 'none':
+            return
+
+        if self.mode == 'celery':
+            # Import local : DocumentService importe l'app webhooks et les moteurs OCR
+            from .document_service import DocumentService
+
+            service = DocumentService()
+            for document in Document.objects.filter(pk__in=document_ids):
+                # File bulk imposée : le routeur enverrait les petites images sur la file interactive
+                service.queue_document_ocr(
+                    document, language=self.language, engine_name=self.engine_name,
+                    queue=settings.OCR_BULK_QUEUE,
+                )
+                self.stats['queued'] += 1
+            return
+
+        args = [(document_id, self.language, self.engine_name) for document_id in document_ids]
+        for outcome in pool.imap_unordered(_process_document_args, args):
+            if outcome['status'] == Document.Status.COMPLETED:
+                self.stats['completed'] += 1
+                self.stats['pages'] += outcome['pages_count']
+            elif outcome['status'] == Document.Status.FAILED:
+                self.stats['failed'] += 1
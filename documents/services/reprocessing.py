@@ -0,0 +1,266 @@
+from datetime import timedelta
+from typing import Dict, List, Optional
+from django.conf import settings
+from django.db.models import Avg, Count, F, Sum
+from django.utils import timezone
+from documents.models import Document, ReprocessingCampaign, ReprocessingItem
+from core import metrics
+from .cost_estimator import OCRCostEstimator
+
+
+class ReprocessingService:
+    """
+    Campagnes de retraitement OCR en arrière-plan
+
+    Les documents sélectionnés sont envoyés par petits lots (débit de la
+    campagne, documents en file plafonnés) sur une file Celery dédiée,
+    consommée par un worker séparé : les traitements interactifs ne sont
+    pas ralentis.
+    """
+
+    # Documents insérés par requête à la création d'une campagne
+    BATCH_SIZE = 1000
+
+    def select_documents(self, engine: str = '', processed_before=None, max_confidence: Optional[float] = None):
+        """
+        Documents terminés correspondant aux filtres d'une campagne
+
+        Args:
+            engine: Moteur ayant produit le résultat courant (vide: tous)
+            processed_before: Documents traités avant cette date
+            max_confidence: Documents dont la confiance est inférieure
+
+        Returns:
+            QuerySet de Document
+        """
+        # Les documents lus par zones ne sont pas comparables à un OCR pleine page
+        queryset = Document.objects.filter(
+            status=Document.Status.COMPLETED, ocr_result__isnull=False, ocr_regions__isnull=True
+        )
+        if engine:
+            queryset = queryset.filter(engine_used=engine)
+        if processed_before is not None:
+            queryset = queryset.filter(processed_at__lt=processed_before)
+        if max_confidence is not None:
+            queryset = queryset.filter(confidence_score__lt=max_confidence)
+        return queryset
+
+    def create_campaign(
+        self,
+        name: str,
+        engine_name: str = 'tesseract',
+        language: Optional[str] = None,
+        filter_engine: str = '',
+        filter_processed_before=None,
+        filter_max_confidence: Optional[float] = None,
+        min_improvement: float = 0.0,
+        rate_per_minute: Optional[int] = None,
+        created_by=None
+    ) -> ReprocessingCampaign:
+        """
+        Crée une campagne et sélectionne ses documents
+
+        La sélection est figée à la création : les documents traités
+        ensuite ne font pas partie de la campagne.
+
+        Returns:
+            Campagne créée (en cours, envoyée par dispatch_reprocessing)
+        """
+        campaign = ReprocessingCampaign.objects.create(
+            name=name,
+            created_by=created_by,
+            engine_name=engine_name,
+            language=language,
+            filter_engine=filter_engine,
+            filter_processed_before=filter_processed_before,
+            filter_max_confidence=filter_max_confidence,
+            min_improvement=min_improvement,
+            rate_per_minute=rate_per_minute or settings.REPROCESSING_RATE_PER_MINUTE,
+        )
+
+        selected = self.select_documents(filter_engine, filter_processed_before, filter_max_confidence)
+        items = []
+        for document_id, pixels in selected.order_by('id').values_list('id', 'estimated_pixels').iterator(
+            chunk_size=self.BATCH_SIZE
+        ):
+            items.append(ReprocessingItem(campaign=campaign, document_id=document_id))
+            campaign.total_items += 1
+            campaign.estimated_pixels += pixels
+            if len(items) >= self.BATCH_SIZE:
+                ReprocessingItem.objects.bulk_create(items)
+                items = []
+        ReprocessingItem.objects.bulk_create(items)
+
+        if campaign.total_items == 0:
+            campaign.status = ReprocessingCampaign.Status.COMPLETED
+            campaign.completed_at = timezone.now()
+        campaign.save(update_fields=['total_items', 'estimated_pixels', 'status', 'completed_at'])
+        return campaign
+
+    def dispatch(self, campaign: ReprocessingCampaign) -> List[int]:
+        """
+        Envoie le prochain lot de documents d'une campagne à Celery
+
+        Appelé chaque minute (Celery Beat) : au plus rate_per_minute
+        documents, dans la limite de REPROCESSING_MAX_INFLIGHT documents en
+        file. Les documents envoyés mais jamais traités (worker perdu) sont
+        renvoyés après REPROCESSING_STALE_AFTER secondes. La campagne est
+        terminée quand tous ses documents ont été traités.
+
+        Returns:
+            IDs des ReprocessingItem envoyés
+        """
+        # Import local pour éviter l'import circulaire avec documents.tasks
+        from documents.tasks import reprocess_document_task
+
+        if campaign.status != ReprocessingCampaign.Status.RUNNING:
+            return []
+
+        now = timezone.now()
+        items = campaign.items.all()
+        items.filter(
+            status=ReprocessingItem.Status.QUEUED,
+            queued_at__lt=now - timedelta(seconds=settings.REPROCESSING_STALE_AFTER),
+        ).update(status=ReprocessingItem.Status.PENDING, queued_at=None)
+
+        in_flight = items.filter(status=ReprocessingItem.Status.QUEUED).count()
+        budget = min(campaign.rate_per_minute, settings.REPROCESSING_MAX_INFLIGHT - in_flight)
+        if budget <= 0:
+            return []
+
+        pending_ids = list(
+            items.filter(status=ReprocessingItem.Status.PENDING).order_by('id').values_list('id', flat=True)[:budget]
+        )
+        if not pending_ids and not in_flight:
+            self._complete(campaign)
+            return []
+
+        # Transition conditionnelle : deux dispatchers n'envoient pas le même document
+        sent = []
+        for item_id in pending_ids:
+            if ReprocessingItem.objects.filter(pk=item_id, status=ReprocessingItem.Status.PENDING).update(
+                status=ReprocessingItem.Status.QUEUED, queued_at=now
+            ):
+                reprocess_document_task.apply_async(args=[item_id], queue=settings.REPROCESSING_QUEUE)
+                sent.append(item_id)
+        return sent
+
+    def _complete(self, campaign: ReprocessingCampaign) -> None:
+        ReprocessingCampaign.objects.filter(
+            pk=campaign.pk, status=ReprocessingCampaign.Status.RUNNING
+        ).update(status=ReprocessingCampaign.Status.COMPLETED, completed_at=timezone.now())
+        campaign.status = ReprocessingCampaign.Status.COMPLETED
+
+    def process_item(self, item_id: int, document_service=None) -> str:
+        """
+        Retraite le document d'un ReprocessingItem
+
+        Le document est ignoré s'il n'est plus terminé (retraitement
+        interactif en cours, échec) ou si la campagne a été annulée ; une
+        campagne en pause remet le document en attente.
+
+        Args:
+            item_id: ID du ReprocessingItem
+            document_service: DocumentService (optionnel)
+
+        Returns:
+            Nouveau statut de l'item
+        """
+        # Import local : DocumentService importe l'app webhooks et les moteurs OCR
+        from .document_service import DocumentService
+
+        item = ReprocessingItem.objects.select_related('campaign', 'document').get(pk=item_id)
+        if item.status != ReprocessingItem.Status.QUEUED:
+            return item.status
+        campaign = item.campaign
+        if campaign.status == ReprocessingCampaign.Status.PAUSED:
+            ReprocessingItem.objects.filter(pk=item.pk).update(status=ReprocessingItem.Status.PENDING, queued_at=None)
+            return ReprocessingItem.Status.PENDING
+
+        item.processed_at = timezone.now()
+        if campaign.status == ReprocessingCampaign.Status.CANCELLED:
+            item.status = ReprocessingItem.Status.SKIPPED
+            item.error_message = "Campagne annulée"
+        elif item.document.status != Document.Status.COMPLETED:
+            item.status = ReprocessingItem.Status.SKIPPED
+            item.error_message = f"Document {item.document.get_status_display().lower()}"
+        else:
+            service = document_service or DocumentService()
+            try:
+                outcome = service.reprocess_document_ocr(
+                    item.document,
+                    language=campaign.language,
+                    engine_name=campaign.engine_name,
+                    min_improvement=campaign.min_improvement,
+                )
+            except Document.ocr_result.RelatedObjectDoesNotExist:
+                item.status = ReprocessingItem.Status.SKIPPED
+                item.error_message = "Aucun résultat OCR à comparer"
+            except Exception as e:
+                item.status = ReprocessingItem.Status.FAILED
+                item.error_message = str(e)
+            else:
+                item.status = ReprocessingItem.Status.IMPROVED if outcome['improved'] else ReprocessingItem.Status.KEPT
+                item.previous_version = outcome['previous_version']
+                item.previous_confidence = outcome['previous_confidence']
+                item.new_confidence = outcome['new_confidence']
+                item.processing_time = outcome['processing_time']
+
+        item.save(update_fields=[
+            'status', 'error_message', 'previous_version', 'previous_confidence',
+            'new_confidence', 'processing_time', 'processed_at',
+        ])
+        metrics.record_reprocessing_outcome(item.status)
+        return item.status
+
+    def set_status(self, campaign: ReprocessingCampaign, status: str) -> None:
+        """
+        Met en pause, reprend ou annule une campagne
+
+        L'annulation ignore les documents pas encore envoyés ; les documents
+        déjà en file sont ignorés par le worker.
+        """
+        campaign.status = status
+        campaign.save(update_fields=['status'])
+        if status == ReprocessingCampaign.Status.CANCELLED:
+            campaign.items.filter(status=ReprocessingItem.Status.PENDING).update(
+                status=ReprocessingItem.Status.SKIPPED,
+                error_message="Campagne annulée",
+                processed_at=timezone.now(),
+            )
+
+    def progress(self, campaign: ReprocessingCampaign) -> Dict:
+        """
+        Avancement et coût d'une campagne
+
+        Returns:
+            Dict (total, counts par statut, done, percent, improved,
+            average_gain, processing_seconds, estimated_cost en mégapixels,
+            eta_minutes au débit de la campagne)
+        """
+        counts = {status: 0 for status in ReprocessingItem.Status.values}
+        for row in campaign.items.values('status').annotate(count=Count('id')).order_by():
+            counts[row['status']] = row['count']
+        done = sum(counts[status] for status in ReprocessingItem.FINAL_STATUSES)
+        remaining = campaign.total_items - done
+
+        totals = campaign.items.aggregate(processing_seconds=Sum('processing_time'))
+        gain = campaign.items.filter(status=ReprocessingItem.Status.IMPROVED).aggregate(
+            average=Avg(F('new_confidence') - F('previous_confidence'))
+        )['average']
+
+        return {
+            'total': campaign.total_items,
+            'counts': counts,
+            'done': done,
+            'percent': round(done * 100 / campaign.total_items, 1) if campaign.total_items else 100.0,
+            'improved': counts[ReprocessingItem.Status.IMPROVED],
+            'average_gain': round(gain, 2) if gain is not None else None,
+            'processing_seconds': round(totals['processing_seconds'] or 0, 1),
+            'estimated_cost': round(OCRCostEstimator.cost_from_pixels(campaign.estimated_pixels), 1),
+            'eta_minutes': (
+                round(remaining / campaign.rate_per_minute, 1)
+                if campaign.status == ReprocessingCampaign.Status.RUNNING and campaign.rate_per_minute
+                else None
+            ),
+        }
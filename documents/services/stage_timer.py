@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+from core import tracing
+
+
+class StageTimer:
+    """Chronomètre cumulatif des étapes du pipeline OCR"""
+    
+    # Étapes instrumentées, dans l'ordre du pipeline
+    STAGES = (
+        'load',
+        'render',
+        'preprocess',
+        'engine_init',
+        'ocr',
+        'postprocess',
+        'persist',
+    )
+    
+    def __init__(self):
+        self._durations = {}
+    
+    @contextmanager
+    def stage(self, name: str, **attributes):
+        """
+        Mesure une étape (cumulée si l'étape est répétée, ex: une fois par page)
+        
+        Chaque exécution de l'étape est aussi émise comme span (ocr.<étape>)
+        si le traçage est activé.
+        
+        Args:
+            name: Nom de l'étape (voir STAGES)
+            **attributes: Attributs du span (page, moteur...)
+        """
+        start = time.perf_counter()
+        try:
+            with tracing.start_span(f'ocr.{name}', attributes):
+                yield
+        finally:
+            self._durations[name] = self._durations.get(name, 0.0) + time.perf_counter() - start
+    
+    def as_dict(self) -> Dict[str, int]:
+        """
+        Retourne les durées mesurées en millisecondes (format compact)
+        
+        Returns:
+            Dict {étape: millisecondes}, dans l'ordre du pipeline
+        """
+        ordered = [name for name in self.STAGES if name in self._durations]
+        ordered += [name for name in self._durations if name not in self.STAGES]
+        return {name: round(self._durations[name] * 1000) for name in ordered}
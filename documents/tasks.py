@@ -1,44 +1,119 @@
 """
 Tâches Celery pour le traitement OCR asynchrone
 """
+import logging
+import random
 from celery import shared_task
+from django.conf import settings
+from django.db.models import Q
 from django.utils import timezone
-from documents.models import Document
+from documents.models import Document, ReprocessingCampaign
 from documents.services.document_service import DocumentService
+from documents.services.reprocessing import ReprocessingService
+from core import metrics, tracing
+from core.profiling import profile_task
+from ocr.exceptions import DocumentLeaseLostError, get_error_code, is_transient_error
+from webhooks.models import WebhookEndpoint
+from webhooks.services import queue_document_event
+
+logger = logging.getLogger(__name__)
+
+
+def _task_header(request, name):
+    """Lit un en-tête personnalisé du message (worker ou mode eager)"""
+    return getattr(request, name, None) or (request.headers or {}).get(name)
+
+
+def compute_retry_countdown(retries: int) -> float:
+    """
+    Délai avant le prochain essai : backoff exponentiel avec jitter
+
+    La moitié du délai est fixe, l'autre moitié aléatoire, pour étaler
+    les nouveaux essais après un incident (broker, base, worker).
+
+    Args:
+        retries: Nombre d'essais déjà effectués
+
+    Returns:
+        Délai en secondes
+    """
+    base = settings.OCR_RETRY_BACKOFF_BASE
+    delay = min(settings.OCR_RETRY_BACKOFF_MAX, base * (2 ** retries))
+    return delay / 2 + random.uniform(0, delay / 2)
 
 
 @shared_task(bind=True, name='documents.process_document_ocr')
-def process_document_ocr_task(self, document_id, language=None, engine_name=None):
+@profile_task('documents.process_document_ocr')
+def process_document_ocr_task(self, document_id, language=None, engine_name=None, profile=False):
     """
     Tâche Celery pour traiter un document avec OCR de manière asynchrone
-    
+
+    Le document est réservé atomiquement avec un bail renouvelé après chaque
+    page ; les pages sont enregistrées au fil de l'eau : un nouvel essai ne
+    traite que les pages manquantes. Seules les erreurs temporaires sont réessayées
+    (backoff exponentiel avec jitter) ; les erreurs permanentes et les essais
+    épuisés partent dans la file des lettres mortes. L'attente dans la file et
+    l'exécution sont tracées dans la trace de l'upload (en-tête traceparent).
+
     Args:
         document_id: ID du document à traiter
         language: Langue pour l'OCR (optionnel)
         engine_name: Nom du moteur OCR (optionnel)
-    
+        profile: Force le profilage de l'exécution (si PROFILING_ENABLED)
+
     Returns:
         ID du OCRResult créé
     """
+    # Contexte de trace transmis par queue_document_ocr
+    parent = tracing.parse_traceparent(_task_header(self.request, 'traceparent'))
+    enqueued_at = _task_header(self.request, 'enqueued_at')
+    if enqueued_at and not self.request.retries:
+        tracing.record_span('celery.queue_wait', float(enqueued_at), parent=parent,
+                            attributes={'document.id': document_id})
+
+    with tracing.start_span('celery.ocr_task', {
+        'document.id': document_id,
+        'celery.task_id': self.request.id or '',
+        'celery.retries': self.request.retries,
+    }, parent=parent):
+        return _run_ocr_task(self, document_id, language, engine_name)
+
+
+def _run_ocr_task(self, document_id, language, engine_name):
+    """Réserve et traite le document (voir process_document_ocr_task)"""
+    service = DocumentService()
+    lease_owner = f"{self.request.id or 'local'}:{service.new_lease_owner()}"
+    can_retry = self.request.retries < settings.OCR_TASK_MAX_RETRIES
+
     try:
-        document = Document.objects.get(id=document_id)
-        
-        # Vérification que le document est en attente ou en erreur
-        if document.status not in [Document.Status.PENDING, Document.Status.FAILED]:
+        # Réservation atomique : un message relivré ou dupliqué ne peut pas
+        # lancer un second OCR du même document
+        if not service.claim_document(document_id, lease_owner):
+            current_status = Document.objects.filter(id=document_id).values_list(
+                'status', flat=True
+            ).first()
+            if current_status is None:
+                raise Document.DoesNotExist
+            metrics.record_task_outcome('skipped')
             return {
-                'status': 'error',
-                'message': f'Document déjà traité ou en cours (statut: {document.status})',
+                'status': 'skipped',
+                'message': f'Document déjà traité ou en cours (statut: {current_status})',
                 'document_id': document_id
             }
-        
-        # Traitement OCR
-        service = DocumentService()
+
+        document = Document.objects.get(id=document_id)
+
+        # Traitement OCR (les pages déjà enregistrées ne sont pas retraitées)
         ocr_result = service.process_document_ocr(
             document=document,
             language=language,
-            engine_name=engine_name or 'tesseract'
+            engine_name=engine_name or 'tesseract',
+            lease_owner=lease_owner,
+            retry_transient=can_retry
         )
-        
+
+        metrics.record_task_outcome('success')
+        _admit_deferred(service, document.user_id)
         return {
             'status': 'success',
             'document_id': document_id,
@@ -47,22 +122,220 @@ def process_document_ocr_task(self, document_id, language=None, engine_name=None
             'word_count': ocr_result.word_count,
             'character_count': ocr_result.character_count,
         }
-        
+
     except Document.DoesNotExist:
         return {
             'status': 'error',
             'message': f'Document {document_id} non trouvé',
             'document_id': document_id
         }
+    except DocumentLeaseLostError as e:
+        # Bail expiré et repris par un autre worker : il termine le travail
+        metrics.record_task_outcome('skipped')
+        return {
+            'status': 'skipped',
+            'message': str(e),
+            'document_id': document_id
+        }
     except Exception as e:
-        # Mise à jour du statut d'erreur
-        try:
-            document = Document.objects.get(id=document_id)
-            document.status = Document.Status.FAILED
-            document.error_message = str(e)
-            document.save()
-        except:
-            pass
-        
-        # Relancer l'exception pour Celery retry
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        error_code = get_error_code(e)
+        transient = is_transient_error(e)
+        retrying = transient and can_retry
+
+        # Mise à jour du statut d'erreur (sauf si un autre worker a repris le
+        # document) : en attente tant qu'un nouvel essai est prévu, pour que
+        # l'attente longue et les flux SSE ne signalent pas un échec définitif
+        Document.objects.filter(
+            Q(claimed_by=lease_owner) | Q(claimed_by__isnull=True),
+            id=document_id,
+        ).update(
+            status=Document.Status.PENDING if retrying else Document.Status.FAILED,
+            error_message=str(e),
+            error_code=error_code,
+            claimed_by=None,
+            lease_expires_at=None,
+            updated_at=timezone.now(),
+        )
+
+        logger.warning(
+            "Échec OCR du document %s (%s, %s, essai %s)",
+            document_id,
+            error_code,
+            'temporaire' if transient else 'permanent',
+            self.request.retries,
+            extra={'document_id': document_id, 'error_code': error_code},
+        )
+
+        metrics.record_task_failure(error_code, transient)
+
+        # Erreur temporaire : nouvel essai avec backoff
+        if retrying:
+            metrics.record_task_outcome('retry')
+            raise self.retry(
+                exc=e,
+                countdown=compute_retry_countdown(self.request.retries),
+                max_retries=settings.OCR_TASK_MAX_RETRIES
+            )
+
+        # Erreur permanente ou essais épuisés : file des lettres mortes
+        metrics.record_task_outcome('dead_letter')
+        dead_letter_document_task.apply_async(
+            args=[document_id, error_code, str(e)],
+            kwargs={'retries': self.request.retries},
+            queue=settings.OCR_DEAD_LETTER_QUEUE,
+        )
+        document = Document.objects.filter(id=document_id).first()
+        if document is not None:
+            # Les erreurs permanentes sont notifiées par le service
+            if transient:
+                queue_document_event(document, WebhookEndpoint.Event.DOCUMENT_FAILED)
+            _admit_deferred(service, document.user_id)
+        return {
+            'status': 'error',
+            'message': str(e),
+            'error_code': error_code,
+            'document_id': document_id
+        }
+
+
+def _admit_deferred(service, user_id):
+    """Libère la place de l'utilisateur : envoie ses documents différés"""
+    try:
+        service.admit_deferred_documents(user_id)
+    except Exception:
+        # Rattrapé par admit_deferred_documents_task (Celery Beat)
+        logger.exception("Admission des documents différés impossible (utilisateur %s)", user_id)
+
+
+@shared_task(name='documents.dead_letter_document')
+def dead_letter_document_task(document_id, error_code, error_message, retries=0):
+    """
+    Lettre morte d'un document dont l'OCR a définitivement échoué
+
+    Les messages restent dans la file OCR_DEAD_LETTER_QUEUE tant qu'aucun
+    worker ne la consomme, ce qui permet de les inspecter ou de les rejouer.
+    Un worker dédié (-Q ocr_dead_letter) les consigne dans les logs.
+
+    Args:
+        document_id: ID du document
+        error_code: Code de l'erreur (voir ocr.exceptions)
+        error_message: Message de l'erreur
+        retries: Nombre d'essais effectués
+    """
+    logger.error(
+        "Document %s en lettre morte (%s après %s essais): %s",
+        document_id,
+        error_code,
+        retries,
+        error_message,
+        extra={'document_id': document_id, 'error_code': error_code},
+    )
+    return {
+        'document_id': document_id,
+        'error_code': error_code,
+        'retries': retries,
+        'dead_lettered_at': timezone.now().isoformat(),
+    }
+
+
+@shared_task(name='documents.requeue_stale_documents')
+def requeue_stale_documents_task(limit=100):
+    """
+    Remet en file les documents bloqués en traitement (bail expiré)
+
+    Tâche périodique (Celery Beat) : un worker perdu laisse son document
+    en PROCESSING ; une fois le bail expiré, le document repasse en attente
+    et est renvoyé à Celery. Les pages déjà enregistrées sont conservées.
+
+    Args:
+        limit: Nombre maximum de documents remis en file par exécution
+
+    Returns:
+        Liste des IDs remis en file
+    """
+    now = timezone.now()
+    stale_ids = list(
+        Document.objects.filter(
+            status=Document.Status.PROCESSING,
+            lease_expires_at__lt=now,
+        ).values_list('id', flat=True)[:limit]
+    )
+
+    service = DocumentService()
+    requeued = []
+    for document_id in stale_ids:
+        # Transition conditionnelle : ignore un document repris entre-temps
+        reset = Document.objects.filter(
+            id=document_id,
+            status=Document.Status.PROCESSING,
+            lease_expires_at__lt=now,
+        ).update(
+            status=Document.Status.PENDING,
+            claimed_by=None,
+            lease_expires_at=None,
+            updated_at=now,
+        )
+        if reset:
+            service.queue_document_ocr(Document.objects.get(id=document_id))
+            requeued.append(document_id)
+
+    if requeued:
+        logger.warning("Documents bloqués remis en file: %s", requeued)
+    return requeued
+
+
+@shared_task(name='documents.admit_deferred_documents')
+def admit_deferred_documents_task():
+    """
+    Admet les documents différés de tous les utilisateurs
+
+    Tâche périodique (Celery Beat) : filet de sécurité si l'admission à la
+    fin d'un traitement n'a pas eu lieu (worker perdu, erreur).
+
+    Returns:
+        Liste des IDs envoyés à Celery
+    """
+    user_ids = Document.objects.filter(
+        status=Document.Status.PENDING,
+        submitted_at__isnull=False,
+        queued_at__isnull=True,
+    ).values_list('user_id', flat=True).order_by().distinct()
+
+    service = DocumentService()
+    admitted = []
+    for user_id in user_ids:
+        admitted += service.admit_deferred_documents(user_id)
+    return admitted
+
+
+@shared_task(name='documents.reprocess_document')
+def reprocess_document_task(item_id):
+    """
+    Retraite un document d'une campagne (file REPROCESSING_QUEUE)
+
+    Args:
+        item_id: ID du ReprocessingItem
+
+    Returns:
+        Dict (item_id, status)
+    """
+    status = ReprocessingService().process_item(item_id)
+    return {'item_id': item_id, 'status': status}
+
+
+@shared_task(name='documents.dispatch_reprocessing')
+def dispatch_reprocessing_task():
+    """
+    Envoie le lot suivant de chaque campagne de retraitement en cours
+
+    Tâche périodique (Celery Beat, chaque minute) : le débit d'une
+    campagne est son nombre de documents envoyés par exécution.
+
+    Returns:
+        Dict {ID de campagne: nombre de documents envoyés}
+    """
+    service = ReprocessingService()
+    dispatched = {}
+    for campaign in ReprocessingCampaign.objects.filter(status=ReprocessingCampaign.Status.RUNNING):
+        dispatched[campaign.pk] = len(service.dispatch(campaign))
+    return dispatched
@@ -2,15 +2,48 @@
 Tests pour les services de l'app documents
 """
 from django.test import TestCase, override_settings
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.files.uploadedfile import InMemoryUploadedFile
 from io import BytesIO
+from unittest.mock import patch
 from PIL import Image
-from documents.models import Document, OCRResult
+from documents.models import (
+    Document,
+    OCRLayout,
+    OCRPageResult,
+    OCRRegionResult,
+    OCRResult,
+    OCRResultVersion,
+    ReprocessingCampaign,
+    ReprocessingItem,
+)
 from documents.services.document_service import DocumentService
 from documents.services.document_service import DocumentService
+from documents.services.cost_estimator import OCRCostEstimator
+from documents.services.stage_timer import StageTimer
+from documents.services.admission import FairShareAdmission
+from documents.services.reprocessing import ReprocessingService
+from django.conf import settings
+from documents.tasks import (
+    admit_deferred_documents_task,
+    compute_retry_countdown,
+    dispatch_reprocessing_task,
+    process_document_ocr_task,
+    requeue_stale_documents_task,
+)
+from img_to_txt_ocr.celery import route_ocr_task
+from ocr.engines.base_engine import BaseOCREngine
+from ocr.exceptions import DocumentLeaseLostError, DocumentLoadError
+from ocr.layout import WordLayout
+from ocr.validators.region_validator import RegionValidator
+from django.utils import timezone
+from datetime import timedelta
+from core import tracing
+from webhooks.models import WebhookEndpoint
 import os
+import time
 
 
 class DocumentServiceTest(TestCase):
@@ -114,3 +147,939 @@ class DocumentServiceTest(TestCase):
         
         # Vérifier le type MIME
         self.assertIn(document.mime_type, ['image/png', 'image/jpeg'])
+
+
+class OCRCostEstimatorTest(TestCase):
+    """Tests pour l'estimation du coût OCR et le routage des tâches"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.service = DocumentService()
+    
+    def _create_document(self, size):
+        """Crée un document image de la taille donnée"""
+        img = Image.new('RGB', size, color='white')
+        img_io = BytesIO()
+        img.save(img_io, format='PNG')
+        uploaded_file = SimpleUploadedFile(
+            "test.png",
+            img_io.getvalue(),
+            content_type='image/png'
+        )
+        return self.service.create_document(user=self.user, uploaded_file=uploaded_file)
+    
+    def test_create_document_estimates_cost(self):
+        """Test que le coût est estimé à l'upload"""
+        document = self._create_document((200, 100))
+        document.refresh_from_db()
+        
+        self.assertEqual(document.pages_count, 1)
+        self.assertEqual(document.estimated_pixels, 20000)
+        self.assertAlmostEqual(document.estimated_cost, 0.02)
+    
+    def test_estimate_unreadable_pdf_falls_back_to_one_page(self):
+        """Test l'estimation d'un PDF illisible (une page A4)"""
+        pages, pixels = OCRCostEstimator().estimate('/nonexistent.pdf', 'application/pdf')
+        
+        self.assertEqual(pages, 1)
+        self.assertGreater(pixels, 0)
+    
+    @override_settings(OCR_BULK_COST_THRESHOLD=1.0)
+    def test_route_small_document_to_interactive_queue(self):
+        """Test que les petits documents partent en file interactive"""
+        document = self._create_document((200, 100))
+        
+        route = route_ocr_task('documents.process_document_ocr', [document.id], {}, {})
+        self.assertEqual(route, {'queue': settings.OCR_INTERACTIVE_QUEUE})
+    
+    @override_settings(OCR_BULK_COST_THRESHOLD=1.0)
+    def test_route_large_document_to_bulk_queue(self):
+        """Test que les gros documents partent en file bulk"""
+        document = self._create_document((1000, 1000))
+        
+        route = route_ocr_task('documents.process_document_ocr', [document.id], {}, {})
+        self.assertEqual(route, {'queue': settings.OCR_BULK_QUEUE})
+    
+    def test_route_ignores_other_tasks(self):
+        """Test que le routeur ignore les autres tâches"""
+        self.assertIsNone(route_ocr_task('other.task', [], {}, {}))
+
+
+class StubOCREngine:
+    """Moteur OCR de test : renvoie le numéro d'appel et peut échouer à la demande"""
+    
+    name = 'stub'
+    
+    def __init__(self, fail_on_call=None):
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+    
+    def extract_text(self, image, language=None, **kwargs):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("Erreur transitoire")
+        return {'text': f'page {image.width}', 'confidence': 90.0, 'language': 'fra'}
+
+
+class DocumentOCRCheckpointTest(TestCase):
+    """Tests pour la reprise des traitements OCR multi-pages"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.service = DocumentService()
+    
+    def _create_multipage_document(self, widths=(10, 20, 30)):
+        """Crée un TIFF multi-pages dont chaque page a une largeur distincte"""
+        frames = [Image.new('RGB', (width, 10), color='white') for width in widths]
+        img_io = BytesIO()
+        frames[0].save(img_io, format='TIFF', save_all=True, append_images=frames[1:])
+        uploaded_file = SimpleUploadedFile(
+            "scan.tiff",
+            img_io.getvalue(),
+            content_type='image/tiff'
+        )
+        return self.service.create_document(user=self.user, uploaded_file=uploaded_file)
+    
+    def test_process_multipage_document(self):
+        """Test que toutes les pages sont traitées et assemblées"""
+        document = self._create_multipage_document()
+        engine = StubOCREngine()
+        
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            ocr_result = self.service.process_document_ocr(document)
+        
+        self.assertEqual(engine.calls, 3)
+        self.assertEqual(ocr_result.raw_text, 'page 10\n\npage 20\n\npage 30')
+        self.assertEqual(document.pages_count, 3)
+        self.assertEqual(document.page_results.count(), 3)
+        self.assertEqual(document.status, Document.Status.COMPLETED)
+    
+    def test_retry_only_processes_missing_pages(self):
+        """Test qu'un nouvel essai ne traite que les pages manquantes"""
+        document = self._create_multipage_document()
+        failing_engine = StubOCREngine(fail_on_call=2)
+        
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=failing_engine):
+            with self.assertRaises(RuntimeError):
+                self.service.process_document_ocr(document)
+        
+        self.assertEqual(document.status, Document.Status.FAILED)
+        self.assertEqual(list(document.page_results.values_list('page_number', flat=True)), [1])
+        
+        retry_engine = StubOCREngine()
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=retry_engine):
+            ocr_result = self.service.process_document_ocr(document)
+        
+        self.assertEqual(retry_engine.calls, 2)
+        self.assertEqual(ocr_result.raw_text, 'page 10\n\npage 20\n\npage 30')
+        self.assertEqual(document.status, Document.Status.COMPLETED)
+
+
+@override_settings(OCR_TASK_MAX_RETRIES=2, OCR_RETRY_BACKOFF_BASE=0)
+class DocumentOCRTaskTest(TestCase):
+    """Tests pour la tâche Celery de traitement OCR"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        img_io = BytesIO()
+        Image.new('RGB', (10, 10), color='white').save(img_io, format='PNG')
+        self.document = DocumentService().create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("test.png", img_io.getvalue(), content_type='image/png')
+        )
+    
+    def _run_task(self, engine):
+        """Exécute la tâche localement avec le moteur donné"""
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine), \
+                patch('documents.tasks.dead_letter_document_task.apply_async') as dead_letter:
+            result = process_document_ocr_task.apply(args=[self.document.id])
+        return result, dead_letter
+    
+    def test_permanent_error_is_not_retried(self):
+        """Test qu'une erreur permanente part directement en lettre morte"""
+        engine = StubOCREngine()
+        engine.extract_text = lambda image, **kwargs: (_ for _ in ()).throw(DocumentLoadError("PDF corrompu"))
+        
+        result, dead_letter = self._run_task(engine)
+        
+        self.assertEqual(result.get()['error_code'], 'document_load_error')
+        dead_letter.assert_called_once()
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.FAILED)
+        self.assertEqual(self.document.error_code, 'document_load_error')
+    
+    def test_transient_error_is_retried(self):
+        """Test qu'une erreur temporaire est réessayée puis réussit"""
+        engine = StubOCREngine(fail_on_call=1)
+        
+        result, dead_letter = self._run_task(engine)
+        
+        self.assertEqual(engine.calls, 2)
+        dead_letter.assert_not_called()
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.COMPLETED)
+        self.assertIsNone(self.document.error_code)
+    
+    def test_transient_error_is_not_final_while_retry_is_pending(self):
+        """Test qu'un document reste en attente (pas en échec) avant son nouvel essai"""
+        from api.progress import wait_for_document
+        
+        between_attempts = []
+        
+        def record_state(retries):
+            between_attempts.append(wait_for_document(Document.objects.filter(user=self.user), self.document.id, 0))
+            return 0
+        
+        with patch('documents.tasks.compute_retry_countdown', side_effect=record_state), \
+                patch('documents.services.document_service.events.publish_document_event') as publish:
+            result, dead_letter = self._run_task(StubOCREngine(fail_on_call=1))
+        
+        self.assertEqual(result.get()['status'], 'success')
+        self.assertEqual(len(between_attempts), 1)
+        self.assertEqual(between_attempts[0]['status'], Document.Status.PENDING)
+        self.assertEqual(between_attempts[0]['error_code'], 'RuntimeError')
+        published = [call.args[0].status for call in publish.call_args_list if call.args[1] == 'status']
+        self.assertNotIn(Document.Status.FAILED, published)
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.COMPLETED)
+    
+    def test_transient_error_fails_once_retries_are_exhausted(self):
+        """Test le passage en échec au dernier essai d'une erreur temporaire"""
+        engine = StubOCREngine()
+        engine.extract_text = lambda image, **kwargs: (_ for _ in ()).throw(RuntimeError("Erreur transitoire"))
+        
+        result, dead_letter = self._run_task(engine)
+        
+        self.assertEqual(result.get()['status'], 'error')
+        dead_letter.assert_called_once()
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.FAILED)
+        self.assertEqual(self.document.error_code, 'RuntimeError')
+    
+    def test_completion_signals_waiters(self):
+        """Test que la fin du traitement pose le signal des attentes longues"""
+        cache.delete(Document.signal_cache_key(self.document.id))
+        
+        self._run_task(StubOCREngine())
+        
+        self.assertIsNotNone(cache.get(Document.signal_cache_key(self.document.id)))
+    
+    def test_progress_events_published(self):
+        """Test la publication des événements de page et de statut"""
+        with patch('documents.services.document_service.events.publish_document_event') as publish:
+            self._run_task(StubOCREngine())
+        
+        event_types = [call.args[1] for call in publish.call_args_list]
+        self.assertEqual(event_types, ['status', 'page', 'status'])
+        self.assertEqual(publish.call_args_list[1].kwargs['progress'], 1.0)
+        self.assertEqual(publish.call_args_list[-1].args[0].status, Document.Status.COMPLETED)
+    
+    def test_completion_and_failure_queue_webhooks(self):
+        """Test la mise en file d'une notification par fin de traitement"""
+        endpoint = WebhookEndpoint.objects.create(user=self.user, url='https://hooks.example.com/ocr')
+        
+        self._run_task(StubOCREngine())
+        
+        delivery = endpoint.deliveries.get()
+        self.assertEqual(delivery.event, WebhookEndpoint.Event.DOCUMENT_COMPLETED)
+        self.assertEqual(delivery.payload['document_id'], self.document.id)
+        self.assertEqual(delivery.payload['status'], Document.Status.COMPLETED)
+        
+        # Erreur permanente : une seule notification (service), pas de doublon par la tâche
+        endpoint.deliveries.all().delete()
+        Document.objects.filter(id=self.document.id).update(status=Document.Status.FAILED)
+        self.document.page_results.all().delete()
+        engine = StubOCREngine()
+        engine.extract_text = lambda image, **kwargs: (_ for _ in ()).throw(DocumentLoadError("PDF corrompu"))
+        self._run_task(engine)
+        
+        delivery = endpoint.deliveries.get()
+        self.assertEqual(delivery.event, WebhookEndpoint.Event.DOCUMENT_FAILED)
+        self.assertEqual(delivery.payload['error_code'], 'document_load_error')
+    
+    def test_retry_countdown_grows_exponentially(self):
+        """Test le backoff exponentiel borné avec jitter"""
+        with self.settings(OCR_RETRY_BACKOFF_BASE=10, OCR_RETRY_BACKOFF_MAX=60):
+            self.assertTrue(5 <= compute_retry_countdown(0) <= 10)
+            self.assertTrue(20 <= compute_retry_countdown(2) <= 40)
+            self.assertTrue(30 <= compute_retry_countdown(10) <= 60)
+
+
+class DocumentClaimTest(TestCase):
+    """Tests pour la réservation atomique des documents et la remise en file"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.service = DocumentService()
+        img_io = BytesIO()
+        Image.new('RGB', (10, 10), color='white').save(img_io, format='PNG')
+        self.document = self.service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("test.png", img_io.getvalue(), content_type='image/png')
+        )
+    
+    def test_claim_is_exclusive(self):
+        """Test que deux workers ne peuvent pas réserver le même document"""
+        self.assertTrue(self.service.claim_document(self.document.id, 'worker-1'))
+        self.assertFalse(self.service.claim_document(self.document.id, 'worker-2'))
+        
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.PROCESSING)
+        self.assertEqual(self.document.claimed_by, 'worker-1')
+    
+    def test_expired_lease_can_be_claimed(self):
+        """Test qu'un bail expiré (worker perdu) peut être repris"""
+        self.service.claim_document(self.document.id, 'worker-1')
+        Document.objects.filter(id=self.document.id).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        
+        self.assertTrue(self.service.claim_document(self.document.id, 'worker-2'))
+    
+    def test_completed_document_cannot_be_claimed(self):
+        """Test qu'un document terminé n'est pas retraité"""
+        Document.objects.filter(id=self.document.id).update(status=Document.Status.COMPLETED)
+        
+        self.assertFalse(self.service.claim_document(self.document.id, 'worker-1'))
+    
+    def test_lost_lease_stops_processing(self):
+        """Test qu'un worker dont le bail a été repris abandonne sans marquer d'échec"""
+        self.service.claim_document(self.document.id, 'worker-1')
+        Document.objects.filter(id=self.document.id).update(claimed_by='worker-2')
+        
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=StubOCREngine()):
+            with self.assertRaises(DocumentLeaseLostError):
+                self.service.process_document_ocr(
+                    Document.objects.get(id=self.document.id),
+                    lease_owner='worker-1-stale'
+                )
+        
+        self.assertFalse(OCRResult.objects.filter(document=self.document).exists())
+    
+    def test_duplicate_task_is_skipped(self):
+        """Test qu'un message dupliqué ne relance pas l'OCR"""
+        self.service.claim_document(self.document.id, 'worker-1')
+        
+        result = process_document_ocr_task.apply(args=[self.document.id]).get()
+        
+        self.assertEqual(result['status'], 'skipped')
+    
+    def test_requeue_stale_documents(self):
+        """Test que le reaper remet en file les documents au bail expiré"""
+        self.service.claim_document(self.document.id, 'worker-1')
+        Document.objects.filter(id=self.document.id).update(
+            lease_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+        
+        with patch('documents.tasks.DocumentService.queue_document_ocr') as queue:
+            requeued = requeue_stale_documents_task()
+        
+        self.assertEqual(requeued, [self.document.id])
+        queue.assert_called_once()
+        self.document.refresh_from_db()
+        self.assertEqual(self.document.status, Document.Status.PENDING)
+        self.assertIsNone(self.document.claimed_by)
+
+
+class StageTimerTest(TestCase):
+    """Tests pour le chronométrage des étapes OCR"""
+    
+    def test_stage_durations_are_cumulative_and_ordered(self):
+        """Test que les étapes répétées sont cumulées dans l'ordre du pipeline"""
+        timer = StageTimer()
+        with timer.stage('ocr'):
+            pass
+        with timer.stage('load'):
+            pass
+        with timer.stage('ocr'):
+            pass
+        
+        self.assertEqual(list(timer.as_dict().keys()), ['load', 'ocr'])
+    
+    def test_process_document_records_stage_timings(self):
+        """Test que le résultat OCR contient les durées par étape"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        service = DocumentService()
+        img_io = BytesIO()
+        Image.new('RGBA', (10, 10)).save(img_io, format='PNG')
+        document = service.create_document(
+            user=user,
+            uploaded_file=SimpleUploadedFile("test.png", img_io.getvalue(), content_type='image/png')
+        )
+        
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=StubOCREngine()):
+            ocr_result = service.process_document_ocr(document)
+        
+        ocr_result.refresh_from_db()
+        for stage in ['load', 'preprocess', 'engine_init', 'ocr', 'postprocess', 'persist']:
+            self.assertIn(stage, ocr_result.stage_timings)
+        self.assertNotIn('render', ocr_result.stage_timings)
+
+
+@override_settings(TRACING_ENABLED=True, TRACING_EXPORTER='memory')
+class TracingTest(TestCase):
+    """Tests pour le traçage de l'upload à la tâche OCR"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = DocumentService()
+        self.exporter = tracing.get_exporter()
+        self.exporter.clear()
+        img_io = BytesIO()
+        Image.new('RGB', (10, 10), color='white').save(img_io, format='PNG')
+        self.document = self.service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("test.png", img_io.getvalue(), content_type='image/png')
+        )
+    
+    def test_queue_document_ocr_propagates_trace_context(self):
+        """Test que le contexte de trace est transmis dans les en-têtes Celery"""
+        with patch('documents.tasks.process_document_ocr_task.apply_async') as apply_async:
+            self.service.queue_document_ocr(self.document)
+        
+        headers = apply_async.call_args.kwargs['headers']
+        self.assertEqual(headers['traceparent'], self.document.trace_context)
+        self.assertIn('enqueued_at', headers)
+    
+    def test_task_spans_join_upload_trace(self):
+        """Test que l'attente, la tâche et les étapes OCR sont dans la trace de l'upload"""
+        headers = {'traceparent': self.document.trace_context, 'enqueued_at': time.time() - 0.5}
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=StubOCREngine()):
+            process_document_ocr_task.apply(args=[self.document.id], headers=headers)
+        
+        spans = {span.name: span for span in self.exporter.spans}
+        upload = spans['document.upload']
+        self.assertEqual(
+            {span.context.trace_id for span in self.exporter.spans},
+            {upload.context.trace_id}
+        )
+        self.assertEqual(spans['celery.queue_wait'].parent_id, upload.context.span_id)
+        self.assertGreaterEqual(spans['celery.queue_wait'].duration_ms, 500)
+        self.assertEqual(spans['ocr.process'].parent_id, spans['celery.ocr_task'].context.span_id)
+        self.assertEqual(spans['ocr.ocr'].parent_id, spans['ocr.process'].context.span_id)
+        self.assertEqual(spans['ocr.ocr'].attributes['engine'], 'stub')
+    
+    def test_tracing_disabled(self):
+        """Test qu'aucun span n'est émis si le traçage est désactivé"""
+        self.exporter.clear()
+        with self.settings(TRACING_ENABLED=False):
+            with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=StubOCREngine()):
+                self.service.process_document_ocr(self.document)
+        self.assertEqual(self.exporter.spans, [])
+
+
+@override_settings(OCR_USER_MAX_INFLIGHT_PAGES=2, OCR_USER_MAX_INFLIGHT_PIXELS=10**9)
+class FairShareAdmissionTest(TestCase):
+    """Tests pour l'admission équitable dans la file OCR"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = DocumentService()
+    
+    def _create_document(self, pages=1, user=None):
+        """Crée un document en attente avec le nombre de pages donné"""
+        img_io = BytesIO()
+        Image.new('RGB', (10, 10), color='white').save(img_io, format='PNG')
+        document = self.service.create_document(
+            user=user or self.user,
+            uploaded_file=SimpleUploadedFile("test.png", img_io.getvalue(), content_type='image/png')
+        )
+        Document.objects.filter(pk=document.pk).update(pages_count=pages)
+        document.pages_count = pages
+        return document
+    
+    def test_document_over_cap_is_deferred(self):
+        """Test qu'un document dépassant le plafond reste en attente"""
+        first = self._create_document(pages=2)
+        second = self._create_document(pages=1)
+        
+        with patch('documents.tasks.process_document_ocr_task.apply_async') as apply_async:
+            self.assertIsNotNone(self.service.queue_document_ocr(first))
+            self.assertIsNone(self.service.queue_document_ocr(second))
+        
+        apply_async.assert_called_once()
+        second.refresh_from_db()
+        self.assertTrue(second.is_deferred)
+        self.assertEqual(FairShareAdmission().in_flight(self.user.id)[0], 2)
+    
+    def test_oversized_document_is_admitted_alone(self):
+        """Test qu'un document plus gros que le plafond passe si rien n'est en cours"""
+        document = self._create_document(pages=5)
+        
+        self.assertTrue(FairShareAdmission().admit(document))
+        self.assertIsNotNone(document.queued_at)
+    
+    def test_users_do_not_share_caps(self):
+        """Test que le plafond est propre à chaque utilisateur"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        admission = FairShareAdmission()
+        
+        self.assertTrue(admission.admit(self._create_document(pages=2)))
+        self.assertTrue(admission.admit(self._create_document(pages=2, user=other)))
+    
+    def test_deferred_documents_admitted_when_work_completes(self):
+        """Test que les documents en attente sont admis dans l'ordre de soumission"""
+        admission = FairShareAdmission()
+        first = self._create_document(pages=2)
+        second = self._create_document(pages=1)
+        third = self._create_document(pages=1)
+        admission.admit(first)
+        self.assertFalse(admission.admit(second))
+        self.assertFalse(admission.admit(third))
+        
+        Document.objects.filter(pk=first.pk).update(status=Document.Status.COMPLETED)
+        with patch('documents.tasks.process_document_ocr_task.apply_async') as apply_async:
+            admitted = self.service.admit_deferred_documents(self.user.id)
+        
+        self.assertEqual(admitted, [second.id, third.id])
+        self.assertEqual(apply_async.call_count, 2)
+    
+    def test_periodic_task_admits_deferred_documents(self):
+        """Test que la tâche périodique admet les documents en attente"""
+        admission = FairShareAdmission()
+        first = self._create_document(pages=2)
+        second = self._create_document(pages=1)
+        admission.admit(first)
+        admission.admit(second)
+        Document.objects.filter(pk=first.pk).update(status=Document.Status.FAILED)
+        
+        with patch('documents.tasks.process_document_ocr_task.apply_async'):
+            result = admit_deferred_documents_task.apply()
+        
+        self.assertEqual(result.get(), [second.id])
+        second.refresh_from_db()
+        self.assertFalse(second.is_deferred)
+
+
+
+class ConfidenceOCREngine(StubOCREngine):
+    """Moteur OCR de test à confiance fixe"""
+    
+    def __init__(self, confidence, text='nouveau texte'):
+        super().__init__()
+        self.confidence = confidence
+        self.text = text
+    
+    def extract_text(self, image, language=None, **kwargs):
+        self.calls += 1
+        return {'text': self.text, 'confidence': self.confidence, 'language': 'fra'}
+
+
+@override_settings(REPROCESSING_MAX_INFLIGHT=2)
+class ReprocessingCampaignTest(TestCase):
+    """Tests pour les campagnes de retraitement OCR"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = ReprocessingService()
+        self.documents = [self._create_completed_document(confidence) for confidence in (60.0, 70.0, 95.0)]
+    
+    def _create_completed_document(self, confidence):
+        """Crée un document traité avec la confiance donnée"""
+        img_io = BytesIO()
+        Image.new('RGB', (10, 10), color='white').save(img_io, format='PNG')
+        document_service = DocumentService()
+        document = document_service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("scan.png", img_io.getvalue(), content_type='image/png')
+        )
+        engine = ConfidenceOCREngine(confidence, text='ancien texte')
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            document_service.process_document_ocr(document)
+        return document
+    
+    def _process(self, item, engine):
+        ReprocessingItem.objects.filter(pk=item.pk).update(status=ReprocessingItem.Status.QUEUED)
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            return self.service.process_item(item.pk)
+    
+    def test_campaign_selects_documents_by_filter(self):
+        """Test que seuls les documents sous le seuil de confiance sont sélectionnés"""
+        campaign = self.service.create_campaign('Tesseract 5', filter_max_confidence=80)
+        
+        self.assertEqual(campaign.total_items, 2)
+        self.assertEqual(
+            set(campaign.items.values_list('document_id', flat=True)),
+            {self.documents[0].pk, self.documents[1].pk}
+        )
+        self.assertEqual(campaign.estimated_pixels, 200)
+        empty = self.service.create_campaign('Vide', filter_engine='easyocr')
+        self.assertEqual(empty.status, ReprocessingCampaign.Status.COMPLETED)
+    
+    def test_dispatch_is_throttled(self):
+        """Test que l'envoi respecte le débit et le plafond de documents en file"""
+        campaign = self.service.create_campaign('Tesseract 5', rate_per_minute=1)
+        with patch('documents.tasks.reprocess_document_task.apply_async') as apply_async:
+            self.assertEqual(dispatch_reprocessing_task(), {campaign.pk: 1})
+            campaign.rate_per_minute = 10
+            campaign.save()
+            self.assertEqual(dispatch_reprocessing_task(), {campaign.pk: 1})
+            self.assertEqual(dispatch_reprocessing_task(), {campaign.pk: 0})
+        
+        self.assertEqual(apply_async.call_count, 2)
+        self.assertEqual(apply_async.call_args.kwargs['queue'], settings.REPROCESSING_QUEUE)
+        self.assertEqual(campaign.items.filter(status=ReprocessingItem.Status.QUEUED).count(), 2)
+    
+    def test_better_result_replaces_current_one(self):
+        """Test qu'un meilleur résultat remplace l'ancien et invalide le cache"""
+        document = self.documents[0]
+        campaign = self.service.create_campaign('Tesseract 5', filter_max_confidence=65)
+        item = campaign.items.get()
+        cache_key = Document.payload_cache_key(document.pk, 'detail')
+        cache.set(cache_key, b'ancien')
+        OCRResult.objects.filter(document=document).update(stage_timings={})
+        updated_at = Document.objects.get(pk=document.pk).updated_at
+        
+        self.assertEqual(self._process(item, ConfidenceOCREngine(85.0)), ReprocessingItem.Status.IMPROVED)
+        
+        document.refresh_from_db()
+        self.assertEqual(document.extracted_text, 'nouveau texte')
+        self.assertEqual(document.confidence_score, 85.0)
+        self.assertEqual(document.status, Document.Status.COMPLETED)
+        self.assertGreater(document.updated_at, updated_at)
+        self.assertIsNone(cache.get(cache_key))
+        self.assertEqual(document.ocr_result.version, 2)
+        self.assertEqual(document.ocr_result.cleaned_text, 'nouveau texte')
+        for stage in ['load', 'preprocess', 'ocr', 'postprocess']:
+            self.assertIn(stage, document.ocr_result.stage_timings)
+        self.assertEqual(list(document.page_results.values_list('text', flat=True)), ['nouveau texte'])
+        item.refresh_from_db()
+        self.assertEqual((item.previous_version, item.previous_confidence, item.new_confidence), (1, 60.0, 85.0))
+    
+    def test_replaced_result_is_archived(self):
+        """Test que la version remplacée (texte, pages, disposition) est conservée"""
+        document = self.documents[0]
+        result = document.ocr_result
+        self.assertFalse(result.versions.exists())
+        campaign = self.service.create_campaign('Tesseract 5', filter_max_confidence=65)
+        
+        self.assertEqual(self._process(campaign.items.get(), ConfidenceOCREngine(85.0)), ReprocessingItem.Status.IMPROVED)
+        
+        archived = OCRResultVersion.objects.get(ocr_result=result)
+        self.assertEqual(archived.version, 1)
+        self.assertEqual((archived.cleaned_text, archived.confidence_score), ('ancien texte', 60.0))
+        self.assertEqual(archived.pages[0]['page_number'], 1)
+        self.assertEqual(archived.pages[0]['text'], 'ancien texte')
+        self.assertEqual(archived.pages[0]['confidence_score'], 60.0)
+        result.refresh_from_db()
+        self.assertEqual((result.version, result.cleaned_text), (2, 'nouveau texte'))
+    
+    def test_worse_result_is_discarded(self):
+        """Test que l'ancien résultat est conservé si le nouveau n'est pas meilleur"""
+        document = self.documents[1]
+        campaign = self.service.create_campaign('Tesseract 5', filter_max_confidence=75, min_improvement=10)
+        item = campaign.items.get(document=document)
+        
+        self.assertEqual(self._process(item, ConfidenceOCREngine(75.0)), ReprocessingItem.Status.KEPT)
+        
+        result = OCRResult.objects.get(document=document)
+        self.assertEqual((result.version, result.cleaned_text, result.confidence_score), (1, 'ancien texte', 70.0))
+        self.assertFalse(result.versions.exists())
+        item.refresh_from_db()
+        self.assertEqual(item.new_confidence, 75.0)
+    
+    def test_progress_and_completion(self):
+        """Test l'avancement, l'ignorance des documents modifiés et la fin de campagne"""
+        campaign = self.service.create_campaign('Tesseract 5', filter_max_confidence=80, rate_per_minute=5)
+        first, second = campaign.items.order_by('id')
+        Document.objects.filter(pk=second.document_id).update(status=Document.Status.PROCESSING)
+        
+        self.assertEqual(self._process(first, ConfidenceOCREngine(90.0)), ReprocessingItem.Status.IMPROVED)
+        self.assertEqual(self._process(second, ConfidenceOCREngine(90.0)), ReprocessingItem.Status.SKIPPED)
+        
+        progress = self.service.progress(campaign)
+        self.assertEqual(progress['done'], 2)
+        self.assertEqual(progress['percent'], 100.0)
+        self.assertEqual(progress['improved'], 1)
+        self.assertEqual(progress['average_gain'], 30.0)
+        self.assertEqual(self.service.dispatch(campaign), [])
+        campaign.refresh_from_db()
+        self.assertEqual(campaign.status, ReprocessingCampaign.Status.COMPLETED)
+    
+    def test_cancelled_campaign_skips_pending_items(self):
+        """Test que l'annulation ignore les documents restants"""
+        campaign = self.service.create_campaign('Tesseract 5')
+        item = campaign.items.first()
+        ReprocessingItem.objects.filter(pk=item.pk).update(status=ReprocessingItem.Status.QUEUED)
+        self.service.set_status(campaign, ReprocessingCampaign.Status.CANCELLED)
+        
+        self.assertEqual(self.service.process_item(item.pk), ReprocessingItem.Status.SKIPPED)
+        self.assertFalse(campaign.items.exclude(status=ReprocessingItem.Status.SKIPPED).exists())
+
+
+
+class TieredOCREngine(StubOCREngine):
+    """Moteur OCR de test : confiance selon la passe, appels enregistrés"""
+    
+    def __init__(self, fast_confidence, best_confidence=95.0):
+        super().__init__()
+        self.confidences = {'fast': fast_confidence, 'best': best_confidence, None: 90.0}
+        self.requests = []
+    
+    def extract_text(self, image, language=None, **kwargs):
+        quality = kwargs.get('quality')
+        self.requests.append((quality, image.size, image.mode))
+        return {'text': f'passe {quality}', 'confidence': self.confidences[quality], 'language': 'fra'}
+
+
+@override_settings(OCR_ADAPTIVE_ENABLED=True, OCR_ADAPTIVE_CONFIDENCE_THRESHOLD=80.0, OCR_ADAPTIVE_FAST_MAX_SIDE=100)
+class AdaptiveOCRTest(TestCase):
+    """Tests pour l'OCR adaptatif (passe rapide, escalade vers la passe précise)"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = DocumentService()
+        img_io = BytesIO()
+        Image.new('RGB', (400, 200), color='white').save(img_io, format='PNG')
+        self.document = self.service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("scan.png", img_io.getvalue(), content_type='image/png')
+        )
+    
+    def _process(self, engine):
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            self.service.process_document_ocr(self.document)
+        return self.document.page_results.get()
+    
+    def test_clean_page_stays_in_fast_tier(self):
+        """Test qu'une page confiante n'est traitée qu'une fois, sur l'image réduite"""
+        engine = TieredOCREngine(fast_confidence=92.0)
+        
+        page = self._process(engine)
+        
+        self.assertEqual(engine.requests, [('fast', (100, 50), 'RGB')])
+        self.assertEqual(page.ocr_tier, OCRPageResult.Tier.FAST)
+        self.assertFalse(page.escalated)
+        self.assertEqual(page.text, 'passe fast')
+    
+    def test_low_confidence_page_is_escalated(self):
+        """Test qu'une page peu confiante passe en qualité précise, en pleine résolution"""
+        engine = TieredOCREngine(fast_confidence=55.0, best_confidence=88.0)
+        
+        page = self._process(engine)
+        
+        self.assertEqual(engine.requests, [('fast', (100, 50), 'RGB'), ('best', (400, 200), 'L')])
+        self.assertEqual(page.ocr_tier, OCRPageResult.Tier.ACCURATE)
+        self.assertTrue(page.escalated)
+        self.assertEqual(page.fast_confidence, 55.0)
+        self.assertEqual(page.confidence_score, 88.0)
+        self.assertEqual(self.document.ocr_result.cleaned_text, 'passe best')
+    
+    def test_escalation_keeps_the_most_confident_result(self):
+        """Test que la passe rapide est conservée si l'escalade n'améliore rien"""
+        page = self._process(TieredOCREngine(fast_confidence=60.0, best_confidence=40.0))
+        
+        self.assertEqual(page.ocr_tier, OCRPageResult.Tier.FAST)
+        self.assertTrue(page.escalated)
+        self.assertEqual(page.text, 'passe fast')
+        self.assertEqual(page.confidence_score, 60.0)
+    
+    @override_settings(OCR_ADAPTIVE_ENABLED=False)
+    def test_adaptive_ocr_disabled(self):
+        """Test qu'une seule passe standard est faite si l'OCR adaptatif est désactivé"""
+        engine = TieredOCREngine(fast_confidence=10.0)
+        
+        page = self._process(engine)
+        
+        self.assertEqual(engine.requests, [(None, (400, 200), 'RGB')])
+        self.assertEqual(page.ocr_tier, OCRPageResult.Tier.STANDARD)
+        self.assertIsNone(page.fast_confidence)
+
+
+class RegionOCREngine(BaseOCREngine):
+    """Moteur OCR de test : lit la taille des zones découpées, appels enregistrés"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    @property
+    def name(self) -> str:
+        return 'region-stub'
+    
+    def is_available(self) -> bool:
+        return True
+    
+    def get_supported_languages(self) -> list:
+        return ['fra']
+    
+    def extract_text(self, image, language=None, **kwargs):
+        self.requests.append((image.size, kwargs.get('single_line', False)))
+        return {'text': f'{image.width}x{image.height}', 'confidence': 70.0 + image.width / 10, 'language': 'fra'}
+
+
+@override_settings(OCR_REGION_WORKERS=2)
+class RegionOCRTest(TestCase):
+    """Tests pour l'OCR par zones (formulaires à mise en page fixe)"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = DocumentService()
+    
+    def _create_document(self, regions, pages=2):
+        frames = [Image.new('RGB', (200, 100), color='white') for _ in range(pages)]
+        img_io = BytesIO()
+        frames[0].save(img_io, format='TIFF', save_all=True, append_images=frames[1:])
+        return self.service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("form.tiff", img_io.getvalue(), content_type='image/tiff'),
+            regions=RegionValidator().normalize(regions),
+        )
+    
+    def _process(self, document, engine):
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            return self.service.process_document_ocr(document)
+    
+    def test_only_regions_are_recognized(self):
+        """Test que seules les zones sont lues, page par page"""
+        padding = BaseOCREngine.REGION_PADDING
+        document = self._create_document([
+            {'name': 'numero', 'x': 0.5, 'y': 0, 'width': 0.5, 'height': 0.1, 'single_line': True},
+            {'name': 'total', 'page': 2, 'x': 0, 'y': 0.8, 'width': 0.25, 'height': 0.2},
+        ], pages=3)
+        engine = RegionOCREngine()
+        
+        ocr_result = self._process(document, engine)
+        
+        self.assertEqual(sorted(engine.requests), [
+            ((50 + 2 * padding, 20 + 2 * padding), False),
+            ((100 + 2 * padding, 10 + 2 * padding), True),
+        ])
+        regions = {region.name: region for region in document.region_results.all()}
+        self.assertEqual(regions['numero'].page_number, 1)
+        self.assertEqual(regions['numero'].text, f'{100 + 2 * padding}x{10 + 2 * padding}')
+        self.assertEqual(regions['total'].page_number, 2)
+        self.assertEqual(regions['total'].engine_used, 'region-stub')
+        self.assertEqual(list(document.page_results.values_list('page_number', flat=True)), [1, 2])
+        self.assertTrue(ocr_result.raw_text.startswith('numero: '))
+        self.assertEqual(document.status, Document.Status.COMPLETED)
+    
+    def test_regions_of_a_page_are_merged(self):
+        """Test l'assemblage des zones d'une page (texte par zone, confiance moyenne)"""
+        document = self._create_document([
+            {'name': 'nom', 'x': 0, 'y': 0, 'width': 0.4, 'height': 0.1},
+            {'name': 'date', 'x': 0, 'y': 0.5, 'width': 0.9, 'height': 0.1},
+        ], pages=1)
+        
+        self._process(document, RegionOCREngine())
+        
+        page = document.page_results.get()
+        self.assertEqual(page.text, 'nom: 100x30\ndate: 200x30')
+        self.assertEqual(page.confidence_score, 85.0)
+    
+    def test_regions_outside_the_document_fail(self):
+        """Test l'échec d'un document dont aucune zone n'est sur ses pages"""
+        document = self._create_document([{'name': 'total', 'page': 5, 'x': 0, 'y': 0, 'width': 1, 'height': 1}])
+        
+        with self.assertRaises(DocumentLoadError):
+            self._process(document, RegionOCREngine())
+        
+        self.assertEqual(document.status, Document.Status.FAILED)
+        self.assertFalse(OCRRegionResult.objects.exists())
+    
+    def test_region_documents_are_not_reprocessed(self):
+        """Test que les campagnes de retraitement ignorent les documents lus par zones"""
+        document = self._create_document([{'name': 'total', 'x': 0, 'y': 0, 'width': 1, 'height': 1}], pages=1)
+        self._process(document, RegionOCREngine())
+        
+        self.assertFalse(ReprocessingService().select_documents().filter(pk=document.pk).exists())
+
+
+class LayoutOCREngine(StubOCREngine):
+    """Moteur OCR de test : un mot par page, boîte à la taille de l'image"""
+    
+    def extract_text(self, image, language=None, **kwargs):
+        result = super().extract_text(image, language=language, **kwargs)
+        result['words'] = [{'text': result['text'], 'bbox': [0, 0, image.width, image.height], 'confidence': 90.0}]
+        return result
+
+
+@override_settings(OCR_ADAPTIVE_ENABLED=False, OCR_WORD_LAYOUT_ENABLED=True)
+class WordLayoutStorageTest(TestCase):
+    """Tests pour l'enregistrement de la disposition des mots"""
+    
+    def setUp(self):
+        """Configuration initiale pour les tests"""
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.service = DocumentService()
+        frames = [Image.new('RGB', (width, 10), color='white') for width in (10, 20, 30)]
+        img_io = BytesIO()
+        frames[0].save(img_io, format='TIFF', save_all=True, append_images=frames[1:])
+        self.document = self.service.create_document(
+            user=self.user,
+            uploaded_file=SimpleUploadedFile("scan.tiff", img_io.getvalue(), content_type='image/tiff')
+        )
+    
+    def _process(self, engine):
+        with patch('documents.services.document_service.OCREngineFactory.get_engine', return_value=engine):
+            return self.service.process_document_ocr(self.document)
+    
+    def test_layout_is_stored_with_the_result(self):
+        """Test que la disposition des pages est regroupée et les checkpoints vidés"""
+        ocr_result = self._process(LayoutOCREngine())
+        
+        layout = OCRLayout.objects.get(ocr_result=ocr_result).decode()
+        self.assertEqual(layout.page_numbers, [1, 2, 3])
+        self.assertEqual(layout.page(2), {'page_number': 2, 'width': 20, 'height': 10, 'words': [
+            {'text': 'page 20', 'bbox': [0, 0, 20, 10], 'confidence': 90},
+        ]})
+        self.assertFalse(self.document.page_results.filter(layout__isnull=False).exists())
+    
+    @override_settings(OCR_ADAPTIVE_ENABLED=True, OCR_ADAPTIVE_CONFIDENCE_THRESHOLD=80.0, OCR_ADAPTIVE_FAST_MAX_SIDE=10)
+    def test_boxes_refer_to_the_image_read(self):
+        """Test que les boîtes de la passe rapide sont rapportées à l'image réduite"""
+        ocr_result = self._process(LayoutOCREngine())
+        
+        page = ocr_result.layout.decode().page(3)
+        self.assertEqual((page['width'], page['height']), (10, 3))
+        self.assertEqual(page['words'][0]['bbox'], [0, 0, 10, 3])
+    
+    def test_reprocessing_archives_previous_layout(self):
+        """Test que la disposition remplacée par un retraitement reste lisible"""
+        ocr_result = self._process(LayoutOCREngine())
+        
+        with patch('documents.services.document_service.OCREngineFactory.get_engine',
+                   return_value=ConfidenceOCREngine(99.0)):
+            outcome = self.service.reprocess_document_ocr(Document.objects.get(pk=self.document.pk))
+        
+        self.assertTrue(outcome['improved'])
+        archived = ocr_result.versions.get(version=1)
+        self.assertEqual([page['text'] for page in archived.pages], ['page 10', 'page 20', 'page 30'])
+        layout = WordLayout(bytes(archived.layout))
+        self.assertEqual(layout.page(2)['words'][0]['text'], 'page 20')
+        self.assertFalse(OCRLayout.objects.filter(ocr_result=ocr_result).exists())
+    
+    def test_no_layout_without_word_boxes(self):
+        """Test l'absence de disposition (moteur sans boîtes, disposition désactivée)"""
+        ocr_result = self._process(StubOCREngine())
+        self.assertFalse(OCRLayout.objects.filter(ocr_result=ocr_result).exists())
+        
+        with self.settings(OCR_WORD_LAYOUT_ENABLED=False):
+            self.document.ocr_result.delete()
+            self.document.page_results.all().delete()
+            ocr_result = self._process(LayoutOCREngine())
+        self.assertFalse(OCRLayout.objects.filter(ocr_result=ocr_result).exists())
@@ -0,0 +1,24 @@
+"""
+Configuration gunicorn (chargée automatiquement depuis le répertoire courant)
+
+Les métriques Prometheus de chaque worker sont écrites dans
+PROMETHEUS_MULTIPROC_DIR et agrégées par la vue /metrics.
+
+Workers à threads (gthread) : une attente longue de l'API
+(/api/v1/documents/{id}/wait/) occupe un thread inactif, pas un worker.
+"""
+import os
+
+threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+
+def on_starting(server):
+    """Vide les métriques d'une exécution précédente"""
+    from core import metrics
+    metrics.reset_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    """Nettoie les métriques d'un worker terminé"""
+    from core import metrics
+    metrics.mark_process_dead(worker.pid)
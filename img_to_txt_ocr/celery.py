@@ -3,6 +3,7 @@ Configuration Celery pour traitement asynchrone
 """
 import os
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
 from django.conf import settings
 
 # Configuration du nom du module Django par défaut
@@ -16,8 +17,59 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # Découverte automatique des tâches dans toutes les apps Django
 app.autodiscover_tasks()
 
+# Nom de la tâche OCR routée selon son coût
+OCR_TASK_NAME = 'documents.process_document_ocr'
+
+
+def route_ocr_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Route les tâches OCR vers la file interactive ou bulk selon le coût estimé
+    
+    Les petits documents (reçus, images) partent sur la file interactive à
+    faible latence ; les gros PDF et grandes images partent sur la file bulk
+    pour ne pas bloquer les utilisateurs interactifs.
+    """
+    if name != OCR_TASK_NAME:
+        return None
+    
+    document_id = args[0] if args else (kwargs or {}).get('document_id')
+    
+    # Import local : les modèles ne sont pas prêts au chargement du module
+    from documents.models import Document
+    from documents.services.cost_estimator import OCRCostEstimator
+    
+    pixels = Document.objects.filter(pk=document_id).values_list(
+        'estimated_pixels', flat=True
+    ).first()
+    cost = OCRCostEstimator.cost_from_pixels(pixels)
+    
+    if cost >= settings.OCR_BULK_COST_THRESHOLD:
+        return {'queue': settings.OCR_BULK_QUEUE}
+    return {'queue': settings.OCR_INTERACTIVE_QUEUE}
+
+
+# Les files sont créées à la volée (task_create_missing_queues) ;
+# chaque pool de workers consomme la sienne via -Q (voir docker-compose)
+app.conf.task_routes = (route_ocr_task,)
+
 
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """Tâche de débogage pour tester Celery"""
     print(f'Request: {self.request!r}')
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """Expose les métriques agrégées des processus du worker (Prometheus)"""
+    from core import metrics
+    metrics.reset_multiprocess_dir()
+    if settings.METRICS_ENABLED:
+        metrics.start_worker_exporter(settings.METRICS_WORKER_PORT)
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    """Nettoie les métriques d'un processus enfant terminé"""
+    from core import metrics
+    metrics.mark_process_dead(pid or os.getpid())
@@ -47,10 +47,12 @@ INSTALLED_APPS = [
     'documents',
     'ocr',
     'api',
+    'webhooks',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -106,6 +108,71 @@ DATABASES = {
 #     }
 # }
 
+# Cache partagé (sessions, limitation de débit, clés d'API, réponses des
+# documents) : Redis si CACHE_URL est défini, sinon cache mémoire local
+# (un par processus : développement et tests)
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'ocrtool',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Sessions lues dans le cache, écrites aussi en base (survivent à un vidage du cache)
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Durée de cache des réponses de l'API pour les documents terminés (0 = désactivé)
+DOCUMENT_CACHE_TIMEOUT = config('DOCUMENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Compression des réponses de l'API (brotli si installé, sinon gzip)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_CONTENT_TYPES = ('application/json', 'text/plain')
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=5, cast=int)
+
+# Suivi des documents : statut groupé (nombre maximal d'ids) et attente
+# longue (délai maximal, lecture du signal en cache, relecture de la base)
+API_STATUS_MAX_IDS = config('API_STATUS_MAX_IDS', default=500, cast=int)
+API_WAIT_MAX_TIMEOUT = config('API_WAIT_MAX_TIMEOUT', default=30, cast=float)
+API_WAIT_POLL_INTERVAL = config('API_WAIT_POLL_INTERVAL', default=0.25, cast=float)
+API_WAIT_DB_INTERVAL = config('API_WAIT_DB_INTERVAL', default=5, cast=float)
+
+# Événements de progression (SSE, /api/v1/events/) : publiés par les
+# workers sur Redis (pub/sub), ou en mémoire sans Redis (un seul processus)
+EVENTS_ENABLED = config('EVENTS_ENABLED', default=True, cast=bool)
+EVENTS_REDIS_URL = config('EVENTS_REDIS_URL', default=CACHE_URL)
+EVENTS_BACKEND = config('EVENTS_BACKEND', default='redis' if EVENTS_REDIS_URL else 'memory')
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=15, cast=float)
+EVENTS_MAX_DURATION = config('EVENTS_MAX_DURATION', default=300, cast=float)
+EVENTS_RETRY_MS = config('EVENTS_RETRY_MS', default=3000, cast=int)
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=100, cast=int)
+# URL de base du service ASGI des événements (vide : même origine que la page)
+EVENTS_BASE_URL = config('EVENTS_BASE_URL', default='')
+
+# Webhooks de fin de traitement : file Celery dédiée, regroupement des
+# notifications par webhook (fenêtre en secondes, taille maximale d'un lot),
+# nouveaux essais avec backoff exponentiel
+WEBHOOKS_QUEUE = config('WEBHOOKS_QUEUE', default='webhooks')
+WEBHOOK_BATCH_WINDOW = config('WEBHOOK_BATCH_WINDOW', default=5, cast=float)
+WEBHOOK_BATCH_SIZE = config('WEBHOOK_BATCH_SIZE', default=50, cast=int)
+WEBHOOK_MAX_ATTEMPTS = config('WEBHOOK_MAX_ATTEMPTS', default=8, cast=int)
+WEBHOOK_RETRY_BACKOFF_BASE = config('WEBHOOK_RETRY_BACKOFF_BASE', default=30, cast=int)  # secondes
+WEBHOOK_RETRY_BACKOFF_MAX = config('WEBHOOK_RETRY_BACKOFF_MAX', default=3600, cast=int)  # secondes
+WEBHOOK_TIMEOUT = config('WEBHOOK_TIMEOUT', default=10, cast=float)
+# Connexions persistantes conservées par hôte et par worker
+WEBHOOK_POOL_SIZE = config('WEBHOOK_POOL_SIZE', default=4, cast=int)
+# Autorise les URL vers le réseau local (développement, tests)
+WEBHOOK_ALLOW_PRIVATE_URLS = config('WEBHOOK_ALLOW_PRIVATE_URLS', default=DEBUG, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -156,6 +223,7 @@ MEDIA_ROOT = config('MEDIA_ROOT', default=BASE_DIR / 'media')
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.APIKeyAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
@@ -183,16 +251,48 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Tesseract OCR Configuration
 TESSERACT_CMD = config('TESSERACT_CMD', default=None)  # Auto-détecté si None
 TESSERACT_LANGUAGES = config('TESSERACT_LANGUAGES', default='fra,eng', cast=Csv())
+# Niveaux de qualité de l'OCR adaptatif : répertoires de modèles (tessdata_fast,
+# tessdata_best ; vide : modèles installés) et options de segmentation
+TESSERACT_FAST_TESSDATA_DIR = config('TESSERACT_FAST_TESSDATA_DIR', default='')
+TESSERACT_BEST_TESSDATA_DIR = config('TESSERACT_BEST_TESSDATA_DIR', default='')
+TESSERACT_FAST_CONFIG = config('TESSERACT_FAST_CONFIG', default='--oem 1 --psm 6')
+TESSERACT_BEST_CONFIG = config('TESSERACT_BEST_CONFIG', default='--oem 1 --psm 3')
 
 # EasyOCR Configuration (optionnel)
 EASYOCR_ENABLED = config('EASYOCR_ENABLED', default=False, cast=bool)
 EASYOCR_LANGUAGES = config('EASYOCR_LANGUAGES', default='fr,en', cast=Csv())
 
+# Résolution de rendu des pages PDF pour l'OCR
+OCR_PDF_DPI = config('OCR_PDF_DPI', default=200, cast=int)
+
+# OCR adaptatif : passe rapide (image réduite, modèles rapides) pour chaque
+# page, passe précise (prétraitement poussé, PDF rendu en haute résolution,
+# meilleurs modèles) seulement si la confiance est sous le seuil
+OCR_ADAPTIVE_ENABLED = config('OCR_ADAPTIVE_ENABLED', default=True, cast=bool)
+OCR_ADAPTIVE_CONFIDENCE_THRESHOLD = config('OCR_ADAPTIVE_CONFIDENCE_THRESHOLD', default=80.0, cast=float)
+OCR_ADAPTIVE_FAST_MAX_SIDE = config('OCR_ADAPTIVE_FAST_MAX_SIDE', default=2000, cast=int)  # pixels
+OCR_ADAPTIVE_ESCALATION_DPI = config('OCR_ADAPTIVE_ESCALATION_DPI', default=300, cast=int)
+
+# OCR par zones (formulaires) : zones par document, zones lues en parallèle
+OCR_MAX_REGIONS = config('OCR_MAX_REGIONS', default=50, cast=int)
+OCR_REGION_WORKERS = config('OCR_REGION_WORKERS', default=4, cast=int)
+
+# Disposition des mots (boîtes et confiances) conservée pour le surlignage,
+# pages rendues par réponse de l'API layout
+OCR_WORD_LAYOUT_ENABLED = config('OCR_WORD_LAYOUT_ENABLED', default=True, cast=bool)
+API_LAYOUT_MAX_PAGES = config('API_LAYOUT_MAX_PAGES', default=10, cast=int)
+
 # Google Vision API Configuration (optionnel)
 GOOGLE_VISION_ENABLED = config('GOOGLE_VISION_ENABLED', default=False, cast=bool)
 GOOGLE_VISION_API_KEY = config('GOOGLE_VISION_API_KEY', default='')
 GOOGLE_VISION_PROJECT_ID = config('GOOGLE_VISION_PROJECT_ID', default='')
 
+# Moteur OCR simulé (benchmarks, tests de charge) : ne jamais activer en production
+OCR_FAKE_ENGINE_ENABLED = config('OCR_FAKE_ENGINE_ENABLED', default=False, cast=bool)
+OCR_FAKE_ENGINE_CPU_MS = config('OCR_FAKE_ENGINE_CPU_MS', default=50, cast=float)
+OCR_FAKE_ENGINE_CPU_MS_PER_MEGAPIXEL = config('OCR_FAKE_ENGINE_CPU_MS_PER_MEGAPIXEL', default=0, cast=float)
+OCR_FAKE_ENGINE_WORDS = config('OCR_FAKE_ENGINE_WORDS', default=200, cast=int)
+
 # ============================================
 # FILE UPLOAD CONFIGURATION
 # ============================================
@@ -207,6 +307,27 @@ ALLOWED_MIME_TYPES = config(
     cast=Csv()
 )
 
+# Uploads reprenables par morceaux (/api/v1/uploads/) : fichiers partiels
+# (répertoire partagé entre les processus web, vide : MEDIA_ROOT/uploads/partial),
+# taille maximale d'un morceau, expiration des sessions abandonnées
+# (secondes sans activité)
+UPLOAD_SESSION_DIR = config('UPLOAD_SESSION_DIR', default='')
+UPLOAD_CHUNK_MAX_SIZE = config('UPLOAD_CHUNK_MAX_SIZE', default=8 * 1024 * 1024, cast=int)  # 8MB
+UPLOAD_SESSION_TTL = config('UPLOAD_SESSION_TTL', default=24 * 3600, cast=int)
+
+# Envois directs vers un stockage objet compatible S3 (/api/v1/upload-intents/),
+# désactivés si OBJECT_STORE_ENDPOINT est vide. OBJECT_STORE_PUBLIC_ENDPOINT :
+# URL du stockage vue par les clients, si différente de celle du serveur.
+OBJECT_STORE_ENDPOINT = config('OBJECT_STORE_ENDPOINT', default='')
+OBJECT_STORE_PUBLIC_ENDPOINT = config('OBJECT_STORE_PUBLIC_ENDPOINT', default='')
+OBJECT_STORE_BUCKET = config('OBJECT_STORE_BUCKET', default='ocr-uploads')
+OBJECT_STORE_REGION = config('OBJECT_STORE_REGION', default='us-east-1')
+OBJECT_STORE_ACCESS_KEY = config('OBJECT_STORE_ACCESS_KEY', default='')
+OBJECT_STORE_SECRET_KEY = config('OBJECT_STORE_SECRET_KEY', default='')
+OBJECT_STORE_TIMEOUT = config('OBJECT_STORE_TIMEOUT', default=30, cast=float)
+# Validité de l'URL d'envoi présignée (secondes)
+UPLOAD_INTENT_TTL = config('UPLOAD_INTENT_TTL', default=3600, cast=int)
+
 # ============================================
 # SECURITY SETTINGS
 # ============================================
@@ -218,7 +339,17 @@ CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default='', cast=Csv())
 SESSION_COOKIE_SECURE = config('SESSION_COOKIE_SECURE', default=False, cast=bool)
 CSRF_COOKIE_SECURE = config('CSRF_COOKIE_SECURE', default=False, cast=bool)
 
-# Rate Limiting (optionnel)
+# Clés d'API : durée de cache de la recherche par préfixe (révocation et
+# suppression immédiates via l'invalidation ; l'utilisateur est relu à
+# chaque requête, sa désactivation est donc immédiate elle aussi)
+API_KEY_CACHE_TIMEOUT = config('API_KEY_CACHE_TIMEOUT', default=60, cast=int)
+
+# Intervalle minimal entre deux mises à jour de la date de dernière utilisation
+API_KEY_LAST_USED_INTERVAL = config('API_KEY_LAST_USED_INTERVAL', default=300, cast=int)
+
+# Rate Limiting de l'API (seau à jetons par utilisateur, dans le cache partagé) :
+# Soumissions OCR (upload, fin d'upload reprenable ou direct) : RATE_LIMIT_REQUESTS
+# en rafale, rechargées sur RATE_LIMIT_WINDOW (0 = désactivé)
 RATE_LIMIT_REQUESTS = config('RATE_LIMIT_REQUESTS', default=100, cast=int)
 RATE_LIMIT_WINDOW = config('RATE_LIMIT_WINDOW', default=3600, cast=int)  # 1 heure
 
@@ -226,6 +357,39 @@ RATE_LIMIT_WINDOW = config('RATE_LIMIT_WINDOW', default=3600, cast=int)  # 1 heu
 CLAMAV_ENABLED = config('CLAMAV_ENABLED', default=False, cast=bool)
 CLAMAV_SOCKET = config('CLAMAV_SOCKET', default='/var/run/clamav/clamd.ctl')
 
+# ============================================
+# MONITORING
+# ============================================
+
+# Export des métriques Prometheus (/metrics)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+
+# IPs autorisées à lire /metrics (vide = boucle locale uniquement)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='', cast=Csv())
+
+# Port d'export des métriques des workers Celery (0 = désactivé)
+METRICS_WORKER_PORT = config('METRICS_WORKER_PORT', default=9808, cast=int)
+
+# Profilage par échantillonnage (requêtes d'upload et tâches OCR)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+
+# Fraction des appels profilés (l'en-tête X-OCR-Profile et profile=True forcent le profilage)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.01, cast=float)
+
+# Intervalle d'échantillonnage de la pile (secondes)
+PROFILING_INTERVAL = config('PROFILING_INTERVAL', default=0.005, cast=float)
+
+# Répertoire des profils (format collapsed, pour flamegraph.pl ou speedscope)
+PROFILING_DIR = config('PROFILING_DIR', default=BASE_DIR / 'profiles')
+
+# Traçage de bout en bout (upload, file Celery, étapes OCR)
+TRACING_ENABLED = config('TRACING_ENABLED', default=False, cast=bool)
+
+# Exporteur des spans : file (JSON lines au format OTLP/JSON) ou memory (tests)
+TRACING_EXPORTER = config('TRACING_EXPORTER', default='file')
+TRACING_FILE = config('TRACING_FILE', default=BASE_DIR / 'traces' / 'spans.jsonl')
+TRACING_SERVICE_NAME = config('TRACING_SERVICE_NAME', default='img_to_txt_ocr')
+
 # ============================================
 # AUTHENTICATION SETTINGS
 # ============================================
@@ -263,3 +427,61 @@ CELERY_TASK_REJECT_ON_WORKER_LOST = True
 
 # Activation de Celery (peut être désactivé pour développement simple)
 CELERY_ENABLED = config('CELERY_ENABLED', default=True, cast=bool)
+
+# Files Celery (un pool de workers par file, voir docker-compose)
+OCR_INTERACTIVE_QUEUE = config('OCR_INTERACTIVE_QUEUE', default='ocr_interactive')
+OCR_BULK_QUEUE = config('OCR_BULK_QUEUE', default='ocr_bulk')
+
+# Coût estimé (mégapixels à traiter) au-delà duquel un document part en file bulk
+# ~30 MP = 8 pages A4 à 200 DPI ou une grande photo
+OCR_BULK_COST_THRESHOLD = config('OCR_BULK_COST_THRESHOLD', default=30.0, cast=float)
+
+# Nouveaux essais OCR (erreurs temporaires uniquement, voir ocr.exceptions)
+OCR_TASK_MAX_RETRIES = config('OCR_TASK_MAX_RETRIES', default=3, cast=int)
+OCR_RETRY_BACKOFF_BASE = config('OCR_RETRY_BACKOFF_BASE', default=10, cast=int)  # secondes
+OCR_RETRY_BACKOFF_MAX = config('OCR_RETRY_BACKOFF_MAX', default=600, cast=int)  # secondes
+
+# File des lettres mortes (erreurs permanentes, essais épuisés)
+OCR_DEAD_LETTER_QUEUE = config('OCR_DEAD_LETTER_QUEUE', default='ocr_dead_letter')
+
+# Bail d'un worker sur un document (renouvelé après chaque page)
+OCR_LEASE_TIMEOUT = config('OCR_LEASE_TIMEOUT', default=300, cast=int)  # secondes
+
+# Partage équitable : travail OCR en cours (en file ou en traitement) par utilisateur.
+# Au-delà, les nouveaux documents attendent la fin des précédents.
+OCR_FAIR_SHARE_ENABLED = config('OCR_FAIR_SHARE_ENABLED', default=True, cast=bool)
+OCR_USER_MAX_INFLIGHT_PAGES = config('OCR_USER_MAX_INFLIGHT_PAGES', default=200, cast=int)
+# ~250 pages A4 à 200 DPI
+OCR_USER_MAX_INFLIGHT_PIXELS = config('OCR_USER_MAX_INFLIGHT_PIXELS', default=1_000_000_000, cast=int)
+
+# Campagnes de retraitement : file basse priorité (worker dédié), débit par
+# défaut d'une campagne, documents en file au plus, délai après lequel un
+# document envoyé mais jamais traité (worker perdu) est renvoyé
+REPROCESSING_QUEUE = config('REPROCESSING_QUEUE', default='ocr_reprocessing')
+REPROCESSING_RATE_PER_MINUTE = config('REPROCESSING_RATE_PER_MINUTE', default=30, cast=int)
+REPROCESSING_MAX_INFLIGHT = config('REPROCESSING_MAX_INFLIGHT', default=20, cast=int)
+REPROCESSING_STALE_AFTER = config('REPROCESSING_STALE_AFTER', default=1800, cast=int)  # secondes
+
+# Tâches périodiques (Celery Beat)
+CELERY_BEAT_SCHEDULE = {
+    'requeue-stale-documents': {
+        'task': 'documents.requeue_stale_documents',
+        'schedule': 60.0,
+    },
+    'admit-deferred-documents': {
+        'task': 'documents.admit_deferred_documents',
+        'schedule': 60.0,
+    },
+    'dispatch-due-webhooks': {
+        'task': 'webhooks.dispatch_due_deliveries',
+        'schedule': 60.0,
+    },
+    'expire-upload-sessions': {
+        'task': 'api.expire_upload_sessions',
+        'schedule': 3600.0,
+    },
+    'dispatch-reprocessing': {
+        'task': 'documents.dispatch_reprocessing',
+        'schedule': 60.0,
+    },
+}
@@ -46,6 +46,7 @@ urlpatterns = [
     path('download-text/<int:document_id>/', views.download_text, name='download_text'),
     path('history/', views.document_history, name='document_history'),
     path('accounts/', include('django.contrib.auth.urls')),
+    path('metrics', views.metrics_view, name='metrics'),
     
     # API REST
     path('api/v1/', include('api.urls')),
@@ -1,5 +1,6 @@
 from .base_engine import BaseOCREngine
 from .tesseract_engine import TesseractEngine
+from .fake_engine import FakeOCREngine
 from .factory import OCREngineFactory
 
-__all__ = ['BaseOCREngine', 'TesseractEngine', 'OCREngineFactory']
+__all__ = ['BaseOCREngine', 'TesseractEngine', 'FakeOCREngine', 'OCREngineFactory']
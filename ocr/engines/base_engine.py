@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from PIL import Image, ImageOps
 
 
 class BaseOCREngine(ABC):
     """Interface de base pour les moteurs OCR"""
     
+    # Marge blanche autour d'une zone découpée (texte collé au bord mal lu)
+    REGION_PADDING = 10
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -26,15 +30,70 @@ class BaseOCREngine(ABC):
             image: Image PIL à traiter
             language: Code langue (ex: 'fra', 'eng')
             **kwargs: Options supplémentaires spécifiques au moteur
+                (quality : niveau de qualité 'fast' ou 'best' de l'OCR
+                adaptatif, single_line : zone d'une seule ligne ; ignorés
+                par les moteurs qui ne les gèrent pas)
             
         Returns:
             Dict avec les clés:
             - text: Texte extrait
             - confidence: Score de confiance (0-100)
             - language: Langue détectée/utilisée
+            - words (optionnel): Mots reconnus (text, bbox [left, top,
+              width, height] en pixels de l'image, confidence)
         """
         pass
     
+    def extract_regions(
+        self,
+        image: Image.Image,
+        regions: List[dict],
+        language: Optional[str] = None,
+        max_workers: int = 1,
+        **kwargs
+    ) -> Dict[str, Dict[str, any]]:
+        """
+        Extrait le texte de zones nommées d'une page
+        
+        Seules les zones découpées sont traitées par le moteur, en
+        parallèle si max_workers > 1 (threads : les moteurs externes comme
+        Tesseract s'exécutent hors de l'interpréteur).
+        
+        Args:
+            image: Page (image PIL)
+            regions: Zones normalisées (voir RegionValidator) : name, x, y,
+                width, height relatifs à la page, single_line
+            language: Code langue (ex: 'fra', 'eng')
+            max_workers: Zones traitées simultanément
+            **kwargs: Options transmises à extract_text
+        
+        Returns:
+            Dict {nom de la zone: résultat de extract_text}, dans l'ordre des zones
+        """
+        crops = [(region, self.crop_region(image, region)) for region in regions]
+        
+        def extract(item):
+            region, crop = item
+            result = self.extract_text(crop, language=language, single_line=region['single_line'], **kwargs)
+            return region['name'], result
+        
+        if max_workers > 1 and len(crops) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(crops))) as pool:
+                return dict(pool.map(extract, crops))
+        return dict(map(extract, crops))
+    
+    @classmethod
+    def crop_region(cls, image: Image.Image, region: dict) -> Image.Image:
+        """Découpe une zone (coordonnées relatives) avec une marge blanche"""
+        width, height = image.size
+        box = (
+            round(region['x'] * width),
+            round(region['y'] * height),
+            max(round((region['x'] + region['width']) * width), round(region['x'] * width) + 1),
+            max(round((region['y'] + region['height']) * height), round(region['y'] * height) + 1),
+        )
+        return ImageOps.expand(image.crop(box), border=cls.REGION_PADDING, fill='white')
+    
     @abstractmethod
     def is_available(self) -> bool:
         """Vérifie si le moteur est disponible"""
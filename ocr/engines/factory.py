@@ -2,6 +2,8 @@ from django.conf import settings
 from typing import Optional
 from .base_engine import BaseOCREngine
 from .tesseract_engine import TesseractEngine
+from .fake_engine import FakeOCREngine
+from ocr.exceptions import EngineUnavailableError, UnknownEngineError
 
 
 class OCREngineFactory:
@@ -12,6 +14,20 @@ class OCREngineFactory:
         # Ajouter d'autres moteurs ici (EasyOCR, etc.)
     }
     
+    # Moteurs enregistrés uniquement si activés dans les settings
+    _optional_engines = {
+        'fake': ('OCR_FAKE_ENGINE_ENABLED', FakeOCREngine),
+    }
+    
+    @classmethod
+    def _registry(cls) -> dict:
+        """Retourne les moteurs enregistrés (y compris les moteurs optionnels activés)"""
+        engines = dict(cls._engines)
+        for name, (setting, engine_class) in cls._optional_engines.items():
+            if getattr(settings, setting, False):
+                engines[name] = engine_class
+        return engines
+    
     @classmethod
     def get_engine(cls, engine_name: Optional[str] = None) -> BaseOCREngine:
         """
@@ -25,23 +41,25 @@ class OCREngineFactory:
             Instance du moteur OCR
         
         Raises:
-            ValueError: Si le moteur n'est pas disponible
+            UnknownEngineError: Si le moteur n'existe pas
+            EngineUnavailableError: Si le moteur n'est pas disponible sur ce système
         """
         if engine_name is None:
             # Utilise le moteur par défaut (tesseract)
             engine_name = 'tesseract'
         
         engine_name = engine_name.lower()
+        engines = cls._registry()
         
-        if engine_name not in cls._engines:
-            available = ', '.join(cls._engines.keys())
-            raise ValueError(f"Moteur '{engine_name}' non disponible. Moteurs disponibles: {available}")
+        if engine_name not in engines:
+            available = ', '.join(engines.keys())
+            raise UnknownEngineError(f"Moteur '{engine_name}' non disponible. Moteurs disponibles: {available}")
         
-        engine_class = cls._engines[engine_name]
+        engine_class = engines[engine_name]
         engine = engine_class()
         
         if not engine.is_available():
-            raise RuntimeError(f"Le moteur '{engine_name}' n'est pas disponible sur ce système")
+            raise EngineUnavailableError(f"Le moteur '{engine_name}' n'est pas disponible sur ce système")
         
         return engine
     
@@ -54,7 +72,7 @@ class OCREngineFactory:
     def get_available_engines(cls) -> list:
         """Retourne la liste des moteurs disponibles"""
         available = []
-        for name, engine_class in cls._engines.items():
+        for name, engine_class in cls._registry().items():
             try:
                 engine = engine_class()
                 if engine.is_available():
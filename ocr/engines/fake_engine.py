@@ -0,0 +1,85 @@
+import hashlib
+import random
+import time
+from typing import Dict, Optional
+from PIL import Image
+from django.conf import settings
+from .base_engine import BaseOCREngine
+
+
+class FakeOCREngine(BaseOCREngine):
+    """
+    Moteur OCR simulé pour les benchmarks et tests de charge
+    
+    Retourne un texte déterministe (dérivé du contenu de l'image) après un
+    coût CPU simulé configurable : les mesures isolent le coût de Django,
+    DRF, de l'ORM, du stockage et de Celery. Activé uniquement avec
+    OCR_FAKE_ENGINE_ENABLED.
+    """
+    
+    WORDS = (
+        'facture', 'total', 'montant', 'client', 'adresse', 'date', 'article',
+        'quantité', 'prix', 'remise', 'livraison', 'paiement', 'contrat', 'page',
+    )
+    
+    # Côté de la vignette hachée (le hachage ne dépend pas de la taille de l'image)
+    THUMBNAIL_SIZE = 32
+    
+    def __init__(self):
+        """Initialise le moteur simulé"""
+        self.cpu_ms = getattr(settings, 'OCR_FAKE_ENGINE_CPU_MS', 50)
+        self.cpu_ms_per_megapixel = getattr(settings, 'OCR_FAKE_ENGINE_CPU_MS_PER_MEGAPIXEL', 0)
+        self.words_count = getattr(settings, 'OCR_FAKE_ENGINE_WORDS', 200)
+    
+    @property
+    def name(self) -> str:
+        """Nom du moteur"""
+        return 'fake'
+    
+    def is_available(self) -> bool:
+        """Disponible uniquement si activé dans les settings"""
+        return getattr(settings, 'OCR_FAKE_ENGINE_ENABLED', False)
+    
+    def get_supported_languages(self) -> list:
+        """Retourne la liste des langues supportées"""
+        return ['fra', 'eng']
+    
+    def extract_text(
+        self,
+        image: Image.Image,
+        language: Optional[str] = None,
+        **kwargs
+    ) -> Dict[str, any]:
+        """
+        Simule l'extraction du texte d'une image
+        
+        Args:
+            image: Image PIL à traiter
+            language: Code langue (ex: 'fra', 'eng')
+            **kwargs: Options supplémentaires (ignorées)
+            
+        Returns:
+            Dict avec text, confidence, language
+        """
+        thumbnail = image.convert('L').resize((self.THUMBNAIL_SIZE, self.THUMBNAIL_SIZE))
+        digest = hashlib.sha256(thumbnail.tobytes()).digest()
+        
+        megapixels = image.width * image.height / 1_000_000
+        self._burn_cpu(self.cpu_ms + self.cpu_ms_per_megapixel * megapixels)
+        
+        rng = random.Random(digest)
+        words = [rng.choice(self.WORDS) for _ in range(self.words_count)]
+        lines = [' '.join(words[i:i + 10]) for i in range(0, len(words), 10)]
+        
+        return {
+            'text': '\n'.join(lines),
+            'confidence': round(80 + digest[0] / 255 * 19, 2),
+            'language': language or 'fra',
+        }
+    
+    @staticmethod
+    def _burn_cpu(milliseconds: float):
+        """Occupe le CPU (et non un simple sleep) pendant la durée donnée"""
+        deadline = time.perf_counter() + milliseconds / 1000
+        while time.perf_counter() < deadline:
+            pass
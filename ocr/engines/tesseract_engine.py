@@ -3,6 +3,13 @@ from typing import Dict, Optional
 from PIL import Image
 from django.conf import settings
 from .base_engine import BaseOCREngine
+from ocr.exceptions import (
+    DocumentLoadError,
+    EngineUnavailableError,
+    OCREngineError,
+    OCRTimeoutError,
+    UnsupportedLanguageError,
+)
 
 
 class TesseractEngine(BaseOCREngine):
@@ -21,6 +28,9 @@ class TesseractEngine(BaseOCREngine):
     # Langues supportées par défaut
     DEFAULT_LANGUAGES = ['fra', 'eng']
     
+    # Niveaux de qualité (OCR adaptatif) : modèles (tessdata) et segmentation
+    QUALITIES = ('fast', 'best')
+    
     def __init__(self):
         """Initialise le moteur Tesseract"""
         self._tesseract_cmd = getattr(settings, 'TESSERACT_CMD', None)
@@ -68,6 +78,38 @@ class TesseractEngine(BaseOCREngine):
         
         return language
     
+    def _quality_config(self, quality: Optional[str]) -> str:
+        """
+        Configuration Tesseract d'un niveau de qualité
+        
+        fast : modèles rapides (tessdata_fast) et segmentation restreinte ;
+        best : modèles les plus précis (tessdata_best) et segmentation
+        automatique. Sans répertoire de modèles configuré, les modèles
+        installés par défaut sont utilisés.
+        """
+        if quality not in self.QUALITIES:
+            return ''
+        prefix = 'TESSERACT_FAST' if quality == 'fast' else 'TESSERACT_BEST'
+        config = getattr(settings, f'{prefix}_CONFIG', '')
+        tessdata_dir = getattr(settings, f'{prefix}_TESSDATA_DIR', '')
+        if tessdata_dir:
+            config = f'--tessdata-dir "{tessdata_dir}" {config}'
+        return config.strip()
+    
+    def _words(self, data: dict) -> list:
+        """Mots reconnus (niveau 5 de image_to_data) avec boîte et confiance"""
+        words = []
+        for index, text in enumerate(data['text']):
+            confidence = float(data['conf'][index])
+            if data['level'][index] != 5 or confidence < 0 or not text.strip():
+                continue
+            words.append({
+                'text': text.strip(),
+                'bbox': [data['left'][index], data['top'][index], data['width'][index], data['height'][index]],
+                'confidence': confidence,
+            })
+        return words
+    
     def extract_text(
         self,
         image: Image.Image,
@@ -80,26 +122,33 @@ class TesseractEngine(BaseOCREngine):
         Args:
             image: Image PIL à traiter
             language: Code langue (ex: 'fra', 'eng')
-            **kwargs: Options supplémentaires
+            **kwargs: Options supplémentaires (config : options Tesseract,
+                quality : niveau de qualité 'fast' ou 'best', single_line :
+                zone d'une seule ligne)
             
         Returns:
-            Dict avec text, confidence, language
+            Dict avec text, confidence, language, words
         """
         if not self.is_available():
-            raise RuntimeError("Tesseract n'est pas disponible sur ce système")
+            raise EngineUnavailableError("Tesseract n'est pas disponible sur ce système")
         
         # Normalise la langue
         tesseract_lang = self._normalize_language(language)
         
         # Configuration Tesseract
-        config = kwargs.get('config', '')
+        config = kwargs.get('config', '') or self._quality_config(kwargs.get('quality'))
+        if kwargs.get('single_line') and '--psm' not in config:
+            # Zone d'une seule ligne (champ de formulaire)
+            config = f'{config} --psm 7'.strip()
         
         try:
             # Extraction du texte
             text = pytesseract.image_to_string(image, lang=tesseract_lang, config=config)
             
-            # Extraction des données avec confiance
-            data = pytesseract.image_to_data(image, lang=tesseract_lang, output_type=pytesseract.Output.DICT)
+            # Extraction des données avec confiance (même configuration que le texte)
+            data = pytesseract.image_to_data(
+                image, lang=tesseract_lang, config=config, output_type=pytesseract.Output.DICT
+            )
             
             # Calcul de la confiance moyenne
             confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
@@ -109,6 +158,28 @@ class TesseractEngine(BaseOCREngine):
                 'text': text.strip(),
                 'confidence': round(avg_confidence, 2),
                 'language': tesseract_lang,
+                'words': self._words(data),
             }
+        except pytesseract.TesseractError as e:
+            # Langue non installée : inutile de réessayer
+            if 'Failed loading language' in str(e):
+                raise UnsupportedLanguageError(f"Langue '{tesseract_lang}' non installée pour Tesseract")
+            raise OCREngineError(f"Erreur lors de l'extraction OCR: {str(e)}")
+        except pytesseract.TesseractNotFoundError as e:
+            raise EngineUnavailableError(f"Tesseract n'est pas disponible sur ce système: {str(e)}")
+        except RuntimeError as e:
+            # pytesseract lève RuntimeError en cas de timeout du processus
+            if 'timeout' in str(e).lower():
+                raise OCRTimeoutError(f"Délai dépassé lors de l'extraction OCR: {str(e)}")
+            raise OCREngineError(f"Erreur lors de l'extraction OCR: {str(e)}")
+        except OSError as e:
+            # Erreur système au lancement du processus (mémoire, processus,
+            # permissions) : temporaire ; sans errno, image refusée par PIL
+            if e.errno is not None:
+                raise EngineUnavailableError(f"Impossible de lancer Tesseract: {str(e)}")
+            raise DocumentLoadError(f"Image illisible pour l'OCR: {str(e)}")
+        except (ValueError, TypeError) as e:
+            # Image corrompue ou non prise en charge : inutile de réessayer
+            raise DocumentLoadError(f"Image illisible pour l'OCR: {str(e)}")
         except Exception as e:
-            raise RuntimeError(f"Erreur lors de l'extraction OCR: {str(e)}")
+            raise OCREngineError(f"Erreur lors de l'extraction OCR: {str(e)}")
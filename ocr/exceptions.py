@@ -0,0 +1,86 @@
+# Taxonomie des erreurs du pipeline OCR
+from django.db import InterfaceError, OperationalError
+
+
+class OCRError(Exception):
+    """Erreur de base du pipeline OCR"""
+
+    # Code stable utilisé pour les statistiques et le document en échec
+    code = 'ocr_error'
+
+
+class TransientOCRError(OCRError):
+    """Erreur temporaire : un nouvel essai peut réussir"""
+    code = 'transient_error'
+
+
+class PermanentOCRError(OCRError):
+    """Erreur déterministe : un nouvel essai échouera de la même manière"""
+    code = 'permanent_error'
+
+
+class FileValidationError(PermanentOCRError, ValueError):
+    """Fichier refusé par la validation (taille, type, extension)"""
+    code = 'invalid_file'
+
+
+class DocumentLoadError(PermanentOCRError, ValueError):
+    """Fichier corrompu ou illisible (PDF, image)"""
+    code = 'document_load_error'
+
+
+class UnsupportedLanguageError(PermanentOCRError, ValueError):
+    """Langue non installée pour le moteur OCR"""
+    code = 'unsupported_language'
+
+
+class UnknownEngineError(PermanentOCRError, ValueError):
+    """Moteur OCR inconnu"""
+    code = 'unknown_engine'
+
+
+class OCREngineError(PermanentOCRError, RuntimeError):
+    """Le moteur OCR a rejeté l'image"""
+    code = 'engine_error'
+
+
+class EngineUnavailableError(TransientOCRError, RuntimeError):
+    """Moteur OCR ou dépendance système indisponible sur ce worker"""
+    code = 'engine_unavailable'
+
+
+class OCRTimeoutError(TransientOCRError, RuntimeError):
+    """Le moteur OCR ou le rendu PDF a dépassé son délai"""
+    code = 'ocr_timeout'
+
+
+class DocumentLeaseLostError(OCRError):
+    """Le bail du document a expiré et un autre worker l'a repris"""
+    code = 'lease_lost'
+
+
+# Erreurs hors pipeline considérées comme temporaires
+TRANSIENT_EXCEPTIONS = (OperationalError, InterfaceError, ConnectionError, TimeoutError)
+
+
+def is_transient_error(exc: Exception) -> bool:
+    """
+    Indique si une erreur justifie un nouvel essai
+
+    Les erreurs inconnues sont considérées comme temporaires : le nombre
+    d'essais reste borné par la tâche.
+    """
+    if isinstance(exc, TransientOCRError):
+        return True
+    if isinstance(exc, PermanentOCRError):
+        return False
+    if isinstance(exc, TRANSIENT_EXCEPTIONS):
+        return True
+    return not isinstance(exc, (ValueError, TypeError, LookupError))
+
+
+def get_error_code(exc: Exception) -> str:
+    """Retourne le code d'erreur stable d'une exception"""
+    if isinstance(exc, OCRError):
+        return exc.code
+    return type(exc).__name__
@@ -0,0 +1,169 @@
+"""
+Disposition des mots reconnus (boîtes englobantes et confiances)
+
+Format binaire en colonnes, bien plus compact que du JSON : les
+coordonnées, confiances et fins de mots sont des tableaux (array) de
+taille fixe, le texte des mots est concaténé en UTF-8. Une table des
+pages donne la plage de mots de chaque page : une page est lue sans
+décoder les autres.
+
+Disposition (petit-boutiste) :
+    en-tête   : magic, version, type des coordonnées, pages, mots
+    pages     : numéro, largeur, hauteur, premier mot, nombre de mots
+    colonnes  : left, top, width, height, confidence, fin du texte
+    texte     : mots concaténés (UTF-8)
+"""
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, List
+
+
+class WordLayout:
+    """Lecture et écriture de la disposition des mots d'un document"""
+    
+    MAGIC = b'OCRW'
+    VERSION = 1
+    HEADER = struct.Struct('<4sBcII')
+    PAGE = struct.Struct('<IIIII')
+    BOX_COLUMNS = ('left', 'top', 'width', 'height')
+    
+    def __init__(self, data: bytes):
+        """
+        Lit l'en-tête et la table des pages (les mots sont décodés à la demande)
+        
+        Args:
+            data: Disposition encodée (bytes, memoryview)
+        
+        Raises:
+            ValueError: Données invalides
+        """
+        self._data = memoryview(data)
+        try:
+            magic, version, typecode, pages_count, self.word_count = self.HEADER.unpack_from(self._data)
+        except struct.error:
+            raise ValueError("Disposition des mots invalide")
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("Disposition des mots invalide")
+        
+        self._box_typecode = typecode.decode()
+        offset = self.HEADER.size
+        self.pages = {}
+        for _ in range(pages_count):
+            page_number, width, height, first, count = self.PAGE.unpack_from(self._data, offset)
+            self.pages[page_number] = {'width': width, 'height': height, 'first': first, 'count': count}
+            offset += self.PAGE.size
+        
+        # Début de chaque colonne
+        box_size = array(self._box_typecode).itemsize * self.word_count
+        self._columns = {}
+        for name in self.BOX_COLUMNS:
+            self._columns[name] = offset
+            offset += box_size
+        self._columns['confidence'] = offset
+        offset += self.word_count
+        self._columns['text_end'] = offset
+        offset += 4 * self.word_count
+        self._text_offset = offset
+    
+    @property
+    def page_numbers(self) -> List[int]:
+        """Numéros des pages, dans l'ordre"""
+        return sorted(self.pages)
+    
+    def page(self, page_number: int) -> Dict:
+        """
+        Décode les mots d'une page
+        
+        Args:
+            page_number: Numéro de la page
+        
+        Returns:
+            Dict (page_number, width, height, words : text, bbox
+            [left, top, width, height], confidence)
+        
+        Raises:
+            KeyError: Page absente de la disposition
+        """
+        page = self.pages[page_number]
+        first, count = page['first'], page['count']
+        columns = {
+            name: self._read(self._box_typecode, self._columns[name], first, count)
+            for name in self.BOX_COLUMNS
+        }
+        confidences = self._read('B', self._columns['confidence'], first, count)
+        # Fin du mot précédent : début du texte du premier mot de la page
+        if first:
+            ends = self._read('I', self._columns['text_end'], first - 1, count + 1)
+        else:
+            ends = array('I', [0]) + self._read('I', self._columns['text_end'], 0, count)
+        text = bytes(self._data[self._text_offset + ends[0]:self._text_offset + ends[-1]])
+        
+        words = []
+        for index in range(count):
+            start, end = ends[index] - ends[0], ends[index + 1] - ends[0]
+            words.append({
+                'text': text[start:end].decode('utf-8'),
+                'bbox': [columns[name][index] for name in self.BOX_COLUMNS],
+                'confidence': confidences[index],
+            })
+        return {'page_number': page_number, 'width': page['width'], 'height': page['height'], 'words': words}
+    
+    def _read(self, typecode: str, column_offset: int, first: int, count: int) -> array:
+        """Lit count valeurs d'une colonne à partir du mot first"""
+        values = array(typecode)
+        start = column_offset + first * values.itemsize
+        values.frombytes(self._data[start:start + count * values.itemsize])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        return values
+    
+    @classmethod
+    def encode(cls, pages: Iterable[Dict]) -> bytes:
+        """
+        Encode la disposition des mots de plusieurs pages
+        
+        Args:
+            pages: Dicts (page_number, width, height, words : text, bbox
+                [left, top, width, height] en pixels, confidence 0 à 100)
+        
+        Returns:
+            Disposition encodée
+        """
+        pages = sorted(pages, key=lambda page: page['page_number'])
+        words = [word for page in pages for word in page['words']]
+        largest = max([value for word in words for value in word['bbox']] + [0])
+        # Coordonnées sur 2 octets, 4 pour les très grandes images
+        typecode = 'H' if largest < 2 ** 16 else 'I'
+        
+        page_table = []
+        first = 0
+        for page in pages:
+            page_table.append(cls.PAGE.pack(
+                page['page_number'], page['width'], page['height'], first, len(page['words'])
+            ))
+            first += len(page['words'])
+        
+        columns = [array(typecode, (max(int(word['bbox'][index]), 0) for word in words)) for index in range(4)]
+        columns.append(array('B', (min(max(round(word['confidence']), 0), 100) for word in words)))
+        text = bytearray()
+        text_end = array('I')
+        for word in words:
+            text += word['text'].encode('utf-8')
+            text_end.append(len(text))
+        columns.append(text_end)
+        if sys.byteorder == 'big':
+            for column in columns:
+                column.byteswap()
+        
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, typecode.encode(), len(pages), len(words))
+        return b''.join([header, *page_table, *(column.tobytes() for column in columns), bytes(text)])
+    
+    @classmethod
+    def merge(cls, layouts: Iterable[bytes]) -> bytes:
+        """Fusionne des dispositions encodées (pages distinctes)"""
+        pages = []
+        for data in layouts:
+            layout = cls(data)
+            pages.extend(layout.page(page_number) for page_number in layout.page_numbers)
+        return cls.encode(pages)
@@ -1 +1,4 @@
 # Processeurs pour le pré et post-traitement
+from .image_processor import ImageProcessor
+
+__all__ = ['ImageProcessor']
@@ -0,0 +1,68 @@
+from PIL import Image, ImageFilter, ImageOps
+
+
+class ImageProcessor:
+    """Prétraitement des images avant OCR"""
+    
+    # Modes gérés directement par les moteurs OCR
+    NATIVE_MODES = ('RGB', 'L')
+    
+    def prepare(self, image: Image.Image) -> Image.Image:
+        """
+        Normalise le mode de l'image pour le moteur OCR
+        
+        Les images transparentes sont aplaties sur fond blanc (un texte noir
+        sur fond transparent deviendrait illisible sur fond noir).
+        
+        Args:
+            image: Image PIL
+        
+        Returns:
+            Image PIL en mode RGB ou L
+        """
+        if image.mode in self.NATIVE_MODES:
+            return image
+        
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            rgba = image.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.split()[-1])
+            return background
+        
+        return image.convert('RGB')
+    
+    def downscale(self, image: Image.Image, max_side: int) -> Image.Image:
+        """
+        Réduit l'image pour la passe OCR rapide
+        
+        Args:
+            image: Image PIL
+            max_side: Plus grand côté autorisé (pixels, 0 : pas de réduction)
+        
+        Returns:
+            Image réduite, ou l'image d'origine si elle est assez petite
+        """
+        if not max_side or max(image.size) <= max_side:
+            return image
+        ratio = max_side / max(image.size)
+        size = (max(round(image.width * ratio), 1), max(round(image.height * ratio), 1))
+        # reducing_gap : réduction entière rapide avant le rééchantillonnage
+        return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    
+    def enhance(self, image: Image.Image) -> Image.Image:
+        """
+        Prétraitement poussé des pages difficiles (passe OCR précise)
+        
+        Niveaux de gris, débruitage (filtre médian), contraste étiré et
+        accentuation des contours des caractères.
+        
+        Args:
+            image: Image PIL en mode RGB ou L
+        
+        Returns:
+            Image PIL en mode L
+        """
+        gray = ImageOps.grayscale(image) if image.mode != 'L' else image
+        gray = gray.filter(ImageFilter.MedianFilter(3))
+        gray = ImageOps.autocontrast(gray, cutoff=1)
+        return gray.filter(ImageFilter.SHARPEN)
@@ -1,3 +1,280 @@
-from django.test import TestCase
+"""
+Tests pour l'app ocr
+"""
+import errno
+import json
+import time
+import pytesseract
+from django.test import TestCase, override_settings
+from django.db import OperationalError
+from unittest.mock import patch
+from PIL import Image
+from ocr.processors.image_processor import ImageProcessor
+from ocr.engines.factory import OCREngineFactory
+from ocr.engines.fake_engine import FakeOCREngine
+from ocr.engines.tesseract_engine import TesseractEngine
+from ocr.engines.base_engine import BaseOCREngine
+from ocr.validators.region_validator import RegionValidator
+from ocr.layout import WordLayout
+from ocr.exceptions import (
+    DocumentLoadError,
+    EngineUnavailableError,
+    OCREngineError,
+    UnknownEngineError,
+    get_error_code,
+    is_transient_error,
+)
 
-# Create your tests here.
+
+class OCRErrorTaxonomyTest(TestCase):
+    """Tests pour la classification des erreurs OCR"""
+    
+    def test_permanent_errors_are_not_transient(self):
+        """Test que les erreurs déterministes ne sont pas réessayées"""
+        self.assertFalse(is_transient_error(DocumentLoadError("PDF corrompu")))
+        self.assertFalse(is_transient_error(UnknownEngineError("moteur inconnu")))
+        self.assertFalse(is_transient_error(ValueError("valeur invalide")))
+    
+    def test_transient_errors(self):
+        """Test que les erreurs temporaires sont réessayées"""
+        self.assertTrue(is_transient_error(EngineUnavailableError("tesseract absent")))
+        self.assertTrue(is_transient_error(OperationalError("connexion perdue")))
+        self.assertTrue(is_transient_error(ConnectionError()))
+    
+    def test_error_codes(self):
+        """Test les codes d'erreur stables"""
+        self.assertEqual(get_error_code(DocumentLoadError()), 'document_load_error')
+        self.assertEqual(get_error_code(KeyError()), 'KeyError')
+    
+    def test_typed_errors_keep_builtin_bases(self):
+        """Test la compatibilité avec les appelants qui attrapent ValueError/RuntimeError"""
+        self.assertIsInstance(DocumentLoadError(), ValueError)
+        self.assertIsInstance(EngineUnavailableError(), RuntimeError)
+    
+    def test_factory_unknown_engine(self):
+        """Test que la factory lève une erreur permanente pour un moteur inconnu"""
+        with self.assertRaises(UnknownEngineError):
+            OCREngineFactory.get_engine('inexistant')
+
+
+class ImageProcessorTest(TestCase):
+    """Tests pour le prétraitement des images"""
+    
+    def test_transparent_image_is_flattened_on_white(self):
+        """Test que la transparence est aplatie sur fond blanc"""
+        image = Image.new('RGBA', (4, 4), (0, 0, 0, 0))
+        
+        prepared = ImageProcessor().prepare(image)
+        
+        self.assertEqual(prepared.mode, 'RGB')
+        self.assertEqual(prepared.getpixel((0, 0)), (255, 255, 255))
+    
+    def test_native_modes_are_unchanged(self):
+        """Test que les images RGB/L ne sont pas copiées"""
+        image = Image.new('L', (4, 4))
+        self.assertIs(ImageProcessor().prepare(image), image)
+    
+    def test_downscale_keeps_aspect_ratio(self):
+        """Test que seules les grandes images sont réduites pour la passe rapide"""
+        processor = ImageProcessor()
+        small = Image.new('RGB', (100, 50))
+        self.assertIs(processor.downscale(small, 200), small)
+        self.assertEqual(processor.downscale(Image.new('RGB', (4000, 1000)), 2000).size, (2000, 500))
+    
+    def test_enhance_returns_grayscale(self):
+        """Test que le prétraitement poussé produit une image en niveaux de gris"""
+        enhanced = ImageProcessor().enhance(Image.new('RGB', (20, 20), color=(120, 130, 140)))
+        self.assertEqual(enhanced.mode, 'L')
+        self.assertEqual(enhanced.size, (20, 20))
+
+
+class TesseractQualityConfigTest(TestCase):
+    """Tests pour les niveaux de qualité de Tesseract (OCR adaptatif)"""
+    
+    @override_settings(TESSERACT_FAST_CONFIG='--oem 1 --psm 6', TESSERACT_FAST_TESSDATA_DIR='/models/fast',
+                       TESSERACT_BEST_CONFIG='--oem 1 --psm 3', TESSERACT_BEST_TESSDATA_DIR='')
+    def test_quality_config(self):
+        """Test la configuration des passes rapide et précise"""
+        engine = TesseractEngine()
+        self.assertEqual(engine._quality_config('fast'), '--tessdata-dir "/models/fast" --oem 1 --psm 6')
+        self.assertEqual(engine._quality_config('best'), '--oem 1 --psm 3')
+        self.assertEqual(engine._quality_config(None), '')
+
+
+class TesseractErrorMappingTest(TestCase):
+    """Tests pour la classification des erreurs de Tesseract"""
+    
+    def _extract(self, error):
+        engine = TesseractEngine()
+        with patch.object(TesseractEngine, 'is_available', return_value=True), \
+                patch('ocr.engines.tesseract_engine.pytesseract.image_to_string', side_effect=error):
+            engine.extract_text(Image.new('RGB', (4, 4)))
+    
+    def test_unreadable_image_is_permanent(self):
+        """Test qu'une image refusée (ValueError, erreur PIL) n'est pas réessayée"""
+        for error in (ValueError("mode d'image non pris en charge"), TypeError("image invalide"),
+                      OSError("image file is truncated")):
+            with self.assertRaises(DocumentLoadError) as context:
+                self._extract(error)
+            self.assertFalse(is_transient_error(context.exception))
+            self.assertEqual(get_error_code(context.exception), 'document_load_error')
+    
+    def test_unexpected_errors_are_permanent(self):
+        """Test qu'une erreur inattendue du moteur n'est pas prise pour une indisponibilité"""
+        for error in (RuntimeError("sortie inattendue"), KeyError('conf')):
+            with self.assertRaises(OCREngineError) as context:
+                self._extract(error)
+            self.assertFalse(is_transient_error(context.exception))
+    
+    def test_missing_binary_and_process_errors_are_transient(self):
+        """Test que l'absence du binaire ou l'échec du lancement est réessayé"""
+        for error in (pytesseract.TesseractNotFoundError(), OSError(errno.ENOMEM, "Cannot allocate memory")):
+            with self.assertRaises(EngineUnavailableError):
+                self._extract(error)
+
+
+class RegionValidatorTest(TestCase):
+    """Tests pour la validation des zones OCR (formulaires)"""
+    
+    def test_normalize_regions(self):
+        """Test les valeurs par défaut et la tolérance d'arrondi des coordonnées"""
+        regions = RegionValidator().normalize([
+            {'name': ' total ', 'x': '0.1', 'y': 0.5, 'width': 0.9, 'height': 0.5, 'single_line': True},
+            {'name': 'date', 'page': 2, 'x': 0, 'y': 0, 'width': 1, 'height': 1},
+        ])
+        self.assertEqual(regions[0], {
+            'name': 'total', 'page': 1, 'x': 0.1, 'y': 0.5, 'width': 0.9, 'height': 0.5, 'single_line': True,
+        })
+        self.assertEqual(regions[1]['page'], 2)
+        self.assertFalse(regions[1]['single_line'])
+    
+    @override_settings(OCR_MAX_REGIONS=2)
+    def test_invalid_regions_are_rejected(self):
+        """Test le refus des zones mal formées, en double, hors page ou trop nombreuses"""
+        box = {'x': 0, 'y': 0, 'width': 0.5, 'height': 0.5}
+        invalid = [
+            [],
+            {'name': 'total'},
+            [{'name': '', **box}],
+            [{'name': 'total', **box}, {'name': 'total', **box}],
+            [{'name': 'total', 'page': 0, **box}],
+            [{'name': 'total', 'x': 0.6, 'y': 0, 'width': 0.5, 'height': 0.5}],
+            [{'name': 'total', 'x': 0, 'y': 0, 'width': 0, 'height': 0.5}],
+            [{'name': 'total', 'x': 0, 'y': 0}],
+            [{'name': f'zone {index}', **box} for index in range(3)],
+        ]
+        for regions in invalid:
+            with self.assertRaises(ValueError, msg=regions):
+                RegionValidator().normalize(regions)
+    
+    def test_crop_region_pads_the_crop(self):
+        """Test le découpage d'une zone en pixels, avec la marge blanche"""
+        image = Image.new('RGB', (200, 100), color='black')
+        crop = BaseOCREngine.crop_region(image, {'x': 0.25, 'y': 0.5, 'width': 0.5, 'height': 0.2})
+        padding = BaseOCREngine.REGION_PADDING
+        self.assertEqual(crop.size, (100 + 2 * padding, 20 + 2 * padding))
+        self.assertEqual(crop.getpixel((0, 0)), (255, 255, 255))
+        self.assertEqual(crop.getpixel((padding, padding)), (0, 0, 0))
+
+
+class WordLayoutTest(TestCase):
+    """Tests pour le format binaire de disposition des mots"""
+    
+    def _pages(self):
+        return [
+            {'page_number': 2, 'width': 800, 'height': 600, 'words': [
+                {'text': 'Total', 'bbox': [10, 500, 60, 20], 'confidence': 91.6},
+                {'text': '42,00 €', 'bbox': [700, 500, 80, 20], 'confidence': 88.0},
+            ]},
+            {'page_number': 1, 'width': 800, 'height': 600, 'words': [
+                {'text': 'Facture', 'bbox': [10, 10, 120, 30], 'confidence': 96.0},
+            ]},
+            {'page_number': 3, 'width': 800, 'height': 600, 'words': []},
+        ]
+    
+    def test_pages_are_decoded_independently(self):
+        """Test l'aller-retour page par page (texte UTF-8, confiances arrondies)"""
+        layout = WordLayout(WordLayout.encode(self._pages()))
+        
+        self.assertEqual(layout.page_numbers, [1, 2, 3])
+        self.assertEqual(layout.word_count, 3)
+        self.assertEqual(layout.page(2), {'page_number': 2, 'width': 800, 'height': 600, 'words': [
+            {'text': 'Total', 'bbox': [10, 500, 60, 20], 'confidence': 92},
+            {'text': '42,00 €', 'bbox': [700, 500, 80, 20], 'confidence': 88},
+        ]})
+        self.assertEqual(layout.page(1)['words'][0]['text'], 'Facture')
+        self.assertEqual(layout.page(3)['words'], [])
+        with self.assertRaises(KeyError):
+            layout.page(4)
+    
+    def test_merge_and_large_coordinates(self):
+        """Test la fusion de pages encodées séparément et les coordonnées sur 4 octets"""
+        pages = self._pages()
+        pages[2]['words'] = [{'text': 'poster', 'bbox': [70000, 0, 10, 10], 'confidence': 50}]
+        layout = WordLayout(WordLayout.merge(WordLayout.encode([page]) for page in pages))
+        
+        self.assertEqual(layout.page_numbers, [1, 2, 3])
+        self.assertEqual(layout.page(3)['words'][0]['bbox'], [70000, 0, 10, 10])
+        self.assertEqual(layout.page(2)['words'][1]['text'], '42,00 €')
+    
+    def test_layout_is_smaller_than_json(self):
+        """Test que le format binaire est bien plus compact que le JSON"""
+        words = [
+            {'text': f'mot{index}', 'bbox': [index % 2000, index // 10, 40, 18], 'confidence': 90}
+            for index in range(1000)
+        ]
+        pages = [{'page_number': 1, 'width': 2480, 'height': 3508, 'words': words}]
+        self.assertLess(len(WordLayout.encode(pages)) * 3, len(json.dumps(pages)))
+    
+    def test_invalid_layout(self):
+        """Test le refus de données qui ne sont pas une disposition"""
+        for data in (b'', b'{"words": []}'):
+            with self.assertRaises(ValueError):
+                WordLayout(data)
+    
+    def test_tesseract_words(self):
+        """Test la sélection des mots de image_to_data (niveau 5, confiance connue)"""
+        data = {
+            'level': [1, 5, 5, 5],
+            'text': ['', 'Total', ' ', '42'],
+            'conf': ['-1', '91.5', '95', '-1'],
+            'left': [0, 10, 80, 120],
+            'top': [0, 20, 20, 20],
+            'width': [800, 60, 5, 30],
+            'height': [600, 18, 18, 18],
+        }
+        self.assertEqual(TesseractEngine()._words(data), [
+            {'text': 'Total', 'bbox': [10, 20, 60, 18], 'confidence': 91.5},
+        ])
+
+
+class FakeOCREngineTest(TestCase):
+    """Tests pour le moteur OCR simulé"""
+    
+    def test_fake_engine_is_registered_only_when_enabled(self):
+        """Test que le moteur simulé n'est disponible que si le setting est activé"""
+        with self.settings(OCR_FAKE_ENGINE_ENABLED=False):
+            with self.assertRaises(UnknownEngineError):
+                OCREngineFactory.get_engine('fake')
+        with self.settings(OCR_FAKE_ENGINE_ENABLED=True):
+            self.assertIsInstance(OCREngineFactory.get_engine('fake'), FakeOCREngine)
+    
+    def test_fake_engine_is_deterministic(self):
+        """Test que le texte dépend uniquement du contenu de l'image"""
+        with self.settings(OCR_FAKE_ENGINE_ENABLED=True, OCR_FAKE_ENGINE_CPU_MS=0):
+            engine = FakeOCREngine()
+            first = engine.extract_text(Image.new('RGB', (50, 50), color='white'))
+            second = engine.extract_text(Image.new('RGB', (50, 50), color='white'))
+            other = engine.extract_text(Image.new('RGB', (50, 50), color='black'))
+        
+        self.assertEqual(first, second)
+        self.assertNotEqual(first['text'], other['text'])
+        self.assertEqual(len(first['text'].split()), 200)
+    
+    def test_fake_engine_simulated_cpu_cost(self):
+        """Test que le coût CPU simulé est appliqué"""
+        with self.settings(OCR_FAKE_ENGINE_ENABLED=True, OCR_FAKE_ENGINE_CPU_MS=30):
+            engine = FakeOCREngine()
+            started = time.process_time()
+            engine.extract_text(Image.new('RGB', (10, 10)))
+        self.assertGreaterEqual(time.process_time() - started, 0.025)
@@ -0,0 +1,73 @@
+from django.conf import settings
+from typing import List
+
+
+class RegionValidator:
+    """
+    Validateur des zones OCR (formulaires à mise en page fixe)
+    
+    Une zone est nommée et placée sur une page par des coordonnées
+    relatives à la taille de la page (0 à 1) : elle reste valable quelle
+    que soit la résolution du scan ou du rendu PDF.
+    """
+    
+    COORDINATES = ('x', 'y', 'width', 'height')
+    # Tolérance d'arrondi des coordonnées (0.1 + 0.9 en flottants)
+    EPSILON = 1e-9
+    
+    def __init__(self):
+        self.max_regions = getattr(settings, 'OCR_MAX_REGIONS', 50)
+    
+    def normalize(self, regions) -> List[dict]:
+        """
+        Valide et normalise une liste de zones
+        
+        Args:
+            regions: Liste de dicts {name, page (défaut 1), x, y, width,
+                height, single_line (défaut False)}
+        
+        Returns:
+            Zones normalisées (ordre conservé)
+        
+        Raises:
+            ValueError: Zone invalide (message destiné au client)
+        """
+        if not isinstance(regions, list) or not regions:
+            raise ValueError("Les zones doivent être une liste non vide")
+        if len(regions) > self.max_regions:
+            raise ValueError(f"{self.max_regions} zones au maximum")
+        
+        normalized = []
+        names = set()
+        for index, region in enumerate(regions):
+            if not isinstance(region, dict):
+                raise ValueError(f"Zone {index + 1}: objet attendu")
+            name = region.get('name')
+            if not isinstance(name, str) or not name.strip() or len(name) > 100:
+                raise ValueError(f"Zone {index + 1}: nom obligatoire (100 caractères au maximum)")
+            name = name.strip()
+            if name in names:
+                raise ValueError(f"Zone '{name}' en double")
+            names.add(name)
+            
+            page = region.get('page', 1)
+            if isinstance(page, bool) or not isinstance(page, int) or page < 1:
+                raise ValueError(f"Zone '{name}': numéro de page invalide")
+            try:
+                x, y, width, height = (float(region[key]) for key in self.COORDINATES)
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"Zone '{name}': x, y, width et height sont obligatoires")
+            outside = x + width > 1 + self.EPSILON or y + height > 1 + self.EPSILON
+            if x < 0 or y < 0 or width <= 0 or height <= 0 or outside:
+                raise ValueError(f"Zone '{name}': coordonnées relatives à la page attendues (0 à 1)")
+            
+            normalized.append({
+                'name': name,
+                'page': page,
+                'x': x,
+                'y': y,
+                'width': width,
+                'height': height,
+                'single_line': bool(region.get('single_line', False)),
+            })
+        return normalized
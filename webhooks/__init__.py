@@ -0,0 +1,3 @@
+"""
+App webhooks : notification des fins de traitement OCR
+"""
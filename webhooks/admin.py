@@ -0,0 +1,18 @@
+from django.contrib import admin
+from webhooks.models import WebhookEndpoint, WebhookDelivery
+
+
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(admin.ModelAdmin):
+    list_display = ['url', 'user', 'is_active', 'consecutive_failures', 'last_success_at', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['url', 'user__username']
+    readonly_fields = ['consecutive_failures', 'last_success_at', 'created_at']
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    list_display = ['event', 'endpoint', 'status', 'attempts', 'response_status', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'event', 'created_at']
+    search_fields = ['endpoint__url']
+    readonly_fields = ['created_at', 'delivered_at']
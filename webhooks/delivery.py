@@ -0,0 +1,230 @@
+"""
+Envoi HTTP des notifications : signature HMAC et connexions réutilisées
+"""
+import hashlib
+import hmac
+import http.client
+import ipaddress
+import queue
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+from django.conf import settings
+
+SIGNATURE_HEADER = 'X-OCR-Signature'
+
+
+def sign_payload(secret: str, body: bytes, timestamp: Optional[int] = None) -> str:
+    """
+    Signature d'un lot : t=<horodatage>,v1=<HMAC-SHA256(secret, "<t>.<corps>")>
+
+    L'horodatage signé permet au destinataire de rejeter les rejeux.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(secret: str, body: bytes, header: str, tolerance: int = 300) -> bool:
+    """
+    Vérifie la signature d'un lot (côté destinataire)
+
+    Args:
+        secret: Secret du webhook
+        body: Corps brut de la requête
+        header: Valeur de l'en-tête X-OCR-Signature
+        tolerance: Ancienneté maximale de l'horodatage (secondes)
+    """
+    try:
+        parts = dict(item.split('=', 1) for item in header.split(','))
+        timestamp = int(parts['t'])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body, timestamp), header)
+
+
+class UnsafeWebhookURLError(ValueError):
+    """Hôte de webhook introuvable ou résolu vers une adresse non publique"""
+    pass
+
+
+def resolve_public_addresses(host: str, port: int) -> List[str]:
+    """
+    Résout l'hôte d'un webhook et vérifie que toutes ses adresses sont publiques
+
+    Un nom résolu vers le réseau local (services internes, 10/8,
+    169.254.169.254...) est refusé comme une adresse littérale.
+
+    Args:
+        host: Nom d'hôte ou adresse IP
+        port: Port de destination
+
+    Returns:
+        Adresses IP de l'hôte (la connexion utilise ces adresses, sans
+        nouvelle résolution)
+
+    Raises:
+        UnsafeWebhookURLError: Hôte introuvable ou adresse non publique
+    """
+    host = (host or '').lower().rstrip('.')
+    if not host or host == 'localhost' or host.endswith('.localhost'):
+        raise UnsafeWebhookURLError("Les adresses locales ne sont pas acceptées")
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except (socket.gaierror, UnicodeError):
+        raise UnsafeWebhookURLError(f"Hôte introuvable: {host}")
+    addresses = []
+    for info in infos:
+        # Adresse IPv6 avec zone (fe80::1%eth0) : la zone est ignorée
+        address = ipaddress.ip_address(info[4][0].split('%')[0])
+        if not address.is_global:
+            raise UnsafeWebhookURLError("Les adresses locales ne sont pas acceptées")
+        if str(address) not in addresses:
+            addresses.append(str(address))
+    if not addresses:
+        raise UnsafeWebhookURLError(f"Hôte introuvable: {host}")
+    return addresses
+
+
+class PinnedHTTPConnection(http.client.HTTPConnection):
+    """Connexion HTTP vers une adresse IP déjà vérifiée (en-tête Host inchangé)"""
+
+    def __init__(self, host, port, address, timeout):
+        super().__init__(host, port, timeout=timeout)
+        self.address = address
+
+    def connect(self):
+        self.sock = socket.create_connection((self.address, self.port), self.timeout, self.source_address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class PinnedHTTPSConnection(http.client.HTTPSConnection):
+    """Connexion HTTPS vers une adresse IP déjà vérifiée (SNI et certificat du nom d'hôte)"""
+
+    def __init__(self, host, port, address, timeout):
+        super().__init__(host, port, timeout=timeout)
+        self.address = address
+
+    def connect(self):
+        sock = socket.create_connection((self.address, self.port), self.timeout, self.source_address)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock = self._context.wrap_socket(sock, server_hostname=self.host)
+
+
+class ConnectionPool:
+    """
+    Connexions HTTP(S) persistantes par hôte (keep-alive)
+
+    Les lots successifs vers un même webhook réutilisent la connexion
+    TCP/TLS au lieu d'en ouvrir une par notification.
+    """
+
+    def __init__(self, maxsize: int = 4):
+        self.maxsize = maxsize
+        self._pools: Dict[Tuple[str, str, int], queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, key) -> queue.LifoQueue:
+        with self._lock:
+            if key not in self._pools:
+                self._pools[key] = queue.LifoQueue(maxsize=self.maxsize)
+            return self._pools[key]
+
+    def _new_connection(self, scheme: str, host: str, port: int, timeout: float):
+        if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+            if scheme == 'https':
+                return http.client.HTTPSConnection(host, port, timeout=timeout)
+            return http.client.HTTPConnection(host, port, timeout=timeout)
+        # Vérification à l'envoi et connexion à l'adresse vérifiée : un
+        # changement de DNS depuis l'enregistrement (rebinding) est sans effet
+        address = resolve_public_addresses(host, port)[0]
+        if scheme == 'https':
+            return PinnedHTTPSConnection(host, port, address, timeout)
+        return PinnedHTTPConnection(host, port, address, timeout)
+
+    def post(self, url: str, body: bytes, headers: Dict[str, str], timeout: float) -> Tuple[int, bytes]:
+        """
+        Envoie un POST en réutilisant une connexion du pool
+
+        Une connexion fermée par le serveur entre deux lots est rouverte une
+        fois ; les autres erreurs réseau sont propagées (OSError,
+        http.client.HTTPException), comme le refus d'un hôte non public
+        (UnsafeWebhookURLError).
+
+        Returns:
+            Tuple (code HTTP, corps de la réponse)
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        pool = self._pool(key)
+
+        for attempt in range(2):
+            try:
+                connection = pool.get_nowait()
+                reused = True
+            except queue.Empty:
+                connection = self._new_connection(scheme, parts.hostname, port, timeout)
+                reused = False
+            connection.timeout = timeout
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise
+            except Exception:
+                connection.close()
+                raise
+            if response.will_close:
+                connection.close()
+            else:
+                try:
+                    pool.put_nowait(connection)
+                except queue.Full:
+                    connection.close()
+            return response.status, content
+
+    def clear(self):
+        """Ferme toutes les connexions"""
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            while not pool.empty():
+                pool.get_nowait().close()
+
+
+_pool: Optional[ConnectionPool] = None
+
+
+def get_pool() -> ConnectionPool:
+    """Pool de connexions du processus"""
+    global _pool
+    if _pool is None:
+        _pool = ConnectionPool(maxsize=settings.WEBHOOK_POOL_SIZE)
+    return _pool
+
+
+def post_batch(url: str, secret: str, body: bytes, batch_id: str) -> Tuple[int, bytes]:
+    """
+    Envoie un lot signé à un webhook
+
+    Returns:
+        Tuple (code HTTP, corps de la réponse)
+    """
+    headers = {
+        'Content-Type': 'application/json',
+        'User-Agent': 'ocrtool-webhooks/1.0',
+        'X-OCR-Batch': batch_id,
+        SIGNATURE_HEADER: sign_payload(secret, body),
+    }
+    return get_pool().post(url, body, headers, timeout=settings.WEBHOOK_TIMEOUT)
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookEndpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('secret', models.CharField(editable=False, max_length=64, verbose_name='Secret de signature')),
+                ('events', models.JSONField(blank=True, default=list, help_text='Vide : tous les événements', verbose_name='Événements')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Actif')),
+                ('consecutive_failures', models.PositiveIntegerField(default=0, verbose_name='Échecs consécutifs')),
+                ('last_success_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernier envoi réussi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhook_endpoints', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Webhook',
+                'verbose_name_plural': 'Webhooks',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WebhookDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('document.completed', 'Document traité'), ('document.failed', 'Échec du traitement')], max_length=50, verbose_name='Événement')),
+                ('payload', models.JSONField(verbose_name='Contenu')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('delivered', 'Envoyée'), ('failed', 'Abandonnée')], default='pending', max_length=20, verbose_name='Statut')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Essais')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Prochain essai')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Dernière erreur')),
+                ('response_status', models.PositiveIntegerField(blank=True, null=True, verbose_name='Code HTTP de la réponse')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name="Date d'envoi")),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='webhooks.webhookendpoint', verbose_name='Webhook')),
+            ],
+            options={
+                'verbose_name': 'Notification webhook',
+                'verbose_name_plural': 'Notifications webhook',
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['endpoint', 'status', 'next_attempt_at'], name='webhooks_we_endpoin_0ec546_idx')],
+            },
+        ),
+    ]
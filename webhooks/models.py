@@ -0,0 +1,167 @@
+import secrets
+from django.db import models
+from django.contrib.auth.models import User
+from django.utils.translation import gettext_lazy as _
+
+
+class WebhookEndpoint(models.Model):
+    """
+    Abonnement d'un utilisateur aux fins de traitement de ses documents
+
+    Les notifications sont envoyées par lots (POST JSON) et signées par
+    HMAC-SHA256 avec le secret de l'abonnement (en-tête X-OCR-Signature).
+    Le secret est conservé en clair : il est nécessaire pour signer.
+    """
+
+    class Event(models.TextChoices):
+        DOCUMENT_COMPLETED = 'document.completed', _('Document traité')
+        DOCUMENT_FAILED = 'document.failed', _('Échec du traitement')
+
+    # Relation
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='webhook_endpoints',
+        verbose_name=_("Utilisateur")
+    )
+
+    # Destination
+    url = models.URLField(
+        max_length=500,
+        verbose_name=_("URL")
+    )
+    secret = models.CharField(
+        max_length=64,
+        editable=False,
+        verbose_name=_("Secret de signature")
+    )
+    events = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name=_("Événements"),
+        help_text=_("Vide : tous les événements")
+    )
+    is_active = models.BooleanField(
+        default=True,
+        verbose_name=_("Actif")
+    )
+
+    # Suivi des envois
+    consecutive_failures = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Échecs consécutifs")
+    )
+    last_success_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Dernier envoi réussi")
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+
+    class Meta:
+        verbose_name = _("Webhook")
+        verbose_name_plural = _("Webhooks")
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.url} ({self.user.username})"
+
+    @staticmethod
+    def generate_secret() -> str:
+        """Secret de signature aléatoire"""
+        return secrets.token_hex(32)
+
+    def save(self, *args, **kwargs):
+        if not self.secret:
+            self.secret = self.generate_secret()
+        super().save(*args, **kwargs)
+
+    def subscribes_to(self, event: str) -> bool:
+        """Vérifie que l'abonnement couvre l'événement"""
+        return not self.events or event in self.events
+
+
+class WebhookDelivery(models.Model):
+    """Notification à envoyer à un webhook (regroupée par lot à l'envoi)"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('En attente')
+        DELIVERED = 'delivered', _('Envoyée')
+        FAILED = 'failed', _('Abandonnée')
+
+    endpoint = models.ForeignKey(
+        WebhookEndpoint,
+        on_delete=models.CASCADE,
+        related_name='deliveries',
+        verbose_name=_("Webhook")
+    )
+    event = models.CharField(
+        max_length=50,
+        choices=WebhookEndpoint.Event.choices,
+        verbose_name=_("Événement")
+    )
+    payload = models.JSONField(
+        verbose_name=_("Contenu")
+    )
+
+    # Envoi
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name=_("Statut")
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Essais")
+    )
+    next_attempt_at = models.DateTimeField(
+        verbose_name=_("Prochain essai")
+    )
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+        verbose_name=_("Dernière erreur")
+    )
+    response_status = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_("Code HTTP de la réponse")
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Date de création")
+    )
+    delivered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Date d'envoi")
+    )
+
+    class Meta:
+        verbose_name = _("Notification webhook")
+        verbose_name_plural = _("Notifications webhook")
+        ordering = ['created_at']
+        indexes = [
+            # Lot suivant d'un webhook
+            models.Index(fields=['endpoint', 'status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} → {self.endpoint.url} ({self.status})"
+
+    def as_event(self) -> dict:
+        """Représentation envoyée dans le lot"""
+        return {
+            'id': self.pk,
+            'event': self.event,
+            'created_at': self.created_at.isoformat(),
+            'data': self.payload,
+        }
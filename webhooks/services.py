@@ -0,0 +1,114 @@
+"""
+Mise en file des notifications webhook
+"""
+import logging
+import random
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from .models import WebhookEndpoint, WebhookDelivery
+
+logger = logging.getLogger(__name__)
+
+
+def document_payload(document) -> dict:
+    """Contenu d'une notification de fin de traitement"""
+    return {
+        'document_id': document.pk,
+        'status': document.status,
+        'file_name': document.file_name,
+        'pages_count': document.pages_count,
+        'confidence_score': document.confidence_score,
+        'error_code': document.error_code,
+        'processed_at': document.processed_at.isoformat() if document.processed_at else None,
+    }
+
+
+def queue_document_event(document, event: str) -> int:
+    """
+    Met en file une notification pour les webhooks de l'utilisateur
+
+    Ne lève jamais d'exception : un webhook ne doit pas faire échouer
+    l'OCR. L'envoi est programmé après la validation de la transaction.
+
+    Args:
+        document: Document terminé ou en échec
+        event: Événement (WebhookEndpoint.Event)
+
+    Returns:
+        Nombre de notifications créées
+    """
+    try:
+        endpoints = [
+            endpoint for endpoint in
+            WebhookEndpoint.objects.filter(user_id=document.user_id, is_active=True)
+            if endpoint.subscribes_to(event)
+        ]
+        if not endpoints:
+            return 0
+        now = timezone.now()
+        payload = document_payload(document)
+        WebhookDelivery.objects.bulk_create([
+            WebhookDelivery(endpoint=endpoint, event=event, payload=payload, next_attempt_at=now)
+            for endpoint in endpoints
+        ])
+        for endpoint in endpoints:
+            transaction.on_commit(lambda endpoint_id=endpoint.pk: schedule_delivery(endpoint_id))
+        return len(endpoints)
+    except Exception:
+        logger.exception("Notification %s du document %s impossible", event, document.pk)
+        return 0
+
+
+def schedule_delivery(endpoint_id: int, countdown: float = None) -> bool:
+    """
+    Programme l'envoi du prochain lot d'un webhook
+
+    Un seul envoi est programmé par webhook et par fenêtre
+    (WEBHOOK_BATCH_WINDOW) : les fins de traitement proches sont
+    regroupées dans le même lot.
+
+    Args:
+        endpoint_id: ID du webhook
+        countdown: Délai avant l'envoi (défaut: WEBHOOK_BATCH_WINDOW)
+
+    Returns:
+        True si un envoi a été programmé
+    """
+    from .tasks import deliver_webhooks_task
+
+    countdown = settings.WEBHOOK_BATCH_WINDOW if countdown is None else countdown
+    # Verrou expirant avec l'envoi programmé (rattrapé par la tâche périodique sinon)
+    if not cache.add(schedule_cache_key(endpoint_id), 1, timeout=int(countdown) + 60):
+        return False
+    try:
+        deliver_webhooks_task.apply_async(
+            args=[endpoint_id],
+            countdown=countdown,
+            queue=settings.WEBHOOKS_QUEUE,
+        )
+    except Exception:
+        cache.delete(schedule_cache_key(endpoint_id))
+        logger.exception("Programmation des notifications du webhook %s impossible", endpoint_id)
+        return False
+    return True
+
+
+def schedule_cache_key(endpoint_id: int) -> str:
+    """Clé du verrou d'envoi programmé d'un webhook"""
+    return f"webhooks:scheduled:{endpoint_id}"
+
+
+def compute_backoff(attempts: int) -> float:
+    """
+    Délai avant un nouvel envoi : backoff exponentiel avec jitter
+
+    Args:
+        attempts: Nombre d'envois déjà tentés
+
+    Returns:
+        Délai en secondes
+    """
+    delay = min(settings.WEBHOOK_RETRY_BACKOFF_MAX, settings.WEBHOOK_RETRY_BACKOFF_BASE * (2 ** max(attempts - 1, 0)))
+    return delay / 2 + random.uniform(0, delay / 2)
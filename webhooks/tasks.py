@@ -0,0 +1,145 @@
+"""
+Tâches Celery d'envoi des notifications webhook (file WEBHOOKS_QUEUE)
+"""
+import http.client
+import json
+import logging
+import uuid
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .delivery import UnsafeWebhookURLError, post_batch
+from .models import WebhookEndpoint, WebhookDelivery
+from .services import compute_backoff, schedule_cache_key, schedule_delivery
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='webhooks.deliver')
+def deliver_webhooks_task(endpoint_id):
+    """
+    Envoie le lot de notifications dues d'un webhook
+
+    Jusqu'à WEBHOOK_BATCH_SIZE notifications sont envoyées dans un seul
+    POST signé. En cas d'échec (réseau ou code HTTP hors 2xx), le lot est
+    réessayé avec un backoff exponentiel ; après WEBHOOK_MAX_ATTEMPTS
+    essais, les notifications sont abandonnées. Le lot est réservé avant
+    l'envoi : une tâche programmée pendant un envoi lent ne le renvoie pas.
+
+    Args:
+        endpoint_id: ID du webhook
+
+    Returns:
+        Dict (delivered, failed, retry_in)
+    """
+    # Les notifications créées à partir d'ici programment un nouvel envoi
+    cache.delete(schedule_cache_key(endpoint_id))
+
+    endpoint = WebhookEndpoint.objects.filter(pk=endpoint_id, is_active=True).first()
+    if endpoint is None:
+        return {'delivered': 0, 'failed': 0, 'retry_in': None}
+
+    now = timezone.now()
+    with transaction.atomic():
+        due = endpoint.deliveries.select_for_update(skip_locked=True).filter(
+            status=WebhookDelivery.Status.PENDING,
+            next_attempt_at__lte=now,
+        )
+        batch = list(due.order_by('created_at')[:settings.WEBHOOK_BATCH_SIZE])
+        if batch:
+            # Réservation le temps de l'envoi (connexion, envoi et réponse
+            # bornés chacun par WEBHOOK_TIMEOUT) ; un worker perdu pendant
+            # l'envoi libère le lot à l'échéance
+            WebhookDelivery.objects.filter(pk__in=[delivery.pk for delivery in batch]).update(
+                next_attempt_at=now + timedelta(seconds=settings.WEBHOOK_TIMEOUT * 3)
+            )
+    if not batch:
+        _schedule_next(endpoint)
+        return {'delivered': 0, 'failed': 0, 'retry_in': None}
+
+    batch_id = uuid.uuid4().hex
+    body = json.dumps({
+        'batch_id': batch_id,
+        'deliveries': [delivery.as_event() for delivery in batch],
+    }).encode()
+
+    response_status = None
+    try:
+        response_status, _ = post_batch(endpoint.url, endpoint.secret, body, batch_id)
+        error = None if 200 <= response_status < 300 else f"HTTP {response_status}"
+    except (OSError, http.client.HTTPException, UnsafeWebhookURLError) as e:
+        error = f"{type(e).__name__}: {e}"
+
+    ids = [delivery.pk for delivery in batch]
+    if error is None:
+        WebhookDelivery.objects.filter(pk__in=ids).update(
+            status=WebhookDelivery.Status.DELIVERED,
+            attempts=F('attempts') + 1,
+            response_status=response_status,
+            last_error=None,
+            delivered_at=now,
+        )
+        WebhookEndpoint.objects.filter(pk=endpoint.pk).update(consecutive_failures=0, last_success_at=now)
+        _schedule_next(endpoint)
+        return {'delivered': len(ids), 'failed': 0, 'retry_in': None}
+
+    logger.warning("Envoi au webhook %s impossible (%s notifications): %s",
+                   endpoint.pk, len(ids), error)
+    WebhookEndpoint.objects.filter(pk=endpoint.pk).update(
+        consecutive_failures=F('consecutive_failures') + 1
+    )
+    # Un lot regroupe des notifications au même nombre d'essais ou presque :
+    # le plus avancé fixe le délai
+    attempts = max(delivery.attempts for delivery in batch) + 1
+    failed = 0
+    if attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        failed = WebhookDelivery.objects.filter(pk__in=ids).update(
+            status=WebhookDelivery.Status.FAILED,
+            attempts=F('attempts') + 1,
+            response_status=response_status,
+            last_error=error,
+        )
+        _schedule_next(endpoint)
+        return {'delivered': 0, 'failed': failed, 'retry_in': None}
+
+    retry_in = compute_backoff(attempts)
+    WebhookDelivery.objects.filter(pk__in=ids).update(
+        attempts=F('attempts') + 1,
+        response_status=response_status,
+        last_error=error,
+        next_attempt_at=now + timedelta(seconds=retry_in),
+    )
+    schedule_delivery(endpoint.pk, countdown=retry_in)
+    return {'delivered': 0, 'failed': 0, 'retry_in': retry_in}
+
+
+def _schedule_next(endpoint):
+    """Programme le lot suivant s'il reste des notifications en attente"""
+    pending = endpoint.deliveries.filter(status=WebhookDelivery.Status.PENDING).order_by('next_attempt_at')
+    next_attempt_at = pending.values_list('next_attempt_at', flat=True).first()
+    if next_attempt_at is not None:
+        countdown = max((next_attempt_at - timezone.now()).total_seconds(), 0)
+        schedule_delivery(endpoint.pk, countdown=countdown)
+
+
+@shared_task(name='webhooks.dispatch_due_deliveries')
+def dispatch_due_deliveries_task():
+    """
+    Programme l'envoi des notifications dues de tous les webhooks
+
+    Tâche périodique (Celery Beat) : filet de sécurité si un envoi
+    programmé a été perdu (broker, worker, cache vidé).
+
+    Returns:
+        Liste des IDs des webhooks programmés
+    """
+    endpoint_ids = WebhookDelivery.objects.filter(
+        status=WebhookDelivery.Status.PENDING,
+        next_attempt_at__lte=timezone.now(),
+        endpoint__is_active=True,
+    ).values_list('endpoint_id', flat=True).order_by().distinct()
+    return [endpoint_id for endpoint_id in endpoint_ids if schedule_delivery(endpoint_id, countdown=0)]
@@ -0,0 +1,255 @@
+"""
+Tests de l'app webhooks (envoi vers un récepteur HTTP local)
+"""
+import json
+import socket
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from documents.models import Document
+from webhooks.delivery import SIGNATURE_HEADER, sign_payload, verify_signature
+from webhooks.models import WebhookEndpoint, WebhookDelivery
+from webhooks.services import compute_backoff, queue_document_event
+from webhooks.tasks import deliver_webhooks_task, dispatch_due_deliveries_task
+
+
+class ReceiverStub:
+    """Récepteur de webhooks local (thread) : enregistre les requêtes reçues"""
+
+    def __init__(self, status=200):
+        self.status = status
+        self.requests = []
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append({
+                    'headers': dict(self.headers),
+                    'body': body,
+                    'client_port': self.client_address[1],
+                })
+                self.send_response(receiver.status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hooks"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SignatureTest(TestCase):
+    """Tests de la signature des lots"""
+
+    def test_signature_roundtrip(self):
+        body = b'{"deliveries": []}'
+        header = sign_payload('secret', body)
+        self.assertTrue(verify_signature('secret', body, header))
+        self.assertFalse(verify_signature('autre', body, header))
+        self.assertFalse(verify_signature('secret', body + b' ', header))
+
+    def test_old_signature_is_rejected(self):
+        body = b'{}'
+        header = sign_payload('secret', body, timestamp=int(time.time()) - 3600)
+        self.assertFalse(verify_signature('secret', body, header))
+        self.assertFalse(verify_signature('secret', body, 'invalide'))
+
+
+class WebhookDeliveryTest(TestCase):
+    """Tests de la mise en file et de l'envoi par lots"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='hookuser', password='testpass123')
+        self.endpoint = WebhookEndpoint.objects.create(user=self.user, url='http://127.0.0.1:9/hooks')
+
+    def _document(self, name='scan.png', status=Document.Status.COMPLETED):
+        return Document.objects.create(
+            user=self.user,
+            original_file=f'documents/{name}',
+            file_name=name,
+            file_size=10,
+            mime_type='image/png',
+            status=status,
+            processed_at=timezone.now(),
+        )
+
+    def _queue(self, document, event=WebhookEndpoint.Event.DOCUMENT_COMPLETED):
+        with patch('webhooks.tasks.deliver_webhooks_task.apply_async') as apply_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            queue_document_event(document, event)
+        return apply_async
+
+    def test_completions_are_batched(self):
+        """Test que deux fins de traitement proches partent dans un seul POST signé"""
+        first = self._queue(self._document('a.png'))
+        second = self._queue(self._document('b.png'))
+        first.assert_called_once()
+        second.assert_not_called()
+
+        with ReceiverStub() as receiver:
+            self.endpoint.url = receiver.url
+            self.endpoint.save()
+            result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertEqual(result['delivered'], 2)
+        self.assertEqual(len(receiver.requests), 1)
+        request = receiver.requests[0]
+        self.assertTrue(verify_signature(self.endpoint.secret, request['body'], request['headers'][SIGNATURE_HEADER]))
+        payload = json.loads(request['body'])
+        self.assertEqual([d['data']['file_name'] for d in payload['deliveries']], ['a.png', 'b.png'])
+        self.assertEqual(payload['deliveries'][0]['event'], 'document.completed')
+        self.assertFalse(self.endpoint.deliveries.exclude(status=WebhookDelivery.Status.DELIVERED).exists())
+
+    def test_connection_is_reused(self):
+        """Test que les lots successifs réutilisent la connexion persistante"""
+        with ReceiverStub() as receiver:
+            self.endpoint.url = receiver.url
+            self.endpoint.save()
+            for name in ('a.png', 'b.png'):
+                self._queue(self._document(name))
+                deliver_webhooks_task.apply(args=[self.endpoint.pk])
+
+        self.assertEqual(len(receiver.requests), 2)
+        self.assertEqual(receiver.requests[0]['client_port'], receiver.requests[1]['client_port'])
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test qu'une réponse 500 reprogramme le lot avec backoff"""
+        self._queue(self._document())
+        with ReceiverStub(status=500) as receiver:
+            self.endpoint.url = receiver.url
+            self.endpoint.save()
+            with patch('webhooks.tasks.deliver_webhooks_task.apply_async') as apply_async:
+                result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertGreater(result['retry_in'], 0)
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs['countdown'], result['retry_in'])
+        delivery = self.endpoint.deliveries.get()
+        self.assertEqual(delivery.status, WebhookDelivery.Status.PENDING)
+        self.assertEqual(delivery.attempts, 1)
+        self.assertEqual(delivery.response_status, 500)
+        self.assertGreater(delivery.next_attempt_at, timezone.now())
+        self.endpoint.refresh_from_db()
+        self.assertEqual(self.endpoint.consecutive_failures, 1)
+
+    def test_overlapping_deliveries_do_not_resend_the_batch(self):
+        """Test qu'un envoi programmé pendant un envoi lent n'envoie que les nouvelles notifications"""
+        self._queue(self._document('a.png'))
+        sent = []
+
+        def slow_post(url, secret, body, batch_id):
+            sent.append([d['data']['file_name'] for d in json.loads(body)['deliveries']])
+            if len(sent) == 1:
+                # Fin de traitement et second envoi pendant le premier POST
+                self._queue(self._document('b.png'))
+                deliver_webhooks_task.apply(args=[self.endpoint.pk])
+            return 200, b''
+
+        with patch('webhooks.tasks.post_batch', side_effect=slow_post), \
+                patch('webhooks.tasks.deliver_webhooks_task.apply_async'):
+            result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertEqual(result['delivered'], 1)
+        self.assertEqual(sent, [['a.png'], ['b.png']])
+        self.assertEqual(
+            set(self.endpoint.deliveries.values_list('status', 'attempts')),
+            {(WebhookDelivery.Status.DELIVERED, 1)}
+        )
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_delivery_is_abandoned_after_max_attempts(self):
+        """Test que les notifications sont abandonnées après le dernier essai"""
+        self._queue(self._document())
+        # Destination injoignable (port 9 fermé)
+        self.endpoint.deliveries.update(attempts=1)
+        result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertEqual(result['failed'], 1)
+        delivery = self.endpoint.deliveries.get()
+        self.assertEqual(delivery.status, WebhookDelivery.Status.FAILED)
+        self.assertEqual(delivery.attempts, 2)
+        self.assertTrue(delivery.last_error)
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_URLS=False)
+    def test_private_address_is_refused_at_delivery(self):
+        """Test qu'un nom résolu vers le réseau local au moment de l'envoi est refusé (rebinding)"""
+        self._queue(self._document())
+        with ReceiverStub() as receiver, \
+                patch('webhooks.delivery.socket.getaddrinfo',
+                      return_value=[(2, 1, 6, '', ('127.0.0.1', receiver.server.server_address[1]))]), \
+                patch('webhooks.tasks.deliver_webhooks_task.apply_async'):
+            self.endpoint.url = f"http://hooks.example.com:{receiver.server.server_address[1]}/hooks"
+            self.endpoint.save()
+            result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertGreater(result['retry_in'], 0)
+        self.assertEqual(receiver.requests, [])
+        self.assertIn('UnsafeWebhookURLError', self.endpoint.deliveries.get().last_error)
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_URLS=False)
+    def test_connection_uses_the_checked_address(self):
+        """Test que la connexion vise l'adresse vérifiée, sans nouvelle résolution du nom"""
+        self._queue(self._document())
+        getaddrinfo = socket.getaddrinfo
+
+        def resolve_literal_only(host, *args, **kwargs):
+            self.assertNotEqual(host, 'hooks.example.com')
+            return getaddrinfo(host, *args, **kwargs)
+
+        with ReceiverStub() as receiver, \
+                patch('webhooks.delivery.resolve_public_addresses', return_value=['127.0.0.1']) as resolve, \
+                patch('webhooks.delivery.socket.getaddrinfo', side_effect=resolve_literal_only):
+            port = receiver.server.server_address[1]
+            self.endpoint.url = f"http://hooks.example.com:{port}/hooks"
+            self.endpoint.save()
+            result = deliver_webhooks_task.apply(args=[self.endpoint.pk]).get()
+
+        self.assertEqual(result['delivered'], 1)
+        resolve.assert_called_once_with('hooks.example.com', port)
+        self.assertEqual(receiver.requests[0]['headers']['Host'], f'hooks.example.com:{port}')
+
+    def test_subscription_filters_events(self):
+        """Test que seuls les événements souscrits sont mis en file"""
+        self.endpoint.events = [WebhookEndpoint.Event.DOCUMENT_FAILED]
+        self.endpoint.save()
+        WebhookEndpoint.objects.create(user=self.user, url='http://127.0.0.1:9/other', is_active=False)
+
+        self._queue(self._document())
+        self._queue(self._document(status=Document.Status.FAILED), WebhookEndpoint.Event.DOCUMENT_FAILED)
+
+        self.assertEqual(WebhookDelivery.objects.count(), 1)
+        self.assertEqual(WebhookDelivery.objects.get().event, WebhookEndpoint.Event.DOCUMENT_FAILED)
+
+    def test_due_deliveries_are_dispatched(self):
+        """Test que la tâche périodique reprogramme les notifications dues"""
+        self._queue(self._document())
+        cache.clear()
+        self.endpoint.deliveries.update(next_attempt_at=timezone.now() - timedelta(minutes=1))
+        with patch('webhooks.tasks.deliver_webhooks_task.apply_async') as apply_async:
+            self.assertEqual(dispatch_due_deliveries_task(), [self.endpoint.pk])
+        apply_async.assert_called_once()
+
+    def test_backoff_is_bounded(self):
+        with self.settings(WEBHOOK_RETRY_BACKOFF_BASE=30, WEBHOOK_RETRY_BACKOFF_MAX=3600):
+            self.assertTrue(15 <= compute_backoff(1) <= 30)
+            self.assertTrue(1800 <= compute_backoff(20) <= 3600)